@@ -1,92 +1,75 @@
-import yaml
-import inspect
-import importlib.util
-import sys
-
-# ==========================================
-# CONFIGURACIÓN
-# ==========================================
-ARCHIVO_OPENAPI = "openapi.yaml"
-ARCHIVO_CLIENTE = "cliente_ecomarket.py"
-MODULO_CLIENTE = "cliente_ecomarket"
-
-# Mapeo manual: Endpoint OpenAPI -> Tu función Python
-# (Esto conecta el contrato con tu código)
-MAPEO_FUNCIONES = {
-    "listar_productos": "listar_productos",
-    "crear_producto": "crear_producto",
-    "obtener_producto": "obtener_producto",
-    "actualizar_producto_parcial": "actualizar_producto_parcial",
-    "eliminar_producto": "eliminar_producto"
-}
-
-def cargar_cliente():
-    """Carga tu archivo cliente_ecomarket.py dinámicamente"""
-    try:
-        spec = importlib.util.spec_from_file_location(MODULO_CLIENTE, ARCHIVO_CLIENTE)
-        modulo = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(modulo)
-        return modulo
-    except FileNotFoundError:
-        print(f"❌ Error: No se encuentra el archivo {ARCHIVO_CLIENTE}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error al importar tu cliente: {e}")
-        sys.exit(1)
-
-def auditar():
-    print(f"--- 🕵️ INICIANDO AUDITORÍA DE CONTRATO ({ARCHIVO_OPENAPI}) ---")
-    
-    # 1. Cargar Contrato
-    try:
-        with open(ARCHIVO_OPENAPI, 'r') as f:
-            contrato = yaml.safe_load(f)
-    except FileNotFoundError:
-        print(f"❌ Error: Falta el archivo {ARCHIVO_OPENAPI}")
-        return
-
-    # 2. Cargar Cliente
-    cliente = cargar_cliente()
-    funciones_cliente = dict(inspect.getmembers(cliente, inspect.isfunction))
-
-    total_checks = 0
-    total_passed = 0
-
-    print(f"\n{'MÉTODO':<8} {'ENDPOINT':<25} {'FUNCIÓN ESPERADA':<30} {'ESTADO'}")
-    print("-" * 80)
-
-    # 3. Recorrer el contrato y validar
-    paths = contrato.get('paths', {})
-    for path, methods in paths.items():
-        for method, specs in methods.items():
-            operation_id = specs.get('operationId')
-            nombre_funcion = MAPEO_FUNCIONES.get(operation_id)
-            
-            method_str = method.upper()
-            
-            if not nombre_funcion:
-                print(f"{method_str:<8} {path:<25} {'(No mapeada)':<30} ⚠️ SKIP")
-                continue
-
-            total_checks += 1
-            
-            # VERIFICACIÓN: ¿Existe la función en tu archivo?
-            if nombre_funcion in funciones_cliente:
-                print(f"{method_str:<8} {path:<25} {nombre_funcion:<30} ✅ CUMPLE")
-                total_passed += 1
-            else:
-                print(f"{method_str:<8} {path:<25} {nombre_funcion:<30} ❌ FALTANTE")
-
-    print("-" * 80)
-    
-    # 4. Resultado Final
-    score = (total_passed / total_checks) * 100 if total_checks > 0 else 0
-    print(f"\n📊 RESULTADO FINAL: {score:.0f}% de Conformidad")
-    
-    if score == 100:
-        print("🎉 ¡Excelente! Tu cliente cumple con la estructura del contrato OpenAPI.")
-    else:
-        print("⚠️ Hay funciones faltantes o mal nombradas. Revisa la tabla anterior.")
-
-if __name__ == "__main__":
-    auditar()
\ No newline at end of file
+import importlib.util
+import re
+import sys
+
+from generar_cliente import RUTA_CONTRATO, RUTA_GENERADO, desactualizado, hash_contrato
+
+# ==========================================
+# CONFIGURACIÓN
+# ==========================================
+# El cliente del contrato (cliente_contrato.py) se genera desde el YAML con
+# generar_cliente.py y guarda el sha256 del contrato del que salió. Auditar
+# es comparar ese hash con el del contrato actual: si coinciden, cada
+# operación del contrato tiene su método por construcción y no hace falta
+# mapear nombres a mano. Si difieren, hay deriva y hay que regenerar.
+ARCHIVO_OPENAPI = RUTA_CONTRATO
+ARCHIVO_CLIENTE = RUTA_GENERADO
+
+def hash_generado(archivo: str = ARCHIVO_CLIENTE):
+    """HASH_CONTRATO del archivo generado, leído sin importarlo (None si no existe o no lo tiene)."""
+    try:
+        with open(archivo, encoding="utf-8") as f:
+            encontrado = re.search(r"^HASH_CONTRATO = '([0-9a-f]{64})'$", f.read(), re.MULTILINE)
+    except FileNotFoundError:
+        return None
+    return encontrado.group(1) if encontrado else None
+
+def cargar_cliente(archivo: str = ARCHIVO_CLIENTE):
+    """Importa el módulo generado desde su ruta"""
+    spec = importlib.util.spec_from_file_location("cliente_contrato", archivo)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+def auditar(contrato: str = ARCHIVO_OPENAPI, archivo: str = ARCHIVO_CLIENTE, estricto: bool = False) -> bool:
+    """
+    Devuelve True si el cliente generado corresponde al contrato.
+    Con estricto=True además regenera en memoria y compara el código completo
+    (detecta ediciones a mano del archivo generado; necesita yaml).
+    """
+    print(f"--- 🕵️ INICIANDO AUDITORÍA DE CONTRATO ({contrato}) ---")
+
+    try:
+        esperado = hash_contrato(contrato)
+    except FileNotFoundError:
+        print(f"❌ Error: Falta el archivo {contrato}")
+        return False
+
+    encontrado = hash_generado(archivo)
+    if encontrado is None:
+        print(f"❌ {archivo} no existe o no es un archivo generado. Ejecuta: python generar_cliente.py")
+        return False
+
+    # 1. Operaciones del cliente generado (informativo: salen del mismo contrato)
+    operaciones = cargar_cliente(archivo).OPERACIONES
+    print(f"\n{'MÉTODO':<8} {'ENDPOINT':<28} {'FUNCIÓN GENERADA'}")
+    print("-" * 80)
+    for metodo, plantilla, nombre in operaciones:
+        print(f"{metodo:<8} {plantilla:<28} {nombre}")
+    print("-" * 80)
+
+    # 2. Deriva: hash del contrato actual vs. hash con el que se generó
+    print(f"\nContrato actual:  {esperado}")
+    print(f"Cliente generado: {encontrado}")
+    ok = esperado == encontrado
+    if ok and estricto and desactualizado(contrato, archivo):
+        print("\n❌ El hash coincide pero el código no: el archivo generado se editó a mano.")
+        ok = False
+    elif ok:
+        print(f"\n🎉 Sin deriva: las {len(operaciones)} operaciones del contrato tienen su método generado.")
+    else:
+        print("\n❌ DERIVA: el contrato cambió después de generar el cliente. Ejecuta: python generar_cliente.py")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if auditar(estricto="--estricto" in sys.argv) else 1)
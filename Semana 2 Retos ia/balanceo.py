@@ -0,0 +1,237 @@
+import itertools
+import math
+import random
+import threading
+import time
+
+from carga_perezosa import importar_perezoso
+
+requests = importar_perezoso("requests")
+
+# ==========================================
+# BALANCEO DE CARGA ENTRE RÉPLICAS (DEL LADO DEL CLIENTE)
+# ==========================================
+# En vez de un proxy delante de la API, el cliente recibe la lista de
+# réplicas y elige una para cada petición. Para quien llama sigue siendo un
+# solo endpoint: mismos métodos y mismas excepciones.
+#
+# Estrategias (intercambiables, por nombre o instancia):
+#   - "round_robin": una réplica tras otra.
+#   - "menos_pendientes": la que tiene menos peticiones en vuelo.
+#   - "peak_ewma": la de menor latencia esperada, calculada como EWMA de la
+#     latencia (que salta de golpe al valor de un pico y baja de a poco) por
+#     las peticiones en vuelo + 1. Una réplica lenta o atascada deja de
+#     recibir tráfico enseguida.
+# Las dos últimas comparan dos réplicas al azar ("power of two choices"):
+# casi tan bueno como mirar todas, sin que todos los hilos elijan la misma.
+#
+# Chequeo pasivo de salud: 'umbral_fallos' errores de conexión o 5xx
+# seguidos expulsan la réplica por 'enfriamiento' segundos. Al volver, un
+# solo fallo más la expulsa de nuevo. Si todas están expulsadas se usan
+# igual (mejor intentar que fallar sin llamar).
+#
+# Uso:
+#   cliente = EcoMarketClient(["http://api-1:8080", "http://api-2:8080"])
+#   cliente = EcoMarketClient(Balanceador(urls, estrategia="round_robin", enfriamiento=30))
+
+# Un error de conexión en estos métodos se reintenta en otra réplica: repetirlos no duplica efectos
+METODOS_IDEMPOTENTES = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+class Replica:
+    """Estado de una réplica, modificado solo por el Balanceador (bajo su lock)."""
+
+    __slots__ = ("url", "en_vuelo", "ewma", "ultima_medicion", "fallos_seguidos",
+                 "expulsada_hasta", "peticiones", "fallos", "expulsiones")
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.en_vuelo = 0
+        self.ewma = 0.0  # Segundos; 0 = sin medir todavía (se prueba primero)
+        self.ultima_medicion = None
+        self.fallos_seguidos = 0
+        self.expulsada_hasta = None
+        self.peticiones = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def disponible(self, ahora: float) -> bool:
+        return self.expulsada_hasta is None or ahora >= self.expulsada_hasta
+
+# ==========================================
+# ESTRATEGIAS
+# ==========================================
+class RoundRobin:
+    nombre = "round_robin"
+
+    def __init__(self):
+        self._contador = itertools.count()
+
+    def elegir(self, candidatas: list, azar: random.Random) -> Replica:
+        return candidatas[next(self._contador) % len(candidatas)]
+
+class MenosPendientes:
+    nombre = "menos_pendientes"
+
+    def costo(self, replica: Replica) -> float:
+        return replica.en_vuelo
+
+    def elegir(self, candidatas: list, azar: random.Random) -> Replica:
+        if len(candidatas) == 1:
+            return candidatas[0]
+        a, b = azar.sample(candidatas, 2)
+        return a if self.costo(a) <= self.costo(b) else b
+
+class PeakEWMA(MenosPendientes):
+    nombre = "peak_ewma"
+
+    def costo(self, replica: Replica) -> float:
+        return replica.ewma * (replica.en_vuelo + 1)
+
+ESTRATEGIAS = {estrategia.nombre: estrategia for estrategia in (RoundRobin, MenosPendientes, PeakEWMA)}
+
+# ==========================================
+# BALANCEADOR
+# ==========================================
+class Balanceador:
+    """Reparte las peticiones entre réplicas y expulsa las que fallan."""
+
+    def __init__(self, urls, estrategia="peak_ewma", umbral_fallos: int = 3, enfriamiento: float = 10.0,
+                 decaimiento: float = 10.0, reloj=time.monotonic, azar: random.Random = None):
+        """
+        Args:
+            urls (list): URLs base de las réplicas.
+            estrategia (str|objeto con elegir()): "round_robin", "menos_pendientes" o "peak_ewma".
+            umbral_fallos (int): Fallos seguidos (conexión o 5xx) que expulsan la réplica.
+            enfriamiento (float): Segundos que la réplica queda fuera.
+            decaimiento (float): Segundos en que la EWMA "olvida" un pico (constante de tiempo).
+        """
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls:
+            raise ValueError("El balanceador necesita al menos una URL")
+        if isinstance(estrategia, str):
+            if estrategia not in ESTRATEGIAS:
+                raise ValueError(f"Estrategia '{estrategia}' no válida. Opciones: {sorted(ESTRATEGIAS)}")
+            estrategia = ESTRATEGIAS[estrategia]()
+        self.replicas = [Replica(url) for url in urls]
+        self.estrategia = estrategia
+        self.umbral_fallos = umbral_fallos
+        self.enfriamiento = enfriamiento
+        self.decaimiento = decaimiento
+        self.reloj = reloj
+        self.azar = azar or random.Random()
+        self._lock = threading.Lock()
+
+    def elegir(self, excluir=()) -> Replica:
+        """Elige réplica para una petición (y la cuenta en vuelo hasta liberar())."""
+        with self._lock:
+            ahora = self.reloj()
+            candidatas = [r for r in self.replicas if r not in excluir] or self.replicas
+            sanas = [r for r in candidatas if r.disponible(ahora)]
+            replica = self.estrategia.elegir(sanas or candidatas, self.azar)
+            replica.en_vuelo += 1
+            replica.peticiones += 1
+            return replica
+
+    def liberar(self, replica: Replica, latencia: float, fallo: bool = False):
+        """Registra el resultado de una petición a 'replica'."""
+        with self._lock:
+            ahora = self.reloj()
+            replica.en_vuelo -= 1
+            if replica.expulsada_hasta is not None and ahora >= replica.expulsada_hasta:
+                # Vuelve a prueba: un fallo más y sale otra vez
+                replica.expulsada_hasta = None
+                replica.fallos_seguidos = self.umbral_fallos - 1
+            if fallo:
+                replica.fallos += 1
+                replica.fallos_seguidos += 1
+                if replica.fallos_seguidos >= self.umbral_fallos and replica.expulsada_hasta is None:
+                    replica.expulsada_hasta = ahora + self.enfriamiento
+                    replica.expulsiones += 1
+                return
+            replica.fallos_seguidos = 0
+            self._actualizar_ewma(replica, latencia, ahora)
+
+    def _actualizar_ewma(self, replica: Replica, latencia: float, ahora: float):
+        if replica.ultima_medicion is None or latencia > replica.ewma:
+            replica.ewma = latencia  # Pico: se toma entero
+        else:
+            peso = math.exp(-(ahora - replica.ultima_medicion) / self.decaimiento)
+            replica.ewma = replica.ewma * peso + latencia * (1 - peso)
+        replica.ultima_medicion = ahora
+
+    def ejecutar(self, metodo: str, funcion):
+        """
+        Llama a funcion(url_base) con la réplica elegida y registra el
+        resultado. Un error de conexión en un método idempotente se reintenta
+        en otra réplica; si no quedan, se relanza el último.
+        """
+        probadas = []
+        while True:
+            replica = self.elegir(excluir=probadas)
+            inicio = self.reloj()
+            try:
+                response = funcion(replica.url)
+            except requests.exceptions.ConnectionError:
+                self.liberar(replica, self.reloj() - inicio, fallo=True)
+                probadas.append(replica)
+                if metodo in METODOS_IDEMPOTENTES and len(probadas) < len(self.replicas):
+                    continue
+                raise
+            except requests.exceptions.Timeout:
+                self.liberar(replica, self.reloj() - inicio, fallo=True)
+                raise
+            except BaseException:
+                self.liberar(replica, self.reloj() - inicio)
+                raise
+            self.liberar(replica, self.reloj() - inicio, fallo=response.status_code >= 500)
+            return response
+
+    def estadisticas(self) -> dict:
+        """{url: {'peticiones': ..., 'en_vuelo': ..., 'ewma_ms': ..., 'expulsada': ...}}"""
+        with self._lock:
+            ahora = self.reloj()
+            return {
+                r.url: {
+                    "peticiones": r.peticiones,
+                    "en_vuelo": r.en_vuelo,
+                    "fallos": r.fallos,
+                    "ewma_ms": r.ewma * 1000,
+                    "expulsada": not r.disponible(ahora),
+                    "expulsiones": r.expulsiones,
+                }
+                for r in self.replicas
+            }
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    from cliente_ecomarket import EcoMarketClient
+    from servidor_local import Inyeccion, ServidorEcoMarket
+
+    print("--- ⚖️ BALANCEO ENTRE 3 RÉPLICAS (una lenta, una que se cae) ---\n")
+    rapida = ServidorEcoMarket(inyeccion=Inyeccion(latencia="fija:2"))
+    lenta = ServidorEcoMarket(inyeccion=Inyeccion(latencia="fija:20"))
+    inestable = ServidorEcoMarket(inyeccion=Inyeccion(latencia="fija:2", tasa_503=0.5))
+    urls = [rapida.iniciar(), lenta.iniciar(), inestable.iniciar()]
+    try:
+        for estrategia in ESTRATEGIAS:
+            balanceador = Balanceador(urls, estrategia=estrategia, enfriamiento=0.5, azar=random.Random(1))
+            with EcoMarketClient(balanceador) as cliente:
+                def leer(i):
+                    try:
+                        cliente.obtener_producto(i % 50 + 1)
+                        return True
+                    except Exception:
+                        return False
+
+                inicio = time.perf_counter()
+                with ThreadPoolExecutor(8) as executor:
+                    exitos = sum(executor.map(leer, range(800)))
+                duracion = time.perf_counter() - inicio
+            reparto = " / ".join(f"{s['peticiones']:>3}" for s in balanceador.estadisticas().values())
+            print(f"{estrategia:<17} {800 / duracion:7.0f} pet/s   ok {exitos}/800   "
+                  f"reparto rápida/lenta/inestable: {reparto}")
+    finally:
+        for servidor in (rapida, lenta, inestable):
+            servidor.detener()
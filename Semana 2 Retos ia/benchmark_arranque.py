@@ -0,0 +1,116 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# ==========================================
+# BENCHMARK DE ARRANQUE (python -X importtime)
+# ==========================================
+# Mide cuánto cuesta importar cada módulo de entrada en un intérprete nuevo,
+# que es lo que pagan los jobs de CLI y los handlers serverless en cada
+# arranque en frío. Cada medición es un subproceso con -X importtime; se toma
+# el tiempo acumulado del módulo (incluye todo lo que importa) y la mediana
+# de varias corridas.
+#
+# Dos controles de regresión:
+#   - PESADOS: dependencias que ningún módulo debe cargar al importarse
+#     (deben quedar para el primer uso). No depende de la máquina.
+#   - UMBRALES_MS: tope de milisegundos por módulo, con margen para máquinas
+#     lentas; --factor lo escala.
+#
+#   python benchmark_arranque.py              # Tabla + controles (sale con 1 si falla)
+#   python benchmark_arranque.py --factor 2   # Umbrales al doble (CI compartida)
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+PESADOS = ("requests", "urllib3", "pydantic", "pydantic_core", "jsonschema", "yaml", "numpy", "orjson", "msgspec")
+
+# Medido en la máquina de desarrollo (Python 3.11, .pyc al día) y multiplicado
+# por ~2. cliente_async incluye asyncio (~80 ms), inevitable en ese camino.
+# Antes de la carga perezosa: cliente_ecomarket ~170 ms, comparacion ~340 ms.
+UMBRALES_MS = {
+    "cliente_ecomarket": 60,
+    "cliente_contrato": 60,
+    "cliente_async": 220,
+    "comparacion_validacion": 25,
+    "validadores": 20,
+    "auditar_contrato": 30,
+}
+
+_LINEA = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def parsear_importtime(texto: str) -> list:
+    """
+    Líneas de -X importtime como [(modulo, propio_us, acumulado_us, nivel)].
+    nivel 0 = importado directamente por el código; 1 = por uno de nivel 0, etc.
+    """
+    filas = []
+    for linea in texto.splitlines():
+        encontrada = _LINEA.match(linea)
+        if encontrada:
+            propio, acumulado, sangria, modulo = encontrada.groups()
+            filas.append((modulo, int(propio), int(acumulado), (len(sangria) - 1) // 2))
+    return filas
+
+def medir_una_vez(modulo: str) -> list:
+    # Sin PYTHONDONTWRITEBYTECODE: en producción los módulos se cargan desde
+    # los .pyc, y medir la compilación de cada .py no diría nada del arranque
+    entorno = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                            capture_output=True, text=True, cwd=DIRECTORIO, env=entorno, check=True)
+    return parsear_importtime(salida.stderr)
+
+def medir_arranque(modulo: str, repeticiones: int = 7) -> dict:
+    """
+    Importa 'modulo' en 'repeticiones' intérpretes nuevos (más uno de
+    calentamiento, que escribe los .pyc) y resume el costo.
+    """
+    medir_una_vez(modulo)
+    acumulados, filas = [], []
+    for _ in range(repeticiones):
+        filas = medir_una_vez(modulo)
+        acumulados.append(next(acumulado for nombre, _, acumulado, nivel in filas if nombre == modulo and nivel == 0))
+    # Lo que arrastró el módulo: todo lo que aparece después de 'site'
+    inicio = max(i for i, fila in enumerate(filas) if fila[0] == "site" and fila[3] == 0) + 1
+    propias = filas[inicio:]
+    return {
+        "modulo": modulo,
+        "mediana_ms": statistics.median(acumulados) / 1000,
+        "min_ms": min(acumulados) / 1000,
+        "pesados": sorted({nombre.split(".")[0] for nombre, *_ in propias} & set(PESADOS)),
+        "mas_costosos": [(nombre, propio / 1000) for nombre, propio, _, _ in
+                         sorted(propias, key=lambda fila: fila[1], reverse=True)[:5]],
+    }
+
+def problemas(resultado: dict, factor: float = 1.0) -> list:
+    """Motivos por los que el resultado es una regresión (lista vacía = OK)."""
+    encontrados = [f"importa {nombre} al arrancar" for nombre in resultado["pesados"]]
+    umbral = UMBRALES_MS.get(resultado["modulo"])
+    if umbral is not None and resultado["mediana_ms"] > umbral * factor:
+        encontrados.append(f"{resultado['mediana_ms']:.1f} ms > umbral {umbral * factor:.0f} ms")
+    return encontrados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Costo de importación de los módulos de EcoMarket")
+    parser.add_argument("modulos", nargs="*", default=list(UMBRALES_MS))
+    parser.add_argument("--repeticiones", type=int, default=7)
+    parser.add_argument("--factor", type=float, default=1.0, help="Multiplica los umbrales de tiempo")
+    args = parser.parse_args()
+
+    print(f"--- 🚀 BENCHMARK DE ARRANQUE ({args.repeticiones} intérpretes por módulo) ---\n")
+    print(f"{'módulo':<24} {'mediana':>9} {'mínimo':>9}  más costosos (propio)")
+    fallas = 0
+    for modulo in args.modulos:
+        resultado = medir_arranque(modulo, args.repeticiones)
+        costosos = ", ".join(f"{nombre} {ms:.1f}" for nombre, ms in resultado["mas_costosos"][:3])
+        print(f"{modulo:<24} {resultado['mediana_ms']:>7.1f}ms {resultado['min_ms']:>7.1f}ms  {costosos}")
+        for problema in problemas(resultado, args.factor):
+            print(f"   ❌ {problema}")
+            fallas += 1
+
+    if fallas:
+        print(f"\n❌ {fallas} regresión(es) de arranque")
+        sys.exit(1)
+    print("\n✅ Sin dependencias pesadas al importar y todos bajo su umbral")
@@ -0,0 +1,78 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+import requests
+
+from benchmark_streaming import producto_fixture
+from codec_json import codecs_disponibles, obtener_codec
+from modelos import Producto
+
+# ==========================================
+# FIXTURE: cuerpo de listar_productos con N productos
+# ==========================================
+def catalogo_en_bytes(total: int) -> bytes:
+    return obtener_codec("json").codificar([producto_fixture(i) for i in range(total)])
+
+def respuesta_http(cuerpo: bytes) -> requests.Response:
+    """Respuesta como la que arma requests (sin charset: response.json() adivina el encoding)."""
+    response = requests.Response()
+    response._content = cuerpo
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+# ==========================================
+# ⏱️ TIEMPO Y PICO DE MEMORIA
+# ==========================================
+def medir(funcion, repeticiones: int) -> tuple:
+    """(mejor tiempo en ms, pico de memoria en MiB) de funcion()."""
+    funcion()  # Calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    # La memoria se mide aparte: tracemalloc agrega costo a cada asignación
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return min(tiempos) * 1000, pico / 2**20
+
+def correr_benchmark(total: int = 100_000, repeticiones: int = 5) -> dict:
+    cuerpo = catalogo_en_bytes(total)
+    response = respuesta_http(cuerpo)
+    datos = obtener_codec("json").decodificar(cuerpo)
+    print(f"--- 🏁 BENCHMARK DE CODECS JSON ({total} productos, {len(cuerpo) / 2**20:.1f} MiB) ---")
+    print(f"{'caso':<36} {'tiempo':>10} {'pico':>11}")
+
+    casos = [("response.json() (antes)", response.json)]
+    for nombre in codecs_disponibles():
+        codec = obtener_codec(nombre)
+        casos += [
+            (f"{nombre}.decodificar(bytes)", lambda c=codec: c.decodificar(cuerpo)),
+            (f"{nombre}.decodificar_como(Producto)", lambda c=codec: c.decodificar_como(cuerpo, Producto)),
+            (f"{nombre}.codificar(lista)", lambda c=codec: c.codificar(datos)),
+        ]
+    resultados = {}
+    for nombre, funcion in casos:
+        milisegundos, pico = medir(funcion, repeticiones)
+        resultados[nombre] = {"ms": milisegundos, "pico_mib": pico}
+        print(f"{nombre:<36} {milisegundos:>7.1f} ms {pico:>7.1f} MiB")
+
+    base = resultados["response.json() (antes)"]["ms"]
+    mejor = min((r["ms"], n) for n, r in resultados.items() if n.endswith("decodificar(bytes)"))
+    print(f"\n✅ {mejor[1]} es {base / mejor[0]:.1f}x más rápido que response.json()")
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo y memoria de decodificar listar_productos por codec")
+    parser.add_argument("--total", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+    correr_benchmark(args.total, args.repeticiones)
@@ -0,0 +1,113 @@
+import argparse
+import time
+
+from benchmark_codec import catalogo_en_bytes
+from cliente_ecomarket import EcoMarketClient
+from compresion import PoliticaCompresion, compresores_disponibles, obtener_compresor
+from servidor_local import ServidorEcoMarket
+
+# ==========================================
+# BENCHMARK DE COMPRESIÓN DEL TRANSPORTE
+# ==========================================
+# Tres mediciones:
+#   1. Cada codificación sobre el cuerpo de listar_productos: tamaño, ratio y
+#      CPU para comprimir (servidor) y descomprimir entero o por bloques (cliente).
+#   2. listar_productos e iter_productos contra servidor_local.py con cada
+#      Accept-Encoding: bytes en el cable, tiempo y CPU del proceso (servidor
+#      y cliente corren en el mismo). En localhost la red es gratis, así que
+#      también se estima cuánto tardarían esos bytes a --mbps.
+#   3. Lote de creaciones con cuerpos grandes, con y sin compresión de cuerpos.
+#
+#   python benchmark_compresion.py --productos 20000 --mbps 50
+
+def mejor_tiempo(funcion, repeticiones: int) -> tuple:
+    """(mejor tiempo de reloj, mejor tiempo de CPU) en ms de funcion()."""
+    funcion()  # Calentamiento
+    reloj, cpu = [], []
+    for _ in range(repeticiones):
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        funcion()
+        reloj.append(time.perf_counter() - inicio)
+        cpu.append(time.process_time() - inicio_cpu)
+    return min(reloj) * 1000, min(cpu) * 1000
+
+def por_bloques(compresor, comprimido: bytes, bloque: int = 64 * 1024) -> int:
+    descompresor = compresor.descompresor()
+    return sum(len(descompresor.descomprimir(comprimido[i:i + bloque])) for i in range(0, len(comprimido), bloque))
+
+def medir_codificaciones(cuerpo: bytes, repeticiones: int) -> list:
+    filas = []
+    for nombre in compresores_disponibles():
+        compresor = obtener_compresor(nombre)
+        comprimido = compresor.comprimir(cuerpo)
+        assert compresor.descomprimir(comprimido) == cuerpo
+        assert por_bloques(compresor, comprimido) == len(cuerpo)
+        filas.append({
+            "codificacion": nombre,
+            "bytes": len(comprimido),
+            "ratio": len(cuerpo) / len(comprimido),
+            "comprimir_ms": mejor_tiempo(lambda: compresor.comprimir(cuerpo), repeticiones)[1],
+            "descomprimir_ms": mejor_tiempo(lambda: compresor.descomprimir(comprimido), repeticiones)[1],
+            "por_bloques_ms": mejor_tiempo(lambda: por_bloques(compresor, comprimido), repeticiones)[1],
+        })
+    return filas
+
+def medir_extremo_a_extremo(servidor: ServidorEcoMarket, repeticiones: int) -> list:
+    filas = []
+    for nombre in ("identity", *compresores_disponibles()):
+        with EcoMarketClient(servidor.base_url) as cliente:
+            cliente.session.headers["Accept-Encoding"] = nombre
+            antes = servidor.bytes_enviados
+            total = len(cliente.listar_productos())
+            bytes_cable = servidor.bytes_enviados - antes
+            listar = mejor_tiempo(cliente.listar_productos, repeticiones)
+            iterar = mejor_tiempo(lambda: sum(1 for _ in cliente.iter_productos(tamano_pagina=total)), repeticiones)
+        filas.append({"codificacion": nombre, "bytes": bytes_cable, "listar": listar, "iterar": iterar})
+    return filas
+
+def medir_lote(servidor: ServidorEcoMarket, cantidad: int) -> list:
+    # Descripciones largas y repetitivas, como las fichas que cargan los productores
+    descripcion = "Miel orgánica de flores silvestres, cosecha de otoño, sin pasteurizar. " * 150
+    productos = [{"nombre": f"Miel {i}", "precio": 5.0, "categoria": "miel", "descripcion": descripcion}
+                 for i in range(cantidad)]
+    filas = []
+    for nombre, compresion in (("sin comprimir", None), ("gzip > 1 KB", PoliticaCompresion(umbral=1024))):
+        with EcoMarketClient(servidor.base_url, compresion=compresion) as cliente:
+            antes = servidor.bytes_recibidos
+            inicio, inicio_cpu = time.perf_counter(), time.process_time()
+            reporte = cliente.crear_productos_lote(productos, workers=4)
+            filas.append({"modo": nombre, "ok": reporte.ok, "bytes": servidor.bytes_recibidos - antes,
+                          "ms": (time.perf_counter() - inicio) * 1000,
+                          "cpu_ms": (time.process_time() - inicio_cpu) * 1000})
+    return filas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes en el cable y CPU por codificación")
+    parser.add_argument("--productos", type=int, default=20000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--mbps", type=float, default=50, help="Ancho de banda para estimar la transferencia")
+    args = parser.parse_args()
+    a_ms = lambda cantidad: cantidad * 8 / (args.mbps * 1e6) * 1000
+
+    cuerpo = catalogo_en_bytes(args.productos)
+    print(f"--- 🗜️ CODIFICACIONES ({args.productos} productos, {len(cuerpo) / 1e6:.2f} MB de JSON) ---")
+    print(f"Instaladas: {', '.join(compresores_disponibles())}\n")
+    print(f"{'codificación':<13} {'bytes':>11} {'ratio':>7} {'comprimir':>11} {'descomprimir':>13} {'por bloques':>12}")
+    for fila in medir_codificaciones(cuerpo, args.repeticiones):
+        print(f"{fila['codificacion']:<13} {fila['bytes']:>11,} {fila['ratio']:>6.1f}x {fila['comprimir_ms']:>9.1f}ms "
+              f"{fila['descomprimir_ms']:>11.1f}ms {fila['por_bloques_ms']:>10.1f}ms")
+
+    with ServidorEcoMarket(productos=args.productos, compresion=True) as servidor:
+        print(f"\n--- 🌐 LISTADO CONTRA EL SERVIDOR LOCAL (CPU = servidor + cliente; red estimada a {args.mbps:g} Mbit/s) ---\n")
+        print(f"{'Accept-Encoding':<16} {'en el cable':>12} {'listar':>9} {'CPU':>9} {'iter':>9} {'CPU':>9} {'+ red':>9}")
+        for fila in medir_extremo_a_extremo(servidor, args.repeticiones):
+            (listar, listar_cpu), (iterar, iterar_cpu) = fila["listar"], fila["iterar"]
+            print(f"{fila['codificacion']:<16} {fila['bytes']:>12,} {listar:>7.1f}ms {listar_cpu:>7.1f}ms "
+                  f"{iterar:>7.1f}ms {iterar_cpu:>7.1f}ms {listar + a_ms(fila['bytes']):>7.0f}ms")
+
+        print("\n--- 📦 LOTE DE 200 CREACIONES CON DESCRIPCIONES LARGAS ---\n")
+        filas = medir_lote(servidor, 200)
+        for fila in filas:
+            print(f"{fila['modo']:<14} {fila['bytes']:>11,} bytes  {fila['ms']:>7.1f} ms  CPU {fila['cpu_ms']:>7.1f} ms  "
+                  f"{'✅' if fila['ok'] else '❌'}")
+        print(f"\n✅ Cuerpos de petición {filas[0]['bytes'] / filas[1]['bytes']:.1f} veces más chicos con gzip")
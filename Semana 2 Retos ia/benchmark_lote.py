@@ -0,0 +1,77 @@
+import argparse
+import random
+import time
+
+from validadores import validar_producto, validar_producto_manual, validar_lote_productos, _cargar_numpy
+
+CATEGORIAS = ['frutas', 'verduras', 'lacteos', 'miel', 'conservas']
+
+# ==========================================
+# DATOS: lote de proveedor con ~1% de filas inválidas
+# ==========================================
+def generar_lote(n: int, semilla: int = 42) -> list:
+    azar = random.Random(semilla)
+    lote = []
+    for i in range(n):
+        producto = {
+            "id": i,
+            "nombre": f"Producto {i}",
+            "precio": round(azar.uniform(1, 500), 2),
+            "categoria": CATEGORIAS[i % len(CATEGORIAS)],
+            "disponible": True,
+        }
+        if azar.random() < 0.01:
+            defecto = azar.choice(["precio", "categoria", "id", "disponible"])
+            producto[defecto] = {"precio": -1, "categoria": "electronica", "id": str(i), "disponible": "SÍ"}[defecto]
+        lote.append(producto)
+    return lote
+
+# ==========================================
+# ESTRATEGIAS
+# ==========================================
+def por_item(validador):
+    """El loop de validar_lista_productos, pero juntando un error por fila en vez de cortar."""
+    def validar(lote):
+        errores = []
+        for indice, item in enumerate(lote):
+            try:
+                validador(item)
+            except (ValueError, TypeError) as e:
+                errores.append((indice, str(e)))
+        return errores
+    return validar
+
+def medir(funcion, lote, repeticiones=3):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(lote)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def correr_benchmark(tamanos=(10_000, 100_000, 1_000_000)):
+    estrategias = [
+        ("Por ítem (manual)", por_item(validar_producto_manual)),
+        ("Por ítem (compilado)", por_item(validar_producto)),
+        ("Lote (predicado compilado)", lambda lote: validar_lote_productos(lote, usar_numpy=False)),
+    ]
+    if _cargar_numpy() is not None:
+        estrategias.append(("Lote (columnar NumPy)", lambda lote: validar_lote_productos(lote, usar_numpy=True)))
+    else:
+        print("ℹ️ NumPy no está instalado: se omite la variante columnar.")
+
+    print("--- 🏁 BENCHMARK VALIDACIÓN POR LOTES ---")
+    for n in tamanos:
+        lote = generar_lote(n)
+        print(f"\n{n} filas:")
+        base = None
+        for nombre, funcion in estrategias:
+            tiempo = medir(funcion, lote, repeticiones=3 if n < 1_000_000 else 1)
+            base = base or tiempo
+            print(f"  {nombre:<30} {tiempo:>8.4f} s  {n / tiempo:>12,.0f} filas/s  x{base / tiempo:.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validación por ítem vs por lotes (predicado compilado y columnar con NumPy)")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    correr_benchmark(args.tamanos)
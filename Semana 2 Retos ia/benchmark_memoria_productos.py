@@ -0,0 +1,80 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmark_streaming import producto_fixture
+from codec_json import obtener_codec
+from modelos import Producto, ProductoBatch
+
+# ==========================================
+# FIXTURE: el catálogo llega como JSON, por páginas
+# ==========================================
+# Se decodifica de bytes reales (no se reutilizan los str del generador), así
+# cada producto trae sus propias cadenas, como pasa con una respuesta HTTP.
+def paginas_decodificadas(total: int, tamano_pagina: int = 10_000):
+    codec = obtener_codec()
+    for inicio in range(0, total, tamano_pagina):
+        pagina = [producto_fixture(i) for i in range(inicio, min(total, inicio + tamano_pagina))]
+        yield codec.decodificar(codec.codificar(pagina))
+
+def como_dicts(total):
+    catalogo = []
+    for pagina in paginas_decodificadas(total):
+        catalogo.extend(pagina)
+    return catalogo
+
+def como_productos(total):
+    catalogo = []
+    for pagina in paginas_decodificadas(total):
+        catalogo.extend(map(Producto.desde_dict, pagina))
+    return catalogo
+
+def como_batch(total):
+    batch = ProductoBatch()
+    for pagina in paginas_decodificadas(total):
+        batch.extender(pagina)
+    return batch
+
+# ==========================================
+# ⏱️ MEMORIA RETENIDA
+# ==========================================
+def medir(nombre: str, construir, total: int) -> dict:
+    """
+    Memoria que queda ocupada por el catálogo ya armado. El tiempo incluye
+    generar y decodificar el JSON, y corre con tracemalloc activo (más lento).
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    catalogo = construir(total)
+    duracion = time.perf_counter() - inicio
+    gc.collect()
+    retenida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Acceso de punta a punta para confirmar que el contenido es el mismo
+    muestra = catalogo[total // 2]
+    muestra = muestra.a_dict() if isinstance(muestra, Producto) else muestra
+    assert muestra == producto_fixture(total // 2)
+    del catalogo
+    print(f"{nombre:<22} {retenida / 2**20:>9.1f} MiB {retenida / total:>8.0f} B/producto "
+          f"{pico / 2**20:>9.1f} MiB {duracion:>7.2f} s")
+    return {"retenida": retenida, "pico": pico, "segundos": duracion}
+
+def correr_benchmark(total: int = 1_000_000) -> dict:
+    print(f"--- 🏁 MEMORIA DE UN CATÁLOGO DE {total:,} PRODUCTOS ---")
+    print(f"{'representación':<22} {'retenida':>13} {'por producto':>13} {'pico':>13} {'tiempo':>9}")
+    resultados = {
+        "list[dict]": medir("list[dict]", como_dicts, total),
+        "list[Producto]": medir("list[Producto]", como_productos, total),
+        "ProductoBatch": medir("ProductoBatch", como_batch, total),
+    }
+    ahorro = resultados["list[dict]"]["retenida"] / resultados["ProductoBatch"]["retenida"]
+    print(f"\n✅ ProductoBatch ocupa {ahorro:.1f}x menos que la lista de dicts")
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memoria de dicts vs Producto vs ProductoBatch")
+    parser.add_argument("--total", type=int, default=1_000_000)
+    args = parser.parse_args()
+    correr_benchmark(args.total)
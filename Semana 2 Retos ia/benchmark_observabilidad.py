@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import statistics
+import time
+
+from cliente_ecomarket import EcoMarketClient
+from observabilidad import FormateadorJSON, Observador
+from servidor_local import ServidorEcoMarket
+
+LIMITE_OVERHEAD = 0.05  # El hook debe costar menos del 5% de una petición
+
+# ==========================================
+# SERVIDOR EN OTRO PROCESO (para no competir por el GIL con el cliente)
+# ==========================================
+def _servir(puerto):
+    servidor = ServidorEcoMarket(productos=100)
+
+    async def arrancar():
+        await servidor.arrancar()
+        puerto.value = servidor.puerto
+        await asyncio.Event().wait()
+    asyncio.run(arrancar())
+
+def _logger_json():
+    """Logger real (formato JSON) que escribe a /dev/null: medimos el costo de emitir, no la consola."""
+    log = logging.getLogger("benchmark.observabilidad")
+    manejador = logging.StreamHandler(open(os.devnull, "w"))
+    manejador.setFormatter(FormateadorJSON())
+    log.addHandler(manejador)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    return log
+
+# ==========================================
+# ⏱️ 1. COSTO AISLADO DEL HOOK
+# ==========================================
+class _SesionFalsa:
+    """Devuelve siempre la misma respuesta: solo queda el costo del Observador."""
+
+    def __init__(self, response):
+        self.response = response
+        self.headers = response.request.headers
+
+    def request(self, metodo, url, **kwargs):
+        return self.response
+
+def costo_hook(observador, response, iteraciones=50_000) -> float:
+    """Microsegundos que agrega observar() por petición."""
+    sesion = _SesionFalsa(response)
+    url = response.url
+
+    def directo():
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            sesion.request("GET", url, timeout=None)
+        return time.perf_counter() - inicio
+
+    def observado():
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            observador.observar(sesion, "GET", url, "/productos/{id}", timeout=None)
+        return time.perf_counter() - inicio
+
+    directo(), observado()  # Calentamiento
+    base = min(directo() for _ in range(3))
+    con_hook = min(observado() for _ in range(3))
+    return (con_hook - base) / iteraciones * 1e6
+
+# ==========================================
+# ⏱️ 2. DE PUNTA A PUNTA
+# ==========================================
+def medir_ronda(cliente, peticiones) -> list:
+    latencias = []
+    for i in range(peticiones):
+        inicio = time.perf_counter()
+        cliente.obtener_producto(1 + i % 100)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+def correr_benchmark(rondas: int = 10, peticiones: int = 300, muestreo: float = 0.01):
+    puerto = multiprocessing.Value("i", 0)
+    proceso = multiprocessing.Process(target=_servir, args=(puerto,), daemon=True)
+    proceso.start()
+    while puerto.value == 0:
+        time.sleep(0.05)
+    base_url = f"http://127.0.0.1:{puerto.value}"
+    observador = Observador(muestreo=muestreo, log=_logger_json())
+
+    print(f"--- 🏁 BENCHMARK DE OBSERVABILIDAD ({rondas} rondas x {peticiones} GET, muestreo {muestreo:.0%}) ---")
+    try:
+        clientes = {
+            "sin_hook": EcoMarketClient(base_url),
+            "control": EcoMarketClient(base_url),  # Idéntico a sin_hook: mide el ruido
+            "con_hook": EcoMarketClient(base_url, observador=observador),
+        }
+        latencias = {nombre: [] for nombre in clientes}
+        for cliente in clientes.values():
+            medir_ronda(cliente, 50)  # Calentamiento y conexiones abiertas
+        # Rondas intercaladas y en orden alterno: la deriva de la máquina
+        # (y el lugar en la ronda) afecta igual a todos los clientes
+        for ronda in range(rondas):
+            orden = list(clientes) if ronda % 2 == 0 else list(reversed(clientes))
+            for nombre in orden:
+                latencias[nombre] += medir_ronda(clientes[nombre], peticiones)
+        response = clientes["con_hook"].session.get(f"{base_url}/productos/1")
+        for cliente in clientes.values():
+            cliente.close()
+    finally:
+        proceso.terminate()
+
+    sin_hook, con_hook = latencias["sin_hook"], latencias["con_hook"]
+    ruido = statistics.median(latencias["control"]) / statistics.median(sin_hook) - 1
+    mediana_sin = statistics.median(sin_hook) * 1e6
+    mediana_con = statistics.median(con_hook) * 1e6
+    hook_us = costo_hook(Observador(muestreo=muestreo, log=_logger_json()), response)
+    overhead_aislado = hook_us / mediana_sin
+    overhead_total = mediana_con / mediana_sin - 1
+
+    print(f"Petición sin observador (mediana):  {mediana_sin:>9.1f} us")
+    print(f"Petición con observador (mediana):  {mediana_con:>9.1f} us  ({overhead_total:+.2%})")
+    print(f"Ruido (dos clientes idénticos):     {ruido:+.2%}")
+    print(f"Costo aislado del hook:             {hook_us:>9.2f} us  ({overhead_aislado:.2%} de la petición)")
+    resumen = observador.metricas.resumen()["GET /productos/{id}"]
+    print(f"Histograma total: p50 {resumen['total']['p50']} us  p99 {resumen['total']['p99']} us  "
+          f"(n={resumen['total']['n']})")
+
+    if overhead_aislado < LIMITE_OVERHEAD:
+        print(f"\n✅ El hook cuesta menos del {LIMITE_OVERHEAD:.0%} de una petición")
+    else:
+        print(f"\n❌ El hook supera el {LIMITE_OVERHEAD:.0%} de una petición")
+    return overhead_aislado
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Costo del Observador sobre cada petición")
+    parser.add_argument("--rondas", type=int, default=10)
+    parser.add_argument("--peticiones", type=int, default=300)
+    parser.add_argument("--muestreo", type=float, default=0.01)
+    args = parser.parse_args()
+    correr_benchmark(args.rondas, args.peticiones, args.muestreo)
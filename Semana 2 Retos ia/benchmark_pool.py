@@ -0,0 +1,69 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from cliente_ecomarket import EcoMarketClient
+
+# ==========================================
+# SERVIDOR LOCAL MÍNIMO (HTTP/1.1 con keep-alive)
+# ==========================================
+PRODUCTO = json.dumps({"id": 1, "nombre": "Manzanas Gala", "precio": 35.5, "categoria": "frutas"}).encode()
+
+class ManejadorProductos(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantiene la conexión abierta entre peticiones si el cliente lo permite
+    protocol_version = "HTTP/1.1"
+    # Sin esto, Nagle + ACK retardado añaden ~40 ms a cada respuesta sobre una conexión reutilizada
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PRODUCTO)))
+        if self.headers.get("Connection", "").lower() == "close":
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(PRODUCTO)
+
+    def log_message(self, *args):
+        pass  # Silenciamos el log por petición para no medir la consola
+
+def iniciar_servidor():
+    """Levanta el servidor en un puerto libre y devuelve (servidor, base_url)."""
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ManejadorProductos)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+# ==========================================
+# ⏱️ BENCHMARK: con y sin pool de conexiones
+# ==========================================
+def medir(nombre, funcion, iteraciones):
+    funcion()  # Calentamiento (DNS, imports perezosos de requests)
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"{nombre:<28} {iteraciones / duracion:>10.0f} req/s  ({duracion:.3f} s)")
+    return iteraciones / duracion
+
+def correr_benchmark(iteraciones: int = 2000):
+    servidor, base_url = iniciar_servidor()
+    print(f"--- 🏁 BENCHMARK POOL DE CONEXIONES ({iteraciones} GET /productos/1) ---")
+    try:
+        sin_pool = medir("Sin pool (requests.get)", lambda: requests.get(f"{base_url}/productos/1").json(), iteraciones)
+
+        with EcoMarketClient(base_url, keep_alive=False) as cliente:
+            medir("Session sin keep-alive", lambda: cliente.obtener_producto(1), iteraciones)
+
+        with EcoMarketClient(base_url) as cliente:
+            con_pool = medir("EcoMarketClient (pool)", lambda: cliente.obtener_producto(1), iteraciones)
+
+        print(f"\n📈 Mejora con pool: x{con_pool / sin_pool:.2f}")
+    finally:
+        servidor.shutdown()
+
+if __name__ == "__main__":
+    correr_benchmark()
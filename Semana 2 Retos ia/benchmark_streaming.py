@@ -0,0 +1,97 @@
+import argparse
+import json
+import multiprocessing
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from cliente_ecomarket import EcoMarketClient
+
+CATEGORIAS = ['frutas', 'verduras', 'lacteos', 'miel', 'conservas']
+
+# ==========================================
+# FIXTURE: catálogo de N productos generado al vuelo
+# ==========================================
+def producto_fixture(i: int) -> dict:
+    return {
+        "id": i,
+        "nombre": f"Producto {i}",
+        "precio": round(1 + (i % 997) * 0.25, 2),
+        "categoria": CATEGORIAS[i % len(CATEGORIAS)],
+        "disponible": i % 7 != 0,
+    }
+
+def crear_manejador(total: int):
+    class ManejadorCatalogo(BaseHTTPRequestHandler):
+        # HTTP/1.0 sin Content-Length: el cuerpo termina al cerrar la conexión,
+        # así el servidor tampoco necesita tener el catálogo entero en memoria.
+        protocol_version = "HTTP/1.0"
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", [str(total)])[0])
+            fin = min(total, offset + limit)
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"[")
+            bloque = []
+            for i in range(offset, fin):
+                bloque.append(json.dumps(producto_fixture(i)))
+                if len(bloque) == 1000:
+                    self.wfile.write((",".join(bloque) + ("," if i + 1 < fin else "")).encode())
+                    bloque = []
+            if bloque:
+                self.wfile.write(",".join(bloque).encode())
+            self.wfile.write(b"]")
+
+        def log_message(self, *args):
+            pass
+
+    return ManejadorCatalogo
+
+def _servir(total: int, puerto):
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), crear_manejador(total))
+    puerto.value = servidor.server_port
+    servidor.serve_forever()
+
+# ==========================================
+# ⏱️ BENCHMARK DE MEMORIA
+# ==========================================
+def medir(nombre, funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    contados = funcion()
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:<34} {contados:>9} productos  pico {pico / 2**20:>8.1f} MiB  {duracion:>6.2f} s")
+
+def correr_benchmark(total: int = 1_000_000, tamano_pagina: int = 5000):
+    # El servidor vive en otro proceso para que tracemalloc solo mida al cliente
+    puerto = multiprocessing.Value("i", 0)
+    proceso = multiprocessing.Process(target=_servir, args=(total, puerto), daemon=True)
+    proceso.start()
+    while puerto.value == 0:
+        time.sleep(0.05)
+
+    print(f"--- 🏁 BENCHMARK DE MEMORIA: CATÁLOGO DE {total} PRODUCTOS ---")
+    try:
+        with EcoMarketClient(f"http://127.0.0.1:{puerto.value}") as cliente:
+            medir("listar_productos() (lista completa)", lambda: len(cliente.listar_productos()))
+            medir(f"iter_productos(tamano_pagina={tamano_pagina})",
+                  lambda: sum(1 for _ in cliente.iter_productos(tamano_pagina)))
+            medir("iter_productos(validar=True)",
+                  lambda: sum(1 for _ in cliente.iter_productos(tamano_pagina, validar=True)))
+    finally:
+        proceso.terminate()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memoria de listar_productos vs iter_productos")
+    parser.add_argument("--total", type=int, default=1_000_000)
+    parser.add_argument("--pagina", type=int, default=5000)
+    args = parser.parse_args()
+    correr_benchmark(args.total, args.pagina)
@@ -0,0 +1,344 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cliente_ecomarket import RUTAS_CLIENTE, EcoMarketClient
+from espejo_catalogo import EspejoCatalogo
+from hedging import Hedging
+from servidor_local import Inyeccion, ServidorEcoMarket
+from url_builder import URLBuilder
+from validadores import validar_producto, validar_producto_manual
+import comparacion_validacion
+
+# ==========================================
+# SUITE DE BENCHMARKS REPRODUCIBLE
+# ==========================================
+# Mide validadores, URLBuilder, el CRUD completo contra servidor_local.py,
+# las consultas al espejo local del catálogo y el hedging de lecturas contra
+# un servidor con cola larga de latencia.
+# Cada caso hace calentamiento, repite la medición y reporta mediana, p95,
+# p99 y ops/s. El resultado se guarda como JSON para comparar dos commits:
+#
+#   python benchmark_suite.py --salida base.json
+#   (cambios...)
+#   python benchmark_suite.py --salida nuevo.json --comparar base.json
+
+VERSION_FORMATO = 1
+TOLERANCIA_POR_DEFECTO = 0.10  # 10% más lento en la mediana = regresión
+
+# ==========================================
+# ESTADÍSTICAS
+# ==========================================
+def percentil(ordenados: list, p: float) -> float:
+    """Percentil p (0-100) con interpolación lineal sobre una lista ya ordenada."""
+    if not ordenados:
+        raise ValueError("No hay muestras para calcular el percentil")
+    posicion = (len(ordenados) - 1) * p / 100
+    abajo = int(posicion)
+    arriba = min(abajo + 1, len(ordenados) - 1)
+    return ordenados[abajo] + (ordenados[arriba] - ordenados[abajo]) * (posicion - abajo)
+
+def resumir(nombre: str, grupo: str, latencias: list, operaciones: int, duracion: float) -> dict:
+    """
+    Resume las latencias (segundos por operación) de un caso.
+    Los tiempos se guardan en microsegundos para que el JSON sea legible.
+    """
+    ordenadas = sorted(latencias)
+    return {
+        "nombre": nombre,
+        "grupo": grupo,
+        "muestras": len(ordenadas),
+        "operaciones": operaciones,
+        "mediana_us": statistics.median(ordenadas) * 1e6,
+        "p95_us": percentil(ordenadas, 95) * 1e6,
+        "p99_us": percentil(ordenadas, 99) * 1e6,
+        "min_us": ordenadas[0] * 1e6,
+        "desviacion_us": (statistics.stdev(ordenadas) if len(ordenadas) > 1 else 0.0) * 1e6,
+        "ops_por_segundo": operaciones / duracion if duracion else 0.0,
+    }
+
+# ==========================================
+# MEDIDORES
+# ==========================================
+def medir_micro(nombre: str, grupo: str, funcion, lote: int = 1000, muestras: int = 30,
+                calentamiento: int = 3) -> dict:
+    """
+    Para operaciones de microsegundos: cada muestra cronometra 'lote' llamadas
+    seguidas y divide, así el costo de perf_counter no contamina el resultado.
+    """
+    for _ in range(calentamiento):
+        for _ in range(lote):
+            funcion()
+    latencias = []
+    total = 0.0
+    for _ in range(muestras):
+        inicio = time.perf_counter()
+        for _ in range(lote):
+            funcion()
+        duracion = time.perf_counter() - inicio
+        total += duracion
+        latencias.append(duracion / lote)
+    return resumir(nombre, grupo, latencias, lote * muestras, total)
+
+def medir_llamadas(nombre: str, grupo: str, funcion, iteraciones: int = 500, calentamiento: int = 50) -> dict:
+    """Para operaciones de red: cronometra cada llamada por separado."""
+    for i in range(calentamiento):
+        funcion(i)
+    latencias = []
+    inicio_total = time.perf_counter()
+    for i in range(iteraciones):
+        inicio = time.perf_counter()
+        funcion(calentamiento + i)
+        latencias.append(time.perf_counter() - inicio)
+    return resumir(nombre, grupo, latencias, iteraciones, time.perf_counter() - inicio_total)
+
+# ==========================================
+# CASOS
+# ==========================================
+PRODUCTO = dict(comparacion_validacion.producto_valido)
+
+def casos_validacion(rapido: bool) -> list:
+    muestras = 5 if rapido else 30
+    estrategias = [
+        ("validadores.validar_producto", validar_producto),
+        ("validadores.validar_producto_manual", validar_producto_manual),
+        ("comparacion.manual", comparacion_validacion.validar_manual),
+        ("comparacion.pydantic", comparacion_validacion.validar_pydantic),
+        ("comparacion.jsonschema", comparacion_validacion.validar_jsonschema),
+        ("comparacion.compilado", comparacion_validacion.validar_compilado),
+    ]
+    resultados = []
+    for nombre, validador in estrategias:
+        # jsonschema es ~100 veces más lento: lotes más chicos para no eternizar la suite
+        lote = 20 if nombre.endswith("jsonschema") else 1000
+        resultados.append(medir_micro(nombre, "validacion", lambda v=validador: v(PRODUCTO),
+                                      lote=lote, muestras=muestras))
+    return resultados
+
+def casos_url(rapido: bool) -> list:
+    muestras = 5 if rapido else 30
+    builder = URLBuilder("https://api.ecomarket.com")
+    filtros = {"categoria": "miel&admin=true", "q": "Café & Postres"}
+    contrato = URLBuilder.desde_openapi("https://api.ecomarket.com")
+    cliente = URLBuilder("https://api.ecomarket.com", RUTAS_CLIENTE)
+    ids = list(range(1, 101))
+    return [
+        # Lo que hace EcoMarketClient en cada llamada: path de la plantilla + base_url
+        medir_micro("url.cliente(id)", "url", lambda: cliente.base_url + cliente.path("/productos/{id}", id=42),
+                    muestras=muestras),
+        medir_micro("url.cliente(listado)", "url", lambda: cliente.base_url + cliente.path("/productos"),
+                    muestras=muestras),
+        medir_micro("url.build_url(id)", "url", lambda: builder.build_url("productos", resource_id=42),
+                    muestras=muestras),
+        medir_micro("url.build_url(id escapado)", "url",
+                    lambda: builder.build_url("productos", resource_id="../../etc/passwd"), muestras=muestras),
+        medir_micro("url.build_url(query)", "url", lambda: builder.build_url("productos", query_params=filtros),
+                    muestras=muestras),
+        # La implementación previa a la memoización, como línea base
+        medir_micro("url.build_url_original(id)", "url",
+                    lambda: builder.build_url_original("productos", resource_id=42), muestras=muestras),
+        medir_micro("url.build_url_original(query)", "url",
+                    lambda: builder.build_url_original("productos", query_params=filtros), muestras=muestras),
+        medir_micro("url.plantilla(id)", "url", lambda: contrato.url("/products/{id}", id=42), muestras=muestras),
+        medir_micro("url.build_many(100)", "url", lambda: contrato.build_many("/products/{id}", ids),
+                    muestras=muestras),
+    ]
+
+def casos_crud(rapido: bool) -> list:
+    iteraciones = 100 if rapido else 1000
+    calentamiento = 10 if rapido else 50
+    servidor = ServidorEcoMarket(productos=50)
+    base_url = servidor.iniciar()
+    resultados = []
+    try:
+        with EcoMarketClient(base_url, pool_maxsize=16) as cliente:
+            ids = []
+            total = iteraciones + calentamiento
+            casos = [
+                ("crud.crear_producto", lambda i: ids.append(cliente.crear_producto(dict(PRODUCTO))["id"])),
+                ("crud.obtener_producto", lambda i: cliente.obtener_producto(ids[i % len(ids)])),
+                ("crud.listar_productos", lambda i: cliente.listar_productos()),
+                ("crud.actualizar_producto_parcial",
+                 lambda i: cliente.actualizar_producto_parcial(ids[i], {"precio": 10.0 + i})),
+                ("crud.actualizar_producto_total", lambda i: cliente.actualizar_producto_total(ids[i], PRODUCTO)),
+                ("crud.eliminar_producto", lambda i: cliente.eliminar_producto(ids[i])),
+            ]
+            for nombre, funcion in casos:
+                resultados.append(medir_llamadas(nombre, "crud", funcion, iteraciones, calentamiento))
+            assert len(ids) == total
+
+            # Throughput con varios hilos: ciclo completo crear/leer/parchear/borrar
+            hilos = 8
+            def ciclo(_):
+                producto_id = cliente.crear_producto(dict(PRODUCTO))["id"]
+                cliente.obtener_producto(producto_id)
+                cliente.actualizar_producto_parcial(producto_id, {"precio": 1.0})
+                cliente.eliminar_producto(producto_id)
+
+            with ThreadPoolExecutor(hilos) as executor:
+                list(executor.map(ciclo, range(calentamiento)))
+                latencias = []
+                def ciclo_medido(i):
+                    inicio = time.perf_counter()
+                    ciclo(i)
+                    latencias.append(time.perf_counter() - inicio)
+                inicio = time.perf_counter()
+                list(executor.map(ciclo_medido, range(iteraciones)))
+                duracion = time.perf_counter() - inicio
+            resultados.append(resumir(f"crud.ciclo_completo({hilos} hilos)", "crud", latencias,
+                                      iteraciones, duracion))
+    finally:
+        servidor.detener()
+    return resultados
+
+def casos_espejo(rapido: bool) -> list:
+    muestras = 5 if rapido else 30
+    servidor = ServidorEcoMarket(productos=5000)
+    base_url = servidor.iniciar()
+    try:
+        with EcoMarketClient(base_url) as cliente, EspejoCatalogo(cliente) as espejo:
+            espejo.sincronizar()
+            return [
+                # Lo que hacían los servicios: bajar todo y filtrar en Python
+                medir_llamadas("espejo.listar_y_filtrar(remoto)", "espejo",
+                               lambda i: [p for p in cliente.listar_productos() if p["categoria"] == "miel"],
+                               iteraciones=10 if rapido else 50, calentamiento=2),
+                medir_micro("espejo.obtener", "espejo", lambda: espejo.obtener(77), muestras=muestras),
+                medir_micro("espejo.buscar(categoria+precio)", "espejo",
+                            lambda: espejo.buscar(categoria="miel", precio_max=5), lote=100, muestras=muestras),
+                medir_micro("espejo.buscar(precio)", "espejo",
+                            lambda: espejo.buscar(precio_min=10, precio_max=10.5), lote=100, muestras=muestras),
+            ]
+    finally:
+        servidor.detener()
+
+# 3% de las respuestas tardan 30 veces más: el p99 queda ~20x la mediana
+LATENCIA_COLA_LARGA = "cola:5:0.03:150"
+
+def casos_hedging(rapido: bool) -> list:
+    iteraciones = 200 if rapido else 1000
+    calentamiento = 30 if rapido else 100
+    servidor = ServidorEcoMarket(productos=50, semilla=1, inyeccion=Inyeccion(latencia=LATENCIA_COLA_LARGA))
+    base_url = servidor.iniciar()
+    resultados = []
+    try:
+        for nombre, hedging in (("hedging.obtener_producto(sin hedging)", None),
+                                ("hedging.obtener_producto(hedge p95)", Hedging(presupuesto=0.1))):
+            with EcoMarketClient(base_url, pool_maxsize=16, hedging=hedging) as cliente:
+                resultado = medir_llamadas(nombre, "hedging", lambda i: cliente.obtener_producto(i % 50 + 1),
+                                           iteraciones, calentamiento)
+            if hedging is not None:
+                total = hedging.estadisticas()["total"]
+                hedging.cerrar()
+                base = resultados[0]
+                resultado["tasa_hedge"] = total["tasa_hedge"]
+                resultado["detalle"] = (f"hedges {total['tasa_hedge']:.1%} (ganó el hedge en "
+                                        f"{total['ganadas_por_hedge']}/{total['hedges']}), "
+                                        f"p99 {resultado['p99_us'] / base['p99_us'] - 1:+.0%} "
+                                        f"y mediana {resultado['mediana_us'] / base['mediana_us'] - 1:+.0%} "
+                                        f"vs. sin hedging")
+            resultados.append(resultado)
+    finally:
+        servidor.detener()
+    return resultados
+
+GRUPOS = {
+    "validacion": casos_validacion,
+    "url": casos_url,
+    "crud": casos_crud,
+    "espejo": casos_espejo,
+    "hedging": casos_hedging,
+}
+
+# ==========================================
+# RESULTADOS EN JSON Y COMPARACIÓN
+# ==========================================
+def _commit_actual():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return salida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def correr_suite(grupos=tuple(GRUPOS), rapido: bool = False) -> dict:
+    resultados = {}
+    for grupo in grupos:
+        for resultado in GRUPOS[grupo](rapido):
+            resultados[resultado["nombre"]] = resultado
+    return {
+        "version": VERSION_FORMATO,
+        "meta": {
+            "fecha": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _commit_actual(),
+            "python": platform.python_version(),
+            "implementacion": platform.python_implementation(),
+            "plataforma": platform.platform(),
+            "rapido": rapido,
+        },
+        "resultados": resultados,
+    }
+
+def comparar(base: dict, actual: dict) -> list:
+    """
+    Compara la mediana de cada caso presente en ambas corridas.
+    Devuelve [(nombre, mediana_base_us, mediana_actual_us, cambio)] ordenado
+    del peor al mejor (cambio positivo = más lento).
+    """
+    filas = []
+    for nombre, nuevo in actual["resultados"].items():
+        viejo = base["resultados"].get(nombre)
+        if viejo is None or not viejo["mediana_us"]:
+            continue
+        cambio = nuevo["mediana_us"] / viejo["mediana_us"] - 1
+        filas.append((nombre, viejo["mediana_us"], nuevo["mediana_us"], cambio))
+    return sorted(filas, key=lambda fila: fila[3], reverse=True)
+
+def regresiones(base: dict, actual: dict, tolerancia: float = TOLERANCIA_POR_DEFECTO) -> list:
+    return [fila for fila in comparar(base, actual) if fila[3] > tolerancia]
+
+def imprimir(reporte: dict):
+    print(f"{'caso':<42} {'mediana':>10} {'p95':>10} {'p99':>10} {'ops/s':>12}")
+    for r in reporte["resultados"].values():
+        print(f"{r['nombre']:<42} {r['mediana_us']:>8.2f}us {r['p95_us']:>8.2f}us {r['p99_us']:>8.2f}us "
+              f"{r['ops_por_segundo']:>12,.0f}")
+        if "detalle" in r:
+            print(f"   ↳ {r['detalle']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de EcoMarket")
+    parser.add_argument("--grupos", nargs="+", choices=list(GRUPOS), default=list(GRUPOS))
+    parser.add_argument("--rapido", action="store_true", help="Menos muestras, para CI o pruebas locales")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior contra la cual comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_POR_DEFECTO)
+    args = parser.parse_args()
+
+    print(f"--- 🏁 SUITE DE BENCHMARKS ({', '.join(args.grupos)}) ---")
+    reporte = correr_suite(args.grupos, args.rapido)
+    imprimir(reporte)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        print(f"\n--- 📊 COMPARACIÓN CONTRA {args.comparar} (commit {base['meta'].get('commit')}) ---")
+        for nombre, viejo, nuevo, cambio in comparar(base, reporte):
+            marca = "❌" if cambio > args.tolerancia else ("✅" if cambio < -args.tolerancia else "  ")
+            print(f"{marca} {nombre:<42} {viejo:>9.2f}us -> {nuevo:>9.2f}us  {cambio:+.1%}")
+        encontradas = regresiones(base, reporte, args.tolerancia)
+        if encontradas:
+            print(f"\n❌ {len(encontradas)} regresión(es) por encima de {args.tolerancia:.0%}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
@@ -0,0 +1,239 @@
+import abc
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+TTL_POR_DEFECTO = 60  # Segundos
+MAX_ENTRADAS = 1024
+
+@dataclass
+class EntradaCache:
+    """Respuesta ya parseada junto con su ETag y el instante en que caduca."""
+    valor: Any
+    etag: str = None
+    expira_en: float = 0.0
+
+    def fresca(self) -> bool:
+        return time.time() < self.expira_en
+
+def politica_cache_control(cabecera: str) -> dict:
+    """
+    Interpreta una cabecera Cache-Control.
+    Ej: 'public, max-age=300' -> {'public': True, 'max-age': 300}
+    """
+    directivas = {}
+    for parte in (cabecera or "").split(","):
+        nombre, _, valor = parte.strip().partition("=")
+        if not nombre:
+            continue
+        nombre = nombre.lower()
+        if valor:
+            valor = valor.strip('"')
+            directivas[nombre] = int(valor) if valor.isdigit() else valor
+        else:
+            directivas[nombre] = True
+    return directivas
+
+class _CacheBase(abc.ABC):
+    """
+    Lógica común de la caché HTTP: TTL, Cache-Control, ETag y contadores.
+    Las subclases solo deciden dónde se guardan las entradas; un backend que
+    no implementa los cuatro métodos de almacenamiento falla al instanciarse.
+    """
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, ttl: float = TTL_POR_DEFECTO):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidaciones = 0
+        self.evictions = 0
+        self.invalidaciones = 0
+
+    # --- Almacenamiento (a implementar por cada backend) ---
+
+    @abc.abstractmethod
+    def _leer(self, clave: str):
+        ...
+
+    @abc.abstractmethod
+    def _escribir(self, clave: str, entrada: EntradaCache):
+        ...
+
+    @abc.abstractmethod
+    def _borrar(self, clave: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def _claves(self) -> list:
+        ...
+
+    def _ttl(self, directivas: dict) -> float:
+        if "no-cache" in directivas:
+            return 0
+        max_age = directivas.get("max-age")
+        return max_age if isinstance(max_age, int) else self.ttl
+
+    # --- API usada por el cliente ---
+
+    def buscar(self, clave: str) -> EntradaCache:
+        """
+        Devuelve la entrada guardada (fresca o caducada) o None.
+        Solo una entrada fresca cuenta como hit: una caducada todavía sirve
+        para revalidar con If-None-Match.
+        """
+        with self._lock:
+            entrada = self._leer(clave)
+            if entrada is not None and entrada.fresca():
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entrada
+
+    def guardar_respuesta(self, clave: str, response, valor):
+        """Guarda el valor parseado si las cabeceras de la respuesta lo permiten."""
+        directivas = politica_cache_control(response.headers.get("Cache-Control"))
+        if "no-store" in directivas:
+            return
+        etag = response.headers.get("ETag")
+        # Con no-cache se guarda, pero hay que revalidar antes de cada uso
+        if "no-cache" in directivas and not etag:
+            return
+        ttl = self._ttl(directivas)
+        with self._lock:
+            self._escribir(clave, EntradaCache(valor, etag, time.time() + ttl))
+
+    def revalidada(self, clave: str, entrada: EntradaCache, response) -> Any:
+        """El servidor respondió 304: renovamos la caducidad sin re-parsear."""
+        ttl = self._ttl(politica_cache_control(response.headers.get("Cache-Control")))
+        with self._lock:
+            entrada.expira_en = time.time() + ttl
+            entrada.etag = response.headers.get("ETag", entrada.etag)
+            self.revalidaciones += 1
+            self._escribir(clave, entrada)
+        return entrada.valor
+
+    def invalidar(self, clave: str):
+        with self._lock:
+            if self._borrar(clave):
+                self.invalidaciones += 1
+
+    def invalidar_prefijo(self, prefijo: str):
+        """Borra todas las entradas cuya clave empiece por el prefijo."""
+        with self._lock:
+            for clave in self._claves():
+                if clave.startswith(prefijo) and self._borrar(clave):
+                    self.invalidaciones += 1
+
+    def limpiar(self):
+        with self._lock:
+            for clave in self._claves():
+                self._borrar(clave)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidaciones": self.revalidaciones,
+                "evictions": self.evictions,
+                "invalidaciones": self.invalidaciones,
+                "entradas": len(self._claves()),
+            }
+
+class CacheLRU(_CacheBase):
+    """Caché en memoria con desalojo LRU por cantidad de entradas y TTL."""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, ttl: float = TTL_POR_DEFECTO):
+        super().__init__(max_entradas, ttl)
+        self._entradas = OrderedDict()
+
+    def _leer(self, clave):
+        entrada = self._entradas.get(clave)
+        if entrada is not None:
+            self._entradas.move_to_end(clave)
+        return entrada
+
+    def _escribir(self, clave, entrada):
+        self._entradas[clave] = entrada
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+            self.evictions += 1
+
+    def _borrar(self, clave):
+        return self._entradas.pop(clave, None) is not None
+
+    def _claves(self):
+        return list(self._entradas)
+
+class CacheDisco(_CacheBase):
+    """
+    Caché persistente: un archivo JSON por entrada dentro de un directorio.
+    Sobrevive a reinicios del proceso; el desalojo LRU usa el orden de acceso.
+    Los valores deben ser serializables a JSON (lo son, vienen de la API).
+    """
+
+    def __init__(self, directorio: str, max_entradas: int = MAX_ENTRADAS, ttl: float = TTL_POR_DEFECTO):
+        super().__init__(max_entradas, ttl)
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+        # Índice clave -> archivo en orden de uso, reconstruido desde el disco
+        self._indice = OrderedDict()
+        archivos = [os.path.join(directorio, nombre) for nombre in os.listdir(directorio) if nombre.endswith(".json")]
+        for ruta in sorted(archivos, key=os.path.getmtime):
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    self._indice[json.load(f)["clave"]] = ruta
+            except (OSError, ValueError, KeyError):
+                os.remove(ruta)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, hashlib.sha256(clave.encode()).hexdigest() + ".json")
+
+    def _leer(self, clave):
+        ruta = self._indice.get(clave)
+        if ruta is None:
+            return None
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            self._indice.pop(clave, None)
+            return None
+        self._indice.move_to_end(clave)
+        os.utime(ruta)
+        return EntradaCache(datos["valor"], datos["etag"], datos["expira_en"])
+
+    def _escribir(self, clave, entrada):
+        ruta = self._ruta(clave)
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"clave": clave, "valor": entrada.valor, "etag": entrada.etag,
+                       "expira_en": entrada.expira_en}, f)
+        os.replace(temporal, ruta)  # Escritura atómica
+        self._indice[clave] = ruta
+        self._indice.move_to_end(clave)
+        while len(self._indice) > self.max_entradas:
+            _, vieja = self._indice.popitem(last=False)
+            os.remove(vieja)
+            self.evictions += 1
+
+    def _borrar(self, clave):
+        ruta = self._indice.pop(clave, None)
+        if ruta is None:
+            return False
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _claves(self):
+        return list(self._indice)
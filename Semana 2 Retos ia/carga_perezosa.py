@@ -0,0 +1,42 @@
+import importlib.util
+import sys
+
+# ==========================================
+# IMPORTACIÓN PEREZOSA
+# ==========================================
+# Los scripts cortos y los handlers serverless importan el cliente cientos de
+# veces por hora, y muchas veces ni siquiera llegan a hacer una petición.
+# importar_perezoso() registra el módulo en sys.modules sin ejecutarlo: el
+# import de verdad (y su costo) ocurre al leer el primer atributo, ej. al
+# crear la requests.Session. Los demás "import requests" del proceso
+# reciben el mismo módulo.
+#
+# Ojo con las anotaciones: "-> requests.Response" se evalúa al definir la
+# función y dispararía el import. Los módulos que lo usan ponen
+# "from __future__ import annotations".
+
+_ModuloPerezoso = importlib.util._LazyModule
+
+def importar_perezoso(nombre: str):
+    """
+    Devuelve el módulo 'nombre' sin ejecutarlo todavía.
+    Si ya estaba importado lo devuelve tal cual. Si no está instalado lanza
+    ImportError ahora (no más tarde, al usarlo).
+    """
+    modulo = sys.modules.get(nombre)
+    if modulo is not None:
+        return modulo
+    spec = importlib.util.find_spec(nombre)
+    if spec is None:
+        raise ModuleNotFoundError(f"No se encontró el módulo '{nombre}'", name=nombre)
+    cargador = importlib.util.LazyLoader(spec.loader)
+    spec.loader = cargador
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    cargador.exec_module(modulo)
+    return modulo
+
+def esta_cargado(nombre: str) -> bool:
+    """True si el módulo ya se ejecutó (no cuenta los registrados con importar_perezoso sin usar)."""
+    modulo = sys.modules.get(nombre)
+    return modulo is not None and not isinstance(modulo, _ModuloPerezoso)
@@ -0,0 +1,440 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from cliente_ecomarket import ProductoNoEncontrado
+
+# ==========================================
+# DATALOADER: LOTES, DEDUPLICACIÓN Y MEMO POR ÁMBITO
+# ==========================================
+# Un tablero con 300 productores hace 300 GET /producers/{id}/products y
+# después un GET /products/{id} por cada producto que muestra: el clásico N+1.
+# Un cargador junta las claves que se piden dentro de una ventana corta
+# (2 ms con hilos, un tick del event loop con asyncio), descarta las
+# repetidas y resuelve el lote de una vez:
+#
+#   - cargar_lote(claves): una sola llamada para todo el lote, ej.
+#     GET /products?ids=1,5,9. Devuelve una lista alineada con 'claves' donde
+#     cada elemento es el valor o la excepción de esa clave.
+#   - cargar_uno(clave): una llamada por clave, todas en paralelo.
+#
+# Lo resuelto queda memorizado: pedirlo de nuevo no sale a la red. El memo no
+# caduca ni se entera de las escrituras, así que un cargador dura lo que una
+# petición o un render (se crea uno por ámbito). Esto NO es una caché
+# compartida. Los errores no se memorizan.
+
+VENTANA = 0.002
+MAX_LOTE = 100
+
+class _Memo:
+    """Memo por clave y métricas comunes a la versión con hilos y a la de asyncio."""
+
+    def __init__(self, cargar_lote, cargar_uno, max_lote: int):
+        if (cargar_lote is None) == (cargar_uno is None):
+            raise ValueError("Hay que pasar cargar_lote o cargar_uno (uno de los dos)")
+        self._cargar_lote = cargar_lote
+        self._cargar_uno = cargar_uno
+        self.max_lote = max_lote if cargar_lote is not None else float("inf")
+        self._lock = threading.Lock()
+        self._memo = {}  # clave -> futuro (resuelto o en vuelo)
+        self.solicitadas = 0
+        self.memorizadas = 0  # Resueltas con el memo o con una carga ya en vuelo
+        self.llamadas = 0     # Llamadas a cargar_lote / cargar_uno
+        self.cargadas = 0     # Claves que salieron a la red
+
+    def _olvidar(self, clave, futuro):
+        with self._lock:
+            if self._memo.get(clave) is futuro:
+                del self._memo[clave]
+
+    def limpiar(self, clave=None):
+        """Olvida una clave (o todas), ej. después de modificarla."""
+        with self._lock:
+            if clave is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(clave, None)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "solicitadas": self.solicitadas,
+                "memorizadas": self.memorizadas,
+                "cargadas": self.cargadas,
+                "llamadas": self.llamadas,
+                "llamadas_ahorradas": self.solicitadas - self.llamadas,
+            }
+
+# ==========================================
+# VERSIÓN CON HILOS
+# ==========================================
+class _Lote:
+    __slots__ = ("futuros", "cerrado")
+
+    def __init__(self):
+        self.futuros = {}  # clave -> Future, en orden de llegada
+        self.cerrado = threading.Event()
+
+class CargadorLotes(_Memo):
+    """
+    DataLoader para llamadas desde hilos.
+
+    Uso:
+        with CargadorLotes(cargar_uno=cliente.obtener_product) as productos:
+            # Desde muchos hilos: las claves de la ventana salen juntas
+            productos.cargar(7)
+            # Desde un solo hilo: el lote sale sin esperar la ventana
+            productos.cargar_muchos([1, 2, 7])
+
+    El primer hilo que abre un lote espera 'ventana' segundos (o a que se
+    llene) y lo despacha al pool propio del cargador; los demás solo esperan
+    el resultado de su clave. Todos reciben el MISMO objeto: no modificarlo.
+    """
+
+    def __init__(self, cargar_lote=None, cargar_uno=None, ventana: float = VENTANA,
+                 max_lote: int = MAX_LOTE, max_hilos: int = 8):
+        """
+        Args:
+            cargar_lote (callable, opcional): f(claves) -> lista de valores o excepciones.
+            cargar_uno (callable, opcional): f(clave) -> valor. Una llamada por clave.
+            ventana (float): Segundos que se juntan claves antes de despachar.
+            max_lote (int): Claves por llamada a cargar_lote (ej. largo de la URL).
+            max_hilos (int): Lotes (o claves, con cargar_uno) resolviéndose a la vez.
+        """
+        super().__init__(cargar_lote, cargar_uno, max_lote)
+        self.ventana = ventana
+        self._abierto = None
+        self._executor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="cargador")
+
+    def cargar(self, clave):
+        """Valor de la clave (o su excepción), esperando a que salga su lote."""
+        return self._encolar([clave], inmediato=False)[0].result()
+
+    def cargar_muchos(self, claves) -> list:
+        """Valores de 'claves' en el mismo orden. Lanza el primer error que encuentre."""
+        return [futuro.result() for futuro in self._encolar(list(claves), inmediato=True)]
+
+    def primar(self, clave, valor):
+        """Memoriza un valor ya conocido (ej. un producto que vino en otro listado)."""
+        futuro = Future()
+        futuro.set_result(valor)
+        with self._lock:
+            self._memo.setdefault(clave, futuro)
+
+    def _encolar(self, claves: list, inmediato: bool) -> list:
+        futuros, listos, propio = [], [], None
+        with self._lock:
+            self.solicitadas += len(claves)
+            for clave in claves:
+                futuro = self._memo.get(clave)
+                if futuro is not None:
+                    self.memorizadas += 1
+                else:
+                    futuro = self._memo[clave] = Future()
+                    if self._abierto is None:
+                        self._abierto = propio = _Lote()
+                    self._abierto.futuros[clave] = futuro
+                    if len(self._abierto.futuros) >= self.max_lote:
+                        listos.append(self._cerrar())
+                futuros.append(futuro)
+            if inmediato and self._abierto is not None:
+                listos.append(self._cerrar())
+        for lote in listos:
+            self._despachar(lote)
+
+        # Quien abrió el lote que sigue abierto lo despacha al vencer la ventana
+        if propio is not None and not propio.cerrado.wait(self.ventana):
+            with self._lock:
+                lote = self._cerrar() if self._abierto is propio else None
+            if lote is not None:
+                self._despachar(lote)
+        return futuros
+
+    def _cerrar(self) -> _Lote:
+        lote, self._abierto = self._abierto, None
+        lote.cerrado.set()
+        return lote
+
+    def _despachar(self, lote: _Lote):
+        with self._lock:
+            self.cargadas += len(lote.futuros)
+            self.llamadas += 1 if self._cargar_lote is not None else len(lote.futuros)
+        if self._cargar_lote is not None:
+            self._executor.submit(self._resolver_lote, lote)
+        else:
+            for clave, futuro in lote.futuros.items():
+                self._executor.submit(self._resolver_uno, clave, futuro)
+
+    def _resolver_lote(self, lote: _Lote):
+        claves = list(lote.futuros)
+        try:
+            valores = self._cargar_lote(claves)
+            if len(valores) != len(claves):
+                raise ValueError(f"cargar_lote devolvió {len(valores)} valores para {len(claves)} claves")
+        except Exception as e:
+            valores = [e] * len(claves)
+        for clave, valor in zip(claves, valores):
+            self._resolver(clave, lote.futuros[clave], valor)
+
+    def _resolver_uno(self, clave, futuro: Future):
+        try:
+            valor = self._cargar_uno(clave)
+        except Exception as e:
+            valor = e
+        self._resolver(clave, futuro, valor)
+
+    def _resolver(self, clave, futuro: Future, valor):
+        if isinstance(valor, Exception):
+            self._olvidar(clave, futuro)
+            futuro.set_exception(valor)
+        else:
+            futuro.set_result(valor)
+
+    def cerrar(self):
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cerrar()
+
+# ==========================================
+# VERSIÓN ASYNCIO
+# ==========================================
+class CargadorLotesAsync(_Memo):
+    """
+    DataLoader para corrutinas de un mismo event loop. cargar_lote y
+    cargar_uno son funciones async. Con ventana=0 el lote se despacha en el
+    siguiente tick: junta todo lo que se pidió en un mismo asyncio.gather.
+    Si una tarea que espera se cancela, la carga sigue para las demás.
+    """
+
+    def __init__(self, cargar_lote=None, cargar_uno=None, ventana: float = 0.0,
+                 max_lote: int = MAX_LOTE, concurrencia: int = 8):
+        """
+        Args:
+            cargar_lote / cargar_uno (async callable): Como en CargadorLotes.
+            ventana (float): Segundos que se juntan claves (0 = un tick del loop).
+            max_lote (int): Claves por llamada a cargar_lote.
+            concurrencia (int): Lotes (o claves, con cargar_uno) resolviéndose a la vez.
+        """
+        super().__init__(cargar_lote, cargar_uno, max_lote)
+        self.ventana = ventana
+        self.concurrencia = concurrencia
+        self._abierto = None
+        self._semaforo = None
+        self._tareas = set()  # Referencias fuertes: asyncio solo guarda débiles
+
+    async def cargar(self, clave):
+        return await asyncio.shield(self._encolar([clave])[0])
+
+    async def cargar_muchos(self, claves) -> list:
+        return list(await asyncio.gather(*(asyncio.shield(f) for f in self._encolar(list(claves)))))
+
+    def primar(self, clave, valor):
+        futuro = asyncio.get_running_loop().create_future()
+        futuro.set_result(valor)
+        with self._lock:
+            self._memo.setdefault(clave, futuro)
+
+    def _encolar(self, claves: list) -> list:
+        loop = asyncio.get_running_loop()
+        futuros = []
+        with self._lock:
+            self.solicitadas += len(claves)
+            for clave in claves:
+                futuro = self._memo.get(clave)
+                if futuro is not None:
+                    self.memorizadas += 1
+                else:
+                    futuro = self._memo[clave] = loop.create_future()
+                    if self._abierto is None:
+                        lote = self._abierto = {}
+                        loop.call_later(self.ventana, self._despachar, lote)
+                    self._abierto[clave] = futuro
+                    if len(self._abierto) >= self.max_lote:
+                        self._despachar(self._abierto)
+                futuros.append(futuro)
+        return futuros
+
+    def _despachar(self, lote: dict):
+        # Puede llegar dos veces (lleno y después la ventana): la segunda no hace nada
+        if self._abierto is not lote:
+            return
+        self._abierto = None
+        self.cargadas += len(lote)
+        if self._cargar_lote is not None:
+            self.llamadas += 1
+            self._lanzar(self._resolver_lote(lote))
+        else:
+            self.llamadas += len(lote)
+            for clave, futuro in lote.items():
+                self._lanzar(self._resolver_uno(clave, futuro))
+
+    def _lanzar(self, corrutina):
+        tarea = asyncio.ensure_future(corrutina)
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+
+    async def _limitar(self, corrutina):
+        # El semáforo se crea dentro del loop activo (asyncio.Semaphore se liga a él)
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.concurrencia)
+        async with self._semaforo:
+            return await corrutina
+
+    async def _resolver_lote(self, lote: dict):
+        claves = list(lote)
+        try:
+            valores = await self._limitar(self._cargar_lote(claves))
+            if len(valores) != len(claves):
+                raise ValueError(f"cargar_lote devolvió {len(valores)} valores para {len(claves)} claves")
+        except Exception as e:
+            valores = [e] * len(claves)
+        for clave, valor in zip(claves, valores):
+            self._resolver(clave, lote[clave], valor)
+
+    async def _resolver_uno(self, clave, futuro):
+        try:
+            valor = await self._limitar(self._cargar_uno(clave))
+        except Exception as e:
+            valor = e
+        self._resolver(clave, futuro, valor)
+
+    def _resolver(self, clave, futuro, valor):
+        if isinstance(valor, Exception):
+            self._olvidar(clave, futuro)
+            futuro.set_exception(valor)
+        else:
+            futuro.set_result(valor)
+
+# ==========================================
+# CARGADORES DEL CATÁLOGO
+# ==========================================
+def _productos_por_ids(ids: list, productos: list) -> list:
+    """Alinea la respuesta de GET /products?ids= con los ids pedidos (404 para los que faltan)."""
+    encontrados = {producto["id"]: producto for producto in productos}
+    return [encontrados[i] if i in encontrados else ProductoNoEncontrado(f"Producto {i} no encontrado")
+            for i in ids]
+
+class CargadoresCatalogo:
+    """
+    Cargadores de un ámbito (una petición, un render del tablero) sobre un
+    cliente_contrato.ClienteContrato:
+
+        with CargadoresCatalogo(cliente, ids_en_lote=True) as cargadores:
+            cargadores.productos_de_productor.cargar(3)  # GET /producers/3/products
+            cargadores.productos.cargar(17)              # Del memo si vino en el listado
+
+    Los productos que trae un listado por productor se priman en el cargador
+    de productos: el GET /products/{id} posterior ya no sale. Con
+    ids_en_lote=True (el backend entiende ?ids=) los productos sueltos se
+    piden de a lotes; si no, uno por id, deduplicados y en paralelo.
+    """
+
+    def __init__(self, cliente, ids_en_lote: bool = False, ventana: float = VENTANA,
+                 max_lote: int = MAX_LOTE, max_hilos: int = 8):
+        self.cliente = cliente
+        if ids_en_lote:
+            self.productos = CargadorLotes(cargar_lote=self._productos_por_ids, ventana=ventana,
+                                           max_lote=max_lote, max_hilos=max_hilos)
+        else:
+            self.productos = CargadorLotes(cargar_uno=cliente.obtener_product, ventana=ventana, max_hilos=max_hilos)
+        self.productos_de_productor = CargadorLotes(cargar_uno=self._productos_de, ventana=ventana,
+                                                    max_hilos=max_hilos)
+
+    def _productos_por_ids(self, ids: list) -> list:
+        return _productos_por_ids(ids, self.cliente.listar_products(ids=",".join(map(str, ids))))
+
+    def _productos_de(self, productor_id: int) -> list:
+        productos = self.cliente.listar_products_de_producer(productor_id)
+        for producto in productos:
+            self.productos.primar(producto["id"], producto)
+        return productos
+
+    def estadisticas(self) -> dict:
+        return {"productos": self.productos.estadisticas(),
+                "productos_de_productor": self.productos_de_productor.estadisticas()}
+
+    def cerrar(self):
+        self.productos.cerrar()
+        self.productos_de_productor.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cerrar()
+
+class CargadoresCatalogoAsync:
+    """
+    Lo mismo que CargadoresCatalogo sobre un AsyncEcoMarketClient que envuelve
+    un ClienteContrato (AsyncEcoMarketClient(cliente=ClienteContrato(...))).
+    """
+
+    def __init__(self, cliente, ids_en_lote: bool = False, ventana: float = 0.0,
+                 max_lote: int = MAX_LOTE, concurrencia: int = 8):
+        self.cliente = cliente
+        if ids_en_lote:
+            self.productos = CargadorLotesAsync(cargar_lote=self._productos_por_ids, ventana=ventana,
+                                                max_lote=max_lote, concurrencia=concurrencia)
+        else:
+            self.productos = CargadorLotesAsync(cargar_uno=self._producto, ventana=ventana, concurrencia=concurrencia)
+        self.productos_de_productor = CargadorLotesAsync(cargar_uno=self._productos_de, ventana=ventana,
+                                                         concurrencia=concurrencia)
+
+    async def _producto(self, producto_id: int) -> dict:
+        return await self.cliente.llamar("obtener_product", producto_id)
+
+    async def _productos_por_ids(self, ids: list) -> list:
+        return _productos_por_ids(ids, await self.cliente.llamar("listar_products", None, ",".join(map(str, ids))))
+
+    async def _productos_de(self, productor_id: int) -> list:
+        productos = await self.cliente.llamar("listar_products_de_producer", productor_id)
+        for producto in productos:
+            self.productos.primar(producto["id"], producto)
+        return productos
+
+    def estadisticas(self) -> dict:
+        return {"productos": self.productos.estadisticas(),
+                "productos_de_productor": self.productos_de_productor.estadisticas()}
+
+if __name__ == "__main__":
+    import random
+    import time
+    from concurrent.futures import ThreadPoolExecutor as Pool
+
+    from cliente_contrato import ClienteContrato
+    from servidor_local import Inyeccion, ServidorEcoMarket
+
+    PRODUCTORES = 200
+
+    def medir(servidor, nombre, funcion, *args):
+        antes = servidor.estadisticas()["peticiones"]
+        inicio = time.perf_counter()
+        cantidad = len(funcion(*args))
+        print(f"{nombre:<26} {cantidad:>5} productos  {servidor.estadisticas()['peticiones'] - antes:>5} peticiones  "
+              f"{(time.perf_counter() - inicio) * 1000:>7.0f} ms")
+
+    # 2 ms por petición: lo que cuesta un ida y vuelta dentro del datacenter
+    with ServidorEcoMarket(productos=2000, productores=PRODUCTORES, inyeccion=Inyeccion(latencia="fija:2")) as servidor:
+        with ClienteContrato(servidor.base_url, pool_maxsize=16) as cliente, Pool(16) as pool:
+
+            def tablero(listar, obtener):
+                listados = list(pool.map(listar, range(1, PRODUCTORES + 1)))
+                return list(pool.map(obtener, [p["id"] for productos in listados for p in productos]))
+
+            print(f"--- 🧺 TABLERO: {PRODUCTORES} PRODUCTORES, SUS PRODUCTOS Y EL DETALLE DE CADA UNO ---\n")
+            medir(servidor, "N+1", tablero, cliente.listar_products_de_producer, cliente.obtener_product)
+            with CargadoresCatalogo(cliente, max_hilos=16) as cargadores:
+                medir(servidor, "cargadores", tablero, cargadores.productos_de_productor.cargar,
+                      cargadores.productos.cargar)
+
+            print("\n--- 🔎 500 DETALLES SUELTOS (ids al azar, con repetidos) ---\n")
+            azar = random.Random(1)
+            ids = [azar.randint(1, 2000) for _ in range(500)]
+            medir(servidor, "un GET por id", lambda: list(pool.map(cliente.obtener_product, ids)))
+            for nombre, ids_en_lote in (("deduplicados", False), ("?ids= en lotes de 100", True)):
+                with CargadoresCatalogo(cliente, ids_en_lote=ids_en_lote, max_hilos=16) as cargadores:
+                    medir(servidor, nombre, cargadores.productos.cargar_muchos, ids)
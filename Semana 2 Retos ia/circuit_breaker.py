@@ -0,0 +1,276 @@
+import threading
+import time
+from collections import deque
+
+from cliente_ecomarket import CircuitoAbiertoError, BulkheadLlenoError
+from retry import STATUS_REINTENTABLES, clasificar_error
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMI_ABIERTO = "semi_abierto"
+
+def es_fallo_por_defecto(error: BaseException) -> bool:
+    """
+    Solo los errores transitorios (red, 408, 429, 500, 502, 503, 504) indican que el backend
+    está degradado. Un 404 o un 409 son respuestas correctas del servidor.
+    """
+    return clasificar_error(error)[0]
+
+class CircuitBreaker:
+    """
+    Circuit breaker con ventana deslizante de las últimas N llamadas.
+
+    CERRADO: las llamadas pasan. Se abre si, con al menos minimo_llamadas en
+        la ventana, la tasa de fallos o la de llamadas lentas supera su umbral.
+    ABIERTO: se rechaza todo sin tocar la red durante espera_abierto segundos.
+    SEMI_ABIERTO: se dejan pasar llamadas_prueba llamadas; si la tasa de fallo
+        de esas pruebas supera el umbral se vuelve a ABIERTO, si no a CERRADO.
+    """
+
+    def __init__(self, nombre: str, ventana: int = 20, minimo_llamadas: int = 10,
+                 umbral_fallos: float = 0.5, umbral_lentas: float = 1.0,
+                 duracion_lenta: float = 2.0, espera_abierto: float = 30.0,
+                 llamadas_prueba: int = 3, reloj=time.monotonic, al_cambiar_estado=None):
+        """
+        Args:
+            umbral_fallos (float): Fracción de fallos (0-1) que abre el circuito.
+            umbral_lentas (float): Fracción de llamadas lentas que lo abre; 1.0 o más
+                desactiva el chequeo (las lentas nunca abren el circuito).
+            duracion_lenta (float): Segundos a partir de los cuales una llamada es lenta.
+            al_cambiar_estado (callable, opcional): f(nombre, anterior, nuevo).
+        """
+        self.nombre = nombre
+        self.minimo_llamadas = minimo_llamadas
+        self.umbral_fallos = umbral_fallos
+        self.umbral_lentas = umbral_lentas
+        self.duracion_lenta = duracion_lenta
+        self.espera_abierto = espera_abierto
+        self.llamadas_prueba = llamadas_prueba
+        self.reloj = reloj
+        self.al_cambiar_estado = al_cambiar_estado
+
+        self._lock = threading.Lock()
+        self._ventana = deque(maxlen=ventana)  # (fallo, lenta) por llamada
+        self._fallos = 0
+        self._lentas = 0
+        self.estado = CERRADO
+        self._abierto_desde = 0.0
+        self._pruebas_emitidas = 0
+        self._pruebas = []
+
+        self.rechazadas = 0
+        self.transiciones = []  # [(instante, anterior, nuevo)]
+
+    def _cambiar(self, nuevo: str) -> tuple:
+        """Cambia de estado con el lock tomado; devuelve la transición a notificar."""
+        anterior, self.estado = self.estado, nuevo
+        self.transiciones.append((self.reloj(), anterior, nuevo))
+        if nuevo == ABIERTO:
+            self._abierto_desde = self.reloj()
+        elif nuevo == SEMI_ABIERTO:
+            self._pruebas_emitidas = 0
+            self._pruebas = []
+        else:
+            self._ventana.clear()
+            self._fallos = self._lentas = 0
+        return anterior, nuevo
+
+    def _notificar(self, transicion: tuple):
+        # Fuera del lock: el callback puede consultar el breaker o tardar (logs, métricas)
+        if transicion is not None and self.al_cambiar_estado is not None:
+            self.al_cambiar_estado(self.nombre, *transicion)
+
+    def permitir(self) -> bool:
+        """¿Puede salir una llamada ahora? Cuenta el rechazo si no."""
+        transicion = None
+        with self._lock:
+            if self.estado == ABIERTO and self.reloj() - self._abierto_desde >= self.espera_abierto:
+                transicion = self._cambiar(SEMI_ABIERTO)
+            if self.estado == CERRADO:
+                permitida = True
+            elif self.estado == SEMI_ABIERTO and self._pruebas_emitidas < self.llamadas_prueba:
+                self._pruebas_emitidas += 1
+                permitida = True
+            else:
+                self.rechazadas += 1
+                permitida = False
+        self._notificar(transicion)
+        return permitida
+
+    def liberar_permiso(self):
+        """
+        Devuelve el permiso de una llamada que pasó por permitir() pero no
+        llegó a salir (ej. la rechazó el bulkhead): no cuenta como resultado.
+        """
+        with self._lock:
+            if self.estado == SEMI_ABIERTO and self._pruebas_emitidas > 0:
+                self._pruebas_emitidas -= 1
+
+    def registrar(self, fallo: bool, duracion: float):
+        """Registra el resultado de una llamada que pasó por permitir()."""
+        lenta = duracion >= self.duracion_lenta
+        with self._lock:
+            transicion = self._registrar(fallo, lenta)
+        self._notificar(transicion)
+
+    def _registrar(self, fallo: bool, lenta: bool) -> tuple:
+        if self.estado == SEMI_ABIERTO:
+            self._pruebas.append(fallo or lenta)
+            if len(self._pruebas) >= self.llamadas_prueba:
+                tasa = sum(self._pruebas) / len(self._pruebas)
+                return self._cambiar(ABIERTO if tasa >= self.umbral_fallos else CERRADO)
+            return None
+        if self.estado != CERRADO:
+            return None  # Llamada que salió antes de abrirse el circuito
+
+        if len(self._ventana) == self._ventana.maxlen:
+            viejo_fallo, vieja_lenta = self._ventana[0]
+            self._fallos -= viejo_fallo
+            self._lentas -= vieja_lenta
+        self._ventana.append((fallo, lenta))
+        self._fallos += fallo
+        self._lentas += lenta
+
+        total = len(self._ventana)
+        if total >= self.minimo_llamadas and (
+            self._fallos / total >= self.umbral_fallos
+            or (self.umbral_lentas < 1.0 and self._lentas / total >= self.umbral_lentas)
+        ):
+            return self._cambiar(ABIERTO)
+        return None
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            total = len(self._ventana)
+            return {
+                "estado": self.estado,
+                "llamadas_en_ventana": total,
+                "tasa_fallos": self._fallos / total if total else 0.0,
+                "tasa_lentas": self._lentas / total if total else 0.0,
+                "rechazadas": self.rechazadas,
+                "transiciones": len(self.transiciones),
+            }
+
+class Bulkhead:
+    """
+    Limita cuántas llamadas de una operación pueden estar en vuelo a la vez,
+    para que una operación lenta no acapare todos los hilos del proceso.
+    """
+
+    def __init__(self, nombre: str, max_concurrentes: int = 10, espera_maxima: float = 0.0):
+        """
+        Args:
+            max_concurrentes (int): Llamadas simultáneas permitidas.
+            espera_maxima (float): Segundos que se espera un lugar antes de rechazar.
+        """
+        self.nombre = nombre
+        self.max_concurrentes = max_concurrentes
+        self.espera_maxima = espera_maxima
+        self._semaforo = threading.BoundedSemaphore(max_concurrentes)
+        self._lock = threading.Lock()
+        self.en_vuelo = 0
+        self.rechazadas = 0
+
+    def adquirir(self) -> bool:
+        if self.espera_maxima > 0:
+            obtenido = self._semaforo.acquire(timeout=self.espera_maxima)
+        else:
+            obtenido = self._semaforo.acquire(blocking=False)
+        with self._lock:
+            if obtenido:
+                self.en_vuelo += 1
+            else:
+                self.rechazadas += 1
+        return obtenido
+
+    def liberar(self):
+        with self._lock:
+            self.en_vuelo -= 1
+        self._semaforo.release()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {"en_vuelo": self.en_vuelo, "max_concurrentes": self.max_concurrentes,
+                    "rechazadas": self.rechazadas}
+
+class RegistroCircuitos:
+    """
+    Circuit breaker + bulkhead por operación del cliente (listar_productos,
+    obtener_producto, ...). Se crean a demanda con la configuración común,
+    que se puede ajustar por operación.
+
+    Uso:
+        circuitos = RegistroCircuitos(breaker={"umbral_fallos": 0.5}, max_concurrentes=20,
+                                      por_operacion={"listar_productos": {"max_concurrentes": 2}})
+        cliente = EcoMarketClient(circuitos=circuitos)
+    """
+
+    def __init__(self, breaker: dict = None, max_concurrentes: int = 10, espera_maxima: float = 0.0,
+                 por_operacion: dict = None, es_fallo=es_fallo_por_defecto, al_cambiar_estado=None):
+        self.config_breaker = dict(breaker or {})
+        self.max_concurrentes = max_concurrentes
+        self.espera_maxima = espera_maxima
+        self.por_operacion = por_operacion or {}
+        self.es_fallo = es_fallo
+        self.al_cambiar_estado = al_cambiar_estado
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self._bulkheads = {}
+
+    def breaker(self, operacion: str) -> CircuitBreaker:
+        with self._lock:
+            if operacion not in self._breakers:
+                config = dict(self.config_breaker)
+                config.update(self.por_operacion.get(operacion, {}).get("breaker", {}))
+                config.setdefault("al_cambiar_estado", self.al_cambiar_estado)
+                self._breakers[operacion] = CircuitBreaker(operacion, **config)
+            return self._breakers[operacion]
+
+    def bulkhead(self, operacion: str) -> Bulkhead:
+        with self._lock:
+            if operacion not in self._bulkheads:
+                ajustes = self.por_operacion.get(operacion, {})
+                self._bulkheads[operacion] = Bulkhead(
+                    operacion,
+                    ajustes.get("max_concurrentes", self.max_concurrentes),
+                    ajustes.get("espera_maxima", self.espera_maxima),
+                )
+            return self._bulkheads[operacion]
+
+    def ejecutar(self, operacion: str, funcion, *args, **kwargs):
+        """
+        Ejecuta funcion(*args) protegida. Si devuelve una respuesta HTTP, su
+        status decide si cuenta como fallo (STATUS_REINTENTABLES: 408, 429, 500, 502-504).
+        """
+        breaker = self.breaker(operacion)
+        if not breaker.permitir():
+            raise CircuitoAbiertoError(f"Circuito abierto para '{operacion}': se rechaza sin llamar a la API")
+        bulkhead = self.bulkhead(operacion)
+        if not bulkhead.adquirir():
+            # La llamada no salió: no es un éxito ni un fallo del backend
+            breaker.liberar_permiso()
+            raise BulkheadLlenoError(
+                f"'{operacion}' ya tiene {bulkhead.max_concurrentes} llamadas en vuelo")
+
+        inicio = breaker.reloj()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except Exception as e:
+            breaker.registrar(self.es_fallo(e), breaker.reloj() - inicio)
+            raise
+        finally:
+            bulkhead.liberar()
+        status_code = getattr(resultado, "status_code", None)
+        breaker.registrar(status_code in STATUS_REINTENTABLES, breaker.reloj() - inicio)
+        return resultado
+
+    def estadisticas(self) -> dict:
+        """Estado por operación: {'obtener_producto': {'estado': ..., 'bulkhead': {...}}}"""
+        with self._lock:
+            operaciones = set(self._breakers) | set(self._bulkheads)
+        resultado = {}
+        for operacion in sorted(operaciones):
+            datos = self.breaker(operacion).estadisticas()
+            datos["bulkhead"] = self.bulkhead(operacion).estadisticas()
+            resultado[operacion] = datos
+        return resultado
@@ -0,0 +1,179 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Iterable
+
+from cliente_ecomarket import (
+    BASE_URL,
+    EcoMarketClient,
+    EcoMarketError,
+    ProductoNoEncontrado,
+    ConflictoError,
+)
+
+__all__ = [
+    "AsyncEcoMarketClient",
+    "Resultado",
+    "recolectar",
+    "EcoMarketError",
+    "ProductoNoEncontrado",
+    "ConflictoError",
+]
+
+LIMITE_CONCURRENCIA = 20
+
+@dataclass
+class Resultado:
+    """Resultado de una llamada dentro de un lote: valor o error, nunca ambos."""
+    valor: Any = None
+    error: BaseException = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+async def recolectar(tareas: Iterable[Awaitable]) -> list:
+    """
+    Versión de asyncio.gather que no aborta el lote si una tarea falla.
+    Devuelve un Resultado por tarea, en el mismo orden de entrada.
+    """
+    salidas = await asyncio.gather(*tareas, return_exceptions=True)
+    resultados = []
+    for salida in salidas:
+        # Dejamos pasar CancelledError/KeyboardInterrupt: no son fallos de la API
+        if isinstance(salida, BaseException) and not isinstance(salida, Exception):
+            raise salida
+        if isinstance(salida, Exception):
+            resultados.append(Resultado(error=salida))
+        else:
+            resultados.append(Resultado(valor=salida))
+    return resultados
+
+class AsyncEcoMarketClient:
+    """
+    Contraparte asyncio de EcoMarketClient.
+    Cada operación corre sobre el cliente con pool (mismas rutas y mismas
+    excepciones) en un pool de hilos propio, y un semáforo limita cuántas
+    peticiones hay en vuelo a la vez.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, limite: int = LIMITE_CONCURRENCIA,
+                 timeout: float = None, cliente: EcoMarketClient = None, coalescedor=None,
+                 control_carga=None):
+        """
+        Args:
+            base_url (str|list): URL base de la API o lista de réplicas.
+            limite (int): Máximo de peticiones simultáneas.
+            timeout (float, opcional): Timeout por petición en segundos.
+            cliente (EcoMarketClient, opcional): Cliente síncrono a reutilizar.
+            coalescedor (coalescencia.CoalescedorAsync, opcional): Las lecturas
+                iguales en curso se comparten antes de ocupar un hilo del pool.
+            control_carga (control_carga.ControlCarga, opcional): Límite de tasa
+                y concurrencia adaptativa por operación; se espera en el event
+                loop, sin ocupar hilos. 'limite' queda como techo.
+        """
+        self.limite = limite
+        self._cliente = cliente or EcoMarketClient(base_url, pool_maxsize=limite, timeout=timeout)
+        self._executor = ThreadPoolExecutor(max_workers=limite, thread_name_prefix="ecomarket")
+        self._semaforo = None
+        self.coalescedor = coalescedor
+        self.control_carga = control_carga
+
+    async def _ejecutar(self, funcion, *args):
+        if self.control_carga is not None:
+            # El nombre del método del cliente síncrono es el de la operación
+            return await self.control_carga.ejecutar_async(funcion.__name__, self._en_hilo, funcion, *args)
+        return await self._en_hilo(funcion, *args)
+
+    async def _en_hilo(self, funcion, *args):
+        # El semáforo se crea dentro del loop activo (asyncio.Semaphore se liga a él)
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.limite)
+        async with self._semaforo:
+            loop = asyncio.get_running_loop()
+            # Copiamos el contexto (como asyncio.to_thread) para que el hilo vea
+            # las contextvars de la tarea, ej. el número de reintento en curso
+            contexto = contextvars.copy_context()
+            return await loop.run_in_executor(self._executor, functools.partial(contexto.run, funcion, *args))
+
+    async def _leer(self, operacion: str, ruta: str, funcion, *args):
+        if self.coalescedor is None:
+            return await self._ejecutar(funcion, *args)
+        return await self.coalescedor.ejecutar(operacion, ("GET", ruta), self._ejecutar, funcion, *args)
+
+    async def aclose(self):
+        """Libera el pool de hilos y las conexiones."""
+        self._executor.shutdown(wait=False)
+        self._cliente.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def llamar(self, metodo: str, *args):
+        """
+        Corre un método del cliente síncrono por nombre, con el mismo límite
+        y control de carga. Sirve para los que no tienen versión async, ej.
+        los generados de ClienteContrato:
+            await cliente.llamar("listar_products_de_producer", 3)
+        """
+        return await self._ejecutar(getattr(self._cliente, metodo), *args)
+
+    # --- Lectura ---
+
+    async def listar_productos(self):
+        """Obtiene la lista de todos los productos."""
+        return await self._leer("listar_productos", "/productos", self._cliente.listar_productos)
+
+    async def obtener_producto(self, producto_id: int):
+        """Obtiene un producto por su ID."""
+        ruta = self._cliente.urls.path("/productos/{id}", id=producto_id)
+        return await self._leer("obtener_producto", ruta, self._cliente.obtener_producto, producto_id)
+
+    async def obtener_productos(self, ids: Iterable[int]) -> list:
+        """
+        Obtiene muchos productos en paralelo (acotado por el límite).
+        Devuelve un Resultado por ID; un 404 no cancela el resto del lote.
+        """
+        return await recolectar(self.obtener_producto(producto_id) for producto_id in ids)
+
+    # --- Escritura ---
+
+    async def crear_producto(self, datos: dict) -> dict:
+        """
+        Crea un nuevo producto en el sistema.
+        Endpoint: POST /productos
+        """
+        return await self._ejecutar(self._cliente.crear_producto, datos)
+
+    async def actualizar_producto_total(self, producto_id: int, datos: dict) -> dict:
+        """
+        Reemplaza COMPLETAMENTE un recurso existente.
+        Endpoint: PUT /productos/{id}
+        """
+        return await self._ejecutar(self._cliente.actualizar_producto_total, producto_id, datos)
+
+    async def actualizar_producto_parcial(self, producto_id: int, campos: dict) -> dict:
+        """
+        Actualiza SOLO los campos enviados.
+        Endpoint: PATCH /productos/{id}
+        """
+        return await self._ejecutar(self._cliente.actualizar_producto_parcial, producto_id, campos)
+
+    async def actualizar_producto_delta(self, producto_id: int, deseado: dict, base: dict = None) -> dict:
+        """
+        Manda solo lo que cambió respecto de 'base' (o nada si no hay cambios).
+        Ver EcoMarketClient.actualizar_producto_delta.
+        """
+        return await self._ejecutar(self._cliente.actualizar_producto_delta, producto_id, deseado, base)
+
+    async def eliminar_producto(self, producto_id: int) -> bool:
+        """
+        Elimina un recurso.
+        Endpoint: DELETE /productos/{id}
+        """
+        return await self._ejecutar(self._cliente.eliminar_producto, producto_id)
@@ -0,0 +1,167 @@
+# ==========================================
+# ARCHIVO GENERADO por generar_cliente.py desde openapi_sem2.yaml.
+# No editar a mano: cambiar el contrato y volver a generar.
+# ==========================================
+from carga_perezosa import importar_perezoso
+from cliente_ecomarket import (BASE_URL, PLANTILLAS_RUTA, RUTAS_CLIENTE, ConflictoError, EcoMarketClient,
+                               EcoMarketError, ProductoNoEncontrado)
+from url_builder import Ruta, URLBuilder
+
+requests = importar_perezoso("requests")  # Solo se carga al crear el cliente
+
+HASH_CONTRATO = 'f984edcdcadca3015f25bc4009e66fa07da7411d0642919842e361c69f7cce62'
+VERSION_GENERADOR = 1
+
+# (método, plantilla, nombre del método generado)
+OPERACIONES = (
+    ('GET', '/products', 'listar_products'),
+    ('POST', '/products', 'crear_product'),
+    ('GET', '/products/{id}', 'obtener_product'),
+    ('PATCH', '/products/{id}', 'actualizar_product_parcial'),
+    ('DELETE', '/products/{id}', 'eliminar_product'),
+    ('DELETE', '/producers/{id}', 'eliminar_producer'),
+    ('GET', '/producers/{id}/products', 'listar_products_de_producer'),
+)
+
+RUTAS_CONTRATO = {
+    '/products': Ruta('/products', {}),
+    '/products/{id}': Ruta('/products/{id}', {'id': 'integer'}),
+    '/producers/{id}': Ruta('/producers/{id}', {'id': 'integer'}),
+    '/producers/{id}/products': Ruta('/producers/{id}/products', {'id': 'integer'}),
+}
+
+PLANTILLAS_CONTRATO = {
+    'listar_products': '/products',
+    'crear_product': '/products',
+    'obtener_product': '/products/{id}',
+    'actualizar_product_parcial': '/products/{id}',
+    'eliminar_product': '/products/{id}',
+    'eliminar_producer': '/producers/{id}',
+    'listar_products_de_producer': '/producers/{id}/products',
+}
+
+# ==========================================
+# VALIDADORES COMPILADOS
+# ==========================================
+_V1_M1 = 'El ProductInput debe ser un objeto (dict), se recibió: {tipo}'
+_V1_M2 = "Falta el campo requerido: 'name'"
+_V1_M3 = "Falta el campo requerido: 'price'"
+_V1_M4 = "Falta el campo requerido: 'producerId'"
+_V1_M5 = "El 'name' debe ser texto (str), se recibió: {tipo}"
+_V1_M6 = "El 'price' debe ser numérico (float), se recibió: {tipo}"
+_V1_M7 = "El 'producerId' debe ser entero (int), se recibió: {tipo}"
+
+def validar_product_input(data):
+    if type(data) is not dict and not isinstance(data, dict):
+        raise TypeError(_V1_M1.format(tipo=type(data).__name__))
+    try:
+        _r0 = data['name']
+        _r1 = data['price']
+        _r2 = data['producerId']
+    except KeyError:
+        if 'name' not in data:
+            raise ValueError(_V1_M2.format())
+        if 'price' not in data:
+            raise ValueError(_V1_M3.format())
+        if 'producerId' not in data:
+            raise ValueError(_V1_M4.format())
+        raise
+    if type(_r0) is not str and not isinstance(_r0, str):
+        raise TypeError(_V1_M5.format(tipo=type(_r0).__name__))
+    if type(_r1) is not float and not isinstance(_r1, (float, int)):
+        raise TypeError(_V1_M6.format(tipo=type(_r1).__name__))
+    if type(_r2) is not int and not isinstance(_r2, int):
+        raise TypeError(_V1_M7.format(tipo=type(_r2).__name__))
+    return data
+
+_V2_M1 = 'El cuerpo debe ser un objeto (dict), se recibió: {tipo}'
+_V2_M2 = "El 'price' debe ser numérico (float), se recibió: {tipo}"
+_V2_M3 = "El 'stock' debe ser entero (int), se recibió: {tipo}"
+
+def validar_actualizar_product_parcial(data):
+    if type(data) is not dict and not isinstance(data, dict):
+        raise TypeError(_V2_M1.format(tipo=type(data).__name__))
+    if 'price' in data:
+        _v0 = data['price']
+        if type(_v0) is not float and not isinstance(_v0, (float, int)):
+            raise TypeError(_V2_M2.format(tipo=type(_v0).__name__))
+    if 'stock' in data:
+        _v0 = data['stock']
+        if type(_v0) is not int and not isinstance(_v0, int):
+            raise TypeError(_V2_M3.format(tipo=type(_v0).__name__))
+    return data
+
+# ==========================================
+# CLIENTE
+# ==========================================
+def _query(*pares) -> dict:
+    """Parámetros de query sin los que quedaron en None."""
+    query = {nombre: valor for nombre, valor in zip(pares[::2], pares[1::2]) if valor is not None}
+    return query or None
+
+class ClienteContrato(EcoMarketClient):
+    """
+    Cliente con un método por operación de openapi_sem2.yaml.
+    Hereda de EcoMarketClient el pool, la caché, los circuitos, el observador
+    y el codec; los métodos escritos a mano (rutas /productos) siguen disponibles.
+    """
+
+    PLANTILLAS = {**PLANTILLAS_RUTA, **PLANTILLAS_CONTRATO}
+
+    def __init__(self, base_url: str = BASE_URL, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.urls = URLBuilder(self.base_url, {**RUTAS_CLIENTE, **RUTAS_CONTRATO})
+
+    def _llamar(self, metodo: str, ruta: str, operacion: str, exitos: tuple, **kwargs):
+        try:
+            response = self._request(metodo, ruta, operacion, **kwargs)
+        except requests.exceptions.RequestException as e:
+            raise EcoMarketError(f"Error de red en {metodo} {ruta}: {e}") from e
+        if response.status_code in exitos:
+            return True if response.status_code == 204 else self._json(response)
+        if response.status_code == 404:
+            error = ProductoNoEncontrado if PLANTILLAS_CONTRATO[operacion].startswith("/products") else EcoMarketError
+            raise error(f"Error 404 en {metodo} {ruta}", response=response)
+        if response.status_code == 409:
+            raise ConflictoError(f"Error 409 en {metodo} {ruta}: {response.text}", response=response)
+        raise EcoMarketError(f"Error en {metodo} {ruta}: {response.status_code} - {response.text}",
+                             response=response)
+
+    def listar_products(self, name: str = None, ids: str = None) -> list:
+        """Listar y buscar productos. Endpoint: GET /products"""
+        ruta = self.urls.path('/products', _query('name', name, 'ids', ids))
+        return self._llamar('GET', ruta, 'listar_products', (200,))
+
+    def crear_product(self, datos: dict, validar: bool = True) -> dict:
+        """Crear nuevo producto. Endpoint: POST /products"""
+        if validar:
+            validar_product_input(datos)
+        ruta = self.urls.path('/products')
+        return self._llamar('POST', ruta, 'crear_product', (201,), **self._cuerpo_json(datos))
+
+    def obtener_product(self, id: int) -> dict:
+        """Obtener detalle de un producto. Endpoint: GET /products/{id}"""
+        ruta = self.urls.path('/products/{id}', id=id)
+        return self._llamar('GET', ruta, 'obtener_product', (200,))
+
+    def actualizar_product_parcial(self, id: int, datos: dict, validar: bool = True) -> dict:
+        """Actualizar parcialmente (ej. solo precio). Endpoint: PATCH /products/{id}"""
+        if validar:
+            validar_actualizar_product_parcial(datos)
+        ruta = self.urls.path('/products/{id}', id=id)
+        return self._llamar('PATCH', ruta, 'actualizar_product_parcial', (200,), **self._cuerpo_json(datos))
+
+    def eliminar_product(self, id: int) -> bool:
+        """Eliminar producto. Endpoint: DELETE /products/{id}"""
+        ruta = self.urls.path('/products/{id}', id=id)
+        return self._llamar('DELETE', ruta, 'eliminar_product', (204,))
+
+    def eliminar_producer(self, id: int) -> bool:
+        """Eliminar productor. Endpoint: DELETE /producers/{id}"""
+        ruta = self.urls.path('/producers/{id}', id=id)
+        return self._llamar('DELETE', ruta, 'eliminar_producer', (204,))
+
+    def listar_products_de_producer(self, id: int) -> list:
+        """Obtener todos los productos de un productor específico. Endpoint: GET /producers/{id}/products"""
+        ruta = self.urls.path('/producers/{id}/products', id=id)
+        return self._llamar('GET', ruta, 'listar_products_de_producer', (200,))
@@ -1,132 +1,737 @@
-import requests
-
-
-BASE_URL =  "https://retos-ia.free.beeceptor.com" 
-
-# --- EXCEPCIONES PERSONALIZADAS ---
-class EcoMarketError(Exception):
-    """Clase base para errores de la API EcoMarket"""
-    pass
-
-class ProductoNoEncontrado(EcoMarketError):
-    """Se lanza cuando el recurso devuelve 404"""
-    pass
-
-class ConflictoError(EcoMarketError):
-    """Se lanza cuando hay duplicados (409)"""
-    pass
-
-# --- FUNCIONES EXISTENTES (Lectura) ---
-
-def listar_productos():
-    """Obtiene la lista de todos los productos."""
-    try:
-        response = requests.get(f"{BASE_URL}/productos")
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        raise EcoMarketError(f"Error al listar productos: {e}")
-
-def obtener_producto(producto_id: int):
-    """Obtiene un producto por su ID."""
-    response = requests.get(f"{BASE_URL}/productos/{producto_id}")
-    if response.status_code == 404:
-        raise ProductoNoEncontrado(f"Producto {producto_id} no encontrado")
-    if response.status_code != 200:
-        raise EcoMarketError(f"Error desconocido: {response.status_code}")
-    return response.json()
-
-# --- NUEVAS FUNCIONES (Escritura - Reto 3) ---
-
-def crear_producto(datos: dict) -> dict:
-    """
-    Crea un nuevo producto en el sistema.
-    Endpoint: POST /productos
-    """
-    url = f"{BASE_URL}/productos"
-    # requests.post con parametro 'json' añade automáticamente el header Content-Type: application/json
-    response = requests.post(url, json=datos)
-
-    if response.status_code == 201:
-        return response.json()
-    elif response.status_code == 409:
-        raise ConflictoError("Error 409: El producto ya existe.")
-    else:
-        # Lanza error para 400, 500, etc.
-        raise EcoMarketError(f"Error al crear: {response.status_code} - {response.text}")
-
-def actualizar_producto_total(producto_id: int, datos: dict) -> dict:
-    """
-    Reemplaza COMPLETAMENTE un recurso existente.
-    Endpoint: PUT /productos/{id}
-    """
-    url = f"{BASE_URL}/productos/{producto_id}"
-    response = requests.put(url, json=datos)
-
-    if response.status_code == 200:
-        return response.json()
-    elif response.status_code == 404:
-        raise ProductoNoEncontrado(f"No se puede actualizar. ID {producto_id} no existe.")
-    else:
-        raise EcoMarketError(f"Error en PUT: {response.status_code}")
-
-def actualizar_producto_parcial(producto_id: int, campos: dict) -> dict:
-    """
-    Actualiza SOLO los campos enviados.
-    Endpoint: PATCH /productos/{id}
-    """
-    url = f"{BASE_URL}/productos/{producto_id}"
-    response = requests.patch(url, json=campos)
-
-    if response.status_code == 200:
-        return response.json()
-    elif response.status_code == 404:
-        raise ProductoNoEncontrado(f"No se puede parchear. ID {producto_id} no existe.")
-    else:
-        raise EcoMarketError(f"Error en PATCH: {response.status_code}")
-
-def eliminar_producto(producto_id: int) -> bool:
-    """
-    Elimina un recurso.
-    Endpoint: DELETE /productos/{id}
-    """
-    url = f"{BASE_URL}/productos/{producto_id}"
-    response = requests.delete(url)
-
-    if response.status_code == 204:
-        return True
-    elif response.status_code == 404:
-        raise ProductoNoEncontrado(f"No se puede eliminar. ID {producto_id} no existe.")
-    else:
-        raise EcoMarketError(f"Error en DELETE: {response.status_code}")
-
-# --- BLOQUE DE EJECUCIÓN ---
-if __name__ == "__main__":
-    print("--- INICIANDO PRUEBAS DEL CLIENTE CRUD ---")
-    
-    # Datos de prueba
-    nuevo_prod = {"nombre": "Manzanas Gala", "precio": 2.5, "stock": 100}
-    patch_data = {"precio": 3.0} # Solo cambiamos precio
-
-    try:
-        # 1. Crear
-        print("\n1. Probando CREAR (POST)...")
-        creado = crear_producto(nuevo_prod)
-        print(f"✅ Creado: {creado}")
-
-        # 2. Actualizar Parcial (PATCH) - IMPORTANTE PARA LA CAPTURA
-        print("\n2. Probando ACTUALIZAR PARCIAL (PATCH)...")
-        # Asumimos que el ID 1 existe o usamos el del creado si el server devuelve ID
-        id_prueba = creado.get("id", 1) 
-        parcheado = actualizar_producto_parcial(id_prueba, patch_data)
-        print(f"✅ Parcheado: {parcheado}")
-
-        # 3. Eliminar
-        print("\n3. Probando ELIMINAR (DELETE)...")
-        eliminado = eliminar_producto(id_prueba)
-        print(f"✅ Eliminado: {eliminado}")
-
-    except EcoMarketError as e:
-        print(f"❌ Error controlado: {e}")
-    except Exception as e:
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+
+from balanceo import Balanceador
+from carga_perezosa import importar_perezoso
+from codec_json import CodecJSON, obtener_codec
+from compresion import PoliticaCompresion
+from json_incremental import iterar_array_json
+from merge_patch import CAMPOS_SOLO_LECTURA, EstadisticasDelta, calcular_merge_patch, tiene_nulos
+from url_builder import Ruta, URLBuilder
+from validadores import validar_producto, iterar_productos_validos
+
+
+# requests (~150 ms de import con urllib3 y compañía) se carga recién al
+# crear el primer cliente: importar este módulo para usar las excepciones o
+# las constantes no lo paga
+requests = importar_perezoso("requests")
+
+BASE_URL =  "https://retos-ia.free.beeceptor.com" 
+
+# --- EXCEPCIONES PERSONALIZADAS ---
+class EcoMarketError(Exception):
+    """Clase base para errores de la API EcoMarket"""
+
+    def __init__(self, mensaje: str = "", response: requests.Response = None):
+        super().__init__(mensaje)
+        # Respuesta HTTP que originó el error (None si fue un fallo de red)
+        self.response = response
+
+    @property
+    def status_code(self):
+        return self.response.status_code if self.response is not None else None
+
+class ProductoNoEncontrado(EcoMarketError):
+    """Se lanza cuando el recurso devuelve 404"""
+    pass
+
+class ConflictoError(EcoMarketError):
+    """Se lanza cuando hay duplicados (409)"""
+    pass
+
+class CircuitoAbiertoError(EcoMarketError):
+    """Se lanza sin llamar a la red cuando el circuit breaker de la operación está abierto"""
+    pass
+
+class BulkheadLlenoError(EcoMarketError):
+    """Se lanza cuando la operación ya tiene el máximo de llamadas en vuelo"""
+    pass
+
+class LimiteTasaError(EcoMarketError):
+    """Se lanza cuando no hay token de tasa dentro de la espera máxima configurada"""
+    pass
+
+class VersionObsoletaError(EcoMarketError):
+    """Se lanza cuando el recurso cambió desde el ETag enviado en If-Match (412)"""
+    pass
+
+# --- REPORTE DE OPERACIONES EN LOTE ---
+
+@dataclass
+class ReporteLote:
+    """
+    Resultado de una operación en lote. Cada diccionario usa como clave el
+    índice del ítem en la lista de entrada.
+    """
+    exitos: dict = field(default_factory=dict)
+    duplicados: dict = field(default_factory=dict)       # ConflictoError (409)
+    no_encontrados: dict = field(default_factory=dict)   # ProductoNoEncontrado (404)
+    invalidos: dict = field(default_factory=dict)        # Rechazados antes de enviar
+    fallos: dict = field(default_factory=dict)           # Cualquier otro error
+
+    def registrar_error(self, indice: int, error: Exception):
+        if isinstance(error, ConflictoError):
+            self.duplicados[indice] = error
+        elif isinstance(error, ProductoNoEncontrado):
+            self.no_encontrados[indice] = error
+        else:
+            self.fallos[indice] = error
+
+    @property
+    def total(self) -> int:
+        return (len(self.exitos) + len(self.duplicados) + len(self.no_encontrados)
+                + len(self.invalidos) + len(self.fallos))
+
+    @property
+    def ok(self) -> bool:
+        return self.total == len(self.exitos)
+
+# --- CAMBIOS DEL CATÁLOGO (sincronización incremental) ---
+
+@dataclass
+class CambiosCatalogo:
+    """
+    Respuesta de listar_cambios().
+    completo=True: 'productos' es el catálogo entero (reemplaza lo que haya).
+    completo=False: solo vienen los modificados y los ids en 'borrados'.
+    no_modificado=True: el servidor respondió 304 y no hay nada que aplicar.
+    """
+    productos: list = field(default_factory=list)
+    borrados: list = field(default_factory=list)
+    cursor: str = None
+    etag: str = None
+    completo: bool = True
+    no_modificado: bool = False
+
+# --- CLIENTE CON POOL DE CONEXIONES ---
+
+# Rutas del cliente, compiladas una sola vez. El id acepta int o str y
+# siempre se escapa (un '../' nunca sale como path traversal).
+RUTAS_CLIENTE = {
+    "/productos": Ruta("/productos"),
+    "/productos/{id}": Ruta("/productos/{id}"),
+}
+
+# Ruta genérica de cada operación, para agrupar métricas sin un id por serie
+PLANTILLAS_RUTA = {
+    "listar_productos": "/productos",
+    "iter_productos": "/productos",
+    "obtener_producto": "/productos/{id}",
+    "crear_producto": "/productos",
+    "actualizar_producto_total": "/productos/{id}",
+    "actualizar_producto_parcial": "/productos/{id}",
+    "eliminar_producto": "/productos/{id}",
+}
+
+class EcoMarketClient:
+    """
+    Cliente HTTP de EcoMarket que reutiliza conexiones (keep-alive).
+    Todas las llamadas comparten una única requests.Session, así que el
+    handshake TCP+TLS se paga una sola vez por conexión del pool y no en
+    cada petición.
+    """
+
+    # Operación -> plantilla de ruta (las subclases agregan las suyas)
+    PLANTILLAS = PLANTILLAS_RUTA
+
+    def __init__(self, base_url: str = BASE_URL, pool_maxsize: int = 10,
+                 pool_connections: int = 10, keep_alive: bool = True,
+                 timeout: float = None, cache=None, circuitos=None, observador=None,
+                 coalescedor=None, codec=None, control_carga=None, hedging=None,
+                 compresion=None):
+        """
+        Args:
+            base_url (str|list|Balanceador): URL base de la API, o varias
+                réplicas (lista de URLs o balanceo.Balanceador ya configurado)
+                entre las que se reparten las peticiones.
+            pool_maxsize (int): Conexiones vivas que se guardan por host.
+            pool_connections (int): Cantidad de hosts distintos con pool propio.
+            keep_alive (bool): Si es False se envía 'Connection: close' y cada
+                petición abre su propia conexión (útil para comparar).
+            timeout (float, opcional): Timeout en segundos para cada petición.
+            cache (CacheLRU|CacheDisco, opcional): Caché HTTP para las lecturas
+                de obtener_producto y listar_productos. Los valores cacheados
+                se comparten entre llamadas: no hay que modificarlos.
+            circuitos (RegistroCircuitos, opcional): Circuit breaker y bulkhead
+                por operación (listar_productos, obtener_producto, ...).
+            observador (observabilidad.Observador, opcional): Registra tiempos
+                (DNS, conexión, TTFB, total), status y bytes de cada petición.
+            coalescedor (coalescencia.Coalescedor, opcional): Lecturas idénticas
+                simultáneas (mismo GET) comparten una sola petición en vuelo.
+            codec (CodecJSON|str, opcional): Codec para los cuerpos JSON ('json',
+                'orjson', 'msgspec'). Por defecto el más rápido instalado.
+            control_carga (control_carga.ControlCarga, opcional): Límite de tasa
+                y de concurrencia adaptativa compartido por todas las llamadas.
+            hedging (hedging.Hedging, opcional): Si una lectura idempotente no
+                responde en el retardo, manda una segunda igual y usa la primera
+                que llegue. Conviene pool_maxsize holgado (hasta 2 conexiones por llamada).
+            compresion (compresion.PoliticaCompresion|bool, opcional): Anuncia
+                br/zstd además de gzip (si están instalados) y comprime los
+                cuerpos de petición que superan el umbral. True = valores por defecto.
+        """
+        if isinstance(base_url, (list, tuple)):
+            base_url = Balanceador(base_url)
+        # Con varias réplicas, base_url es la primera: las rutas y las claves
+        # de caché no dependen de la réplica que atienda
+        self.balanceador = None if isinstance(base_url, str) else base_url
+        if self.balanceador is not None:
+            base_url = self.balanceador.replicas[0].url
+        self.base_url = base_url.rstrip('/')
+        self.urls = URLBuilder(self.base_url, RUTAS_CLIENTE)
+        self.timeout = timeout
+        self.cache = cache
+        self.circuitos = circuitos
+        self.observador = observador
+        self.coalescedor = coalescedor
+        self.control_carga = control_carga
+        self.hedging = hedging
+        self.compresion = PoliticaCompresion() if compresion is True else compresion or None
+        self.deltas = EstadisticasDelta()
+        self.codec = codec if isinstance(codec, CodecJSON) else obtener_codec(codec)
+        self._suscriptores = []
+        self.session = requests.Session()
+        crear_adaptador = requests.adapters.HTTPAdapter if observador is None else observador.crear_adaptador
+        adapter = crear_adaptador(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        if self.compresion is not None:
+            self.session.headers["Accept-Encoding"] = self.compresion.accept_encoding()
+
+    def _request(self, metodo: str, ruta: str, operacion: str = None, **kwargs) -> requests.Response:
+        """
+        Envía la petición por la sesión compartida.
+        'operacion' identifica la llamada para las protecciones por operación.
+        El control de carga va por fuera: una llamada que espera token o lugar
+        todavía no cuenta para el circuit breaker ni para el bulkhead.
+        """
+        if self.control_carga is not None:
+            return self.control_carga.ejecutar(operacion, self._proteger, metodo, ruta, operacion, **kwargs)
+        return self._proteger(metodo, ruta, operacion, **kwargs)
+
+    def _proteger(self, metodo: str, ruta: str, operacion: str = None, **kwargs) -> requests.Response:
+        if self.circuitos is not None and operacion is not None:
+            return self.circuitos.ejecutar(operacion, self._cubrir, metodo, ruta, operacion, **kwargs)
+        return self._cubrir(metodo, ruta, operacion, **kwargs)
+
+    def _cubrir(self, metodo: str, ruta: str, operacion: str = None, **kwargs) -> requests.Response:
+        # El hedge va por dentro del circuit breaker: la llamada cubierta cuenta
+        # como un solo resultado, el de la respuesta que ganó
+        if self.hedging is not None and self.hedging.aplica(metodo, operacion, kwargs):
+            return self.hedging.ejecutar(operacion, self._enviar, metodo, ruta, operacion, **kwargs)
+        return self._enviar(metodo, ruta, operacion, **kwargs)
+
+    def _enviar(self, metodo: str, ruta: str, operacion: str = None, **kwargs) -> requests.Response:
+        if self.balanceador is not None:
+            return self.balanceador.ejecutar(metodo, lambda base: self._enviar_a(base, metodo, ruta, operacion, **kwargs))
+        return self._enviar_a(self.urls.base_url, metodo, ruta, operacion, **kwargs)
+
+    def _enviar_a(self, base: str, metodo: str, ruta: str, operacion: str = None, **kwargs) -> requests.Response:
+        url = base + ruta
+        if self.observador is not None:
+            plantilla = self.PLANTILLAS.get(operacion, ruta.split("?")[0])
+            return self.observador.observar(self.session, metodo, url, plantilla, timeout=self.timeout, **kwargs)
+        return self.session.request(metodo, url, timeout=self.timeout, **kwargs)
+
+    def _json(self, response: requests.Response, tipo=None):
+        """
+        Decodifica el cuerpo desde los bytes con el codec del cliente.
+        Un cuerpo inválido lanza requests.JSONDecodeError, igual que response.json().
+        """
+        try:
+            if tipo is not None:
+                return self.codec.decodificar_como(response.content, tipo)
+            return self.codec.decodificar(response.content)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(str(e), "", 0, response=response) from e
+
+    def _cuerpo_json(self, datos) -> dict:
+        """kwargs de la petición con el cuerpo ya codificado a bytes (y comprimido si corresponde)."""
+        return self._cuerpo_bytes(self.codec.codificar(datos))
+
+    def _cuerpo_bytes(self, cuerpo: bytes) -> dict:
+        headers = {"Content-Type": "application/json"}
+        if self.compresion is not None:
+            cuerpo, codificacion = self.compresion.comprimir_cuerpo(cuerpo)
+            if codificacion is not None:
+                headers["Content-Encoding"] = codificacion
+        return {"data": cuerpo, "headers": headers}
+
+    def _get_con_cache(self, operacion: str, ruta: str, procesar, tipo=None):
+        """
+        GET que pasa por la caché si está activa.
+        procesar(response) aplica el manejo de errores de cada operación y
+        devuelve el valor parseado, que es lo que se guarda.
+        Con coalescedor, los GET iguales en curso se comparten (ruta = clave).
+        Las lecturas tipadas (tipo != None) no usan la caché, que guarda dicts.
+        """
+        if self.coalescedor is not None:
+            return self.coalescedor.ejecutar(operacion, ("GET", ruta, tipo), self._get, operacion, ruta, procesar, tipo)
+        return self._get(operacion, ruta, procesar, tipo)
+
+    def _get(self, operacion: str, ruta: str, procesar, tipo=None):
+        if self.cache is None or tipo is not None:
+            return procesar(self._request("GET", ruta, operacion))
+
+        entrada = self.cache.buscar(ruta)
+        if entrada is not None and entrada.fresca():
+            return entrada.valor
+
+        headers = {}
+        if entrada is not None and entrada.etag:
+            headers["If-None-Match"] = entrada.etag
+        response = self._request("GET", ruta, operacion, headers=headers)
+        if response.status_code == 304 and entrada is not None:
+            # 304 Not Modified: no se descarga ni se parsea el cuerpo otra vez
+            return self.cache.revalidada(ruta, entrada, response)
+
+        valor = procesar(response)
+        self.cache.guardar_respuesta(ruta, response, valor)
+        return valor
+
+    def suscribir_escrituras(self, funcion):
+        """
+        Registra funcion(producto_id, producto) para que se llame tras cada
+        escritura exitosa. En crear_producto producto_id es None; en
+        eliminar_producto producto es None. Ej: EspejoCatalogo (write-through).
+        """
+        self._suscriptores.append(funcion)
+
+    def desuscribir_escrituras(self, funcion):
+        """Deja de avisarle a 'funcion' (registrada con suscribir_escrituras)."""
+        if funcion in self._suscriptores:
+            self._suscriptores.remove(funcion)
+
+    def _tras_escritura(self, producto_id, producto):
+        self._invalidar_cache(producto_id)
+        for funcion in tuple(self._suscriptores):
+            try:
+                funcion(producto_id, producto)
+            except Exception:
+                # La escritura ya se aplicó en el servidor: que falle un
+                # suscriptor no la convierte en un error para quien llamó
+                import logging  # Solo se importa si algún suscriptor falla
+
+                logging.getLogger("ecomarket.cliente").exception(
+                    "Falló el suscriptor %r tras escribir el producto %s", funcion, producto_id)
+
+    def _invalidar_cache(self, producto_id=None):
+        """Tras una escritura exitosa, borra el producto y los listados cacheados."""
+        if self.cache is None:
+            return
+        if producto_id is not None:
+            self.cache.invalidar(self.urls.path("/productos/{id}", id=producto_id))
+        listado = self.urls.path("/productos")
+        self.cache.invalidar(listado)
+        self.cache.invalidar_prefijo(listado + "?")
+
+    def close(self):
+        """Cierra las conexiones abiertas del pool."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Lectura ---
+
+    def listar_productos(self, tipo=None):
+        """
+        Obtiene la lista de todos los productos.
+        Con tipo (ej. modelos.Producto) el codec decodifica directo a esas
+        instancias en vez de dicts; con modelos.ProductoBatch devuelve el
+        catálogo guardado por columnas.
+        """
+        def procesar(response):
+            response.raise_for_status()
+            return self._json(response, tipo)
+
+        try:
+            return self._get_con_cache("listar_productos", self.urls.path("/productos"), procesar, tipo)
+        except requests.exceptions.RequestException as e:
+            raise EcoMarketError(f"Error al listar productos: {e}", response=e.response) from e
+
+    def listar_cambios(self, cursor: str = None, etag: str = None) -> CambiosCatalogo:
+        """
+        Lectura del catálogo para mantener una copia local.
+        Con cursor pide GET /productos?updated_since=<cursor> (solo cambios y
+        borrados, cabecera X-Deleted-Ids). Sin cursor pide el catálogo entero,
+        con If-None-Match si hay etag. El cursor siguiente sale de X-Sync-Cursor;
+        si el servidor no lo envía, la respuesta se trata como catálogo completo.
+        """
+        ruta = self.urls.path("/productos", {"updated_since": cursor} if cursor is not None else None)
+        headers = {"If-None-Match": etag} if etag and cursor is None else {}
+        try:
+            response = self._request("GET", ruta, "listar_productos", headers=headers)
+            if response.status_code == 304:
+                return CambiosCatalogo(cursor=cursor, etag=etag, no_modificado=True)
+            response.raise_for_status()
+            productos = self._json(response)
+        except requests.exceptions.RequestException as e:
+            raise EcoMarketError(f"Error al listar cambios: {e}", response=e.response) from e
+
+        siguiente = response.headers.get("X-Sync-Cursor")
+        borrados = response.headers.get("X-Deleted-Ids", "")
+        return CambiosCatalogo(
+            productos=productos,
+            borrados=[int(i) if i.isdigit() else i for i in borrados.split(",") if i],
+            cursor=siguiente,
+            etag=response.headers.get("ETag"),
+            completo=cursor is None or siguiente is None,
+        )
+
+    def iter_productos(self, tamano_pagina: int = 500, paginacion: str = "offset",
+                       validar: bool = False, chunk_size: int = 64 * 1024,
+                       cabecera_cursor: str = "X-Next-Cursor"):
+        """
+        Recorre el catálogo página a página y entrega los productos de uno en uno.
+        Cada página se lee en streaming y su array se decodifica de forma
+        incremental, así que la memoria no crece con el tamaño del catálogo.
+
+        Args:
+            tamano_pagina (int): Productos por página (parámetro 'limit').
+            paginacion (str): "offset" envía limit/offset y termina con una
+                página incompleta; "cursor" envía limit/cursor y sigue el valor
+                de la cabecera indicada en cabecera_cursor hasta que no venga.
+            validar (bool): Encadena validar_producto como etapa perezosa.
+            chunk_size (int): Bytes leídos del socket por bloque.
+        """
+        if paginacion not in ("offset", "cursor"):
+            raise ValueError(f"Paginación '{paginacion}' no válida. Opciones: ['offset', 'cursor']")
+        productos = self._iter_paginas(tamano_pagina, paginacion, chunk_size, cabecera_cursor)
+        return iterar_productos_validos(productos) if validar else productos
+
+    def _iter_paginas(self, tamano_pagina, paginacion, chunk_size, cabecera_cursor):
+        params = {"limit": tamano_pagina}
+        if paginacion == "offset":
+            params["offset"] = 0
+        while True:
+            try:
+                ruta = self.urls.path("/productos", params)
+                with self._request("GET", ruta, "iter_productos", stream=True) as response:
+                    response.raise_for_status()
+                    leidos = 0
+                    for producto in iterar_array_json(response.iter_content(chunk_size)):
+                        leidos += 1
+                        yield producto
+                    siguiente = response.headers.get(cabecera_cursor)
+            except requests.exceptions.RequestException as e:
+                raise EcoMarketError(f"Error al listar productos: {e}", response=e.response) from e
+
+            if paginacion == "cursor":
+                if not siguiente:
+                    return
+                params["cursor"] = siguiente
+            else:
+                # Una página incompleta es la última. Si el servidor ignora 'limit'
+                # y devuelve más, ya entregó todo el catálogo: no repetimos.
+                if leidos != tamano_pagina:
+                    return
+                params["offset"] += leidos
+
+    def obtener_producto(self, producto_id: int, tipo=None):
+        """Obtiene un producto por su ID (como instancia de 'tipo' si se indica)."""
+        def procesar(response):
+            if response.status_code == 404:
+                raise ProductoNoEncontrado(f"Producto {producto_id} no encontrado", response=response)
+            if response.status_code != 200:
+                raise EcoMarketError(f"Error desconocido: {response.status_code}", response=response)
+            return self._json(response, tipo)
+
+        ruta = self.urls.path("/productos/{id}", id=producto_id)
+        return self._get_con_cache("obtener_producto", ruta, procesar, tipo)
+
+    # --- Escritura ---
+
+    def crear_producto(self, datos: dict) -> dict:
+        """
+        Crea un nuevo producto en el sistema.
+        Endpoint: POST /productos
+        """
+        # El cuerpo sale ya codificado a bytes por el codec, con Content-Type: application/json
+        response = self._request("POST", self.urls.path("/productos"), "crear_producto", **self._cuerpo_json(datos))
+
+        if response.status_code == 201:
+            creado = self._json(response)
+            self._tras_escritura(None, creado)
+            return creado
+        elif response.status_code == 409:
+            raise ConflictoError("Error 409: El producto ya existe.", response=response)
+        else:
+            # Lanza error para 400, 500, etc.
+            raise EcoMarketError(f"Error al crear: {response.status_code} - {response.text}", response=response)
+
+    def actualizar_producto_total(self, producto_id: int, datos: dict, etag: str = None) -> dict:
+        """
+        Reemplaza COMPLETAMENTE un recurso existente.
+        Endpoint: PUT /productos/{id}
+        Con etag se envía If-Match: si el producto cambió, VersionObsoletaError.
+        """
+        return self._actualizar("PUT", producto_id, self.codec.codificar(datos), etag)
+
+    def actualizar_producto_parcial(self, producto_id: int, campos: dict, etag: str = None) -> dict:
+        """
+        Actualiza SOLO los campos enviados (JSON merge patch: null borra el campo).
+        Endpoint: PATCH /productos/{id}
+        Con etag se envía If-Match: si el producto cambió, VersionObsoletaError.
+        """
+        return self._actualizar("PATCH", producto_id, self.codec.codificar(campos), etag)
+
+    def _actualizar(self, metodo: str, producto_id: int, cuerpo: bytes, etag: str = None) -> dict:
+        ruta = self.urls.path("/productos/{id}", id=producto_id)
+        operacion = "actualizar_producto_total" if metodo == "PUT" else "actualizar_producto_parcial"
+        kwargs = self._cuerpo_bytes(cuerpo)
+        if etag is not None:
+            kwargs["headers"]["If-Match"] = etag
+        response = self._request(metodo, ruta, operacion, **kwargs)
+
+        if response.status_code == 200:
+            actualizado = self._json(response)
+            self._tras_escritura(producto_id, actualizado)
+            return actualizado
+        elif response.status_code == 404:
+            verbo = "actualizar" if metodo == "PUT" else "parchear"
+            raise ProductoNoEncontrado(f"No se puede {verbo}. ID {producto_id} no existe.", response=response)
+        elif response.status_code == 412:
+            raise VersionObsoletaError(f"El producto {producto_id} cambió desde la versión {etag}", response=response)
+        else:
+            raise EcoMarketError(f"Error en {metodo}: {response.status_code}", response=response)
+
+    def actualizar_producto_delta(self, producto_id: int, deseado: dict, base: dict = None,
+                                  etag: str = None) -> dict:
+        """
+        Lleva el producto al estado 'deseado' mandando solo lo que cambió.
+
+        El estado conocido del servidor sale de 'base' (ej. espejo.obtener(id)),
+        de la caché del cliente o, si no hay, de un GET. Con él se calcula el
+        merge patch mínimo:
+          - vacío: no sale ninguna petición y se devuelve la base;
+          - si no, se manda PATCH o PUT, el que pese menos (PUT si 'deseado'
+            tiene nulls, que un merge patch no puede fijar).
+        El ETag (argumento, de la caché o del GET) viaja como If-Match: si el
+        producto cambió en el medio, VersionObsoletaError y no se pisa nada.
+        Los ahorros se acumulan en self.deltas.estadisticas().
+        """
+        if base is None:
+            base, etag = self._estado_conocido(producto_id, etag)
+        completo = {clave: valor for clave, valor in deseado.items() if clave not in CAMPOS_SOLO_LECTURA}
+        cuerpo_put = self.codec.codificar(completo)
+        patch = calcular_merge_patch(base, completo, ignorar=CAMPOS_SOLO_LECTURA)
+        if not patch:
+            self.deltas.registrar(None, 0, len(cuerpo_put))
+            return base
+
+        cuerpo_patch = self.codec.codificar(patch)
+        if tiene_nulos(completo) or len(cuerpo_put) <= len(cuerpo_patch):
+            metodo, cuerpo = "PUT", cuerpo_put
+        else:
+            metodo, cuerpo = "PATCH", cuerpo_patch
+        actualizado = self._actualizar(metodo, producto_id, cuerpo, etag)
+        self.deltas.registrar(metodo, len(cuerpo), len(cuerpo_put))
+        return actualizado
+
+    def _estado_conocido(self, producto_id: int, etag: str = None) -> tuple:
+        """(producto, etag) desde la caché (aunque esté caducada) o con un GET."""
+        ruta = self.urls.path("/productos/{id}", id=producto_id)
+        entrada = self.cache.buscar(ruta) if self.cache is not None else None
+        if entrada is not None:
+            return entrada.valor, etag or entrada.etag
+        response = self._request("GET", ruta, "obtener_producto")
+        if response.status_code == 404:
+            raise ProductoNoEncontrado(f"Producto {producto_id} no encontrado", response=response)
+        if response.status_code != 200:
+            raise EcoMarketError(f"Error desconocido: {response.status_code}", response=response)
+        return self._json(response), etag or response.headers.get("ETag")
+
+    def eliminar_producto(self, producto_id: int) -> bool:
+        """
+        Elimina un recurso.
+        Endpoint: DELETE /productos/{id}
+        """
+        response = self._request("DELETE", self.urls.path("/productos/{id}", id=producto_id), "eliminar_producto")
+
+        if response.status_code == 204:
+            self._tras_escritura(producto_id, None)
+            return True
+        elif response.status_code == 404:
+            raise ProductoNoEncontrado(f"No se puede eliminar. ID {producto_id} no existe.", response=response)
+        else:
+            raise EcoMarketError(f"Error en DELETE: {response.status_code}", response=response)
+
+    # --- Operaciones en lote ---
+
+    def _ejecutar_lote(self, funcion, trabajos: list, workers: int, reporte: ReporteLote) -> ReporteLote:
+        """Ejecuta (indice, args) en un pool de hilos y clasifica cada resultado."""
+        from concurrent.futures import ThreadPoolExecutor, as_completed  # Arrastra logging: solo si hay lotes
+
+        if trabajos:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futuros = {executor.submit(funcion, *args): indice for indice, args in trabajos}
+                for futuro in as_completed(futuros):
+                    indice = futuros[futuro]
+                    try:
+                        reporte.exitos[indice] = futuro.result()
+                    except Exception as e:
+                        reporte.registrar_error(indice, e)
+        return reporte
+
+    def crear_productos_lote(self, productos: list, workers: int = 8, validar: bool = False) -> ReporteLote:
+        """
+        Crea muchos productos en paralelo.
+        Con validar=True cada ítem pasa primero por validadores.validar_producto
+        y los inválidos quedan en reporte.invalidos sin llegar a la red.
+        Conviene que pool_maxsize del cliente sea >= workers.
+        """
+        reporte = ReporteLote()
+        trabajos = []
+        for indice, datos in enumerate(productos):
+            if validar:
+                try:
+                    validar_producto(datos)
+                except (ValueError, TypeError) as e:
+                    reporte.invalidos[indice] = e
+                    continue
+            trabajos.append((indice, (datos,)))
+        return self._ejecutar_lote(self.crear_producto, trabajos, workers, reporte)
+
+    def actualizar_productos_parcial_lote(self, cambios: list, workers: int = 8) -> ReporteLote:
+        """
+        Aplica muchos PATCH en paralelo.
+        cambios es una lista de tuplas (producto_id, campos).
+        """
+        trabajos = [(indice, (producto_id, campos)) for indice, (producto_id, campos) in enumerate(cambios)]
+        return self._ejecutar_lote(self.actualizar_producto_parcial, trabajos, workers, ReporteLote())
+
+    def actualizar_productos_delta_lote(self, deseados: dict, bases: dict = None, workers: int = 8) -> ReporteLote:
+        """
+        actualizar_producto_delta para {id: estado deseado} en paralelo.
+        bases ({id: producto}, opcional) es el estado conocido, ej. del espejo.
+        Las claves del reporte son los ids; los omitidos por no tener cambios
+        cuentan como éxito y se ven en self.deltas.estadisticas().
+        """
+        bases = bases or {}
+        trabajos = [(producto_id, (producto_id, deseado, bases.get(producto_id)))
+                    for producto_id, deseado in deseados.items()]
+        return self._ejecutar_lote(self.actualizar_producto_delta, trabajos, workers, ReporteLote())
+
+    def eliminar_productos_lote(self, ids: list, workers: int = 8) -> ReporteLote:
+        """Elimina muchos productos en paralelo."""
+        trabajos = [(indice, (producto_id,)) for indice, producto_id in enumerate(ids)]
+        return self._ejecutar_lote(self.eliminar_producto, trabajos, workers, ReporteLote())
+
+# --- INSTANCIA POR DEFECTO ---
+# Se crea en la primera llamada para que importar el módulo no abra sesiones.
+_cliente_por_defecto = None
+_lock_cliente = threading.Lock()
+
+def cliente_por_defecto() -> EcoMarketClient:
+    """Devuelve (y crea si hace falta) el cliente compartido del módulo."""
+    global _cliente_por_defecto
+    if _cliente_por_defecto is None:
+        with _lock_cliente:
+            if _cliente_por_defecto is None:
+                _cliente_por_defecto = EcoMarketClient(BASE_URL)
+    return _cliente_por_defecto
+
+def configurar_cliente_por_defecto(cliente: EcoMarketClient):
+    """
+    Reemplaza el cliente que usan las funciones del módulo.
+    Ej: configurar_cliente_por_defecto(EcoMarketClient(cache=CacheLRU()))
+    """
+    global _cliente_por_defecto
+    with _lock_cliente:
+        _cliente_por_defecto = cliente
+
+# --- FUNCIONES DEL MÓDULO (fachadas sobre el cliente por defecto) ---
+
+def listar_productos():
+    """Obtiene la lista de todos los productos."""
+    return cliente_por_defecto().listar_productos()
+
+def iter_productos(tamano_pagina: int = 500, paginacion: str = "offset", validar: bool = False):
+    """Recorre el catálogo paginado en streaming. Ver EcoMarketClient.iter_productos."""
+    return cliente_por_defecto().iter_productos(tamano_pagina, paginacion, validar)
+
+def obtener_producto(producto_id: int):
+    """Obtiene un producto por su ID."""
+    return cliente_por_defecto().obtener_producto(producto_id)
+
+def crear_producto(datos: dict) -> dict:
+    """
+    Crea un nuevo producto en el sistema.
+    Endpoint: POST /productos
+    """
+    return cliente_por_defecto().crear_producto(datos)
+
+def actualizar_producto_total(producto_id: int, datos: dict) -> dict:
+    """
+    Reemplaza COMPLETAMENTE un recurso existente.
+    Endpoint: PUT /productos/{id}
+    """
+    return cliente_por_defecto().actualizar_producto_total(producto_id, datos)
+
+def actualizar_producto_parcial(producto_id: int, campos: dict) -> dict:
+    """
+    Actualiza SOLO los campos enviados.
+    Endpoint: PATCH /productos/{id}
+    """
+    return cliente_por_defecto().actualizar_producto_parcial(producto_id, campos)
+
+def actualizar_producto_delta(producto_id: int, deseado: dict, base: dict = None, etag: str = None) -> dict:
+    """Manda solo lo que cambió (o nada). Ver EcoMarketClient.actualizar_producto_delta."""
+    return cliente_por_defecto().actualizar_producto_delta(producto_id, deseado, base, etag)
+
+def eliminar_producto(producto_id: int) -> bool:
+    """
+    Elimina un recurso.
+    Endpoint: DELETE /productos/{id}
+    """
+    return cliente_por_defecto().eliminar_producto(producto_id)
+
+def crear_productos_lote(productos: list, workers: int = 8, validar: bool = False) -> ReporteLote:
+    """Crea muchos productos en paralelo. Ver EcoMarketClient.crear_productos_lote."""
+    return cliente_por_defecto().crear_productos_lote(productos, workers=workers, validar=validar)
+
+def actualizar_productos_parcial_lote(cambios: list, workers: int = 8) -> ReporteLote:
+    """Aplica muchos PATCH en paralelo. cambios = [(producto_id, campos), ...]"""
+    return cliente_por_defecto().actualizar_productos_parcial_lote(cambios, workers=workers)
+
+def eliminar_productos_lote(ids: list, workers: int = 8) -> ReporteLote:
+    """Elimina muchos productos en paralelo."""
+    return cliente_por_defecto().eliminar_productos_lote(ids, workers=workers)
+
+# --- BLOQUE DE EJECUCIÓN ---
+if __name__ == "__main__":
+    print("--- INICIANDO PRUEBAS DEL CLIENTE CRUD ---")
+    
+    # Datos de prueba
+    nuevo_prod = {"nombre": "Manzanas Gala", "precio": 2.5, "stock": 100}
+    patch_data = {"precio": 3.0} # Solo cambiamos precio
+
+    try:
+        # 1. Crear
+        print("\n1. Probando CREAR (POST)...")
+        creado = crear_producto(nuevo_prod)
+        print(f"✅ Creado: {creado}")
+
+        # 2. Actualizar Parcial (PATCH) - IMPORTANTE PARA LA CAPTURA
+        print("\n2. Probando ACTUALIZAR PARCIAL (PATCH)...")
+        # Asumimos que el ID 1 existe o usamos el del creado si el server devuelve ID
+        id_prueba = creado.get("id", 1) 
+        parcheado = actualizar_producto_parcial(id_prueba, patch_data)
+        print(f"✅ Parcheado: {parcheado}")
+
+        # 3. Eliminar
+        print("\n3. Probando ELIMINAR (DELETE)...")
+        eliminado = eliminar_producto(id_prueba)
+        print(f"✅ Eliminado: {eliminado}")
+
+    except EcoMarketError as e:
+        print(f"❌ Error controlado: {e}")
+    except Exception as e:
         print(f"❌ Error inesperado: {e}")
\ No newline at end of file
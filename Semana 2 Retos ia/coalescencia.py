@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from collections import Counter
+
+# ==========================================
+# SINGLE-FLIGHT: UNA SOLA PETICIÓN POR CLAVE EN VUELO
+# ==========================================
+# Si 30 hilos piden GET /productos/7 al mismo tiempo, el primero (el "líder")
+# hace la llamada y los demás esperan su resultado. Al terminar la clave se
+# libera: la siguiente petición ya sale a la red (esto NO es una caché).
+# Solo debe usarse con lecturas idempotentes.
+
+class _Vuelo:
+    """Llamada en curso: los seguidores esperan el evento y leen valor o error."""
+
+    __slots__ = ("evento", "valor", "error")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.valor = None
+        self.error = None
+
+class _Contadores:
+    """Métricas comunes a la versión con hilos y a la de asyncio."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_vuelo = {}
+        self.ejecutadas = Counter()   # Llamadas que salieron a la red, por operación
+        self.coalescidas = Counter()  # Llamadas que reutilizaron una en vuelo
+
+    def estadisticas(self) -> dict:
+        """{'obtener_producto': {'ejecutadas': 1, 'coalescidas': 29}, ...} + totales."""
+        with self._lock:
+            operaciones = sorted(set(self.ejecutadas) | set(self.coalescidas))
+            resultado = {op: {"ejecutadas": self.ejecutadas[op], "coalescidas": self.coalescidas[op]}
+                         for op in operaciones}
+            resultado["total"] = {"ejecutadas": sum(self.ejecutadas.values()),
+                                  "coalescidas": sum(self.coalescidas.values()),
+                                  "en_vuelo": len(self._en_vuelo)}
+            return resultado
+
+class Coalescedor(_Contadores):
+    """
+    Single-flight para llamadas desde hilos.
+
+    Uso:
+        coalescedor = Coalescedor()
+        cliente = EcoMarketClient(coalescedor=coalescedor)
+        ...
+        coalescedor.estadisticas()["obtener_producto"]["coalescidas"]
+
+    Todos los que comparten una llamada reciben el MISMO objeto (no una copia)
+    o la misma excepción: el valor devuelto no debe modificarse.
+    """
+
+    def ejecutar(self, operacion: str, clave, funcion, *args, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) salvo que ya haya una llamada con la
+        misma clave en curso; en ese caso espera y devuelve su resultado.
+        """
+        with self._lock:
+            vuelo = self._en_vuelo.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._en_vuelo[clave] = _Vuelo()
+                self.ejecutadas[operacion] += 1
+            else:
+                self.coalescidas[operacion] += 1
+        if not lider:
+            vuelo.evento.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.valor
+
+        try:
+            vuelo.valor = funcion(*args, **kwargs)
+            return vuelo.valor
+        except BaseException as e:
+            vuelo.error = e
+            raise
+        finally:
+            # Primero se libera la clave (las llamadas nuevas van a la red) y
+            # después se despierta a los que ya esperaban
+            with self._lock:
+                del self._en_vuelo[clave]
+            vuelo.evento.set()
+
+class CoalescedorAsync(_Contadores):
+    """
+    Single-flight para corrutinas de un mismo event loop.
+    La llamada del líder corre como tarea propia: si quien la inició se
+    cancela, los demás siguen esperando el resultado sin cancelarse.
+    """
+
+    async def ejecutar(self, operacion: str, clave, fabrica, *args):
+        """
+        Espera fabrica(*args) (una corrutina) o, si ya hay una con la misma
+        clave en curso, su resultado.
+        """
+        with self._lock:
+            tarea = self._en_vuelo.get(clave)
+            if tarea is not None:
+                self.coalescidas[operacion] += 1
+            else:
+                tarea = self._en_vuelo[clave] = asyncio.ensure_future(fabrica(*args))
+                self.ejecutadas[operacion] += 1
+                tarea.add_done_callback(lambda _: self._liberar(clave, tarea))
+        return await asyncio.shield(tarea)
+
+    def _liberar(self, clave, tarea):
+        with self._lock:
+            if self._en_vuelo.get(clave) is tarea:
+                del self._en_vuelo[clave]
+        # Si nadie quedó esperando (todos cancelados), marcamos la excepción
+        # como recuperada para que asyncio no avise "never retrieved"
+        if not tarea.cancelled():
+            tarea.exception()
@@ -0,0 +1,112 @@
+import json
+
+# ==========================================
+# CODECS JSON INTERCAMBIABLES
+# ==========================================
+# response.json() decodifica los bytes a str (adivinando el encoding) y recién
+# después corre json.loads: con listados de varios MB es el mayor costo de CPU
+# del cliente. Los codecs trabajan directo sobre response.content (bytes) y
+# codifican los cuerpos de las peticiones a bytes.
+#
+# Por defecto se usa el más rápido instalado: orjson, msgspec o la biblioteca
+# estándar (siempre disponible). Ambos son opcionales y se importan al crear
+# el codec, no al importar este módulo.
+
+PREFERENCIA = ("orjson", "msgspec", "json")
+
+class CodecJSON:
+    """Codec de la biblioteca estándar. Base de los demás."""
+
+    nombre = "json"
+
+    def __init__(self):
+        self._codificador = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def decodificar(self, datos: bytes):
+        # json.loads acepta bytes y detecta UTF-8/16/32 sin pasar por response.text
+        return json.loads(datos)
+
+    def codificar(self, obj) -> bytes:
+        return self._codificador.encode(obj).encode("utf-8")
+
+    def decodificar_como(self, datos: bytes, tipo):
+        """
+        Decodifica a instancias de 'tipo' (ej. modelos.Producto): un objeto
+        JSON da una instancia y un array da una lista. 'tipo' debe tener
+        desde_dict(); este codec arma los dicts y después los convierte.
+        Si 'tipo' es un contenedor con desde_dicts() (ej. modelos.ProductoBatch),
+        un array da una sola instancia con todos los elementos.
+        """
+        obj = self.decodificar(datos)
+        if isinstance(obj, list):
+            if hasattr(tipo, "desde_dicts"):
+                return tipo.desde_dicts(obj)
+            return [tipo.desde_dict(item) for item in obj]
+        return tipo.desde_dict(obj)
+
+class CodecOrjson(CodecJSON):
+    """orjson: decodifica bytes en Rust y codifica directo a bytes."""
+
+    nombre = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.decodificar = orjson.loads
+        self.codificar = orjson.dumps
+
+class CodecMsgspec(CodecJSON):
+    """
+    msgspec: además de decodificar a dicts, decodifica directo a dataclasses
+    (sin el dict intermedio) validando los tipos de cada campo.
+    """
+
+    nombre = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self._msgspec = msgspec
+        self.decodificar = msgspec.json.Decoder().decode
+        self.codificar = msgspec.json.Encoder().encode
+        self._decodificadores = {}
+
+    def decodificar_como(self, datos: bytes, tipo):
+        if hasattr(tipo, "desde_dicts"):
+            return super().decodificar_como(datos, tipo)  # Contenedor: no es un tipo de msgspec
+        decodificador = self._decodificadores.get(tipo)
+        if decodificador is None:
+            decodificador = self._decodificadores[tipo] = self._msgspec.json.Decoder(list[tipo] | tipo)
+        try:
+            return decodificador.decode(datos)
+        except self._msgspec.ValidationError as e:
+            raise ValueError(str(e)) from e
+
+CODECS = {codec.nombre: codec for codec in (CodecOrjson, CodecMsgspec, CodecJSON)}
+
+def obtener_codec(nombre: str = None) -> CodecJSON:
+    """
+    Devuelve el codec pedido ('json', 'orjson', 'msgspec') o, sin nombre, el
+    primero de PREFERENCIA que esté instalado.
+    """
+    if nombre is not None:
+        if nombre not in CODECS:
+            raise ValueError(f"Codec '{nombre}' no válido. Opciones: {sorted(CODECS)}")
+        return CODECS[nombre]()
+    for candidato in PREFERENCIA:
+        try:
+            return CODECS[candidato]()
+        except ImportError:
+            continue
+    return CodecJSON()
+
+def codecs_disponibles() -> list:
+    """Nombres de los codecs que se pueden usar en este entorno."""
+    disponibles = []
+    for nombre in PREFERENCIA:
+        try:
+            CODECS[nombre]()
+            disponibles.append(nombre)
+        except ImportError:
+            pass
+    return disponibles
@@ -1,132 +1,176 @@
-import time
-import json
-from pydantic import BaseModel, ValidationError, PositiveFloat
-from jsonschema import validate, ValidationError as SchemaError
-
-# ==========================================
-# DATOS DE PRUEBA
-# ==========================================
-producto_valido = {
-    "id": 1,
-    "nombre": "Manzanas Gala",
-    "precio": 35.50,
-    "categoria": "frutas",
-    "disponible": True
-}
-
-# Producto con error (precio negativo) para probar mensajes
-producto_invalido = {
-    "id": 1,
-    "nombre": "Manzanas Gala",
-    "precio": -10.0, 
-    "categoria": "frutas",
-    "disponible": True
-}
-
-# ==========================================
-# ESTRATEGIA 1: Validación Manual (Tu código actual)
-# ==========================================
-def validar_manual(data):
-    # Verificamos tipos
-    if not isinstance(data.get('id'), int):
-        raise ValueError("El campo 'id' debe ser un entero")
-    if not isinstance(data.get('nombre'), str):
-        raise ValueError("El campo 'nombre' debe ser texto")
-    if not isinstance(data.get('precio'), (int, float)):
-        raise ValueError("El campo 'precio' debe ser numérico")
-    
-    # Verificamos lógica de negocio
-    if data['precio'] <= 0:
-        raise ValueError("El precio debe ser mayor a 0")
-    
-    categorias_validas = ['frutas', 'verduras', 'lacteos']
-    if data.get('categoria') not in categorias_validas:
-        raise ValueError(f"Categoría inválida. Opciones: {categorias_validas}")
-    
-    return True
-
-# ==========================================
-# ESTRATEGIA 2: Pydantic (Estándar moderno)
-# ==========================================
-class ProductoModel(BaseModel):
-    id: int
-    nombre: str
-    precio: PositiveFloat  # Valida automáticamente que sea > 0
-    categoria: str
-    disponible: bool
-
-def validar_pydantic(data):
-    try:
-        ProductoModel(**data)
-        return True
-    except ValidationError as e:
-        raise e
-
-# ==========================================
-# ESTRATEGIA 3: JSON Schema (Estándar web)
-# ==========================================
-schema_producto = {
-    "type": "object",
-    "properties": {
-        "id": {"type": "integer"},
-        "nombre": {"type": "string"},
-        "precio": {"type": "number", "exclusiveMinimum": 0},
-        "categoria": {"type": "string", "enum": ["frutas", "verduras", "lacteos"]},
-        "disponible": {"type": "boolean"}
-    },
-    "required": ["id", "nombre", "precio", "categoria"]
-}
-
-def validar_jsonschema(data):
-    validate(instance=data, schema=schema_producto)
-    return True
-
-# ==========================================
-# ⏱️ BENCHMARK (Prueba de velocidad)
-# ==========================================
-def correr_benchmark():
-    iteraciones = 10000  # Validaremos 10,000 veces
-    print(f"--- 🏁 INICIANDO BENCHMARK ({iteraciones} iteraciones) ---")
-
-    # 1. Test Manual
-    inicio = time.time()
-    for _ in range(iteraciones):
-        validar_manual(producto_valido)
-    fin = time.time()
-    tiempo_manual = fin - inicio
-    print(f"1. Manual (if/else): {tiempo_manual:.4f} segundos")
-
-    # 2. Test Pydantic
-    inicio = time.time()
-    for _ in range(iteraciones):
-        validar_pydantic(producto_valido)
-    fin = time.time()
-    tiempo_pydantic = fin - inicio
-    print(f"2. Pydantic:        {tiempo_pydantic:.4f} segundos")
-
-    # 3. Test JSON Schema
-    inicio = time.time()
-    for _ in range(iteraciones):
-        validar_jsonschema(producto_valido)
-    fin = time.time()
-    tiempo_schema = fin - inicio
-    print(f"3. JSON Schema:     {tiempo_schema:.4f} segundos")
-
-    print("\n--- 📢 COMPARACIÓN DE MENSAJES DE ERROR ---")
-    
-    print("\n[Manual] Error:")
-    try: validar_manual(producto_invalido)
-    except ValueError as e: print(f"  ❌ {e}")
-
-    print("\n[Pydantic] Error:")
-    try: validar_pydantic(producto_invalido)
-    except ValidationError as e: 
-        # Pydantic devuelve errores detallados, mostramos el primero
-        print(f"  ❌ {e.errors()[0]['msg']} (Campo: {e.errors()[0]['loc']})")
-
-    print("\n[JSON Schema] Error:")
-    try: validar_jsonschema(producto_invalido)
-    except SchemaError as e: print(f"  ❌ {e.message}")
-
-if __name__ == "__main__":
+import time
+import json
+
+from compilador_validadores import compilar_validador
+
+# pydantic y jsonschema suman ~150 ms al arranque: se importan la primera vez
+# que se usa su estrategia, no al importar este módulo
+
+# ==========================================
+# DATOS DE PRUEBA
+# ==========================================
+producto_valido = {
+    "id": 1,
+    "nombre": "Manzanas Gala",
+    "precio": 35.50,
+    "categoria": "frutas",
+    "disponible": True
+}
+
+# Producto con error (precio negativo) para probar mensajes
+producto_invalido = {
+    "id": 1,
+    "nombre": "Manzanas Gala",
+    "precio": -10.0, 
+    "categoria": "frutas",
+    "disponible": True
+}
+
+# ==========================================
+# ESTRATEGIA 1: Validación Manual (Tu código actual)
+# ==========================================
+def validar_manual(data):
+    # Verificamos tipos
+    if not isinstance(data.get('id'), int):
+        raise ValueError("El campo 'id' debe ser un entero")
+    if not isinstance(data.get('nombre'), str):
+        raise ValueError("El campo 'nombre' debe ser texto")
+    if not isinstance(data.get('precio'), (int, float)):
+        raise ValueError("El campo 'precio' debe ser numérico")
+    
+    # Verificamos lógica de negocio
+    if data['precio'] <= 0:
+        raise ValueError("El precio debe ser mayor a 0")
+    
+    categorias_validas = ['frutas', 'verduras', 'lacteos']
+    if data.get('categoria') not in categorias_validas:
+        raise ValueError(f"Categoría inválida. Opciones: {categorias_validas}")
+    
+    return True
+
+# ==========================================
+# ESTRATEGIA 2: Pydantic (Estándar moderno)
+# ==========================================
+_modelo = None
+
+def modelo_pydantic():
+    """Crea ProductoModel (e importa pydantic) la primera vez que se necesita."""
+    global _modelo
+    if _modelo is None:
+        from pydantic import BaseModel, PositiveFloat
+
+        class ProductoModel(BaseModel):
+            id: int
+            nombre: str
+            precio: PositiveFloat  # Valida automáticamente que sea > 0
+            categoria: str
+            disponible: bool
+
+        _modelo = ProductoModel
+    return _modelo
+
+def __getattr__(nombre):
+    # comparacion_validacion.ProductoModel sigue funcionando, pero bajo demanda
+    if nombre == "ProductoModel":
+        return modelo_pydantic()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+def validar_pydantic(data):
+    (_modelo or modelo_pydantic())(**data)
+    return True
+
+# ==========================================
+# ESTRATEGIA 3: JSON Schema (Estándar web)
+# ==========================================
+schema_producto = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "nombre": {"type": "string"},
+        "precio": {"type": "number", "exclusiveMinimum": 0},
+        "categoria": {"type": "string", "enum": ["frutas", "verduras", "lacteos"]},
+        "disponible": {"type": "boolean"}
+    },
+    "required": ["id", "nombre", "precio", "categoria"]
+}
+
+def validar_jsonschema(data):
+    from jsonschema import validate  # Tras la primera llamada es una búsqueda en sys.modules
+
+    validate(instance=data, schema=schema_producto)
+    return True
+
+# ==========================================
+# ESTRATEGIA 4: Validador compilado desde el schema
+# ==========================================
+# Reutiliza el mismo schema_producto de la estrategia 3, pero lo convierte una
+# sola vez en una función Python especializada (enums como frozenset). Como las
+# demás estrategias, devuelve True si el producto es válido.
+validar_compilado = compilar_validador(schema_producto, "validar_compilado", devolver_datos=False)
+
+# ==========================================
+# ⏱️ BENCHMARK (Prueba de velocidad)
+# ==========================================
+def medir(validador, iteraciones, repeticiones=3):
+    """
+    Mejor tiempo de 'repeticiones' vueltas de 'iteraciones' llamadas.
+    Antes se hace un calentamiento para no medir el arranque del intérprete.
+    """
+    for _ in range(min(iteraciones, 1000)):
+        validador(producto_valido)
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            validador(producto_valido)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def correr_benchmark():
+    iteraciones = 10000  # Validaremos 10,000 veces
+    print(f"--- 🏁 INICIANDO BENCHMARK ({iteraciones} iteraciones) ---")
+
+    # 1. Test Manual
+    tiempo_manual = medir(validar_manual, iteraciones)
+    print(f"1. Manual (if/else): {tiempo_manual:.4f} segundos")
+
+    # 2. Test Pydantic
+    tiempo_pydantic = medir(validar_pydantic, iteraciones)
+    print(f"2. Pydantic:        {tiempo_pydantic:.4f} segundos")
+
+    # 3. Test JSON Schema (muy lento: una sola vuelta alcanza)
+    tiempo_schema = medir(validar_jsonschema, iteraciones, repeticiones=1)
+    print(f"3. JSON Schema:     {tiempo_schema:.4f} segundos")
+
+    # 4. Test Compilado
+    tiempo_compilado = medir(validar_compilado, iteraciones)
+    print(f"4. Compilado:       {tiempo_compilado:.4f} segundos")
+
+    mas_rapida = min(tiempo_manual, tiempo_pydantic, tiempo_schema)
+    print(f"\n📈 Compilado vs mejor alternativa: x{mas_rapida / tiempo_compilado:.2f} más rápido")
+
+    print("\n--- 📢 COMPARACIÓN DE MENSAJES DE ERROR ---")
+    
+    print("\n[Manual] Error:")
+    try: validar_manual(producto_invalido)
+    except ValueError as e: print(f"  ❌ {e}")
+
+    from jsonschema import ValidationError as SchemaError
+    from pydantic import ValidationError
+
+    print("\n[Pydantic] Error:")
+    try: validar_pydantic(producto_invalido)
+    except ValidationError as e: 
+        # Pydantic devuelve errores detallados, mostramos el primero
+        print(f"  ❌ {e.errors()[0]['msg']} (Campo: {e.errors()[0]['loc']})")
+
+    print("\n[JSON Schema] Error:")
+    try: validar_jsonschema(producto_invalido)
+    except SchemaError as e: print(f"  ❌ {e.message}")
+
+    print("\n[Compilado] Error:")
+    try: validar_compilado(producto_invalido)
+    except ValueError as e: print(f"  ❌ {e}")
+
+if __name__ == "__main__":
     correr_benchmark()
\ No newline at end of file
@@ -0,0 +1,288 @@
+import datetime
+import sys
+
+# ==========================================
+# COMPILADOR DE VALIDADORES
+# ==========================================
+# Convierte un schema (subconjunto de JSON Schema / OpenAPI) en una función
+# Python escrita a medida: el orden de los campos, los enums (como frozenset)
+# y los mensajes de error se calculan una sola vez al compilar, no en cada
+# llamada. Palabras clave soportadas: type, required, properties, enum,
+# minimum, maximum, exclusiveMinimum, exclusiveMaximum, format (date-time,
+# date), title (nombre a mostrar en enums) y x-mensaje (mensaje de tipo propio).
+
+MENSAJES_TIPO = {
+    "integer": "El '{campo}' debe ser entero (int), se recibió: {tipo}",
+    "string": "El '{campo}' debe ser texto (str), se recibió: {tipo}",
+    "number": "El '{campo}' debe ser numérico (float), se recibió: {tipo}",
+    "boolean": "El campo '{campo}' debe ser booleano, se recibió: {tipo}",
+    "object": "El campo '{campo}' debe ser un objeto (dict)",
+    "array": "El campo '{campo}' debe ser una lista (list), se recibió: {tipo}",
+}
+
+# Condición de error por tipo. Primero se compara type() exacto (el caso
+# común, más barato) y solo si no coincide se paga el isinstance completo.
+CONDICION_TIPO = {
+    "integer": "type({v}) is not int and not isinstance({v}, int)",
+    "string": "type({v}) is not str and not isinstance({v}, str)",
+    "number": "type({v}) is not float and not isinstance({v}, (float, int))",
+    "boolean": "{v} is not True and {v} is not False",
+    "object": "type({v}) is not dict and not isinstance({v}, dict)",
+    "array": "type({v}) is not list and not isinstance({v}, list)",
+}
+
+# Códigos de error de compilar_recolector_errores (uno por clase de chequeo)
+CODIGOS_ERROR = {"falta": "falta", "tipo": "tipo", "rango": "rango", "enum": "enum", "formato": "formato"}
+
+# Tipos cuyos valores siempre son hasheables (el 'in frozenset' no puede fallar)
+_TIPOS_HASHEABLES = {"integer", "string", "number", "boolean"}
+
+# Desde Python 3.11 fromisoformat entiende el sufijo 'Z' sin reemplazos
+_ISO_ACEPTA_Z = sys.version_info >= (3, 11)
+
+def _fecha_iso(valor: str):
+    if not _ISO_ACEPTA_Z and valor.endswith('Z'):
+        valor = valor[:-1] + '+00:00'
+    return datetime.datetime.fromisoformat(valor)
+
+def _plantilla(texto: str) -> str:
+    """Escapa llaves para que solo {campo}/{tipo}/{valor} sean marcadores."""
+    return texto.replace('{', '{{').replace('}', '}}')
+
+class _Generador:
+    def __init__(self, entidad: str, lanzar_errores: bool = True, prefijo_constantes: str = "",
+                 codigos: dict = None):
+        self.entidad = entidad
+        self.lanzar_errores = lanzar_errores
+        self.prefijo_constantes = prefijo_constantes
+        self.codigos = codigos  # Modo recolector: cada chequeo devuelve (campo, código)
+        self.lineas = []
+        self.constantes = {"_fecha_iso": _fecha_iso}
+        self._contador = 0
+
+    def constante(self, valor, prefijo="_C") -> str:
+        self._contador += 1
+        nombre = f"{self.prefijo_constantes}{prefijo}{self._contador}"
+        self.constantes[nombre] = valor
+        return nombre
+
+    def emitir(self, nivel: int, linea: str):
+        self.lineas.append("    " * nivel + linea)
+
+    def lanzar(self, nivel: int, excepcion: str, plantilla: str, campo: str, codigo: str, **valores):
+        """Emite un raise con el mensaje formateado solo en el camino de error."""
+        if self.codigos is not None:
+            self.emitir(nivel, f"return ({campo!r}, {self.codigos[codigo]!r})")
+            return
+        if not self.lanzar_errores:
+            self.emitir(nivel, "return False")
+            return
+        mensaje = self.constante(plantilla, "_M")
+        argumentos = ", ".join(f"{k}={v}" for k, v in valores.items())
+        self.emitir(nivel, f"raise {excepcion}({mensaje}.format({argumentos}))")
+
+    # --- Chequeos por propiedad ---
+
+    def chequear_tipo(self, nivel, var, campo, schema):
+        tipo = schema.get("type")
+        if tipo is None:
+            return
+        if tipo not in CONDICION_TIPO:
+            raise ValueError(f"Tipo '{tipo}' no soportado en '{campo}'")
+        self.emitir(nivel, f"if {CONDICION_TIPO[tipo].format(v=var)}:")
+        if "x-mensaje" in schema:
+            plantilla = _plantilla(schema["x-mensaje"])
+        else:
+            plantilla = MENSAJES_TIPO[tipo].replace("{campo}", _plantilla(campo))
+        self.lanzar(nivel + 1, "TypeError", plantilla, campo, "tipo", tipo=f"type({var}).__name__")
+
+    def chequear_restricciones(self, nivel, var, campo, schema):
+        etiqueta = _plantilla(campo.split('.')[-1])
+        limites = [
+            ("minimum", "<", "mayor o igual a"),
+            ("maximum", ">", "menor o igual a"),
+        ]
+        for clave, operador, texto in limites:
+            if clave in schema:
+                # OpenAPI 3.0 marca la exclusividad con un booleano aparte
+                exclusivo = schema.get("exclusive" + clave.capitalize()) is True
+                op = operador + ("=" if exclusivo else "")
+                desc = texto.replace(" o igual", "") if exclusivo else texto
+                self._limite(nivel, var, campo, etiqueta, schema[clave], op, desc)
+        if isinstance(schema.get("exclusiveMinimum"), (int, float)) and not isinstance(schema.get("exclusiveMinimum"), bool):
+            self._limite(nivel, var, campo, etiqueta, schema["exclusiveMinimum"], "<=", "mayor a")
+        if isinstance(schema.get("exclusiveMaximum"), (int, float)) and not isinstance(schema.get("exclusiveMaximum"), bool):
+            self._limite(nivel, var, campo, etiqueta, schema["exclusiveMaximum"], ">=", "menor a")
+
+        if "enum" in schema:
+            opciones = list(schema["enum"])
+            conjunto = self.constante(frozenset(opciones), "_E")
+            titulo = _plantilla(schema.get("title", campo.split('.')[-1].capitalize()))
+            if schema.get("type") in _TIPOS_HASHEABLES:
+                self.emitir(nivel, f"if {var} not in {conjunto}:")
+            else:
+                # frozenset no acepta valores no hasheables (listas, dicts): son inválidos igual
+                self.emitir(nivel, "try:")
+                self.emitir(nivel + 1, f"_en_enum = {var} in {conjunto}")
+                self.emitir(nivel, "except TypeError:")
+                self.emitir(nivel + 1, "_en_enum = False")
+                self.emitir(nivel, "if not _en_enum:")
+            self.lanzar(nivel + 1, "ValueError", f"{titulo} '{{valor}}' no válida. Opciones: {_plantilla(repr(opciones))}",
+                        campo, "enum", valor=var)
+
+        if schema.get("format") in ("date-time", "date"):
+            self.emitir(nivel, "try:")
+            self.emitir(nivel + 1, f"_fecha_iso({var})")
+            self.emitir(nivel, "except ValueError:")
+            self.lanzar(nivel + 1, "ValueError", f"Formato de fecha inválido en '{_plantilla(campo)}': {{valor}}",
+                        campo, "formato", valor=var)
+
+    def _limite(self, nivel, var, campo, etiqueta, limite, operador, descripcion):
+        self.emitir(nivel, f"if {var} {operador} {limite!r}:")
+        self.lanzar(nivel + 1, "ValueError",
+                    f"El {etiqueta} debe ser {descripcion} {_plantilla(str(limite))}. Valor actual: {{valor}}",
+                    campo, "rango", valor=var)
+
+    def propiedad_completa(self, nivel, var, campo, schema, profundidad):
+        """Tipo + restricciones + anidados, para campos opcionales y anidados."""
+        self.chequear_tipo(nivel, var, campo, schema)
+        self.chequear_restricciones(nivel, var, campo, schema)
+        if schema.get("type") == "object" and schema.get("properties"):
+            self.objeto_anidado(nivel, var, campo, schema, profundidad + 1)
+
+    def objeto_anidado(self, nivel, var, campo, schema, profundidad):
+        requeridos = schema.get("required", [])
+        for sub, sub_schema in schema.get("properties", {}).items():
+            nombre = f"{campo}.{sub}"
+            sub_var = f"_v{profundidad}"
+            if sub in requeridos:
+                self.emitir(nivel, f"if {sub!r} not in {var}:")
+                self.lanzar(nivel + 1, "ValueError", f"Falta el campo requerido: '{_plantilla(nombre)}'",
+                            nombre, "falta")
+                self.emitir(nivel, f"{sub_var} = {var}[{sub!r}]")
+                self.propiedad_completa(nivel, sub_var, nombre, sub_schema, profundidad)
+            else:
+                self.emitir(nivel, f"if {sub!r} in {var}:")
+                self.emitir(nivel + 1, f"{sub_var} = {var}[{sub!r}]")
+                self.propiedad_completa(nivel + 1, sub_var, nombre, sub_schema, profundidad)
+
+def compilar_validador(schema: dict, nombre: str = "validar", entidad: str = "producto",
+                       lanzar_errores: bool = True, prefijo_constantes: str = "",
+                       devolver_datos: bool = True):
+    """
+    Genera y compila una función validadora especializada para el schema.
+
+    La función resultante sigue el mismo orden que validadores.validar_producto:
+    1) tipo del objeto, 2) presencia de requeridos, 3) tipos de requeridos,
+    4) reglas de negocio de requeridos, 5) campos opcionales.
+    Lanza ValueError/TypeError y devuelve el mismo dict si es válido (o True
+    con devolver_datos=False, como los validadores que solo confirman).
+    Con lanzar_errores=False genera un predicado que devuelve True/False sin
+    excepciones ni mensajes (útil para filtrar lotes grandes).
+    El código generado queda en la función como atributo __source__ y los
+    valores que usa (mensajes, enums) en __constantes__; prefijo_constantes
+    evita choques de nombres al volcar varios validadores en un mismo módulo.
+    """
+    if schema.get("type", "object") != "object":
+        raise ValueError("Solo se pueden compilar schemas de tipo 'object'")
+    gen = _Generador(entidad, lanzar_errores, prefijo_constantes)
+    propiedades = schema.get("properties", {})
+    requeridos = list(schema.get("required", []))
+
+    gen.emitir(0, f"def {nombre}(data):")
+    gen.emitir(1, f"if {CONDICION_TIPO['object'].format(v='data')}:")
+    gen.lanzar(2, "TypeError", f"El {_plantilla(entidad)} debe ser un objeto (dict), se recibió: {{tipo}}",
+               None, "tipo", tipo="type(data).__name__")
+
+    # Leemos cada requerido una sola vez a una variable local. Si falta alguno,
+    # el KeyError lleva al camino lento que busca el primero ausente en orden.
+    variables = {}
+    if requeridos:
+        gen.emitir(1, "try:")
+        for i, campo in enumerate(requeridos):
+            variables[campo] = f"_r{i}"
+            gen.emitir(2, f"_r{i} = data[{campo!r}]")
+        gen.emitir(1, "except KeyError:")
+        for campo in requeridos:
+            gen.emitir(2, f"if {campo!r} not in data:")
+            gen.lanzar(3, "ValueError", f"Falta el campo requerido: '{_plantilla(campo)}'", campo, "falta")
+        gen.emitir(2, "raise" if lanzar_errores else "return False")
+    for campo in requeridos:
+        gen.chequear_tipo(1, variables[campo], campo, propiedades.get(campo, {}))
+    for campo in requeridos:
+        sub = propiedades.get(campo, {})
+        gen.chequear_restricciones(1, variables[campo], campo, sub)
+        if sub.get("type") == "object" and sub.get("properties"):
+            gen.objeto_anidado(1, variables[campo], campo, sub, 1)
+
+    for campo, sub in propiedades.items():
+        if campo in variables:
+            continue
+        gen.emitir(1, f"if {campo!r} in data:")
+        gen.emitir(2, f"_v0 = data[{campo!r}]")
+        gen.propiedad_completa(2, "_v0", campo, sub, 0)
+
+    gen.emitir(1, "return data" if lanzar_errores and devolver_datos else "return True")
+    return _compilar(gen, nombre)
+
+def compilar_recolector_errores(schema: dict, nombre: str = "errores", codigos: dict = None):
+    """
+    Genera, desde el mismo schema que compilar_validador, una función que
+    devuelve TODOS los errores de un objeto como lista de (campo, código),
+    en el orden de los campos (requeridos primero) en lugar de cortar en el
+    primero. Un objeto válido da []; uno que no es dict, [(None, 'tipo')].
+
+    Cada campo corta en su primer error (un precio de tipo str no se compara
+    con el mínimo); los anidados se reportan como 'productor.id'.
+    'codigos' reemplaza los valores de CODIGOS_ERROR, ej. {"enum": "categoria"}.
+    """
+    if schema.get("type", "object") != "object":
+        raise ValueError("Solo se pueden compilar schemas de tipo 'object'")
+    gen = _Generador("", prefijo_constantes="", codigos={**CODIGOS_ERROR, **(codigos or {})})
+    propiedades = schema.get("properties", {})
+    requeridos = list(schema.get("required", []))
+    orden = requeridos + [campo for campo in propiedades if campo not in requeridos]
+
+    # Un chequeador por campo: cada error es un 'return', así el primero corta
+    for i, campo in enumerate(orden):
+        gen.emitir(0, f"def _campo{i}(_v0):")
+        gen.propiedad_completa(1, "_v0", campo, propiedades.get(campo, {}), 0)
+        gen.emitir(1, "return None")
+        gen.emitir(0, "")
+
+    gen.emitir(0, f"def {nombre}(data):")
+    gen.emitir(1, f"if {CONDICION_TIPO['object'].format(v='data')}:")
+    gen.emitir(2, f"return [(None, {gen.codigos['tipo']!r})]")
+    gen.emitir(1, "_errores = []")
+    for i, campo in enumerate(orden):
+        if campo in requeridos:
+            gen.emitir(1, f"if {campo!r} not in data:")
+            gen.emitir(2, f"_errores.append(({campo!r}, {gen.codigos['falta']!r}))")
+            gen.emitir(1, "else:")
+        else:
+            gen.emitir(1, f"if {campo!r} in data:")
+        gen.emitir(2, f"_error = _campo{i}(data[{campo!r}])")
+        gen.emitir(2, "if _error is not None:")
+        gen.emitir(3, "_errores.append(_error)")
+    gen.emitir(1, "return _errores")
+    return _compilar(gen, nombre)
+
+def _compilar(gen: _Generador, nombre: str):
+    codigo = "\n".join(gen.lineas) + "\n"
+    espacio = dict(gen.constantes)
+    exec(compile(codigo, f"<validador {nombre}>", "exec"), espacio)
+    funcion = espacio[nombre]
+    funcion.__source__ = codigo
+    funcion.__constantes__ = gen.constantes
+    return funcion
+
+def schema_desde_openapi(ruta: str, componente: str) -> dict:
+    """Lee components/schemas/<componente> de un archivo OpenAPI YAML."""
+    import yaml  # Solo se necesita al compilar desde el contrato
+
+    with open(ruta, encoding="utf-8") as f:
+        contrato = yaml.safe_load(f)
+    try:
+        return contrato["components"]["schemas"][componente]
+    except KeyError:
+        raise ValueError(f"El componente '{componente}' no existe en {ruta}")
@@ -0,0 +1,167 @@
+import zlib
+from dataclasses import dataclass
+
+# ==========================================
+# COMPRESIÓN DEL TRANSPORTE (Content-Encoding)
+# ==========================================
+# Los listados de productos son JSON muy repetitivo: con gzip viajan ~10 veces
+# menos bytes. Este módulo junta las codificaciones que entiende el cliente:
+#
+#   - gzip: biblioteca estándar (zlib), siempre disponible.
+#   - br (brotli) y zstd (zstandard): opcionales. Se importan al crear el
+#     compresor; si no están instalados simplemente no se anuncian.
+#
+# Las respuestas las descomprime urllib3 mientras se leen (también con
+# iter_content), así que el parseo incremental de iter_productos sigue
+# trabajando bloque a bloque sin juntar el cuerpo entero. Lo que agrega el
+# cliente es anunciar br/zstd y comprimir los cuerpos grandes que envía.
+
+PREFERENCIA = ("zstd", "br", "gzip")
+
+class CompresorGzip:
+    """gzip con zlib. Base de los demás: comprimir, descomprimir y descompresor por bloques."""
+
+    nombre = "gzip"
+    nivel_por_defecto = 6
+
+    def comprimir(self, datos: bytes, nivel: int = None) -> bytes:
+        nivel = self.nivel_por_defecto if nivel is None else nivel
+        compresor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compresor.compress(datos) + compresor.flush()
+
+    def descomprimir(self, datos: bytes) -> bytes:
+        return zlib.decompress(datos, 16 + zlib.MAX_WBITS)
+
+    def descompresor(self):
+        """Objeto con descomprimir(bloque) -> bytes para cuerpos que llegan de a partes."""
+        return _Flujo(zlib.decompressobj(16 + zlib.MAX_WBITS).decompress)
+
+class CompresorBrotli(CompresorGzip):
+    """brotli: comprime más que gzip con JSON, a costa de más CPU al comprimir."""
+
+    nombre = "br"
+    nivel_por_defecto = 5  # 11 es el máximo, pero ~50 veces más lento
+
+    def __init__(self):
+        import brotli
+
+        self._brotli = brotli
+
+    def comprimir(self, datos: bytes, nivel: int = None) -> bytes:
+        return self._brotli.compress(datos, quality=self.nivel_por_defecto if nivel is None else nivel)
+
+    def descomprimir(self, datos: bytes) -> bytes:
+        return self._brotli.decompress(datos)
+
+    def descompresor(self):
+        return _Flujo(self._brotli.Decompressor().process)
+
+class CompresorZstd(CompresorGzip):
+    """zstd: ratio parecido a gzip con bastante menos CPU en ambos lados."""
+
+    nombre = "zstd"
+    nivel_por_defecto = 3
+
+    def __init__(self):
+        import zstandard
+
+        self._zstd = zstandard
+
+    def comprimir(self, datos: bytes, nivel: int = None) -> bytes:
+        return self._zstd.ZstdCompressor(level=self.nivel_por_defecto if nivel is None else nivel).compress(datos)
+
+    def descomprimir(self, datos: bytes) -> bytes:
+        # decompressobj no necesita que el cuadro traiga el tamaño original
+        return self.descompresor().descomprimir(datos)
+
+    def descompresor(self):
+        return _Flujo(self._zstd.ZstdDecompressor().decompressobj().decompress)
+
+class _Flujo:
+    __slots__ = ("descomprimir",)
+
+    def __init__(self, descomprimir):
+        self.descomprimir = descomprimir
+
+COMPRESORES = {compresor.nombre: compresor for compresor in (CompresorZstd, CompresorBrotli, CompresorGzip)}
+
+def obtener_compresor(nombre: str):
+    """Compresor para una Content-Encoding ('gzip', 'br', 'zstd'). ImportError si no está instalado."""
+    if nombre not in COMPRESORES:
+        raise ValueError(f"Codificación '{nombre}' no válida. Opciones: {sorted(COMPRESORES)}")
+    return COMPRESORES[nombre]()
+
+def compresores_disponibles(candidatas=PREFERENCIA) -> list:
+    """Nombres de 'candidatas' que se pueden usar en este entorno, en el mismo orden."""
+    disponibles = []
+    for nombre in candidatas:
+        try:
+            obtener_compresor(nombre)
+            disponibles.append(nombre)
+        except ImportError:
+            pass
+    return disponibles
+
+def negociar(accept_encoding: str, ofrecidas) -> str:
+    """
+    Elige entre 'ofrecidas' (en orden de preferencia del servidor) la primera
+    que acepte la cabecera Accept-Encoding. None = sin comprimir.
+    Respeta q=0 ('gzip;q=0' la rechaza) y el comodín '*'.
+    """
+    aceptadas = {}
+    for parte in (accept_encoding or "").split(","):
+        nombre, *parametros = [trozo.strip() for trozo in parte.split(";")]
+        if not nombre:
+            continue
+        calidad = 1.0
+        for parametro in parametros:
+            clave, _, valor = parametro.partition("=")
+            if clave.strip() == "q":
+                try:
+                    calidad = float(valor)
+                except ValueError:
+                    calidad = 0.0
+        aceptadas[nombre.lower()] = calidad
+    for nombre in ofrecidas:
+        if aceptadas.get(nombre, aceptadas.get("*", 0.0)) > 0:
+            return nombre
+    return None
+
+# ==========================================
+# POLÍTICA DEL CLIENTE
+# ==========================================
+@dataclass
+class PoliticaCompresion:
+    """
+    Compresión del lado del cliente (EcoMarketClient(compresion=...)).
+
+    Args:
+        aceptar (tuple): Codificaciones a anunciar en Accept-Encoding, en orden
+            de preferencia. Se anuncian solo las instaladas que urllib3 sabe
+            descomprimir.
+        cuerpos (str): Content-Encoding de los cuerpos de petición (None = no se comprimen).
+        umbral (int): Bytes mínimos del cuerpo JSON para comprimirlo. Un producto
+            suelto (~150 bytes) sale tal cual: comprimirlo cuesta CPU y no ahorra nada.
+        nivel (int, opcional): Nivel de compresión de los cuerpos.
+    """
+    aceptar: tuple = PREFERENCIA
+    cuerpos: str = "gzip"
+    umbral: int = 8 * 1024
+    nivel: int = None
+
+    def __post_init__(self):
+        self._compresor = obtener_compresor(self.cuerpos) if self.cuerpos else None
+
+    def accept_encoding(self) -> str:
+        """Valor de Accept-Encoding para la sesión (gzip siempre está)."""
+        from urllib3.util.request import ACCEPT_ENCODING
+
+        decodificables = set(ACCEPT_ENCODING.split(","))
+        nombres = [nombre for nombre in compresores_disponibles(self.aceptar) if nombre in decodificables]
+        return ", ".join(nombres or ["gzip"])
+
+    def comprimir_cuerpo(self, cuerpo: bytes):
+        """(cuerpo, Content-Encoding) a enviar; la codificación es None si no conviene comprimir."""
+        if self._compresor is None or len(cuerpo) < self.umbral:
+            return cuerpo, None
+        return self._compresor.comprimir(cuerpo, self.nivel), self._compresor.nombre
@@ -0,0 +1,13 @@
+import pytest
+
+class Reloj:
+    """Reloj manual para avanzar el tiempo (reloj.ahora = ...) sin dormir."""
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+@pytest.fixture
+def reloj():
+    return Reloj()
@@ -0,0 +1,464 @@
+import asyncio
+import collections
+import threading
+import time
+
+from carga_perezosa import importar_perezoso
+from cliente_ecomarket import BulkheadLlenoError, LimiteTasaError
+
+requests = importar_perezoso("requests")
+
+# ==========================================
+# LÍMITE DE TASA Y CONCURRENCIA ADAPTATIVA
+# ==========================================
+# Cuando los lotes aceleran, la API empieza a responder 429/503 y cada hilo
+# reintenta por su cuenta. Este módulo pone dos frenos compartidos por todas
+# las llamadas del cliente (hilos y corrutinas):
+#
+#   - LimitadorTasa: token buckets (uno global y uno por operación). Un 429
+#     con Retry-After pausa el bucket para TODOS, no solo para quien lo vio.
+#   - LimiteAdaptativo: cuántas peticiones pueden estar en vuelo, ajustado
+#     con AIMD. Sube de a poco mientras la latencia se mantiene estable y
+#     baja multiplicativamente ante 429/503/504, timeouts o picos de latencia.
+#     Así encuentra solo el throughput que aguanta el backend, sin ajustar a
+#     mano la cantidad de workers.
+#
+# Uso:
+#   control = ControlCarga(tasa=LimitadorTasa(tasa=200, por_operacion={"crear_producto": {"tasa": 20}}),
+#                          concurrencia=LimiteAdaptativo(inicial=8, maximo=64))
+#   cliente = EcoMarketClient(control_carga=control)
+
+# Respuestas que indican que el backend está saturado (no un error del cliente)
+STATUS_SOBRECARGA = frozenset({429, 503, 504})
+
+class TokenBucket:
+    """
+    Cubeta de 'rafaga' tokens que se rellena a 'tasa' tokens por segundo.
+    Quien no encuentra token reserva el siguiente (la cubeta queda en
+    negativo) y espera lo que falta: los que llegan después esperan más, así
+    que el orden de llegada se respeta sin colas explícitas.
+    """
+
+    def __init__(self, tasa: float, rafaga: float = None, reloj=time.monotonic):
+        """
+        Args:
+            tasa (float): Tokens por segundo (peticiones por segundo sostenidas).
+            rafaga (float, opcional): Capacidad de la cubeta. Por defecto, un segundo de tasa.
+        """
+        if tasa <= 0:
+            raise ValueError("La tasa debe ser mayor a 0")
+        self.tasa = tasa
+        self.rafaga = rafaga if rafaga is not None else max(1.0, tasa)
+        self.reloj = reloj
+        self._lock = threading.Lock()
+        self._tokens = self.rafaga
+        self._ultimo = reloj()
+        self.esperas = 0
+        self.rechazadas = 0
+
+    def _rellenar(self):
+        ahora = self.reloj()
+        self._tokens = min(self.rafaga, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def reservar(self, n: float = 1, espera_maxima: float = None):
+        """
+        Toma n tokens y devuelve los segundos que hay que esperar antes de
+        usarlos (0.0 = ya), o None si la espera superaría espera_maxima
+        (en ese caso no se toma nada).
+        """
+        with self._lock:
+            self._rellenar()
+            if self._tokens >= n:
+                self._tokens -= n
+                return 0.0
+            espera = (n - self._tokens) / self.tasa
+            if espera_maxima is not None and espera > espera_maxima:
+                self.rechazadas += 1
+                return None
+            self._tokens -= n
+            self.esperas += 1
+            return espera
+
+    def devolver(self, n: float = 1):
+        """Devuelve tokens reservados que al final no se usaron."""
+        with self._lock:
+            self._tokens = min(self.rafaga, self._tokens + n)
+
+    def intentar(self, n: float = 1) -> bool:
+        """Toma n tokens solo si están disponibles ahora."""
+        return self.reservar(n, espera_maxima=0.0) is not None
+
+    def adquirir(self, n: float = 1, espera_maxima: float = None) -> bool:
+        """Bloquea hasta tener n tokens. False si habría que esperar más de espera_maxima."""
+        espera = self.reservar(n, espera_maxima)
+        if espera is None:
+            return False
+        if espera:
+            time.sleep(espera)
+        return True
+
+    async def adquirir_async(self, n: float = 1, espera_maxima: float = None) -> bool:
+        """Igual que adquirir, pero espera con asyncio.sleep."""
+        espera = self.reservar(n, espera_maxima)
+        if espera is None:
+            return False
+        if espera:
+            await asyncio.sleep(espera)
+        return True
+
+    def pausar(self, segundos: float):
+        """No entrega tokens durante 'segundos' (ej. lo que pidió un Retry-After)."""
+        with self._lock:
+            self._rellenar()
+            self._tokens = min(self._tokens, 0.0) - segundos * self.tasa
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            self._rellenar()
+            return {"tokens": self._tokens, "tasa": self.tasa, "rafaga": self.rafaga,
+                    "esperas": self.esperas, "rechazadas": self.rechazadas}
+
+class LimitadorTasa:
+    """
+    Token buckets compartidos por todas las llamadas del cliente: uno global
+    (si se da 'tasa') y uno por operación configurada en por_operacion.
+    Una llamada necesita un token de cada bucket que le corresponda.
+    """
+
+    def __init__(self, tasa: float = None, rafaga: float = None, por_operacion: dict = None,
+                 espera_maxima: float = None, reloj=time.monotonic):
+        """
+        Args:
+            tasa / rafaga (float, opcional): Límite global en peticiones por segundo.
+            por_operacion (dict, opcional): {'crear_producto': {'tasa': 20, 'rafaga': 5}}.
+            espera_maxima (float, opcional): Segundos que se espera un token
+                antes de rechazar con LimiteTasaError. None = esperar lo necesario.
+        """
+        self.espera_maxima = espera_maxima
+        self.reloj = reloj
+        self.bucket_global = TokenBucket(tasa, rafaga, reloj) if tasa is not None else None
+        self._buckets = {operacion: TokenBucket(config["tasa"], config.get("rafaga"), reloj)
+                         for operacion, config in (por_operacion or {}).items()}
+
+    def buckets(self, operacion: str = None) -> list:
+        return [b for b in (self._buckets.get(operacion), self.bucket_global) if b is not None]
+
+    def _reservar(self, operacion: str):
+        """Espera necesaria para tener token en todos los buckets, o None (sin tomar ninguno)."""
+        reservados, espera = [], 0.0
+        for bucket in self.buckets(operacion):
+            espera_bucket = bucket.reservar(1, self.espera_maxima)
+            if espera_bucket is None:
+                for anterior in reservados:
+                    anterior.devolver(1)
+                return None
+            reservados.append(bucket)
+            espera = max(espera, espera_bucket)
+        return espera
+
+    def adquirir(self, operacion: str = None) -> bool:
+        espera = self._reservar(operacion)
+        if espera is None:
+            return False
+        if espera:
+            time.sleep(espera)
+        return True
+
+    async def adquirir_async(self, operacion: str = None) -> bool:
+        espera = self._reservar(operacion)
+        if espera is None:
+            return False
+        if espera:
+            await asyncio.sleep(espera)
+        return True
+
+    def devolver(self, operacion: str = None):
+        """Devuelve el token que adquirir() tomó de cada bucket, si la llamada no llegó a salir."""
+        for bucket in self.buckets(operacion):
+            bucket.devolver(1)
+
+    def pausar(self, operacion: str, segundos: float):
+        """Un 429/503 con Retry-After frena el bucket global (o el de la operación si no hay global)."""
+        bucket = self.bucket_global or self._buckets.get(operacion)
+        if bucket is not None:
+            bucket.pausar(segundos)
+
+    def estadisticas(self) -> dict:
+        resultado = {operacion: bucket.estadisticas() for operacion, bucket in sorted(self._buckets.items())}
+        if self.bucket_global is not None:
+            resultado["global"] = self.bucket_global.estadisticas()
+        return resultado
+
+class LimiteAdaptativo:
+    """
+    Límite de peticiones en vuelo con AIMD (aumento aditivo, reducción
+    multiplicativa), como el control de congestión de TCP:
+
+    - Cada respuesta normal suma aumento/limite: con el límite lleno eso es
+      +aumento por "ronda" de peticiones. Solo sube si el límite se está
+      usando (en vuelo >= la mitad); si no, no sabemos si el backend aguanta más.
+    - Una sobrecarga (429/503/504, timeout) o una latencia mayor que
+      tolerancia_latencia * la mínima reciente multiplica el límite por
+      factor_reduccion. Las señales de peticiones que salieron antes de la
+      última reducción se ignoran: ya se reaccionó a esa congestión.
+
+    Sirve para hilos (adquirir) y para corrutinas (adquirir_async), incluso
+    compartiendo la misma instancia.
+    """
+
+    def __init__(self, inicial: int = 10, minimo: int = 1, maximo: int = 200, aumento: float = 1.0,
+                 factor_reduccion: float = 0.7, tolerancia_latencia: float = 2.0, ventana_latencia: int = 100,
+                 espera_maxima: float = None, reloj=time.monotonic):
+        """
+        Args:
+            inicial / minimo / maximo (int): Límite de partida y sus cotas.
+            factor_reduccion (float): Multiplicador del límite ante sobrecarga (0-1).
+            tolerancia_latencia (float): Cuántas veces la latencia mínima reciente
+                se considera pico (= cola en el backend).
+            ventana_latencia (int): Respuestas sobre las que se toma la mínima.
+            espera_maxima (float, opcional): Segundos que se espera un lugar
+                antes de rechazar. None = esperar lo necesario.
+        """
+        if not 0 < factor_reduccion < 1:
+            raise ValueError("factor_reduccion debe estar entre 0 y 1")
+        self.limite = float(min(max(inicial, minimo), maximo))
+        self.minimo = minimo
+        self.maximo = maximo
+        self.aumento = aumento
+        self.factor_reduccion = factor_reduccion
+        self.tolerancia_latencia = tolerancia_latencia
+        self.espera_maxima = espera_maxima
+        self.reloj = reloj
+        self._condicion = threading.Condition(threading.Lock())
+        self._latencias = collections.deque(maxlen=ventana_latencia)
+        self._esperando_async = []  # (loop, futuro)
+        self._ultima_reduccion = float("-inf")
+        self.en_vuelo = 0
+        self.reducciones = 0
+        self.rechazadas = 0
+        self.historial = []  # [(instante, límite)] tras cada cambio de entero
+
+    # --- Permisos ---
+
+    def _hay_lugar(self) -> bool:
+        return self.en_vuelo < int(self.limite)
+
+    def _tomar(self) -> bool:
+        if self._hay_lugar():
+            self.en_vuelo += 1
+            return True
+        return False
+
+    def adquirir(self) -> bool:
+        """Bloquea hasta que haya lugar. False si se superó espera_maxima."""
+        with self._condicion:
+            if not self._condicion.wait_for(self._hay_lugar, self.espera_maxima):
+                self.rechazadas += 1
+                return False
+            self.en_vuelo += 1
+            return True
+
+    async def adquirir_async(self) -> bool:
+        """Igual que adquirir, pero sin bloquear el event loop."""
+        loop = asyncio.get_running_loop()
+        limite_espera = None if self.espera_maxima is None else loop.time() + self.espera_maxima
+        while True:
+            with self._condicion:
+                if self._tomar():
+                    return True
+                futuro = loop.create_future()
+                self._esperando_async.append((loop, futuro))
+            try:
+                restante = None if limite_espera is None else limite_espera - loop.time()
+                if restante is not None and restante <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(futuro, restante)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                with self._condicion:
+                    if (loop, futuro) in self._esperando_async:
+                        self._esperando_async.remove((loop, futuro))
+                    else:
+                        self._despertar()  # Ya nos habían avisado: el aviso pasa a otro
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.rechazadas += 1
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                return False
+
+    def _despertar(self):
+        """Avisa a tantos esperando (hilos y corrutinas) como lugares libres haya."""
+        libres = int(self.limite) - self.en_vuelo
+        if libres <= 0:
+            return
+        self._condicion.notify(libres)
+        while libres > 0 and self._esperando_async:
+            loop, futuro = self._esperando_async.pop(0)
+            loop.call_soon_threadsafe(_resolver, futuro)
+            libres -= 1
+
+    # --- Ajuste ---
+
+    def liberar(self, latencia: float, sobrecarga: bool = False):
+        """
+        Devuelve el lugar y ajusta el límite con el resultado de la llamada.
+        latencia en segundos; sobrecarga = 429/503/504 o timeout.
+        """
+        with self._condicion:
+            usado = self.en_vuelo >= self.limite / 2
+            self.en_vuelo -= 1
+            ahora = self.reloj()
+            minima = min(self._latencias) if self._latencias else None
+            pico = minima is not None and latencia > self.tolerancia_latencia * minima
+            if not sobrecarga:
+                self._latencias.append(latencia)
+
+            anterior = int(self.limite)
+            if sobrecarga or pico:
+                # Salió después de la última reducción: es congestión nueva
+                if ahora - latencia >= self._ultima_reduccion:
+                    self.limite = max(self.minimo, self.limite * self.factor_reduccion)
+                    self._ultima_reduccion = ahora
+                    self.reducciones += 1
+            elif usado:
+                self.limite = min(self.maximo, self.limite + self.aumento / self.limite)
+            if int(self.limite) != anterior:
+                self.historial.append((ahora, int(self.limite)))
+            self._despertar()
+
+    def estadisticas(self) -> dict:
+        with self._condicion:
+            return {"limite": int(self.limite), "en_vuelo": self.en_vuelo, "reducciones": self.reducciones,
+                    "rechazadas": self.rechazadas,
+                    "latencia_minima_ms": min(self._latencias) * 1000 if self._latencias else None}
+
+def _resolver(futuro):
+    if not futuro.done():
+        futuro.set_result(None)
+
+# ==========================================
+# INTEGRACIÓN CON EL CLIENTE
+# ==========================================
+def _retry_after(response) -> float:
+    valor = response.headers.get("Retry-After", "") if response is not None else ""
+    return float(valor) if valor.strip().isdigit() else None
+
+class ControlCarga:
+    """
+    Une LimitadorTasa y LimiteAdaptativo (ambos opcionales) alrededor de cada
+    petición. EcoMarketClient(control_carga=...) lo aplica a cada llamada HTTP
+    (reintentos incluidos); AsyncEcoMarketClient(control_carga=...) a cada
+    operación, esperando en el event loop en lugar de ocupar un hilo.
+    No pasar la misma instancia a un cliente async y a su cliente síncrono.
+    """
+
+    def __init__(self, tasa: LimitadorTasa = None, concurrencia: LimiteAdaptativo = None, reloj=time.monotonic):
+        self.tasa = tasa
+        self.concurrencia = concurrencia
+        self.reloj = reloj
+
+    def _es_sobrecarga(self, operacion: str, response=None, error: BaseException = None) -> bool:
+        if error is not None:
+            response = getattr(error, "response", None)
+            if response is None:
+                causa = error if isinstance(error, requests.exceptions.RequestException) else error.__cause__
+                return isinstance(causa, requests.exceptions.Timeout)
+        status_code = getattr(response, "status_code", None)
+        if status_code not in STATUS_SOBRECARGA:
+            return False
+        retry_after = _retry_after(response)
+        if retry_after and self.tasa is not None:
+            self.tasa.pausar(operacion, retry_after)
+        return True
+
+    def _entrar(self, operacion: str):
+        if self.tasa is not None and not self.tasa.adquirir(operacion):
+            raise LimiteTasaError(f"'{operacion}' superó su límite de tasa")
+        if self.concurrencia is not None and not self.concurrencia.adquirir():
+            self._rechazo_concurrencia(operacion)
+
+    async def _entrar_async(self, operacion: str):
+        if self.tasa is not None and not await self.tasa.adquirir_async(operacion):
+            raise LimiteTasaError(f"'{operacion}' superó su límite de tasa")
+        if self.concurrencia is not None:
+            try:
+                lugar = await self.concurrencia.adquirir_async()
+            except BaseException:
+                if self.tasa is not None:
+                    self.tasa.devolver(operacion)  # Cancelada mientras esperaba lugar
+                raise
+            if not lugar:
+                self._rechazo_concurrencia(operacion)
+
+    def _rechazo_concurrencia(self, operacion: str):
+        # La llamada no llega a la red: el token de tasa que ya tomó no se gastó
+        if self.tasa is not None:
+            self.tasa.devolver(operacion)
+        raise BulkheadLlenoError(f"'{operacion}': límite adaptativo de {int(self.concurrencia.limite)} en vuelo")
+
+    def _salir(self, operacion: str, inicio: float, response=None, error: BaseException = None):
+        sobrecarga = self._es_sobrecarga(operacion, response, error)
+        if self.concurrencia is not None:
+            self.concurrencia.liberar(self.reloj() - inicio, sobrecarga)
+
+    def ejecutar(self, operacion: str, funcion, *args, **kwargs):
+        """Ejecuta funcion(*args) cuando hay token y lugar; su respuesta ajusta el límite."""
+        self._entrar(operacion)
+        inicio = self.reloj()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except BaseException as e:
+            # KeyboardInterrupt y compañía también liberan el lugar en vuelo
+            self._salir(operacion, inicio, error=e if isinstance(e, Exception) else None)
+            raise
+        self._salir(operacion, inicio, response=resultado)
+        return resultado
+
+    async def ejecutar_async(self, operacion: str, fabrica, *args):
+        """Igual que ejecutar, para una corrutina fabrica(*args)."""
+        await self._entrar_async(operacion)
+        inicio = self.reloj()
+        try:
+            resultado = await fabrica(*args)
+        except BaseException as e:
+            self._salir(operacion, inicio, error=e if isinstance(e, Exception) else None)
+            raise
+        self._salir(operacion, inicio, response=resultado)
+        return resultado
+
+    def estadisticas(self) -> dict:
+        return {"tasa": self.tasa.estadisticas() if self.tasa is not None else None,
+                "concurrencia": self.concurrencia.estadisticas() if self.concurrencia is not None else None}
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    from cliente_ecomarket import EcoMarketClient, EcoMarketError
+    from servidor_local import Inyeccion, ServidorEcoMarket
+
+    # Backend que procesa 12 peticiones a la vez (20 ms cada una) y rechaza el resto con 503
+    inyeccion = Inyeccion(latencia="fija:20", capacidad=12)
+    print("--- 🚦 CONTROL DE CARGA ADAPTATIVO (backend con capacidad 12, 48 workers) ---\n")
+    for nombre, control in (("❌ Sin control", None),
+                            ("✅ AIMD", ControlCarga(concurrencia=LimiteAdaptativo(inicial=4, maximo=48)))):
+        with ServidorEcoMarket(inyeccion=inyeccion) as servidor:
+            with EcoMarketClient(servidor.base_url, pool_maxsize=48, control_carga=control) as cliente:
+                fin = time.monotonic() + 3
+
+                def trabajar(_):
+                    ok = 0
+                    while time.monotonic() < fin:
+                        try:
+                            cliente.obtener_producto(1)
+                            ok += 1
+                        except EcoMarketError:
+                            pass
+                    return ok
+
+                with ThreadPoolExecutor(48) as executor:
+                    exitos = sum(executor.map(trabajar, range(48)))
+            estadisticas = servidor.estadisticas()
+        print(f"{nombre}: {exitos / 3:.0f} respuestas OK/s, 503: {estadisticas['por_status'].get(503, 0)}")
+        if control is not None:
+            print(f"   límite final: {control.concurrencia.estadisticas()['limite']} "
+                  f"(reducciones: {control.concurrencia.reducciones})")
@@ -0,0 +1,263 @@
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+from cliente_ecomarket import EcoMarketClient, EcoMarketError
+
+logger = logging.getLogger("ecomarket.espejo")
+
+# ==========================================
+# ESPEJO LOCAL DEL CATÁLOGO (SQLite)
+# ==========================================
+# En vez de descargar el catálogo entero cada vez que hay que filtrarlo,
+# se guarda una copia en SQLite con índices por id, categoria, producerId y
+# precio. Las consultas se responden en microsegundos sin tocar la red:
+# SQLite resuelve el filtro con los índices (solo ids) y los productos ya
+# decodificados se toman de un dict en memoria, sin json.loads por fila.
+#
+# Sincronización:
+#   - La primera vez (o si el servidor no soporta cursores) se baja el
+#     catálogo completo, con If-None-Match si ya teníamos ETag (304 = nada).
+#   - Luego se piden solo los cambios con ?updated_since=<cursor>.
+#   - Las escrituras hechas con el mismo cliente se aplican al instante
+#     (write-through), sin esperar a la siguiente sincronización.
+#
+# Con ruta=":memory:" la copia vive en el proceso; con un archivo sobrevive
+# a reinicios y la siguiente sincronización ya es incremental.
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS productos (
+    id INTEGER PRIMARY KEY,
+    categoria TEXT,
+    producer_id INTEGER,
+    precio REAL,
+    datos TEXT NOT NULL
+);
+-- Compuestos con precio: sirven para "categoria = ?" sola y para
+-- "categoria = ? AND precio <= ?" sin recorrer toda la categoría
+CREATE INDEX IF NOT EXISTS idx_productos_categoria ON productos (categoria, precio);
+CREATE INDEX IF NOT EXISTS idx_productos_producer_id ON productos (producer_id, precio);
+CREATE INDEX IF NOT EXISTS idx_productos_precio ON productos (precio);
+CREATE TABLE IF NOT EXISTS estado (clave TEXT PRIMARY KEY, valor TEXT);
+"""
+
+def _fila(producto: dict) -> tuple:
+    return (producto["id"], producto.get("categoria"), producto.get("producerId"),
+            producto.get("precio"), json.dumps(producto, ensure_ascii=False, separators=(",", ":")))
+
+class EspejoCatalogo:
+    """
+    Copia local e indexada del catálogo de un EcoMarketClient.
+    Los productos devueltos se comparten entre consultas: no hay que modificarlos.
+
+    Uso:
+        espejo = EspejoCatalogo(cliente)
+        espejo.sincronizar()
+        espejo.buscar(categoria="miel", precio_max=10)
+        espejo.antiguedad()  # Segundos desde la última sincronización correcta
+    """
+
+    def __init__(self, cliente: EcoMarketClient, ruta: str = ":memory:", reloj=time.time):
+        """
+        Args:
+            cliente (EcoMarketClient): Cliente del que se lee y cuyas escrituras
+                se reflejan en la copia.
+            ruta (str): Archivo SQLite, o ":memory:" para una copia en memoria.
+            reloj (callable): Fuente de tiempo para medir la antigüedad.
+        """
+        self.cliente = cliente
+        self.reloj = reloj
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._db.executescript(ESQUEMA)
+        if ruta != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        estado = dict(self._db.execute("SELECT clave, valor FROM estado"))
+        self.cursor = estado.get("cursor")
+        self.etag = estado.get("etag")
+        self.ultima_sincronizacion = float(estado["ultima_sincronizacion"]) if "ultima_sincronizacion" in estado else None
+        self._productos = {i: json.loads(datos) for i, datos in self._db.execute("SELECT id, datos FROM productos")}
+
+        self.sincronizaciones = {"completa": 0, "incremental": 0, "no_modificada": 0, "error": 0}
+        self.ultimo_error = None
+        self._hilo = None
+        self._detener = threading.Event()
+        cliente.suscribir_escrituras(self._al_escribir)
+
+    # --- Sincronización ---
+
+    def sincronizar(self) -> str:
+        """
+        Trae los cambios del servidor y los aplica en una transacción.
+        Devuelve el tipo de sincronización: 'completa', 'incremental' o 'no_modificada'.
+        Si falla (red, o un payload que no se puede aplicar), la copia queda
+        como estaba, su antigüedad sigue creciendo y el error se cuenta.
+        """
+        try:
+            cambios = self.cliente.listar_cambios(cursor=self.cursor, etag=self.etag)
+            with self._lock:
+                return self._aplicar(cambios)
+        except Exception as e:
+            with self._lock:
+                self.sincronizaciones["error"] += 1
+                self.ultimo_error = e
+            raise
+
+    def _aplicar(self, cambios) -> str:
+        if cambios.no_modificado:
+            tipo = "no_modificada"
+        else:
+            tipo = "completa" if cambios.completo else "incremental"
+            # Un producto sin id (o que no es dict) falla acá, antes de abrir la transacción
+            filas = [_fila(p) for p in cambios.productos]
+            self._db.execute("BEGIN")
+            try:
+                if cambios.completo:
+                    self._db.execute("DELETE FROM productos")
+                self._db.executemany("INSERT OR REPLACE INTO productos VALUES (?, ?, ?, ?, ?)", filas)
+                self._db.executemany("DELETE FROM productos WHERE id = ?", [(i,) for i in cambios.borrados])
+            except BaseException:
+                # Sin esto la conexión queda en la transacción y todo BEGIN posterior falla
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            self.cursor, self.etag = cambios.cursor, cambios.etag
+            if cambios.completo:
+                self._productos.clear()
+            self._productos.update((p["id"], p) for p in cambios.productos)
+            for producto_id in cambios.borrados:
+                self._productos.pop(producto_id, None)
+        self.ultima_sincronizacion = self.reloj()
+        self._guardar_estado()
+        self.sincronizaciones[tipo] += 1
+        self.ultimo_error = None
+        return tipo
+
+    def _guardar_estado(self):
+        valores = {"cursor": self.cursor, "etag": self.etag, "ultima_sincronizacion": self.ultima_sincronizacion}
+        self._db.executemany("INSERT OR REPLACE INTO estado VALUES (?, ?)",
+                             [(clave, str(valor)) for clave, valor in valores.items() if valor is not None])
+
+    def _al_escribir(self, producto_id, producto):
+        """Write-through: el cliente avisa después de cada escritura exitosa."""
+        with self._lock:
+            if producto is None:
+                self._db.execute("DELETE FROM productos WHERE id = ?", (producto_id,))
+                self._productos.pop(producto_id, None)
+            else:
+                if "id" not in producto:
+                    producto = dict(producto, id=producto_id)
+                self._db.execute("INSERT OR REPLACE INTO productos VALUES (?, ?, ?, ?, ?)", _fila(producto))
+                self._productos[producto["id"]] = producto
+
+    def iniciar(self, intervalo: float = 30.0):
+        """Sincroniza en segundo plano cada 'intervalo' segundos."""
+        def ciclo():
+            while not self._detener.wait(intervalo):
+                try:
+                    self.sincronizar()
+                except EcoMarketError:
+                    pass  # Ya quedó en estadisticas(); se reintenta en el siguiente ciclo
+                except Exception:
+                    # Payload inesperado u otro bug: también queda en estadisticas(),
+                    # pero se loguea con traceback y el hilo sigue vivo
+                    logger.exception("Falló la sincronización en segundo plano del espejo")
+
+        self._detener.clear()
+        self._hilo = threading.Thread(target=ciclo, name="espejo-catalogo", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        if self._hilo is not None:
+            self._detener.set()
+            self._hilo.join()
+            self._hilo = None
+
+    def close(self):
+        self.detener()
+        self.cliente.desuscribir_escrituras(self._al_escribir)
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Consultas locales ---
+
+    def obtener(self, producto_id: int):
+        """Producto por id, o None si no está en la copia."""
+        return self._productos.get(producto_id)
+
+    def buscar(self, categoria: str = None, producer_id: int = None, precio_min: float = None,
+               precio_max: float = None, limite: int = None) -> list:
+        """Productos que cumplen todos los filtros dados, ordenados por id."""
+        condiciones, valores = [], []
+        for condicion, valor in (("categoria = ?", categoria), ("producer_id = ?", producer_id),
+                                 ("precio >= ?", precio_min), ("precio <= ?", precio_max)):
+            if valor is not None:
+                condiciones.append(condicion)
+                valores.append(valor)
+        sql = "SELECT id FROM productos"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY id"
+        if limite is not None:
+            sql += " LIMIT ?"
+            valores.append(limite)
+        with self._lock:
+            filas = self._db.execute(sql, valores).fetchall()
+            return [self._productos[producto_id] for producto_id, in filas]
+
+    def contar(self) -> int:
+        return len(self._productos)
+
+    # --- Frescura ---
+
+    def antiguedad(self) -> float:
+        """Segundos desde la última sincronización correcta (inf si nunca se sincronizó)."""
+        if self.ultima_sincronizacion is None:
+            return math.inf
+        return self.reloj() - self.ultima_sincronizacion
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "productos": self.contar(),
+                "antiguedad_s": self.antiguedad(),
+                "cursor": self.cursor,
+                "sincronizaciones": dict(self.sincronizaciones),
+                "ultimo_error": str(self.ultimo_error) if self.ultimo_error else None,
+            }
+
+if __name__ == "__main__":
+    from servidor_local import ServidorEcoMarket
+
+    print("--- 🗂️ ESPEJO LOCAL DEL CATÁLOGO ---\n")
+    with ServidorEcoMarket(productos=5000) as servidor:
+        with EcoMarketClient(servidor.base_url) as cliente, EspejoCatalogo(cliente) as espejo:
+            inicio = time.perf_counter()
+            print(f"1. Primera sincronización: {espejo.sincronizar()} "
+                  f"({espejo.contar()} productos, {(time.perf_counter() - inicio) * 1000:.1f} ms)")
+
+            inicio = time.perf_counter()
+            baratos = cliente.listar_productos()
+            baratos = [p for p in baratos if p["categoria"] == "miel" and p["precio"] <= 5]
+            remoto_us = (time.perf_counter() - inicio) * 1e6
+            inicio = time.perf_counter()
+            locales = espejo.buscar(categoria="miel", precio_max=5)
+            local_us = (time.perf_counter() - inicio) * 1e6
+            print(f"2. Miel a <= $5: {len(locales)} productos")
+            print(f"   ❌ listar_productos() + filtro: {remoto_us:>10.0f} us")
+            print(f"   ✅ espejo.buscar():             {local_us:>10.0f} us")
+
+            cliente.actualizar_producto_parcial(1, {"precio": 1.0})
+            cliente.eliminar_producto(2)
+            print(f"\n3. Write-through: precio del 1 = {espejo.obtener(1)['precio']}, el 2 existe: "
+                  f"{espejo.obtener(2) is not None}")
+            print(f"4. Siguiente sincronización: {espejo.sincronizar()}")
+            print(f"\n📊 {espejo.estadisticas()}")
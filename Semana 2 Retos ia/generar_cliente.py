@@ -0,0 +1,325 @@
+import argparse
+import hashlib
+import keyword
+import os
+import re
+
+from compilador_validadores import compilar_validador
+
+# ==========================================
+# GENERADOR DE CLIENTE DESDE EL CONTRATO
+# ==========================================
+# Lee openapi_sem2.yaml UNA vez (al generar, no al arrancar) y escribe
+# cliente_contrato.py: Python plano con
+#   - HASH_CONTRATO: sha256 del YAML del que salió (lo usa auditar_contrato.py)
+#   - RUTAS_CONTRATO: plantillas de ruta ya tipadas (url_builder.Ruta)
+#   - un validador compilado por schema de entrada (compilador_validadores)
+#   - ClienteContrato: un método por operación, sobre EcoMarketClient
+# El módulo generado no importa yaml ni jsonschema: el servicio que lo usa
+# arranca sin parsear el contrato.
+#
+# El contrato no declara operationId, así que el nombre de cada método sale
+# del método HTTP y la ruta (ver nombre_operacion). Si algún día se agregan
+# operationId, se usan tal cual.
+#
+# Uso:
+#   python generar_cliente.py              # Regenera cliente_contrato.py
+#   python generar_cliente.py --verificar  # Falla si el archivo quedó viejo
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_CONTRATO = os.path.join(DIRECTORIO, "openapi_sem2.yaml")
+RUTA_GENERADO = os.path.join(DIRECTORIO, "cliente_contrato.py")
+VERSION_GENERADOR = 1
+
+METODOS = ("get", "post", "put", "patch", "delete")
+
+TIPOS_PYTHON = {"integer": "int", "number": "float", "string": "str", "boolean": "bool",
+                "array": "list", "object": "dict"}
+
+def hash_contrato(ruta: str = RUTA_CONTRATO) -> str:
+    """
+    sha256 del contrato: cualquier cambio, incluso de formato, cuenta. Los
+    finales de línea se normalizan (el YAML está en CRLF y git puede
+    convertirlo al hacer checkout).
+    """
+    with open(ruta, "rb") as f:
+        return hashlib.sha256(f.read().replace(b"\r\n", b"\n")).hexdigest()
+
+def cargar_contrato(ruta: str = RUTA_CONTRATO) -> dict:
+    import yaml  # Solo al generar
+
+    with open(ruta, encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+# ==========================================
+# NOMBRES
+# ==========================================
+def _singular(recurso: str) -> str:
+    return recurso[:-1] if recurso.endswith("s") else recurso
+
+def _snake(nombre: str) -> str:
+    """'ProductInput' -> 'product_input'"""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", nombre).lower()
+
+def _identificador(nombre: str) -> str:
+    identificador = re.sub(r"\W", "_", nombre)
+    return identificador + "_" if keyword.iskeyword(identificador) else identificador
+
+def nombre_operacion(metodo: str, plantilla: str, operacion: dict = None) -> str:
+    """
+    Nombre del método generado, con los verbos de EcoMarketClient:
+        GET    /products                 -> listar_products
+        GET    /products/{id}            -> obtener_product
+        POST   /products                 -> crear_product
+        PUT    /products/{id}            -> actualizar_product_total
+        PATCH  /products/{id}            -> actualizar_product_parcial
+        DELETE /producers/{id}           -> eliminar_producer
+        GET    /producers/{id}/products  -> listar_products_de_producer
+    """
+    if operacion and operacion.get("operationId"):
+        return _identificador(_snake(operacion["operationId"]))
+    partes = plantilla.strip("/").split("/")
+    estaticas = [p for p in partes if not p.startswith("{")]
+    recurso = estaticas[-1]
+    es_item = partes[-1].startswith("{")
+    metodo = metodo.lower()
+    if metodo == "get":
+        nombre = f"obtener_{_singular(recurso)}" if es_item else f"listar_{recurso}"
+    else:
+        verbo = {"post": "crear_{}", "put": "actualizar_{}_total", "patch": "actualizar_{}_parcial",
+                 "delete": "eliminar_{}"}[metodo]
+        nombre = verbo.format(_singular(recurso))
+    if len(estaticas) > 1:
+        nombre += f"_de_{_singular(estaticas[-2])}"
+    return _identificador(nombre)
+
+# ==========================================
+# LECTURA DEL CONTRATO
+# ==========================================
+def _resolver(schema: dict, esquemas: dict):
+    """Devuelve (schema, nombre del componente o None) siguiendo un $ref."""
+    referencia = (schema or {}).get("$ref")
+    if referencia is None:
+        return schema or {}, None
+    nombre = referencia.rsplit("/", 1)[-1]
+    return esquemas[nombre], nombre
+
+def _tipo_python(schema: dict, esquemas: dict) -> str:
+    schema, _ = _resolver(schema, esquemas)
+    return TIPOS_PYTHON.get(schema.get("type", "object"), "dict")
+
+def _operaciones(contrato: dict) -> list:
+    """Una entrada por operación del contrato, en el orden en que aparecen."""
+    esquemas = contrato.get("components", {}).get("schemas", {})
+    operaciones = []
+    for plantilla, metodos in contrato.get("paths", {}).items():
+        comunes = metodos.get("parameters", [])
+        for metodo in METODOS:
+            operacion = metodos.get(metodo)
+            if operacion is None:
+                continue
+            parametros = {(p["in"], p["name"]): p for p in comunes + operacion.get("parameters", [])}
+            respuestas = operacion.get("responses", {})
+            exitos = sorted(int(s) for s in respuestas if str(s).startswith("2"))
+            retorno = "bool" if exitos == [204] else "dict"
+            for status in exitos:
+                schema = respuestas[str(status)].get("content", {}).get("application/json", {}).get("schema")
+                if schema is not None:
+                    retorno = _tipo_python(schema, esquemas)
+            cuerpo = operacion.get("requestBody", {}).get("content", {}).get("application/json", {}).get("schema")
+            operaciones.append({
+                "metodo": metodo.upper(),
+                "plantilla": plantilla,
+                "nombre": nombre_operacion(metodo, plantilla, operacion),
+                "resumen": operacion.get("summary", ""),
+                "path": [(p["name"], p.get("schema", {}).get("type")) for (ubicacion, _), p in parametros.items()
+                         if ubicacion == "path"],
+                "query": [(p["name"], p.get("schema", {}).get("type")) for (ubicacion, _), p in parametros.items()
+                          if ubicacion == "query"],
+                "cuerpo": cuerpo,
+                "exitos": tuple(exitos) or (200,),
+                "retorno": retorno,
+            })
+    return operaciones
+
+# ==========================================
+# EMISIÓN
+# ==========================================
+def _literal(valor) -> str:
+    """repr estable entre ejecuciones (el orden de un frozenset depende del hash de str)."""
+    if isinstance(valor, frozenset):
+        return f"frozenset({sorted(valor, key=repr)!r})"
+    return repr(valor)
+
+def _emitir_validador(schema: dict, nombre: str, entidad: str, prefijo: str) -> list:
+    funcion = compilar_validador(schema, nombre, entidad=entidad, prefijo_constantes=prefijo)
+    lineas = [f"{constante} = {_literal(valor)}" for constante, valor in funcion.__constantes__.items()
+              if not callable(valor)]
+    return lineas + [""] + funcion.__source__.rstrip("\n").split("\n")
+
+def _validadores(contrato: dict, operaciones: list) -> tuple:
+    """
+    Compila un validador por schema usado como cuerpo de petición.
+    Devuelve (líneas de código, {nombre de operación: nombre del validador}).
+    """
+    esquemas = contrato.get("components", {}).get("schemas", {})
+    lineas, por_operacion, emitidos = [], {}, set()
+    for operacion in operaciones:
+        if operacion["cuerpo"] is None:
+            continue
+        schema, componente = _resolver(operacion["cuerpo"], esquemas)
+        if schema.get("type", "object") != "object":
+            continue
+        if componente is not None:
+            nombre, entidad = f"validar_{_snake(componente)}", componente
+        else:
+            nombre, entidad = f"validar_{operacion['nombre']}", "cuerpo"
+        if nombre not in emitidos:
+            emitidos.add(nombre)
+            prefijo = "_V%d" % len(emitidos)
+            lineas += _emitir_validador(schema, nombre, entidad, prefijo) + [""]
+        por_operacion[operacion["nombre"]] = nombre
+    return lineas, por_operacion
+
+def _emitir_metodo(operacion: dict, validador: str) -> list:
+    argumentos = ["self"] + [f"{_identificador(n)}: {TIPOS_PYTHON.get(t, 'str')}" for n, t in operacion["path"]]
+    if operacion["cuerpo"] is not None:
+        argumentos.append("datos: dict")
+    argumentos += [f"{_identificador(n)}: {TIPOS_PYTHON.get(t, 'str')} = None" for n, t in operacion["query"]]
+    if validador:
+        argumentos.append("validar: bool = True")
+
+    valores = "".join(f", {n}={_identificador(n)}" for n, _ in operacion["path"])
+    query = ""
+    if operacion["query"]:
+        query = ", _query(" + ", ".join(f"{n!r}, {_identificador(n)}" for n, _ in operacion["query"]) + ")"
+    kwargs = ", **self._cuerpo_json(datos)" if operacion["cuerpo"] is not None else ""
+
+    lineas = [
+        f"    def {operacion['nombre']}({', '.join(argumentos)}) -> {operacion['retorno']}:",
+        f'        """{operacion["resumen"]}. Endpoint: {operacion["metodo"]} {operacion["plantilla"]}"""',
+    ]
+    if validador:
+        lineas += ["        if validar:", f"            {validador}(datos)"]
+    lineas += [
+        f"        ruta = self.urls.path({operacion['plantilla']!r}{query}{valores})",
+        f"        return self._llamar({operacion['metodo']!r}, ruta, {operacion['nombre']!r}, "
+        f"{operacion['exitos']!r}{kwargs})",
+    ]
+    return lineas
+
+CABECERA = '''\
+# ==========================================
+# ARCHIVO GENERADO por generar_cliente.py desde {contrato}.
+# No editar a mano: cambiar el contrato y volver a generar.
+# ==========================================
+from carga_perezosa import importar_perezoso
+from cliente_ecomarket import (BASE_URL, PLANTILLAS_RUTA, RUTAS_CLIENTE, ConflictoError, EcoMarketClient,
+                               EcoMarketError, ProductoNoEncontrado)
+from url_builder import Ruta, URLBuilder
+
+requests = importar_perezoso("requests")  # Solo se carga al crear el cliente
+'''
+
+BASE_CLIENTE = '''\
+def _query(*pares) -> dict:
+    """Parámetros de query sin los que quedaron en None."""
+    query = {nombre: valor for nombre, valor in zip(pares[::2], pares[1::2]) if valor is not None}
+    return query or None
+
+class ClienteContrato(EcoMarketClient):
+    """
+    Cliente con un método por operación de {contrato}.
+    Hereda de EcoMarketClient el pool, la caché, los circuitos, el observador
+    y el codec; los métodos escritos a mano (rutas /productos) siguen disponibles.
+    """
+
+    PLANTILLAS = {**PLANTILLAS_RUTA, **PLANTILLAS_CONTRATO}
+
+    def __init__(self, base_url: str = BASE_URL, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.urls = URLBuilder(self.base_url, {**RUTAS_CLIENTE, **RUTAS_CONTRATO})
+
+    def _llamar(self, metodo: str, ruta: str, operacion: str, exitos: tuple, **kwargs):
+        try:
+            response = self._request(metodo, ruta, operacion, **kwargs)
+        except requests.exceptions.RequestException as e:
+            raise EcoMarketError(f"Error de red en {metodo} {ruta}: {e}") from e
+        if response.status_code in exitos:
+            return True if response.status_code == 204 else self._json(response)
+        if response.status_code == 404:
+            error = ProductoNoEncontrado if PLANTILLAS_CONTRATO[operacion].startswith("/products") else EcoMarketError
+            raise error(f"Error 404 en {metodo} {ruta}", response=response)
+        if response.status_code == 409:
+            raise ConflictoError(f"Error 409 en {metodo} {ruta}: {response.text}", response=response)
+        raise EcoMarketError(f"Error en {metodo} {ruta}: {response.status_code} - {response.text}",
+                             response=response)
+'''
+
+def generar(ruta_contrato: str = RUTA_CONTRATO) -> str:
+    """Devuelve el código de cliente_contrato.py para el contrato dado."""
+    contrato = cargar_contrato(ruta_contrato)
+    operaciones = _operaciones(contrato)
+    nombre_contrato = os.path.basename(ruta_contrato)
+
+    lineas = CABECERA.format(contrato=nombre_contrato).split("\n")
+    lineas += [
+        f"HASH_CONTRATO = {hash_contrato(ruta_contrato)!r}",
+        f"VERSION_GENERADOR = {VERSION_GENERADOR}",
+        "",
+        "# (método, plantilla, nombre del método generado)",
+        "OPERACIONES = (",
+        *[f"    ({op['metodo']!r}, {op['plantilla']!r}, {op['nombre']!r})," for op in operaciones],
+        ")",
+        "",
+        "RUTAS_CONTRATO = {",
+    ]
+    tipos_por_plantilla = {}
+    for operacion in operaciones:
+        tipos_por_plantilla.setdefault(operacion["plantilla"], {}).update(
+            (nombre, tipo) for nombre, tipo in operacion["path"] if tipo)
+    lineas += [f"    {plantilla!r}: Ruta({plantilla!r}, {tipos!r})," for plantilla, tipos in tipos_por_plantilla.items()]
+    lineas += ["}", "", "PLANTILLAS_CONTRATO = {"]
+    lineas += [f"    {op['nombre']!r}: {op['plantilla']!r}," for op in operaciones]
+    lineas += ["}", "", "# " + "=" * 42, "# VALIDADORES COMPILADOS", "# " + "=" * 42]
+
+    codigo_validadores, por_operacion = _validadores(contrato, operaciones)
+    if any("_fecha_iso" in linea for linea in codigo_validadores):
+        lineas.insert(lineas.index("from cliente_ecomarket import (BASE_URL, PLANTILLAS_RUTA, RUTAS_CLIENTE, "
+                                   "ConflictoError, EcoMarketClient,"), "from compilador_validadores import _fecha_iso")
+    lineas += codigo_validadores
+    lineas += ["# " + "=" * 42, "# CLIENTE", "# " + "=" * 42]
+    lineas += BASE_CLIENTE.replace("{contrato}", nombre_contrato).split("\n")
+    for operacion in operaciones:
+        lineas += _emitir_metodo(operacion, por_operacion.get(operacion["nombre"])) + [""]
+    return "\n".join(lineas).rstrip("\n") + "\n"
+
+def escribir(ruta_contrato: str = RUTA_CONTRATO, salida: str = RUTA_GENERADO) -> str:
+    codigo = generar(ruta_contrato)
+    with open(salida, "w", encoding="utf-8") as f:
+        f.write(codigo)
+    return salida
+
+def desactualizado(ruta_contrato: str = RUTA_CONTRATO, salida: str = RUTA_GENERADO) -> bool:
+    """True si el archivo generado no coincide con lo que saldría hoy del contrato."""
+    try:
+        with open(salida, encoding="utf-8") as f:
+            actual = f.read()
+    except FileNotFoundError:
+        return True
+    return actual != generar(ruta_contrato)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera cliente_contrato.py desde el contrato OpenAPI")
+    parser.add_argument("--contrato", default=RUTA_CONTRATO)
+    parser.add_argument("--salida", default=RUTA_GENERADO)
+    parser.add_argument("--verificar", action="store_true", help="No escribe; sale con 1 si hay que regenerar")
+    args = parser.parse_args()
+
+    if args.verificar:
+        if desactualizado(args.contrato, args.salida):
+            print(f"❌ {args.salida} no coincide con {args.contrato}: ejecutar generar_cliente.py")
+            raise SystemExit(1)
+        print(f"✅ {args.salida} está al día con {args.contrato}")
+    else:
+        print(f"✅ Generado {escribir(args.contrato, args.salida)}")
@@ -0,0 +1,231 @@
+import contextvars
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# ==========================================
+# HEDGED REQUESTS: UNA SEGUNDA PETICIÓN PARA LA COLA DE LATENCIA
+# ==========================================
+# El p99 de obtener_producto es ~20 veces la mediana porque de vez en cuando
+# una réplica del backend tarda mucho. Reintentar no ayuda: el reintento sale
+# recién cuando la primera petición ya falló. Con hedging, si la respuesta no
+# llega en 'retardo' se manda una segunda petición idéntica y se usa la que
+# llegue primero. Como la lentitud es de la réplica y no de la petición, la
+# segunda casi siempre cae en una rápida.
+#
+#   - Solo lecturas idempotentes (GET): repetirlas no cambia nada en el servidor.
+#   - El retardo es fijo o sale del percentil observado (p95 por defecto):
+#     solo se cubre ~5% de las peticiones, justo las de la cola.
+#   - Un presupuesto limita la carga extra: cada petición deposita
+#     'presupuesto' (ej. 0.1) y cada hedge gasta 1, con tope 'rafaga'. Si la
+#     API entera se pone lenta no se duplica el tráfico, se deja de cubrir.
+#
+# Uso:
+#   hedging = Hedging(presupuesto=0.1)              # Retardo = p95 observado
+#   cliente = EcoMarketClient(hedging=hedging)
+#   ...
+#   hedging.estadisticas()["total"]["tasa_hedge"]
+
+OPERACIONES_IDEMPOTENTES = ("listar_productos", "obtener_producto")
+
+class Hedging:
+    """
+    Manda una petición de respaldo para las lecturas que tardan más que el
+    retardo y devuelve la primera respuesta que llegue.
+
+    requests no permite abortar una petición que ya está en vuelo: la
+    perdedora se cancela si todavía no salió del pool de hilos y, si ya
+    salió, su respuesta se cierra apenas llega (sin leer más del socket).
+    """
+
+    def __init__(self, retardo: float = None, percentil: float = 95, presupuesto: float = 0.1,
+                 rafaga: float = 10, ventana: int = 200, minimo_muestras: int = 20,
+                 retardo_minimo: float = 0.001, operaciones=OPERACIONES_IDEMPOTENTES,
+                 max_hilos: int = 64, reloj=time.perf_counter):
+        """
+        Args:
+            retardo (float, opcional): Segundos antes de mandar el hedge. Si es
+                None se usa el 'percentil' de las últimas 'ventana' latencias
+                de la operación (sin hedge hasta juntar 'minimo_muestras').
+            presupuesto (float): Hedges por petición permitidos a la larga (0.1 = 10% de carga extra).
+            rafaga (float): Tope de saldo acumulado para cubrir varias lentas seguidas.
+            retardo_minimo (float): Piso del retardo derivado (evita cubrir todo con un p95 de ~0).
+            operaciones (iterable): Operaciones que se pueden cubrir (deben ser idempotentes).
+            max_hilos (int): Hilos del pool donde corren los intentos.
+        """
+        if not 0 <= presupuesto <= 1:
+            raise ValueError("El presupuesto debe estar entre 0 y 1")
+        self.retardo = retardo
+        self.percentil = percentil
+        self.presupuesto = presupuesto
+        self.rafaga = rafaga
+        self.minimo_muestras = minimo_muestras
+        self.retardo_minimo = retardo_minimo
+        self.operaciones = frozenset(operaciones)
+        self.reloj = reloj
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="hedging")
+        self._ventana = ventana
+        self._latencias = {}
+        self._saldo = 0.0
+        self.peticiones = Counter()
+        self.hedges = Counter()           # Segundas peticiones enviadas
+        self.ganadas_por_hedge = Counter()
+        self.sin_presupuesto = Counter()  # Hubiera correspondido hedge pero no había saldo
+        self.canceladas = Counter()       # Perdedoras que no llegaron a salir
+
+    def aplica(self, metodo: str, operacion: str, kwargs: dict) -> bool:
+        """True si la llamada se puede cubrir (GET de una operación habilitada, sin streaming)."""
+        return metodo == "GET" and operacion in self.operaciones and not kwargs.get("stream")
+
+    def retardo_para(self, operacion: str):
+        """Segundos a esperar antes del hedge (None = todavía no se cubre)."""
+        if self.retardo is not None:
+            return self.retardo
+        with self._lock:
+            latencias = self._latencias.get(operacion)
+            if latencias is None or len(latencias) < self.minimo_muestras:
+                return None
+            ordenadas = sorted(latencias)
+        posicion = min(len(ordenadas) - 1, int(len(ordenadas) * self.percentil / 100))
+        return max(self.retardo_minimo, ordenadas[posicion])
+
+    def _registrar(self, operacion: str, latencia: float):
+        with self._lock:
+            latencias = self._latencias.get(operacion)
+            if latencias is None:
+                latencias = self._latencias[operacion] = deque(maxlen=self._ventana)
+            latencias.append(latencia)
+
+    def _gastar(self, operacion: str) -> bool:
+        with self._lock:
+            if self._saldo < 1:
+                self.sin_presupuesto[operacion] += 1
+                return False
+            self._saldo -= 1
+            self.hedges[operacion] += 1
+            return True
+
+    def _lanzar(self, operacion: str, funcion, args, kwargs):
+        """
+        Corre un intento en el pool. Cada uno con su copia del contexto (dos
+        hilos no pueden entrar al mismo) y registrando su propia latencia:
+        las perdedoras también cuentan, así el percentil refleja al backend
+        y no a las respuestas ya recortadas por el hedge.
+        """
+        inicio = self.reloj()
+
+        def intento():
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                self._registrar(operacion, self.reloj() - inicio)
+
+        return self._executor.submit(contextvars.copy_context().run, intento)
+
+    def ejecutar(self, operacion: str, funcion, *args, **kwargs):
+        """
+        Llama a funcion(*args, **kwargs) y, si no termina en el retardo y hay
+        presupuesto, lanza una segunda llamada igual. Devuelve el primer
+        resultado sin excepción; si las dos fallan, relanza el error de la
+        primera.
+        """
+        retardo = self.retardo_para(operacion)
+        with self._lock:
+            self.peticiones[operacion] += 1
+            self._saldo = min(self.rafaga, self._saldo + self.presupuesto)
+        if retardo is None:
+            # Sin datos para decidir: la llamada va directo, solo se mide
+            inicio = self.reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                self._registrar(operacion, self.reloj() - inicio)
+
+        primera = self._lanzar(operacion, funcion, args, kwargs)
+        listas, _ = wait([primera], timeout=retardo)
+        if listas or not self._gastar(operacion):
+            return primera.result()
+
+        segunda = self._lanzar(operacion, funcion, args, kwargs)
+        pendientes = {primera, segunda}
+        while pendientes:
+            listas, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for ganadora in listas:
+                if ganadora.exception() is None:
+                    if ganadora is segunda:
+                        with self._lock:
+                            self.ganadas_por_hedge[operacion] += 1
+                    for perdedora in pendientes:
+                        self._descartar(operacion, perdedora)
+                    return ganadora.result()
+        return primera.result()
+
+    def _descartar(self, operacion: str, perdedora):
+        if perdedora.cancel():
+            with self._lock:
+                self.canceladas[operacion] += 1
+            return
+        perdedora.add_done_callback(_cerrar_respuesta)
+
+    def estadisticas(self) -> dict:
+        """{'obtener_producto': {'peticiones': 500, 'hedges': 24, ...}, ..., 'total': {...}}"""
+        with self._lock:
+            resultado = {}
+            for operacion in sorted(self.peticiones):
+                resultado[operacion] = {
+                    "peticiones": self.peticiones[operacion],
+                    "hedges": self.hedges[operacion],
+                    "ganadas_por_hedge": self.ganadas_por_hedge[operacion],
+                    "sin_presupuesto": self.sin_presupuesto[operacion],
+                    "canceladas": self.canceladas[operacion],
+                }
+            peticiones = sum(self.peticiones.values())
+            hedges = sum(self.hedges.values())
+            resultado["total"] = {
+                "peticiones": peticiones,
+                "hedges": hedges,
+                "ganadas_por_hedge": sum(self.ganadas_por_hedge.values()),
+                "sin_presupuesto": sum(self.sin_presupuesto.values()),
+                "tasa_hedge": hedges / peticiones if peticiones else 0.0,
+                "saldo": self._saldo,
+            }
+        for operacion in resultado:
+            if operacion != "total":
+                retardo = self.retardo_para(operacion)
+                resultado[operacion]["retardo_ms"] = retardo * 1000 if retardo is not None else None
+        return resultado
+
+    def cerrar(self):
+        """Libera el pool de hilos (las perdedoras en vuelo terminan solas)."""
+        self._executor.shutdown(wait=False)
+
+def _cerrar_respuesta(futuro):
+    if futuro.cancelled() or futuro.exception() is not None:
+        return
+    cerrar = getattr(futuro.result(), "close", None)
+    if cerrar is not None:
+        cerrar()
+
+if __name__ == "__main__":
+    from cliente_ecomarket import EcoMarketClient
+    from servidor_local import Inyeccion, ServidorEcoMarket
+
+    print("--- 🐢 HEDGING CONTRA UN BACKEND CON COLA LARGA (3% de las respuestas tardan 150 ms) ---\n")
+    with ServidorEcoMarket(productos=50, semilla=7, inyeccion=Inyeccion(latencia="cola:4:0.03:150")) as servidor:
+        for nombre, hedging in (("sin hedging", None), ("hedging p95", Hedging(presupuesto=0.1))):
+            with EcoMarketClient(servidor.base_url, hedging=hedging) as cliente:
+                latencias = []
+                for i in range(600):
+                    inicio = time.perf_counter()
+                    cliente.obtener_producto(i % 50 + 1)
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+            latencias.sort()
+            print(f"{nombre:<12} p50 {latencias[300]:6.1f} ms   p99 {latencias[594]:6.1f} ms   "
+                  f"máx {latencias[-1]:6.1f} ms")
+            if hedging is not None:
+                total = hedging.estadisticas()["total"]
+                print(f"   ✅ hedges: {total['hedges']} ({total['tasa_hedge']:.1%}), "
+                      f"ganó el hedge en {total['ganadas_por_hedge']}")
+                hedging.cerrar()
@@ -0,0 +1,71 @@
+import codecs
+import json
+from typing import Iterable, Iterator
+
+_ESPACIOS = " \t\n\r"
+_SEPARADORES = _ESPACIOS + ",]"
+_decoder = json.JSONDecoder()
+
+def iterar_array_json(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator:
+    """
+    Decodifica un array JSON a medida que llegan los bytes y entrega sus
+    elementos uno por uno. Solo mantiene en memoria el elemento que se está
+    leyendo, no el documento completo.
+
+    Args:
+        chunks: Iterable de bloques de bytes (ej. response.iter_content()).
+        encoding (str): Codificación del cuerpo.
+
+    Raises:
+        ValueError: Si el cuerpo no es un array JSON válido.
+    """
+    decodificador = codecs.getincrementaldecoder(encoding)()
+    buffer = ""
+    pos = 0
+    abierto = False
+    terminado = False
+    fuente = iter(chunks)
+    fin_de_datos = False
+
+    while not terminado:
+        # Saltamos espacios y separadores entre elementos
+        while pos < len(buffer) and buffer[pos] in _ESPACIOS:
+            pos += 1
+        if abierto and pos < len(buffer) and buffer[pos] == ",":
+            pos += 1
+            continue
+
+        if pos < len(buffer):
+            if not abierto:
+                if buffer[pos] != "[":
+                    raise ValueError(f"Se esperaba un array JSON, se encontró: {buffer[pos]!r}")
+                abierto = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                terminado = True
+                break
+            try:
+                elemento, fin = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                elemento, fin = None, None
+            # Solo aceptamos el elemento si detrás viene un separador: un número
+            # al final del buffer puede estar cortado (el 12 de un 123 o de 12.5).
+            if fin is not None and (fin_de_datos or (fin < len(buffer) and buffer[fin] in _SEPARADORES)):
+                yield elemento
+                pos = fin
+                continue
+            if fin_de_datos:
+                raise ValueError(f"JSON inválido o truncado cerca de: {buffer[pos:pos + 40]!r}")
+
+        if fin_de_datos:
+            raise ValueError("El cuerpo terminó antes de cerrar el array JSON")
+
+        # Necesitamos más datos: descartamos lo ya consumido y leemos otro bloque
+        buffer = buffer[pos:]
+        pos = 0
+        try:
+            buffer += decodificador.decode(next(fuente))
+        except StopIteration:
+            buffer += decodificador.decode(b"", final=True)
+            fin_de_datos = True
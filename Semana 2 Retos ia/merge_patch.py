@@ -0,0 +1,152 @@
+import threading
+
+# ==========================================
+# JSON MERGE PATCH (RFC 7386) Y ACTUALIZACIONES POR DELTA
+# ==========================================
+# Los jobs de sincronización llaman a actualizar_producto_* con el producto
+# completo aunque no haya cambiado nada: una petición y una escritura en el
+# backend por producto. Con el estado conocido del servidor (caché, espejo o
+# un 'base' explícito) alcanza con mandar la diferencia:
+#
+#   base    = {"nombre": "Miel", "precio": 5.0, "stock": 3}
+#   deseado = {"nombre": "Miel", "precio": 5.5}
+#   calcular_merge_patch(base, deseado)  ->  {"precio": 5.5, "stock": None}
+#
+# En un merge patch los objetos se mezclan recursivamente, null borra la
+# clave y cualquier otro valor (listas incluidas) reemplaza al anterior.
+# Por eso un null "de verdad" en el estado deseado no se puede expresar: en
+# ese caso el cliente usa PUT.
+
+# Campos que pone el servidor: nunca forman parte del delta
+CAMPOS_SOLO_LECTURA = frozenset({"id"})
+
+def _iguales(a, b) -> bool:
+    """Igualdad de JSON: a diferencia de Python, true != 1 y 1 == 1.0."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_iguales(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_iguales(x, y) for x, y in zip(a, b))
+    return a == b
+
+def calcular_merge_patch(base: dict, deseado: dict, ignorar=frozenset()) -> dict:
+    """
+    Merge patch mínimo que lleva 'base' a 'deseado' ({} = no hay cambios).
+    Las claves de 'ignorar' no se comparan (solo en el primer nivel).
+    """
+    patch = {}
+    for clave in base:
+        if clave not in deseado and clave not in ignorar:
+            patch[clave] = None
+    for clave, valor in deseado.items():
+        if clave in ignorar:
+            continue
+        if clave not in base:
+            patch[clave] = valor
+        elif isinstance(valor, dict) and isinstance(base[clave], dict):
+            interno = calcular_merge_patch(base[clave], valor)
+            if interno:
+                patch[clave] = interno
+        elif not _iguales(base[clave], valor):
+            patch[clave] = valor
+    return patch
+
+def aplicar_merge_patch(base, patch):
+    """Resultado de aplicar 'patch' sobre 'base' (RFC 7386), sin modificar ninguno de los dos."""
+    if not isinstance(patch, dict):
+        return patch
+    resultado = dict(base) if isinstance(base, dict) else {}
+    for clave, valor in patch.items():
+        if valor is None:
+            resultado.pop(clave, None)
+        else:
+            resultado[clave] = aplicar_merge_patch(resultado.get(clave), valor)
+    return resultado
+
+def tiene_nulos(valor) -> bool:
+    """True si hay algún null (a cualquier profundidad): un merge patch no puede fijarlo."""
+    if valor is None:
+        return True
+    if isinstance(valor, dict):
+        return any(tiene_nulos(v) for v in valor.values())
+    if isinstance(valor, list):
+        return any(tiene_nulos(v) for v in valor)
+    return False
+
+class EstadisticasDelta:
+    """Cuánto se ahorró frente a mandar siempre el producto entero por PUT."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.omitidas = 0        # Sin cambios: no salió ninguna petición
+        self.patch = 0
+        self.put = 0
+        self.bytes_enviados = 0
+        self.bytes_completos = 0  # Lo que hubieran pesado los PUT completos
+
+    def registrar(self, metodo: str, bytes_enviados: int, bytes_completos: int):
+        """metodo = 'PATCH', 'PUT' o None (omitida)."""
+        with self._lock:
+            if metodo is None:
+                self.omitidas += 1
+            elif metodo == "PATCH":
+                self.patch += 1
+            else:
+                self.put += 1
+            self.bytes_enviados += bytes_enviados
+            self.bytes_completos += bytes_completos
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            total = self.omitidas + self.patch + self.put
+            return {
+                "actualizaciones": total,
+                "peticiones": self.patch + self.put,
+                "peticiones_ahorradas": self.omitidas,
+                "patch": self.patch,
+                "put": self.put,
+                "bytes_enviados": self.bytes_enviados,
+                "bytes_ahorrados": self.bytes_completos - self.bytes_enviados,
+                "ahorro_bytes": 1 - self.bytes_enviados / self.bytes_completos if self.bytes_completos else 0.0,
+            }
+
+if __name__ == "__main__":
+    import random
+
+    from cliente_ecomarket import EcoMarketClient, ReporteLote
+    from espejo_catalogo import EspejoCatalogo
+    from servidor_local import ServidorEcoMarket
+
+    print("--- 🔁 SINCRONIZACIÓN DE 2000 PRODUCTOS (5% con precio nuevo, 1% sin 'disponible') ---\n")
+    azar = random.Random(3)
+    with ServidorEcoMarket(productos=2000) as servidor:
+        with EcoMarketClient(servidor.base_url, pool_maxsize=8) as cliente, EspejoCatalogo(cliente) as espejo:
+            espejo.sincronizar()
+            # Lo que manda el sistema de origen: el catálogo entero, casi sin cambios
+            deseados = {}
+            for producto in cliente.listar_productos():
+                deseado = dict(producto)
+                sorteo = azar.random()
+                if sorteo < 0.05:
+                    deseado["precio"] = round(deseado["precio"] * 1.1, 2)
+                elif sorteo < 0.06:
+                    del deseado["disponible"]
+                deseados[producto["id"]] = deseado
+
+            for modo in ("delta", "PUT completo"):
+                antes = servidor.estadisticas()
+                if modo == "delta":
+                    bases = {producto_id: espejo.obtener(producto_id) for producto_id in deseados}
+                    reporte = cliente.actualizar_productos_delta_lote(deseados, bases, workers=8)
+                else:
+                    reporte = cliente._ejecutar_lote(cliente.actualizar_producto_total,
+                                                     [(i, (i, d)) for i, d in deseados.items()], 8, ReporteLote())
+                despues = servidor.estadisticas()
+                print(f"{modo:<13} peticiones {despues['peticiones'] - antes['peticiones']:>5}   "
+                      f"bytes enviados {despues['bytes_recibidos'] - antes['bytes_recibidos']:>9,}   "
+                      f"{'✅' if reporte.ok else '❌'}")
+
+            stats = cliente.deltas.estadisticas()
+            print(f"\n✅ Delta: {stats['peticiones_ahorradas']} peticiones ahorradas, {stats['patch']} PATCH, "
+                  f"{stats['put']} PUT, {stats['ahorro_bytes']:.1%} menos bytes que PUT completos")
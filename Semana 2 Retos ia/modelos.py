@@ -0,0 +1,217 @@
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+# ==========================================
+# PRODUCTO TIPADO
+# ==========================================
+# Alternativa a los dicts para quien quiera atributos con tipo. Los campos son
+# los de SCHEMA_PRODUCTO (validadores.py); los que no vengan quedan en su
+# valor por defecto y los desconocidos se ignoran.
+#
+# Con __slots__ un Producto ocupa 88 bytes frente a ~184 de un dict con las
+# mismas claves, y la categoría se interna: los miles de productos de 'miel'
+# comparten un único str en vez de uno por producto decodificado.
+
+@dataclass(frozen=True, slots=True)
+class Producto:
+    id: int
+    nombre: str
+    precio: float
+    categoria: str
+    disponible: bool = True
+    productor: dict = None
+    creado_en: str = None
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> "Producto":
+        # Se llama una vez por producto del catálogo: en lugar del __init__ de
+        # una dataclass frozen (un object.__setattr__ por campo) se escriben
+        # los slots directo con sus descriptores, ~2x más rápido.
+        producto = _nuevo(cls)
+        get = datos.get
+        _set_id(producto, datos["id"])
+        _set_nombre(producto, datos["nombre"])
+        _set_precio(producto, datos["precio"])
+        _set_categoria(producto, _internar(datos["categoria"]))
+        _set_disponible(producto, get("disponible", True))
+        _set_productor(producto, get("productor"))
+        _set_creado_en(producto, get("creado_en"))
+        return producto
+
+    def a_dict(self) -> dict:
+        """Dict como el de la API, sin los opcionales que no vinieron."""
+        datos = {"id": self.id, "nombre": self.nombre, "precio": self.precio,
+                 "categoria": self.categoria, "disponible": self.disponible}
+        if self.productor is not None:
+            datos["productor"] = self.productor
+        if self.creado_en is not None:
+            datos["creado_en"] = self.creado_en
+        return datos
+
+_nuevo = object.__new__
+(_set_id, _set_nombre, _set_precio, _set_categoria, _set_disponible, _set_productor, _set_creado_en) = (
+    Producto.__dict__[campo].__set__ for campo in Producto.__slots__)
+
+def _internar(categoria):
+    return sys.intern(categoria) if type(categoria) is str else categoria
+
+# ==========================================
+# CATÁLOGO EN COLUMNAS
+# ==========================================
+class ProductoBatch:
+    """
+    Lista de productos guardada por columnas, para tener catálogos grandes en
+    memoria: ids y precios en array (8 bytes cada uno), la categoría como
+    código de 2 bytes sobre un vocabulario, los nombres en un único buffer
+    UTF-8 y 'disponible' en un byte. productor y creado_en solo ocupan lugar
+    en las filas que los traen.
+
+    Se comporta como una lista de dicts (len, índices, slices, iteración),
+    pero cada dict se arma al pedirlo: modificarlo no cambia el batch.
+
+    Uso:
+        batch = cliente.listar_productos(tipo=ProductoBatch)
+        batch = ProductoBatch.desde_dicts(cliente.iter_productos())  # Sin la lista intermedia
+        batch[0]["precio"], batch.producto(0).precio, batch.por_id(42)
+    """
+
+    __slots__ = ("ids", "precios", "codigos", "categorias", "_codigo", "_nombres", "_fin_nombres",
+                 "disponibles", "_opcionales", "_filas_por_id")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.precios = array("d")
+        self.codigos = array("H")  # Índice en self.categorias
+        self.categorias = []
+        self._codigo = {}
+        self._nombres = bytearray()
+        self._fin_nombres = array("Q")
+        self.disponibles = bytearray()
+        self._opcionales = {"productor": {}, "creado_en": {}}  # fila -> valor
+        self._filas_por_id = None
+
+    @classmethod
+    def desde_dicts(cls, productos: Iterable[dict]) -> "ProductoBatch":
+        """Arma el batch desde cualquier iterable de dicts (lista, generador...)."""
+        batch = cls()
+        batch.extender(productos)
+        return batch
+
+    def agregar(self, datos: dict):
+        """Agrega un producto al final. Ver extender()."""
+        self.extender((datos,))
+
+    def extender(self, productos: Iterable[dict]):
+        """
+        Agrega productos al final. id debe ser entero; precio se guarda como
+        float. Falta un campo requerido -> KeyError.
+        """
+        # Métodos ligados en variables locales: este bucle corre una vez por
+        # producto de catálogos de millones
+        codigos_por_categoria = self._codigo
+        categorias = self.categorias
+        ids, precios, codigos = self.ids.append, self.precios.append, self.codigos.append
+        nombres, fin_nombres = self._nombres, self._fin_nombres.append
+        disponibles = self.disponibles.append
+        productores, creados = self._opcionales["productor"], self._opcionales["creado_en"]
+        filas_por_id = self._filas_por_id
+        fila = len(self.ids)
+        for datos in productos:
+            # Primero se leen todos los campos: una fila inválida no deja el
+            # batch con unas columnas agregadas y otras no
+            producto_id, precio, categoria = datos["id"], datos["precio"], datos["categoria"]
+            nombre = datos["nombre"].encode("utf-8")
+            get = datos.get
+            disponible = 1 if get("disponible", True) else 0
+            productor, creado_en = get("productor"), get("creado_en")
+            codigo = codigos_por_categoria.get(categoria)
+            if codigo is None:
+                codigo = codigos_por_categoria[categoria] = len(categorias)
+                categorias.append(categoria)
+            try:
+                # Las únicas columnas que pueden rechazar un valor (tipo o rango)
+                ids(producto_id)
+                precios(precio)
+                codigos(codigo)
+            except Exception:
+                del self.ids[fila:], self.precios[fila:]
+                raise
+            nombres += nombre
+            fin_nombres(len(nombres))
+            disponibles(disponible)
+            if productor is not None:
+                productores[fila] = productor
+            if creado_en is not None:
+                creados[fila] = creado_en
+            if filas_por_id is not None:
+                filas_por_id[producto_id] = fila
+            fila += 1
+
+    # --- Acceso por fila ---
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _fila(self, indice: int) -> int:
+        total = len(self.ids)
+        if indice < 0:
+            indice += total
+        if not 0 <= indice < total:
+            raise IndexError("índice fuera de rango en ProductoBatch")
+        return indice
+
+    def nombre(self, indice: int) -> str:
+        fila = self._fila(indice)
+        inicio = self._fin_nombres[fila - 1] if fila else 0
+        return self._nombres[inicio:self._fin_nombres[fila]].decode("utf-8")
+
+    def categoria(self, indice: int) -> str:
+        return self.categorias[self.codigos[self._fila(indice)]]
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return ProductoBatch.desde_dicts(self[i] for i in range(*indice.indices(len(self))))
+        fila = self._fila(indice)
+        datos = {"id": self.ids[fila], "nombre": self.nombre(fila), "precio": self.precios[fila],
+                 "categoria": self.categorias[self.codigos[fila]], "disponible": bool(self.disponibles[fila])}
+        for campo, valores in self._opcionales.items():
+            if fila in valores:
+                datos[campo] = valores[fila]
+        return datos
+
+    def __iter__(self) -> Iterator[dict]:
+        nombres, fin_nombres, categorias, codigos = self._nombres, self._fin_nombres, self.categorias, self.codigos
+        productores, creados = self._opcionales["productor"], self._opcionales["creado_en"]
+        inicio = 0
+        for fila, (producto_id, precio, disponible) in enumerate(zip(self.ids, self.precios, self.disponibles)):
+            fin = fin_nombres[fila]
+            datos = {"id": producto_id, "nombre": nombres[inicio:fin].decode("utf-8"), "precio": precio,
+                     "categoria": categorias[codigos[fila]], "disponible": bool(disponible)}
+            inicio = fin
+            if productores and fila in productores:
+                datos["productor"] = productores[fila]
+            if creados and fila in creados:
+                datos["creado_en"] = creados[fila]
+            yield datos
+
+    def producto(self, indice: int) -> Producto:
+        return Producto.desde_dict(self[indice])
+
+    def productos(self) -> Iterator[Producto]:
+        for datos in self:
+            yield Producto.desde_dict(datos)
+
+    def por_id(self, producto_id: int):
+        """Dict del producto con ese id, o None. El índice id -> fila se arma la primera vez."""
+        if self._filas_por_id is None:
+            self._filas_por_id = {producto_id: fila for fila, producto_id in enumerate(self.ids)}
+        fila = self._filas_por_id.get(producto_id)
+        return self[fila] if fila is not None else None
+
+    def a_dicts(self) -> list:
+        return list(self)
+
+    def __repr__(self) -> str:
+        return f"ProductoBatch({len(self)} productos, {len(self.categorias)} categorías)"
@@ -0,0 +1,382 @@
+import contextvars
+import json
+import logging
+import random
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+# ==========================================
+# OBSERVABILIDAD DEL CLIENTE (versión Python del Logger de la semana 1)
+# ==========================================
+# Por cada petición se registra método, ruta (plantilla), status, bytes,
+# tiempos de DNS / conexión / TTFB / total y número de reintento.
+# Los tiempos van a histogramas de memoria constante y, con muestreo, a un
+# log JSON con las cabeceras sensibles ofuscadas.
+
+# Número de reintento en curso. Lo fija retry.PoliticaReintentos alrededor de
+# cada intento; 0 = primer intento (o llamada sin política de reintentos).
+INTENTO_ACTUAL = contextvars.ContextVar("intento_actual", default=0)
+
+# Identificador de la llamada en curso, compartido por todos sus intentos. Lo
+# fija retry.PoliticaReintentos; va como 'call_id' en el log de cada petición
+# y en el de cada reintento para poder correlacionarlos. None = sin política.
+LLAMADA_ACTUAL = contextvars.ContextVar("llamada_actual", default=None)
+
+CABECERAS_SENSIBLES = {"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key"}
+UMBRAL_LENTO_MS = 2000  # Igual que el WARN de fetchConLogging
+
+logger = logging.getLogger("ecomarket.http")
+
+# ==========================================
+# HISTOGRAMA (estilo HDR)
+# ==========================================
+class Histograma:
+    """
+    Histograma log-lineal de enteros (microsegundos, bytes...) con memoria fija.
+    Cada potencia de dos se divide en 'sub_cubetas / 2' cubetas lineales, así
+    que el error relativo de cualquier percentil es menor a 2 / sub_cubetas
+    (1,6% con el valor por defecto), sin guardar las muestras.
+    """
+
+    def __init__(self, bits_precision: int = 7, maximo: int = 2 ** 36):
+        """
+        Args:
+            bits_precision (int): sub_cubetas = 2^bits (7 -> 128).
+            maximo (int): Mayor valor representable; los mayores se recortan.
+                2^36 us son unas 19 horas.
+        """
+        self.bits = bits_precision
+        self.sub_cubetas = 1 << bits_precision
+        self.mitad = self.sub_cubetas >> 1
+        self.maximo = maximo
+        self.cubetas = [0] * self._indice(maximo) + [0]
+        self.total = 0
+        self.suma = 0
+        self.minimo_visto = None
+        self.maximo_visto = 0
+        self._lock = threading.Lock()
+
+    def _indice(self, valor: int) -> int:
+        magnitud = valor.bit_length() - self.bits
+        if magnitud <= 0:
+            return valor
+        return magnitud * self.mitad + (valor >> magnitud)
+
+    def _valor(self, indice: int) -> int:
+        """Límite superior de la cubeta (lo que reporta HDR para un percentil)."""
+        if indice < self.sub_cubetas:
+            return indice
+        magnitud = indice // self.mitad - 1
+        return ((indice - magnitud * self.mitad + 1) << magnitud) - 1
+
+    def registrar(self, valor: int):
+        valor = min(max(int(valor), 0), self.maximo)
+        indice = self._indice(valor)
+        with self._lock:
+            self.cubetas[indice] += 1
+            self.total += 1
+            self.suma += valor
+            if valor > self.maximo_visto:
+                self.maximo_visto = valor
+            if self.minimo_visto is None or valor < self.minimo_visto:
+                self.minimo_visto = valor
+
+    def percentil(self, p: float) -> int:
+        """Valor bajo el cual cae el p% (0-100) de las muestras."""
+        with self._lock:
+            if not self.total:
+                return 0
+            objetivo = max(1, -(-self.total * p // 100))  # ceil sin floats raros
+            acumulado = 0
+            for indice, cantidad in enumerate(self.cubetas):
+                acumulado += cantidad
+                if acumulado >= objetivo:
+                    return min(self._valor(indice), self.maximo_visto)
+        return self.maximo_visto
+
+    def combinar(self, otro: "Histograma"):
+        """Suma otro histograma con la misma precisión (ej. de otro proceso)."""
+        if (otro.bits, otro.maximo) != (self.bits, self.maximo):
+            raise ValueError("Solo se pueden combinar histogramas con la misma precisión y máximo")
+        with self._lock:
+            for indice, cantidad in enumerate(otro.cubetas):
+                self.cubetas[indice] += cantidad
+            self.total += otro.total
+            self.suma += otro.suma
+            self.maximo_visto = max(self.maximo_visto, otro.maximo_visto)
+            if otro.minimo_visto is not None:
+                self.minimo_visto = otro.minimo_visto if self.minimo_visto is None else min(self.minimo_visto, otro.minimo_visto)
+
+    def resumen(self) -> dict:
+        return {
+            "n": self.total,
+            "min": self.minimo_visto or 0,
+            "p50": self.percentil(50),
+            "p90": self.percentil(90),
+            "p99": self.percentil(99),
+            "max": self.maximo_visto,
+            "media": self.suma / self.total if self.total else 0.0,
+        }
+
+# ==========================================
+# MÉTRICAS POR RUTA
+# ==========================================
+FASES = ("dns", "conexion", "ttfb", "total")
+
+class MetricasRuta:
+    """Histogramas (us) por fase, bytes y contadores de una (método, ruta)."""
+
+    def __init__(self):
+        self.fases = {fase: Histograma() for fase in FASES}
+        self.bytes = Histograma()
+        self.por_status = {}
+        self.reintentos = 0
+        self.errores_red = 0
+        # El cliente se comparte entre hilos (pool, hedging): los += van con lock
+        self._lock = threading.Lock()
+
+    def contar(self, status: int, reintento: bool, error_red: bool):
+        with self._lock:
+            if reintento:
+                self.reintentos += 1
+            if error_red:
+                self.errores_red += 1
+            else:
+                self.por_status[status] = self.por_status.get(status, 0) + 1
+
+    def contadores(self) -> dict:
+        with self._lock:
+            return {"por_status": dict(self.por_status), "reintentos": self.reintentos,
+                    "errores_red": self.errores_red}
+
+class Metricas:
+    """Agrupa MetricasRuta por 'MÉTODO /ruta/{plantilla}'."""
+
+    def __init__(self):
+        self._rutas = {}
+        self._lock = threading.Lock()
+
+    def ruta(self, metodo: str, plantilla: str) -> MetricasRuta:
+        clave = f"{metodo} {plantilla}"
+        metricas = self._rutas.get(clave)
+        if metricas is None:
+            with self._lock:
+                metricas = self._rutas.setdefault(clave, MetricasRuta())
+        return metricas
+
+    def resumen(self) -> dict:
+        """{'GET /productos/{id}': {'total': {...p50/p99 en us}, 'por_status': {...}, ...}}"""
+        with self._lock:
+            rutas = dict(self._rutas)
+        resultado = {}
+        for clave, metricas in sorted(rutas.items()):
+            datos = {fase: h.resumen() for fase, h in metricas.fases.items() if h.total}
+            datos["bytes"] = metricas.bytes.resumen()
+            datos.update(metricas.contadores())
+            resultado[clave] = datos
+        return resultado
+
+# ==========================================
+# FASES DE LA CONEXIÓN (DNS, connect, TTFB)
+# ==========================================
+# requests no expone estos tiempos: los anotan la conexión y el adaptador en
+# un thread-local, y el Observador los lee al terminar la petición (que corre
+# entera en el mismo hilo).
+_fases = threading.local()
+
+class _MedirConexion:
+    def _new_conn(self):
+        host = self._dns_host
+        inicio = time.perf_counter()
+        try:
+            direcciones = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)))
+        except socket.gaierror:
+            return super()._new_conn()  # Que urllib3 arme el NameResolutionError de siempre
+        resuelto = time.perf_counter()
+        _fases.dns = resuelto - inicio
+        # Conectamos a las IPs ya resueltas para no medir el DNS dos veces
+        try:
+            for numero, direccion in enumerate(direcciones):
+                self._dns_host = direccion
+                try:
+                    sock = super()._new_conn()
+                    break
+                except NewConnectionError:
+                    if numero == len(direcciones) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+        _fases.conexion = time.perf_counter() - resuelto
+        return sock
+
+class _ConexionMedida(_MedirConexion, HTTPConnection):
+    pass
+
+class _ConexionMedidaHTTPS(_MedirConexion, HTTPSConnection):
+    pass
+
+class _PoolMedido(HTTPConnectionPool):
+    ConnectionCls = _ConexionMedida
+
+class _PoolMedidoHTTPS(HTTPSConnectionPool):
+    ConnectionCls = _ConexionMedidaHTTPS
+
+class AdaptadorMedido(HTTPAdapter):
+    """HTTPAdapter que anota DNS, conexión y TTFB de cada petición."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _PoolMedido, "https": _PoolMedidoHTTPS}
+
+    def send(self, request, *args, **kwargs):
+        _fases.dns = _fases.conexion = None
+        inicio = time.perf_counter()
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            # send() vuelve al tener las cabeceras; el cuerpo se lee después
+            _fases.ttfb = time.perf_counter() - inicio
+
+# ==========================================
+# LOGS JSON
+# ==========================================
+def sanitizar_cabeceras(cabeceras) -> dict:
+    """Ofusca credenciales. 'Bearer abc' -> 'Bearer [OFUSCADO]'."""
+    limpias = {}
+    for nombre, valor in (cabeceras or {}).items():
+        if nombre.lower() in CABECERAS_SENSIBLES:
+            esquema, espacio, _ = str(valor).partition(" ")
+            valor = f"{esquema} [OFUSCADO]" if espacio else "[OFUSCADO]"
+        limpias[nombre] = valor
+    return limpias
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por registro: timestamp, level, message y los campos de 'extra'."""
+
+    def format(self, record):
+        entrada = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+                         + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        entrada.update(getattr(record, "campos", {}))
+        if record.exc_info:
+            entrada["error"] = self.formatException(record.exc_info)
+        return json.dumps(entrada, ensure_ascii=False)
+
+def configurar_logs_json(nivel=logging.INFO, destino=None) -> logging.Handler:
+    """Atajo: manda el logger 'ecomarket.http' a stderr (o destino) en JSON."""
+    manejador = logging.StreamHandler(destino)
+    manejador.setFormatter(FormateadorJSON())
+    logger.addHandler(manejador)
+    logger.setLevel(nivel)
+    return manejador
+
+# ==========================================
+# OBSERVADOR (el hook que usa EcoMarketClient)
+# ==========================================
+class Observador:
+    """
+    Mide cada petición del cliente.
+
+    Uso:
+        observador = Observador(muestreo=0.1)
+        cliente = EcoMarketClient(observador=observador)
+        ...
+        observador.metricas.resumen()
+
+    Args:
+        muestreo (float): Fracción de peticiones exitosas y rápidas que se
+            loguean (INFO). Errores (ERROR) y lentas (WARN) se loguean siempre.
+        umbral_lento_ms (float): Desde cuántos ms una respuesta es lenta.
+    """
+
+    def __init__(self, metricas: Metricas = None, muestreo: float = 1.0,
+                 umbral_lento_ms: float = UMBRAL_LENTO_MS, log: logging.Logger = None,
+                 azar=random.random):
+        self.metricas = metricas or Metricas()
+        self.muestreo = muestreo
+        self.umbral_lento_ms = umbral_lento_ms
+        self.log = log or logger
+        self.azar = azar
+
+    def crear_adaptador(self, **kwargs) -> HTTPAdapter:
+        return AdaptadorMedido(**kwargs)
+
+    def observar(self, session, metodo: str, url: str, plantilla: str, **kwargs):
+        """Hace session.request(...) registrando tiempos; re-lanza cualquier error."""
+        _fases.dns = _fases.conexion = _fases.ttfb = None
+        inicio = time.perf_counter()
+        try:
+            response = session.request(metodo, url, **kwargs)
+        except Exception as e:
+            enviadas = {**session.headers, **(kwargs.get("headers") or {})}
+            self._registrar(metodo, url, plantilla, None, 0, time.perf_counter() - inicio, enviadas, e)
+            raise
+        total = time.perf_counter() - inicio
+        if kwargs.get("stream"):
+            largo = int(response.headers.get("Content-Length") or 0)
+        else:
+            largo = len(response.content)
+        self._registrar(metodo, url, plantilla, response.status_code, largo, total, response.request.headers, None)
+        return response
+
+    def _registrar(self, metodo, url, plantilla, status, largo, total, cabeceras, error):
+        metricas = self.metricas.ruta(metodo, plantilla)
+        fases = metricas.fases
+        fases["total"].registrar(total * 1e6)
+        dns, conexion, ttfb = getattr(_fases, "dns", None), getattr(_fases, "conexion", None), getattr(_fases, "ttfb", None)
+        if dns is not None:
+            fases["dns"].registrar(dns * 1e6)
+        if conexion is not None:
+            fases["conexion"].registrar(conexion * 1e6)
+        if ttfb is not None:
+            fases["ttfb"].registrar(ttfb * 1e6)
+        metricas.bytes.registrar(largo)
+        intento = INTENTO_ACTUAL.get()
+        metricas.contar(status, bool(intento), error is not None)
+
+        # Clasificación de niveles como fetchConLogging
+        duracion_ms = total * 1000
+        if error is not None or status >= 400:
+            nivel = logging.ERROR
+        elif duracion_ms > self.umbral_lento_ms:
+            nivel = logging.WARNING
+        elif self.muestreo >= 1 or self.azar() < self.muestreo:
+            nivel = logging.INFO
+        else:
+            return
+        if not self.log.isEnabledFor(nivel):
+            return
+
+        campos = {
+            "method": metodo,
+            "route": plantilla,
+            "url": url,
+            "status": status,
+            "bytes": largo,
+            "duration_ms": round(duracion_ms, 3),
+            "dns_ms": round(dns * 1000, 3) if dns is not None else None,
+            "connect_ms": round(conexion * 1000, 3) if conexion is not None else None,
+            "ttfb_ms": round(ttfb * 1000, 3) if ttfb is not None else None,
+            "retry": intento,
+            "call_id": LLAMADA_ACTUAL.get(),
+            "headers": sanitizar_cabeceras(cabeceras),
+        }
+        if error is not None:
+            mensaje = f"Error de red: {error}"
+            campos["error"] = repr(error)
+        elif status >= 400:
+            mensaje = f"Fallo HTTP {status}"
+        elif nivel == logging.WARNING:
+            mensaje = f"Respuesta lenta detectada ({duracion_ms:.0f}ms)"
+        else:
+            mensaje = "Petición exitosa"
+        self.log.log(nivel, mensaje, extra={"campos": campos})
@@ -1,99 +1,352 @@
-import time
-import random
-import functools
-import requests
-
-# Configuración por defecto
-MAX_RETRIES = 3
-BASE_DELAY = 1  # Segundos
-
-def with_retry(func):
-    """
-    Decorador que reintenta la función si ocurren errores de red o 5xx.
-    Usa Exponential Backoff + Jitter.
-    NO reintenta en errores 4xx (excepto 408 o 429 si quisiéramos ser muy estrictos, 
-    pero por ahora asumimos 4xx = error del cliente).
-    """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        retries = 0
-        
-        while True:
-            try:
-                # Intentamos ejecutar la función original
-                return func(*args, **kwargs)
-                
-            except requests.exceptions.RequestException as e:
-                # Analizamos el error
-                es_error_cliente = False
-                status_code = None
-
-                if e.response is not None:
-                    status_code = e.response.status_code
-                    # Si es 4xx (ej: 404, 400), NO reintentamos. Es culpa nuestra.
-                    if 400 <= status_code < 500:
-                        es_error_cliente = True
-
-                # Si es error del cliente o ya gastamos los intentos, fallamos oficialmente
-                if es_error_cliente or retries >= MAX_RETRIES:
-                    print(f"❌ Fallo definitivo en {func.__name__} | Status: {status_code} | Error: {e}")
-                    raise e
-
-                # Si llegamos aquí, es un error transitorio (5xx o red). A reintentar.
-                retries += 1
-                
-                # FÓRMULA DE EXPONENTIAL BACKOFF: 2^retries
-                delay = BASE_DELAY * (2 ** (retries - 1))
-                
-                # AGREGAMOS JITTER (Variación aleatoria)
-                # Esto evita que todos los clientes reintenten EXACTAMENTE al mismo tiempo
-                jitter = random.uniform(0, 1)
-                final_wait = delay + jitter
-                
-                print(f"⚠️ Error transitorio ({e}). Reintentando {func.__name__} en {final_wait:.2f}s... (Intento {retries}/{MAX_RETRIES})")
-                time.sleep(final_wait)
-                
-    return wrapper
-
-# ==========================================
-# ZONA DE PRUEBAS (TESTS INTERNOS)
-# ==========================================
-if __name__ == "__main__":
-    print("--- 🧪 INICIANDO PRUEBAS DE RESILIENCIA ---")
-
-    # Simulamos un servidor que falla 2 veces y a la 3ra funciona
-    intentos_mock = 0
-    
-    @with_retry
-    def funcion_inestable():
-        global intentos_mock
-        intentos_mock += 1
-        if intentos_mock < 3:
-            # Simulamos error 503 Service Unavailable
-            raise requests.exceptions.HTTPError("Servidor ocupado", response=requests.Response())
-        print("✅ ¡Éxito! El servidor respondió.")
-        return "Datos recibidos"
-
-    # Inyectamos el código de estado 503 al mock del response para que la lógica lo detecte
-    # (Pequeño hack para simular requests sin hacer peticiones reales)
-    def simular_fallo_503():
-        resp = requests.Response()
-        resp.status_code = 503
-        raise requests.exceptions.HTTPError("503 Server Error", response=resp)
-
-    # Redefinimos para usar el simulador más preciso
-    intentos_mock = 0
-    @with_retry
-    def obtener_datos_simulados():
-        global intentos_mock
-        intentos_mock += 1
-        if intentos_mock < 3:
-            simular_fallo_503()
-        print("✅ Conexión exitosa al tercer intento.")
-        return "OK"
-
-    try:
-        obtener_datos_simulados()
-        print("\n🏆 PRUEBA PASADA: El sistema se recuperó automáticamente.")
-    except Exception as e:
+import asyncio
+import email.utils
+import functools
+import inspect
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+
+from observabilidad import INTENTO_ACTUAL, LLAMADA_ACTUAL, logger
+
+# Configuración por defecto
+MAX_RETRIES = 3
+BASE_DELAY = 1  # Segundos
+MAX_DELAY = 30  # Tope de una sola espera
+
+# 408 Request Timeout y 429 Too Many Requests son 4xx, pero transitorios
+STATUS_REINTENTABLES = frozenset({408, 429, 500, 502, 503, 504})
+
+JITTER_COMPLETO = "completo"
+JITTER_DECORRELACIONADO = "decorrelacionado"
+
+class PresupuestoReintentos:
+    """
+    Presupuesto de reintentos compartido por todo el proceso.
+    Permite como máximo ratio * peticiones + minimo_por_segundo * ventana
+    reintentos dentro de la ventana deslizante. Si el backend está caído, los
+    reintentos dejan de multiplicar la carga en lugar de triplicarla.
+    La ventana se guarda en cubetas de 1 segundo (memoria constante).
+    """
+
+    def __init__(self, ratio: float = 0.2, minimo_por_segundo: float = 1,
+                 ventana: int = 10, reloj=time.monotonic):
+        self.ratio = ratio
+        self.minimo_por_segundo = minimo_por_segundo
+        self.ventana = ventana
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._peticiones = [0] * ventana
+        self._reintentos = [0] * ventana
+        self._segundo = [None] * ventana
+        self.rechazados = 0
+
+    def _cubeta(self) -> int:
+        segundo = int(self._reloj())
+        i = segundo % self.ventana
+        if self._segundo[i] != segundo:
+            # La cubeta pertenecía a una vuelta anterior de la ventana: se recicla
+            self._segundo[i] = segundo
+            self._peticiones[i] = 0
+            self._reintentos[i] = 0
+        return i
+
+    def _vigentes(self, actual: int) -> list:
+        """Cubetas que caen dentro de la ventana que termina en el segundo actual."""
+        limite = actual - self.ventana
+        return [j for j in range(self.ventana) if self._segundo[j] is not None and self._segundo[j] > limite]
+
+    def registrar_peticion(self):
+        with self._lock:
+            self._peticiones[self._cubeta()] += 1
+
+    def intentar_reintento(self) -> bool:
+        """Consume un reintento si queda presupuesto. Devuelve False si no."""
+        with self._lock:
+            i = self._cubeta()
+            vigentes = self._vigentes(self._segundo[i])
+            peticiones = sum(self._peticiones[j] for j in vigentes)
+            reintentos = sum(self._reintentos[j] for j in vigentes)
+            if reintentos + 1 > self.ratio * peticiones + self.minimo_por_segundo * self.ventana:
+                self.rechazados += 1
+                return False
+            self._reintentos[i] += 1
+            return True
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            vigentes = self._vigentes(int(self._reloj()))
+            return {
+                "peticiones": sum(self._peticiones[j] for j in vigentes),
+                "reintentos": sum(self._reintentos[j] for j in vigentes),
+                "rechazados": self.rechazados,
+            }
+
+# Presupuesto por defecto, compartido por todas las políticas que no pasen uno propio
+PRESUPUESTO_GLOBAL = PresupuestoReintentos()
+
+def parsear_retry_after(valor: str, ahora: float = None):
+    """
+    Interpreta la cabecera Retry-After: segundos ('120') o fecha HTTP
+    ('Wed, 21 Oct 2015 07:28:00 GMT'). Devuelve segundos a esperar o None.
+    """
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        fecha = email.utils.parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    ahora = time.time() if ahora is None else ahora
+    return max(0.0, fecha.timestamp() - ahora)
+
+def clasificar_error(error: BaseException):
+    """
+    Decide si un error es transitorio.
+    Devuelve (reintentable, status_code, retry_after_segundos).
+    Entiende excepciones de requests y EcoMarketError (que guarda la respuesta).
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        causa = error.__cause__ or error.__context__
+        if not isinstance(error, requests.exceptions.RequestException) and causa is not None:
+            # EcoMarketError sin respuesta: miramos el error de red que lo provocó
+            return clasificar_error(causa)
+        if isinstance(error, requests.exceptions.RequestException):
+            # Error de red (conexión, timeout). Las URLs mal formadas heredan de
+            # ValueError y nunca se van a arreglar solas.
+            return (not isinstance(error, ValueError), None, None)
+        return (False, None, None)
+
+    status_code = response.status_code
+    retry_after = None
+    if status_code in (429, 503):
+        retry_after = parsear_retry_after(response.headers.get("Retry-After"))
+    return (status_code in STATUS_REINTENTABLES, status_code, retry_after)
+
+# next() sobre itertools.count es atómico con el GIL: ids únicos sin lock
+_contador_llamadas = itertools.count(1)
+
+def _nuevo_id_llamada() -> str:
+    return f"{os.getpid()}-{next(_contador_llamadas)}"
+
+class PoliticaReintentos:
+    """
+    Política configurable de reintentos con Exponential Backoff + Jitter.
+
+    Args:
+        max_reintentos (int): Reintentos después del primer intento.
+        base_delay (float): Espera base en segundos.
+        max_delay (float): Tope de una sola espera.
+        jitter (str): "completo" -> uniforme entre 0 y base*2^n;
+            "decorrelacionado" -> uniforme entre base y 3 * espera anterior.
+        deadline (float, opcional): Tiempo total máximo por llamada en segundos,
+            contando intentos y esperas. Si la próxima espera no entra, se falla ya.
+        presupuesto (PresupuestoReintentos, opcional): Presupuesto compartido;
+            None desactiva el límite.
+        respetar_retry_after (bool): Usar la cabecera Retry-After de 429/503.
+        log (logging.Logger, opcional): Dónde se anuncian reintentos (WARNING)
+            y fallos definitivos (ERROR); por defecto el de observabilidad.
+    """
+
+    def __init__(self, max_reintentos: int = None, base_delay: float = None,
+                 max_delay: float = MAX_DELAY, jitter: str = JITTER_COMPLETO,
+                 deadline: float = None, presupuesto=PRESUPUESTO_GLOBAL,
+                 respetar_retry_after: bool = True, reloj=time.monotonic,
+                 azar: random.Random = None, log: logging.Logger = None):
+        if jitter not in (JITTER_COMPLETO, JITTER_DECORRELACIONADO):
+            raise ValueError(f"Jitter '{jitter}' no válido. Opciones: {[JITTER_COMPLETO, JITTER_DECORRELACIONADO]}")
+        self.max_reintentos = MAX_RETRIES if max_reintentos is None else max_reintentos
+        self.base_delay = BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+        self.presupuesto = presupuesto
+        self.respetar_retry_after = respetar_retry_after
+        self.reloj = reloj
+        self.azar = azar or random.Random()
+        self.log = log or logger
+
+    def calcular_espera(self, reintento: int, espera_anterior: float) -> float:
+        """Espera antes del reintento número 'reintento' (empieza en 1)."""
+        if self.jitter == JITTER_DECORRELACIONADO:
+            espera = self.azar.uniform(self.base_delay, max(self.base_delay, espera_anterior * 3))
+        else:
+            # FÓRMULA DE EXPONENTIAL BACKOFF: base * 2^(n-1), con jitter completo
+            espera = self.azar.uniform(0, self.base_delay * (2 ** (reintento - 1)))
+        return min(espera, self.max_delay)
+
+    def _decidir(self, nombre, error, reintento, espera_anterior, inicio):
+        """
+        Devuelve los segundos a esperar antes del próximo intento,
+        o None si hay que fallar definitivamente.
+        """
+        reintentable, status_code, retry_after = clasificar_error(error)
+        motivo = None
+        if not reintentable:
+            motivo = "error no transitorio"
+        elif reintento > self.max_reintentos:
+            motivo = "sin reintentos"
+
+        espera = None
+        if motivo is None:
+            espera = self.calcular_espera(reintento, espera_anterior)
+            if retry_after is not None and self.respetar_retry_after:
+                espera = max(espera, retry_after)
+            if self.deadline is not None and self.reloj() - inicio + espera > self.deadline:
+                motivo = "deadline agotado"
+            elif self.presupuesto is not None and not self.presupuesto.intentar_reintento():
+                motivo = "presupuesto de reintentos agotado"
+
+        nivel = logging.ERROR if motivo is not None else logging.WARNING
+        if self.log.isEnabledFor(nivel):
+            campos = {
+                "operation": nombre,
+                "call_id": LLAMADA_ACTUAL.get(),
+                "retry": reintento - 1,  # El intento que falló, como en el log de la petición
+                "max_retries": self.max_reintentos,
+                "status": status_code,
+                "error": repr(error),
+            }
+            if motivo is not None:
+                campos["reason"] = motivo
+                mensaje = f"Fallo definitivo en {nombre} ({motivo})"
+            else:
+                campos["delay_s"] = round(espera, 3)
+                mensaje = f"Error transitorio. Reintentando {nombre} en {espera:.2f}s ({reintento}/{self.max_reintentos})"
+            self.log.log(nivel, mensaje, extra={"campos": campos})
+        return None if motivo is not None else espera
+
+    def ejecutar(self, func, *args, **kwargs):
+        """Llama a func reintentando según la política (bloquea con time.sleep)."""
+        inicio = self.reloj()
+        if self.presupuesto is not None:
+            self.presupuesto.registrar_peticion()
+        reintento = 0
+        espera = self.base_delay
+        llamada = LLAMADA_ACTUAL.set(_nuevo_id_llamada())
+        try:
+            while True:
+                # El observador de peticiones lee el número de reintento de aquí
+                marca = INTENTO_ACTUAL.set(reintento)
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    reintento += 1
+                    espera = self._decidir(func.__name__, e, reintento, espera, inicio)
+                    if espera is None:
+                        raise
+                finally:
+                    INTENTO_ACTUAL.reset(marca)
+                time.sleep(espera)
+        finally:
+            LLAMADA_ACTUAL.reset(llamada)
+
+    async def ejecutar_async(self, func, *args, **kwargs):
+        """Igual que ejecutar, pero para corrutinas: espera con asyncio.sleep."""
+        inicio = self.reloj()
+        if self.presupuesto is not None:
+            self.presupuesto.registrar_peticion()
+        reintento = 0
+        espera = self.base_delay
+        llamada = LLAMADA_ACTUAL.set(_nuevo_id_llamada())
+        try:
+            while True:
+                # El observador de peticiones lee el número de reintento de aquí
+                marca = INTENTO_ACTUAL.set(reintento)
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    reintento += 1
+                    espera = self._decidir(func.__name__, e, reintento, espera, inicio)
+                    if espera is None:
+                        raise
+                finally:
+                    INTENTO_ACTUAL.reset(marca)
+                await asyncio.sleep(espera)
+        finally:
+            LLAMADA_ACTUAL.reset(llamada)
+
+def with_retry(func=None, *, politica: PoliticaReintentos = None):
+    """
+    Decorador que reintenta la función si ocurren errores de red o los status
+    de STATUS_REINTENTABLES: 408, 429, 500, 502, 503 y 504.
+    Usa Exponential Backoff + Jitter, respeta Retry-After, un deadline por
+    llamada y el presupuesto global de reintentos.
+    NO reintenta el resto de 4xx (son culpa del cliente) ni 501, 505 y siguientes.
+
+    Uso:
+        @with_retry
+        def f(): ...
+
+        @with_retry(politica=PoliticaReintentos(deadline=5, jitter="decorrelacionado"))
+        async def g(): ...
+    """
+    def decorador(funcion):
+        if inspect.iscoroutinefunction(funcion):
+            @functools.wraps(funcion)
+            async def wrapper_async(*args, **kwargs):
+                return await (politica or PoliticaReintentos()).ejecutar_async(funcion, *args, **kwargs)
+            return wrapper_async
+
+        @functools.wraps(funcion)
+        def wrapper(*args, **kwargs):
+            # Sin política explícita se crea en cada llamada para leer
+            # MAX_RETRIES/BASE_DELAY vigentes (compatibilidad con la versión anterior)
+            return (politica or PoliticaReintentos()).ejecutar(funcion, *args, **kwargs)
+        return wrapper
+
+    if func is not None:
+        return decorador(func)
+    return decorador
+
+# ==========================================
+# ZONA DE PRUEBAS (TESTS INTERNOS)
+# ==========================================
+if __name__ == "__main__":
+    print("--- 🧪 INICIANDO PRUEBAS DE RESILIENCIA ---")
+    from observabilidad import configurar_logs_json
+    configurar_logs_json()  # Los reintentos se ven como líneas JSON en stderr
+
+    # Simulamos un servidor que falla 2 veces y a la 3ra funciona
+    intentos_mock = 0
+    
+    @with_retry
+    def funcion_inestable():
+        global intentos_mock
+        intentos_mock += 1
+        if intentos_mock < 3:
+            # Simulamos error 503 Service Unavailable
+            raise requests.exceptions.HTTPError("Servidor ocupado", response=requests.Response())
+        print("✅ ¡Éxito! El servidor respondió.")
+        return "Datos recibidos"
+
+    # Inyectamos el código de estado 503 al mock del response para que la lógica lo detecte
+    # (Pequeño hack para simular requests sin hacer peticiones reales)
+    def simular_fallo_503():
+        resp = requests.Response()
+        resp.status_code = 503
+        raise requests.exceptions.HTTPError("503 Server Error", response=resp)
+
+    # Redefinimos para usar el simulador más preciso
+    intentos_mock = 0
+    @with_retry
+    def obtener_datos_simulados():
+        global intentos_mock
+        intentos_mock += 1
+        if intentos_mock < 3:
+            simular_fallo_503()
+        print("✅ Conexión exitosa al tercer intento.")
+        return "OK"
+
+    try:
+        obtener_datos_simulados()
+        print("\n🏆 PRUEBA PASADA: El sistema se recuperó automáticamente.")
+    except Exception as e:
         print(f"\n❌ PRUEBA FALLIDA: {e}")
\ No newline at end of file
@@ -0,0 +1,714 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import socket
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs, unquote
+
+from compilador_validadores import compilar_validador
+from compresion import compresores_disponibles, negociar, obtener_compresor
+from merge_patch import aplicar_merge_patch
+
+# ==========================================
+# SERVIDOR LOCAL DE ECOMARKET (sustituto de Beeceptor)
+# ==========================================
+# Las rutas salen de openapi_sem2.yaml; el almacenamiento vive en memoria.
+# Corre sobre asyncio.Protocol con keep-alive y pipelining, sin un hilo por
+# conexión, para sostener decenas de miles de peticiones por segundo.
+# Además permite inyectar latencia, errores 503/429 con Retry-After y cuerpos
+# lentos, para medir throughput, reintentos y timeouts sin salir a internet.
+# Acepta cuerpos comprimidos (Content-Encoding) y, con compresion=..., también
+# comprime las respuestas según el Accept-Encoding del cliente.
+#
+#   python servidor_local.py --puerto 8080 --latencia lognormal:20:0.5 --tasa-503 0.05
+#   python servidor_local.py --compresion gzip,br
+
+RUTA_CONTRATO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openapi_sem2.yaml")
+
+# Rutas que usa cliente_ecomarket (en español) y que no están en el contrato.
+# Comparten manejadores con /products pero tienen su propia colección.
+ALIAS = {
+    "/productos": {"get", "post"},
+    "/productos/{id}": {"get", "put", "patch", "delete"},
+}
+
+MOTIVOS = {
+    200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 412: "Precondition Failed", 415: "Unsupported Media Type", 429: "Too Many Requests",
+    503: "Service Unavailable",
+}
+
+_codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# ==========================================
+# INYECCIÓN DE FALLAS
+# ==========================================
+class Latencia:
+    """
+    Distribución de latencia en milisegundos, a partir de un texto:
+    'fija:5', 'uniforme:1:10', 'normal:20:5', 'lognormal:20:0.5'
+    (mediana y sigma), 'exponencial:10' (media) o 'cola:5:0.03:150' (5 ms,
+    salvo un 3% de las respuestas que tardan 150 ms: una réplica lenta de vez
+    en cuando). '0' o '' = sin latencia.
+    """
+
+    DISTRIBUCIONES = {
+        "fija": (1, lambda azar, ms: ms),
+        "uniforme": (2, lambda azar, a, b: azar.uniform(a, b)),
+        "normal": (2, lambda azar, media, desv: azar.gauss(media, desv)),
+        "lognormal": (2, lambda azar, mediana, sigma: azar.lognormvariate(math.log(mediana), sigma)),
+        "exponencial": (1, lambda azar, media: azar.expovariate(1 / media)),
+        "cola": (3, lambda azar, normal, probabilidad, lenta: lenta if azar.random() < probabilidad else normal),
+    }
+
+    def __init__(self, especificacion: str = "0"):
+        self.especificacion = especificacion or "0"
+        nombre, *parametros = self.especificacion.split(":")
+        if nombre in ("0", "ninguna"):
+            self.nombre = None
+            return
+        if nombre not in self.DISTRIBUCIONES:
+            raise ValueError(f"Distribución '{nombre}' no válida. Opciones: {list(self.DISTRIBUCIONES)}")
+        if len(parametros) != self.DISTRIBUCIONES[nombre][0]:
+            raise ValueError(f"'{nombre}' espera {self.DISTRIBUCIONES[nombre][0]} parámetro(s): {self.especificacion}")
+        # Se guardan nombre y valores (no la función) para poder pasarla a otros procesos
+        self.nombre = nombre
+        self.valores = [float(p) for p in parametros]
+
+    def __bool__(self):
+        return self.nombre is not None
+
+    def muestra(self, azar: random.Random) -> float:
+        """Segundos a esperar (nunca negativos)."""
+        if self.nombre is None:
+            return 0.0
+        return max(0.0, self.DISTRIBUCIONES[self.nombre][1](azar, *self.valores)) / 1000
+
+@dataclass
+class Inyeccion:
+    """
+    Fallas a inyectar en cada petición (globales o por ruta).
+
+    Args:
+        latencia (str): Distribución de Latencia antes de responder.
+        tasa_503 / tasa_429 (float): Probabilidad (0-1) de responder ese error.
+        retry_after (int): Valor de Retry-After (segundos) en los 503/429.
+        cuerpo_lento (tuple): (bytes_por_bloque, pausa_ms) para enviar el
+            cuerpo a cuentagotas después de las cabeceras.
+        capacidad (int, opcional): Peticiones que el servidor procesa a la vez
+            (las que esperan su latencia); por encima responde 503. Simula un
+            backend saturado para probar el control de carga del cliente.
+    """
+    latencia: str = "0"
+    tasa_503: float = 0.0
+    tasa_429: float = 0.0
+    retry_after: int = 1
+    cuerpo_lento: tuple = None
+    capacidad: int = None
+    _latencia: Latencia = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._latencia = Latencia(self.latencia)
+
+# ==========================================
+# ALMACENAMIENTO EN MEMORIA
+# ==========================================
+class Coleccion:
+    """
+    Recursos por id con autoincremento. Solo se toca desde el event loop.
+    Cada escritura sube 'version' y anota en qué versión cambió (o se borró)
+    cada id: con eso se responde ?updated_since=<version> y el ETag del listado.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.siguiente_id = 1
+        self.version = 0
+        self.versiones = {}  # id -> versión de su último cambio
+        self.borrados = {}   # id -> versión en que se borró
+
+    def agregar(self, datos: dict) -> dict:
+        datos = dict(datos, id=self.siguiente_id)
+        self.siguiente_id += 1
+        return self.guardar(datos)
+
+    def guardar(self, datos: dict) -> dict:
+        self.version += 1
+        self.items[datos["id"]] = datos
+        self.versiones[datos["id"]] = self.version
+        self.borrados.pop(datos["id"], None)
+        return datos
+
+    def borrar(self, producto_id: int):
+        self.version += 1
+        del self.items[producto_id]
+        del self.versiones[producto_id]
+        self.borrados[producto_id] = self.version
+
+    def cambios_desde(self, version: int):
+        """(items modificados, ids borrados) después de 'version'."""
+        modificados = [self.items[i] for i, v in self.versiones.items() if v > version]
+        return modificados, sorted(i for i, v in self.borrados.items() if v > version)
+
+def producto_semilla(i: int, productores: int) -> dict:
+    return {"name": f"Producto {i}", "price": round(1 + (i % 997) * 0.25, 2), "producerId": 1 + i % productores}
+
+def producto_semilla_es(i: int) -> dict:
+    categorias = ['frutas', 'verduras', 'lacteos', 'miel', 'conservas']
+    return {"nombre": f"Producto {i}", "precio": round(1 + (i % 997) * 0.25, 2),
+            "categoria": categorias[i % len(categorias)], "disponible": i % 7 != 0}
+
+# ==========================================
+# RUTAS A PARTIR DEL CONTRATO
+# ==========================================
+@dataclass
+class Ruta:
+    metodo: str
+    plantilla: str
+    patron: re.Pattern
+    manejador: str
+
+def _patron(plantilla: str) -> re.Pattern:
+    return re.compile("^" + re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(plantilla)) + "$")
+
+def cargar_contrato(ruta: str = RUTA_CONTRATO) -> dict:
+    import yaml  # Solo al arrancar el servidor
+
+    with open(ruta, encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def _nombre_manejador(metodo: str, plantilla: str) -> str:
+    """'get', '/producers/{id}/products' -> '_get_producers_id_products'"""
+    partes = [p.strip("{}") for p in plantilla.strip("/").split("/")]
+    if partes[0] == "productos":
+        partes[0] = "products"
+    return "_" + "_".join([metodo] + partes)
+
+# ==========================================
+# SERVIDOR
+# ==========================================
+class ServidorEcoMarket:
+    """
+    Servidor HTTP/1.1 en memoria que implementa openapi_sem2.yaml.
+
+    Uso:
+        with ServidorEcoMarket(inyeccion=Inyeccion(tasa_503=0.1)) as servidor:
+            cliente = EcoMarketClient(servidor.base_url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 0, contrato: str = RUTA_CONTRATO,
+                 inyeccion: Inyeccion = None, por_ruta: dict = None, productos: int = 100,
+                 productores: int = 10, semilla: int = None, reuse_port: bool = False,
+                 compresion=None, umbral_compresion: int = 1024):
+        """
+        Args:
+            por_ruta (dict): Inyección específica, ej. {"GET /products/{id}": Inyeccion(...)}.
+            productos / productores (int): Datos iniciales en cada colección.
+            reuse_port (bool): SO_REUSEPORT para repartir un puerto entre procesos.
+            compresion (tuple|bool, opcional): Codificaciones con las que comprimir
+                las respuestas, en orden de preferencia (True = todas las instaladas).
+                Por defecto las respuestas salen sin comprimir.
+            umbral_compresion (int): Cuerpos más chicos salen sin comprimir.
+        """
+        self.host = host
+        self.puerto = puerto
+        self.inyeccion = inyeccion or Inyeccion()
+        self.por_ruta = por_ruta or {}
+        self.azar = random.Random(semilla)
+        self.reuse_port = reuse_port
+        self.peticiones = 0
+        self.por_status = {}
+        self.en_curso = 0  # Respuestas esperando su latencia
+        self.bytes_recibidos = 0  # Cuerpos tal como viajan (comprimidos o no)
+        self.bytes_enviados = 0
+        self._conexiones = set()
+        self.compresion = tuple(compresores_disponibles() if compresion is True else compresion or ())
+        self.umbral_compresion = umbral_compresion
+        self._compresores = {nombre: obtener_compresor(nombre) for nombre in self.compresion}
+
+        especificacion = cargar_contrato(contrato)
+        self.rutas = self._construir_rutas(especificacion)
+        esquemas = especificacion.get("components", {}).get("schemas", {})
+        self._validar_entrada = compilar_validador(esquemas["ProductInput"], "validar_product_input",
+                                                   entidad="producto") if "ProductInput" in esquemas else None
+        self._error_conflicto = esquemas.get("ErrorResponse", {}).get("properties", {})
+
+        self.colecciones = {"/products": Coleccion(), "/productos": Coleccion()}
+        self.productores = set(range(1, productores + 1))
+        for i in range(productos):
+            self.colecciones["/products"].agregar(producto_semilla(i, max(productores, 1)))
+            self.colecciones["/productos"].agregar(producto_semilla_es(i))
+
+        self._loop = None
+        self._servidor = None
+        self._hilo = None
+
+    def _construir_rutas(self, especificacion: dict) -> list:
+        plantillas = {p: {m for m in ops if m in ("get", "post", "put", "patch", "delete")}
+                      for p, ops in especificacion.get("paths", {}).items()}
+        plantillas.update(ALIAS)
+        rutas = []
+        for plantilla, metodos in plantillas.items():
+            for metodo in sorted(metodos):
+                nombre = _nombre_manejador(metodo, plantilla)
+                if not hasattr(self, nombre):
+                    raise NotImplementedError(f"El contrato define {metodo.upper()} {plantilla} y no hay {nombre}")
+                rutas.append(Ruta(metodo.upper(), plantilla, _patron(plantilla), nombre))
+        return rutas
+
+    # --- Ciclo de vida ---
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.puerto}"
+
+    async def arrancar(self):
+        """Empieza a escuchar en el loop actual (para usarlo desde código async)."""
+        self._loop = asyncio.get_running_loop()
+        self._servidor = await self._loop.create_server(
+            lambda: _ConexionHTTP(self), self.host, self.puerto, reuse_port=self.reuse_port or None)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+
+    def iniciar(self) -> str:
+        """Arranca en un hilo con su propio event loop y devuelve la base_url."""
+        listo = threading.Event()
+
+        def correr():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.arrancar())
+            listo.set()
+            loop.run_forever()
+            # Respuestas que seguían esperando latencia inyectada
+            pendientes = asyncio.all_tasks(loop)
+            for tarea in pendientes:
+                tarea.cancel()
+            loop.run_until_complete(asyncio.gather(*pendientes, return_exceptions=True))
+            # Y las conexiones abiertas: un cliente que espera una respuesta
+            # (ej. la perdedora de un hedge) recibe el cierre en vez de colgarse
+            for conexion in list(self._conexiones):
+                conexion.transporte.close()
+            self._servidor.close()
+            loop.run_until_complete(self._servidor.wait_closed())
+            loop.close()
+
+        self._hilo = threading.Thread(target=correr, daemon=True)
+        self._hilo.start()
+        listo.wait()
+        return self.base_url
+
+    def detener(self):
+        if self._loop is not None and self._hilo is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._hilo.join()
+            self._hilo = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.detener()
+
+    def estadisticas(self) -> dict:
+        return {"peticiones": self.peticiones, "por_status": dict(self.por_status),
+                "bytes_recibidos": self.bytes_recibidos, "bytes_enviados": self.bytes_enviados}
+
+    def codificacion_para(self, cabeceras: dict):
+        """Content-Encoding de la respuesta según el Accept-Encoding (None = sin comprimir)."""
+        if not self.compresion:
+            return None
+        return negociar(cabeceras.get("accept-encoding"), self.compresion)
+
+    def cuerpo_respuesta(self, respuesta, extra: tuple, codificacion):
+        """(cuerpo en bytes, cabeceras extra) listos para enviar, comprimidos si corresponde."""
+        cuerpo = _codificar(respuesta).encode() if respuesta is not None else b""
+        if self.compresion:
+            extra = extra + (("Vary", "Accept-Encoding"),)
+            if codificacion is not None and len(cuerpo) >= self.umbral_compresion:
+                cuerpo = self._compresores[codificacion].comprimir(cuerpo)
+                extra = extra + (("Content-Encoding", codificacion),)
+        self.bytes_enviados += len(cuerpo)
+        return cuerpo, extra
+
+    # --- Despacho ---
+
+    def resolver(self, metodo: str, camino: str):
+        """Devuelve (ruta, parametros) o (None, status) si no hay coincidencia."""
+        existe = False
+        for ruta in self.rutas:
+            encontrado = ruta.patron.match(camino)
+            if encontrado:
+                if ruta.metodo == metodo:
+                    return ruta, encontrado.groupdict()
+                existe = True
+        return None, 405 if existe else 404
+
+    def inyeccion_para(self, ruta: Ruta) -> Inyeccion:
+        return self.por_ruta.get(f"{ruta.metodo} {ruta.plantilla}", self.inyeccion)
+
+    def atender(self, metodo: str, objetivo: str, cuerpo: bytes, cabeceras: dict = None):
+        """
+        Ejecuta la petición y devuelve (status, cabeceras_extra, cuerpo_json, inyeccion).
+        La latencia y el cuerpo lento los aplica la conexión.
+        Si el manejador entrega un ETag igual al If-None-Match recibido, responde 304.
+        Una escritura sobre un producto con If-Match distinto de su ETag actual
+        responde 412 sin tocar nada (evita pisar cambios ajenos).
+        """
+        camino, _, consulta = objetivo.partition("?")
+        ruta, resultado = self.resolver(metodo, unquote(camino))
+        if ruta is None:
+            return resultado, (), {"error": MOTIVOS[resultado]}, None
+        inyeccion = self.inyeccion_para(ruta)
+
+        if inyeccion.capacidad is not None and self.en_curso >= inyeccion.capacidad:
+            return 503, (("Retry-After", "0"),), {"error": MOTIVOS[503]}, None
+
+        sorteo = self.azar.random() if inyeccion.tasa_503 or inyeccion.tasa_429 else 1.0
+        if sorteo < inyeccion.tasa_503 + inyeccion.tasa_429:
+            status = 503 if sorteo < inyeccion.tasa_503 else 429
+            return status, (("Retry-After", str(inyeccion.retry_after)),), {"error": MOTIVOS[status]}, inyeccion
+
+        codificacion = (cabeceras or {}).get("content-encoding", "identity").lower()
+        if cuerpo and codificacion != "identity":
+            try:
+                compresor = obtener_compresor(codificacion)
+            except (ValueError, ImportError):
+                return 415, (), {"error": f"Content-Encoding '{codificacion}' no soportada"}, inyeccion
+            try:
+                cuerpo = compresor.descomprimir(cuerpo)
+            except Exception:  # zlib.error, brotli.error, ZstdError: cada biblioteca tiene la suya
+                return 400, (), {"error": "Cuerpo comprimido inválido"}, inyeccion
+        try:
+            datos = json.loads(cuerpo) if cuerpo else None
+        except ValueError:
+            return 400, (), {"error": "JSON inválido"}, inyeccion
+        coleccion = "/productos" if camino.startswith("/productos") else "/products"
+        si_coincide = (cabeceras or {}).get("if-match")
+        if si_coincide is not None and ruta.plantilla in ("/products/{id}", "/productos/{id}"):
+            actual = self._etag_producto(coleccion, self._buscar(coleccion, resultado))
+            if actual is not None and si_coincide not in ("*", actual):
+                return 412, (("ETag", actual),), {"error": "El producto cambió (If-Match no coincide)"}, inyeccion
+        try:
+            status, respuesta, *extra = getattr(self, ruta.manejador)(coleccion, resultado, parse_qs(consulta), datos)
+        except (ValueError, TypeError) as e:
+            status, respuesta, extra = 400, {"error": str(e)}, ()
+        extra = tuple(extra[0]) if extra else ()
+        etag = dict(extra).get("ETag")
+        if etag is not None and cabeceras and cabeceras.get("if-none-match") == etag:
+            return 304, extra, None, inyeccion
+        return status, extra, respuesta, inyeccion
+
+    # --- Manejadores (uno por operación del contrato) ---
+
+    def _buscar(self, coleccion, parametros):
+        try:
+            return self.colecciones[coleccion].items.get(int(parametros["id"]))
+        except ValueError:
+            return None
+
+    def _get_products(self, coleccion, parametros, consulta, datos):
+        almacen = self.colecciones[coleccion]
+        # El cursor de sincronización es la versión de la colección: con
+        # ?updated_since=N solo viajan los cambios y los ids borrados
+        extra = [("X-Sync-Cursor", str(almacen.version))]
+        if "updated_since" in consulta:
+            items, borrados = almacen.cambios_desde(int(consulta["updated_since"][0]))
+            extra.append(("X-Deleted-Ids", ",".join(map(str, borrados))))
+            return 200, items, extra
+        extra.append(("ETag", f'"{almacen.version}-{zlib.crc32(repr(sorted(consulta.items())).encode())}"'))
+        if "ids" in consulta:
+            # Búsqueda en lote (?ids=1,5,9): en el orden pedido, sin repetidos ni inexistentes
+            ids = dict.fromkeys(int(i) for i in consulta["ids"][0].split(",") if i.strip())
+            items = [almacen.items[i] for i in ids if i in almacen.items]
+        else:
+            items = list(almacen.items.values())
+        if "name" in consulta:
+            texto = consulta["name"][0].lower()
+            items = [p for p in items if texto in str(p.get("name", p.get("nombre", ""))).lower()]
+        offset = int(consulta.get("offset", ["0"])[0])
+        if "limit" in consulta:
+            items = items[offset:offset + int(consulta["limit"][0])]
+        elif offset:
+            items = items[offset:]
+        return 200, items, extra
+
+    def _post_products(self, coleccion, parametros, consulta, datos):
+        if not isinstance(datos, dict):
+            raise TypeError("El cuerpo debe ser un objeto JSON")
+        if coleccion == "/products":
+            if self._validar_entrada is not None:
+                self._validar_entrada(datos)
+            self.productores.add(datos["producerId"])
+        return 201, self.colecciones[coleccion].agregar(datos)
+
+    def _etag_producto(self, coleccion, producto):
+        # La versión de la colección en que cambió el producto: única y creciente
+        if producto is None:
+            return None
+        return f'"v{self.colecciones[coleccion].versiones[producto["id"]]}"'
+
+    def _get_products_id(self, coleccion, parametros, consulta, datos):
+        producto = self._buscar(coleccion, parametros)
+        if producto is None:
+            return 404, {"error": "Producto no encontrado"}
+        return 200, producto, [("ETag", self._etag_producto(coleccion, producto))]
+
+    def _modificar(self, coleccion, parametros, datos, reemplazar):
+        producto = self._buscar(coleccion, parametros)
+        if producto is None:
+            return 404, {"error": "Producto no encontrado"}
+        if not isinstance(datos, dict):
+            raise TypeError("El cuerpo debe ser un objeto JSON")
+        # PATCH es un JSON merge patch (RFC 7386): null borra la clave, los objetos se mezclan
+        nuevo = dict(datos) if reemplazar else aplicar_merge_patch(producto, datos)
+        guardado = self.colecciones[coleccion].guardar(dict(nuevo, id=producto["id"]))
+        return 200, guardado, [("ETag", self._etag_producto(coleccion, guardado))]
+
+    def _patch_products_id(self, coleccion, parametros, consulta, datos):
+        return self._modificar(coleccion, parametros, datos, reemplazar=False)
+
+    def _put_products_id(self, coleccion, parametros, consulta, datos):
+        return self._modificar(coleccion, parametros, datos, reemplazar=True)
+
+    def _delete_products_id(self, coleccion, parametros, consulta, datos):
+        producto = self._buscar(coleccion, parametros)
+        if producto is None:
+            return 404, {"error": "Producto no encontrado"}
+        self.colecciones[coleccion].borrar(producto["id"])
+        return 204, None
+
+    def _productos_de(self, productor_id: int) -> list:
+        return [p for p in self.colecciones["/products"].items.values() if p.get("producerId") == productor_id]
+
+    def _delete_producers_id(self, coleccion, parametros, consulta, datos):
+        productor_id = int(parametros["id"])
+        if productor_id not in self.productores:
+            return 404, {"error": "Productor no encontrado"}
+        if self._productos_de(productor_id):
+            # Mismo cuerpo que documenta el ErrorResponse del contrato
+            return 409, {campo: schema.get("example", "") for campo, schema in self._error_conflicto.items()}
+        self.productores.discard(productor_id)
+        return 204, None
+
+    def _get_producers_id_products(self, coleccion, parametros, consulta, datos):
+        productor_id = int(parametros["id"])
+        if productor_id not in self.productores:
+            return 404, {"error": "Productor no encontrado"}
+        return 200, self._productos_de(productor_id)
+
+class _ConexionHTTP(asyncio.Protocol):
+    """
+    Parser HTTP/1.1 mínimo: Content-Length (sin chunked en la entrada),
+    keep-alive y pipelining. Las respuestas salen en el mismo orden que las
+    peticiones aunque alguna espere latencia inyectada.
+    """
+
+    def __init__(self, servidor: ServidorEcoMarket):
+        self.servidor = servidor
+        self.buffer = b""
+        self.pendientes = []
+        self.ocupada = False
+        self.transporte = None
+
+    def connection_made(self, transporte):
+        self.transporte = transporte
+        self.servidor._conexiones.add(self)
+        sock = transporte.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def connection_lost(self, exc):
+        self.transporte = None
+        self.servidor._conexiones.discard(self)
+
+    def data_received(self, datos: bytes):
+        self.buffer += datos
+        while True:
+            fin_cabeceras = self.buffer.find(b"\r\n\r\n")
+            if fin_cabeceras < 0:
+                return
+            lineas = self.buffer[:fin_cabeceras].decode("latin-1").split("\r\n")
+            try:
+                metodo, objetivo, version = lineas[0].split(" ")
+            except ValueError:
+                self._enviar(400, (), {"error": "Línea de petición inválida"}, cerrar=True)
+                self.transporte.close()
+                return
+            cabeceras = {}
+            for linea in lineas[1:]:
+                nombre, _, valor = linea.partition(":")
+                cabeceras[nombre.strip().lower()] = valor.strip()
+            largo = int(cabeceras.get("content-length", 0))
+            if len(self.buffer) < fin_cabeceras + 4 + largo:
+                return
+            cuerpo = self.buffer[fin_cabeceras + 4:fin_cabeceras + 4 + largo]
+            self.servidor.bytes_recibidos += largo
+            self.buffer = self.buffer[fin_cabeceras + 4 + largo:]
+            conexion = cabeceras.get("connection", "").lower()
+            cerrar = conexion == "close" or (version == "HTTP/1.0" and conexion != "keep-alive")
+            self.pendientes.append((metodo, objetivo, cuerpo, cabeceras, cerrar))
+            self._procesar()
+
+    def _procesar(self):
+        while self.pendientes and not self.ocupada and self.transporte is not None:
+            metodo, objetivo, cuerpo, cabeceras, cerrar = self.pendientes.pop(0)
+            status, extra, respuesta, inyeccion = self.servidor.atender(metodo, objetivo, cuerpo, cabeceras)
+            codificacion = self.servidor.codificacion_para(cabeceras)
+            espera = inyeccion._latencia.muestra(self.servidor.azar) if inyeccion else 0.0
+            lento = inyeccion.cuerpo_lento if inyeccion else None
+            if espera or lento:
+                self.ocupada = True
+                self.servidor.en_curso += 1
+                asyncio.ensure_future(self._responder_despues(espera, lento, status, extra, respuesta, cerrar,
+                                                              codificacion))
+            else:
+                self._enviar(status, extra, respuesta, cerrar, codificacion)
+
+    async def _responder_despues(self, espera, lento, status, extra, respuesta, cerrar, codificacion):
+        try:
+            if espera:
+                await asyncio.sleep(espera)
+            if self.transporte is not None:
+                if lento:
+                    await self._enviar_lento(status, extra, respuesta, cerrar, lento, codificacion)
+                else:
+                    self._enviar(status, extra, respuesta, cerrar, codificacion)
+        finally:
+            self.servidor.en_curso -= 1
+        self.ocupada = False
+        self._procesar()
+
+    def _cabeceras(self, status, extra, cuerpo: bytes, cerrar) -> bytes:
+        lineas = [f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}", f"Content-Length: {len(cuerpo)}"]
+        if cuerpo:
+            lineas.append("Content-Type: application/json")
+        lineas.extend(f"{nombre}: {valor}" for nombre, valor in extra)
+        if cerrar:
+            lineas.append("Connection: close")
+        return ("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1")
+
+    def _registrar(self, status):
+        self.servidor.peticiones += 1
+        self.servidor.por_status[status] = self.servidor.por_status.get(status, 0) + 1
+
+    def _enviar(self, status, extra, respuesta, cerrar, codificacion=None):
+        cuerpo, extra = self.servidor.cuerpo_respuesta(respuesta, extra, codificacion)
+        self._registrar(status)
+        self.transporte.write(self._cabeceras(status, extra, cuerpo, cerrar) + cuerpo)
+        if cerrar:
+            self.transporte.close()
+
+    async def _enviar_lento(self, status, extra, respuesta, cerrar, lento, codificacion=None):
+        cuerpo, extra = self.servidor.cuerpo_respuesta(respuesta, extra, codificacion)
+        bloque, pausa_ms = lento
+        self._registrar(status)
+        self.transporte.write(self._cabeceras(status, extra, cuerpo, cerrar))
+        for inicio in range(0, len(cuerpo), bloque):
+            await asyncio.sleep(pausa_ms / 1000)
+            if self.transporte is None:
+                return
+            self.transporte.write(cuerpo[inicio:inicio + bloque])
+        if cerrar and self.transporte is not None:
+            self.transporte.close()
+
+# ==========================================
+# ⏱️ GENERADOR DE CARGA (para medir el servidor)
+# ==========================================
+async def _trabajador(host, puerto, peticion: bytes, hasta: float, latencias: list, profundidad: int):
+    reader, writer = await asyncio.open_connection(host, puerto)
+    writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        while time.perf_counter() < hasta:
+            inicio = time.perf_counter()
+            writer.write(peticion * profundidad)  # Pipelining: varias peticiones por escritura
+            for _ in range(profundidad):
+                cabeceras = await reader.readuntil(b"\r\n\r\n")
+                largo = int(re.search(rb"Content-Length: (\d+)", cabeceras).group(1))
+                await reader.readexactly(largo)
+            latencias.append((time.perf_counter() - inicio) / profundidad)
+    finally:
+        writer.close()
+
+async def generar_carga(base_url: str, camino: str = "/products/1", conexiones: int = 50,
+                        duracion: float = 5.0, profundidad: int = 1) -> dict:
+    """Bombardea un GET con conexiones keep-alive y devuelve req/s y percentiles (ms)."""
+    host, puerto = base_url.split("//")[1].split(":")
+    peticion = f"GET {camino} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    latencias = []
+    hasta = time.perf_counter() + duracion
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_trabajador(host, int(puerto), peticion, hasta, latencias, profundidad)
+                           for _ in range(conexiones)))
+    transcurrido = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        "peticiones_por_segundo": len(latencias) * profundidad / transcurrido,
+        "p50_ms": latencias[len(latencias) // 2] * 1000,
+        "p99_ms": latencias[int(len(latencias) * 0.99)] * 1000,
+    }
+
+def _servir_proceso(argumentos):
+    host, puerto, inyeccion, compresion = argumentos
+    servidor = ServidorEcoMarket(host, puerto, inyeccion=inyeccion, reuse_port=True, compresion=compresion)
+    asyncio.run(_servir_para_siempre(servidor))
+
+async def _servir_para_siempre(servidor):
+    await servidor.arrancar()
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de EcoMarket a partir de openapi_sem2.yaml")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos con SO_REUSEPORT (uno por núcleo)")
+    parser.add_argument("--latencia", default="0", help="fija:5 | uniforme:1:10 | normal:20:5 | lognormal:20:0.5 | exponencial:10 | cola:5:0.03:150")
+    parser.add_argument("--tasa-503", type=float, default=0.0)
+    parser.add_argument("--tasa-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--cuerpo-lento", help="bytes_por_bloque:pausa_ms, ej. 512:100")
+    parser.add_argument("--compresion", help="Codificaciones para las respuestas, ej. gzip o zstd,br,gzip")
+    parser.add_argument("--carga", action="store_true", help="Levanta el servidor y lo mide con el generador de carga")
+    args = parser.parse_args()
+
+    lento = tuple(int(x) for x in args.cuerpo_lento.split(":")) if args.cuerpo_lento else None
+    inyeccion = Inyeccion(args.latencia, args.tasa_503, args.tasa_429, args.retry_after, lento)
+    compresion = tuple(args.compresion.split(",")) if args.compresion else None
+
+    if args.carga:
+        import multiprocessing
+
+        proceso = multiprocessing.Process(target=_servir_proceso, args=((args.host, args.puerto, inyeccion, compresion),),
+                                          daemon=True)
+        proceso.start()
+        time.sleep(1)
+        print(f"--- 🏁 CARGA CONTRA {args.host}:{args.puerto} (GET /products/1, 5 s) ---")
+        for profundidad in (1, 8):
+            resultado = asyncio.run(generar_carga(f"http://{args.host}:{args.puerto}", profundidad=profundidad))
+            print(f"pipelining x{profundidad}: {resultado['peticiones_por_segundo']:>10,.0f} req/s  "
+                  f"p50 {resultado['p50_ms']:.2f} ms  p99 {resultado['p99_ms']:.2f} ms")
+        proceso.terminate()
+    elif args.procesos > 1:
+        import multiprocessing
+
+        print(f"🚀 EcoMarket local en http://{args.host}:{args.puerto} ({args.procesos} procesos)")
+        procesos = [multiprocessing.Process(target=_servir_proceso, args=((args.host, args.puerto, inyeccion, compresion),))
+                    for _ in range(args.procesos)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+    else:
+        servidor = ServidorEcoMarket(args.host, args.puerto, inyeccion=inyeccion, compresion=compresion)
+        print(f"🚀 EcoMarket local en {servidor.base_url} (Ctrl+C para salir)")
+        try:
+            asyncio.run(_servir_para_siempre(servidor))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,114 @@
+import random
+import socket
+
+import pytest
+
+from balanceo import Balanceador
+from cliente_ecomarket import EcoMarketClient, EcoMarketError
+from servidor_local import Inyeccion, ServidorEcoMarket
+
+def url_caida() -> str:
+    """URL de un puerto local donde no escucha nadie (conexión rechazada)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+URLS = ["http://a", "http://b", "http://c"]
+
+# ==========================================
+# 1. ESTRATEGIAS
+# ==========================================
+def test_round_robin_reparte_parejo():
+    balanceador = Balanceador(URLS, estrategia="round_robin")
+    elegidas = []
+    for _ in range(6):
+        replica = balanceador.elegir()
+        elegidas.append(replica.url)
+        balanceador.liberar(replica, 0.01)
+    assert elegidas == URLS * 2
+
+def test_menos_pendientes_evita_la_ocupada():
+    balanceador = Balanceador(URLS[:2], estrategia="menos_pendientes", azar=random.Random(0))
+    ocupada = balanceador.elegir()
+    otra = balanceador.elegir()
+    assert otra is not ocupada
+    balanceador.liberar(otra, 0.01)
+    assert balanceador.elegir() is otra
+
+def test_peak_ewma_prefiere_la_rapida_y_toma_picos_enteros(reloj):
+    balanceador = Balanceador(URLS[:2], estrategia="peak_ewma", reloj=reloj, azar=random.Random(0))
+    rapida, lenta = balanceador.replicas
+    balanceador.liberar(balanceador.elegir(excluir=[lenta]), 0.002)
+    balanceador.liberar(balanceador.elegir(excluir=[rapida]), 0.050)
+    assert all(balanceador.elegir() is rapida for _ in range(10))
+    rapida.en_vuelo = 30  # 2 ms x 31 pendientes ya es peor que 50 ms x 1
+    assert balanceador.elegir() is lenta
+
+    reloj.ahora = 1.0
+    rapida.en_vuelo = lenta.en_vuelo = 1
+    balanceador.liberar(rapida, 0.500)
+    assert rapida.ewma == 0.5  # El pico no se promedia
+    reloj.ahora = 100.0
+    rapida.en_vuelo = 1
+    balanceador.liberar(rapida, 0.002)
+    assert rapida.ewma == pytest.approx(0.002, abs=1e-4)  # Y se olvida con el tiempo
+
+def test_estrategia_invalida():
+    with pytest.raises(ValueError):
+        Balanceador(URLS, estrategia="aleatoria")
+
+# ==========================================
+# 2. CHEQUEO PASIVO DE SALUD
+# ==========================================
+def test_expulsa_tras_fallos_y_readmite_tras_enfriamiento(reloj):
+    balanceador = Balanceador(URLS[:2], estrategia="round_robin", umbral_fallos=2, enfriamiento=5, reloj=reloj)
+    mala = balanceador.replicas[0]
+    for _ in range(2):
+        mala.en_vuelo += 1
+        balanceador.liberar(mala, 0.01, fallo=True)
+    assert balanceador.estadisticas()["http://a"]["expulsada"]
+    assert {balanceador.elegir().url for _ in range(4)} == {"http://b"}
+
+    reloj.ahora = 6
+    assert balanceador.elegir(excluir=[balanceador.replicas[1]]) is mala
+    balanceador.liberar(mala, 0.01, fallo=True)  # A prueba: un solo fallo la vuelve a sacar
+    assert balanceador.estadisticas()["http://a"]["expulsiones"] == 2
+
+def test_todas_expulsadas_se_usan_igual():
+    balanceador = Balanceador(URLS[:1], umbral_fallos=1)
+    replica = balanceador.elegir()
+    balanceador.liberar(replica, 0.01, fallo=True)
+    assert balanceador.elegir() is replica
+
+# ==========================================
+# 3. CON EL CLIENTE
+# ==========================================
+def test_un_solo_endpoint_logico_aunque_una_replica_este_caida():
+    with ServidorEcoMarket(productos=5) as servidor:
+        balanceador = Balanceador([url_caida(), servidor.base_url], estrategia="round_robin")
+        with EcoMarketClient(balanceador) as cliente:
+            for i in range(1, 6):
+                assert cliente.obtener_producto(i)["id"] == i  # El error de conexión pasa a la otra
+        estadisticas = balanceador.estadisticas()
+    caida = estadisticas[balanceador.replicas[0].url]
+    assert caida["expulsada"] and caida["peticiones"] == 3
+    assert estadisticas[servidor.base_url]["peticiones"] == 5
+
+def test_5xx_expulsa_la_replica():
+    with ServidorEcoMarket(productos=5, inyeccion=Inyeccion(tasa_503=1.0)) as rota, \
+            ServidorEcoMarket(productos=5) as sana:
+        with EcoMarketClient([rota.base_url, sana.base_url]) as cliente:
+            assert cliente.balanceador.replicas[0].url == cliente.base_url == rota.base_url
+            errores = 0
+            for _ in range(30):
+                try:
+                    cliente.obtener_producto(1)
+                except EcoMarketError:
+                    errores += 1
+            assert cliente.balanceador.estadisticas()[rota.base_url]["expulsada"]
+        assert errores == 3 == rota.estadisticas()["peticiones"]
+
+def test_sin_replicas_disponibles_la_excepcion_es_la_de_siempre():
+    with EcoMarketClient([url_caida(), url_caida()], timeout=1) as cliente:
+        with pytest.raises(EcoMarketError):
+            cliente.listar_productos()
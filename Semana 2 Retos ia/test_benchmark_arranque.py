@@ -0,0 +1,28 @@
+import pytest
+
+from benchmark_arranque import UMBRALES_MS, medir_arranque, parsear_importtime, problemas
+
+SALIDA = """\
+import time: self [us] | cumulative | imported package
+import time:       300 |        300 |   _io
+import time:      1900 |      44000 | site
+import time:       200 |        200 |     concurrent
+import time:       700 |       7000 |   concurrent.futures
+import time:     12000 |      51000 | cliente_ecomarket
+"""
+
+def test_parsear_importtime():
+    filas = parsear_importtime(SALIDA)
+    assert filas[0] == ("_io", 300, 300, 1)
+    assert filas[-1] == ("cliente_ecomarket", 12000, 51000, 0)
+    assert ("concurrent", 200, 200, 2) in filas
+
+def test_problemas_por_pesados_y_umbral():
+    resultado = {"modulo": "cliente_ecomarket", "mediana_ms": 500.0, "pesados": ["requests"]}
+    assert problemas(resultado) == ["importa requests al arrancar", "500.0 ms > umbral 60 ms"]
+    assert problemas(dict(resultado, pesados=[]), factor=10) == []
+
+@pytest.mark.parametrize("modulo", sorted(UMBRALES_MS))
+def test_ningun_modulo_carga_dependencias_pesadas_al_importarse(modulo):
+    # El tiempo depende de la máquina; qué se importa, no
+    assert medir_arranque(modulo, repeticiones=1)["pesados"] == []
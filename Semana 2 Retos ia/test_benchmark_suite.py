@@ -0,0 +1,35 @@
+import pytest
+
+from benchmark_suite import comparar, medir_micro, percentil, regresiones, resumir
+
+def test_percentil_interpola():
+    datos = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert percentil(datos, 0) == 1
+    assert percentil(datos, 50) == 5.5
+    assert percentil(datos, 100) == 10
+    assert percentil([7], 99) == 7
+    with pytest.raises(ValueError):
+        percentil([], 50)
+
+def test_resumir_en_microsegundos():
+    resultado = resumir("caso", "grupo", [0.000002, 0.000001, 0.000003], operaciones=3, duracion=0.000006)
+    assert resultado["mediana_us"] == pytest.approx(2)
+    assert resultado["min_us"] == pytest.approx(1)
+    assert resultado["ops_por_segundo"] == pytest.approx(500_000)
+
+def test_medir_micro_cuenta_operaciones():
+    llamadas = []
+    resultado = medir_micro("append", "micro", lambda: llamadas.append(1), lote=10, muestras=4, calentamiento=1)
+    assert len(llamadas) == 50
+    assert resultado["muestras"] == 4 and resultado["operaciones"] == 40
+
+def test_comparar_detecta_regresiones():
+    def corrida(**medianas):
+        return {"resultados": {n: {"mediana_us": m} for n, m in medianas.items()}}
+
+    base = corrida(a=10.0, b=10.0, c=10.0)
+    actual = corrida(a=12.0, b=9.0, c=10.5, nuevo=1.0)
+    filas = comparar(base, actual)
+    assert [fila[0] for fila in filas] == ["a", "c", "b"]  # Sin 'nuevo': no hay base
+    assert filas[0][3] == pytest.approx(0.2)
+    assert [fila[0] for fila in regresiones(base, actual, tolerancia=0.10)] == ["a"]
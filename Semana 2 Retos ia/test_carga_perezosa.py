@@ -0,0 +1,29 @@
+import sys
+
+import pytest
+
+from carga_perezosa import esta_cargado, importar_perezoso
+
+@pytest.fixture
+def modulo_de_prueba(tmp_path, monkeypatch):
+    (tmp_path / "modulo_perezoso_prueba.py").write_text("EJECUCIONES = []\nEJECUCIONES.append(1)\nVALOR = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "modulo_perezoso_prueba"
+    sys.modules.pop("modulo_perezoso_prueba", None)
+
+def test_se_ejecuta_al_usar_el_primer_atributo(modulo_de_prueba):
+    modulo = importar_perezoso(modulo_de_prueba)
+    assert modulo_de_prueba in sys.modules and not esta_cargado(modulo_de_prueba)
+    assert modulo.VALOR == 42
+    assert esta_cargado(modulo_de_prueba)
+    assert modulo.EJECUCIONES == [1]
+
+def test_import_normal_recibe_el_mismo_modulo(modulo_de_prueba):
+    perezoso = importar_perezoso(modulo_de_prueba)
+    import modulo_perezoso_prueba
+    assert modulo_perezoso_prueba is perezoso
+    assert importar_perezoso(modulo_de_prueba) is perezoso
+
+def test_modulo_inexistente_falla_al_pedirlo():
+    with pytest.raises(ImportError):
+        importar_perezoso("modulo_que_no_existe_en_ningun_lado")
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cargador_lotes import CargadoresCatalogo, CargadoresCatalogoAsync, CargadorLotes, CargadorLotesAsync
+from cliente_async import AsyncEcoMarketClient
+from cliente_contrato import ClienteContrato
+from cliente_ecomarket import ProductoNoEncontrado
+from servidor_local import ServidorEcoMarket
+
+class Backend:
+    """cargar_lote de mentira: anota cada lote y falla con las claves negativas."""
+
+    def __init__(self):
+        self.lotes = []
+        self._lock = threading.Lock()
+
+    def cargar_lote(self, claves):
+        with self._lock:
+            self.lotes.append(list(claves))
+        return [KeyError(c) if c < 0 else c * 10 for c in claves]
+
+    async def cargar_lote_async(self, claves):
+        await asyncio.sleep(0.01)
+        return self.cargar_lote(claves)
+
+# ==========================================
+# 1. VERSIÓN CON HILOS
+# ==========================================
+def test_junta_y_deduplica_las_claves_de_la_ventana():
+    backend = Backend()
+    with CargadorLotes(cargar_lote=backend.cargar_lote, ventana=0.05) as cargador:
+        claves = [i % 10 for i in range(40)]
+        with ThreadPoolExecutor(40) as pool:
+            assert list(pool.map(cargador.cargar, claves)) == [c * 10 for c in claves]
+    assert len(backend.lotes) == 1 and sorted(backend.lotes[0]) == list(range(10))
+    stats = cargador.estadisticas()
+    assert (stats["solicitadas"], stats["memorizadas"], stats["llamadas"]) == (40, 30, 1)
+
+def test_cargar_muchos_no_espera_y_respeta_max_lote():
+    backend = Backend()
+    with CargadorLotes(cargar_lote=backend.cargar_lote, ventana=10, max_lote=100) as cargador:
+        assert cargador.cargar_muchos(range(250)) == [i * 10 for i in range(250)]
+    assert [len(lote) for lote in backend.lotes] == [100, 100, 50]
+
+def test_memo_primar_limpiar_y_errores():
+    backend = Backend()
+    with CargadorLotes(cargar_lote=backend.cargar_lote, ventana=0) as cargador:
+        cargador.primar(1, "conocido")
+        assert cargador.cargar(1) == "conocido"
+        assert cargador.cargar(2) == 20 and cargador.cargar(2) == 20
+        with pytest.raises(KeyError):
+            cargador.cargar(-1)
+        with pytest.raises(KeyError):
+            cargador.cargar(-1)  # Los errores no se memorizan: se vuelve a pedir
+        cargador.limpiar(2)
+        cargador.cargar(2)
+    assert backend.lotes == [[2], [-1], [-1], [2]]
+
+def test_cargar_uno_una_llamada_por_clave_distinta():
+    vistos = []
+    with CargadorLotes(cargar_uno=lambda clave: vistos.append(clave) or clave.upper()) as cargador:
+        assert cargador.cargar_muchos(["a", "b", "a"]) == ["A", "B", "A"]
+    assert sorted(vistos) == ["a", "b"]
+    with pytest.raises(ValueError):
+        CargadorLotes()
+
+# ==========================================
+# 2. VERSIÓN ASYNCIO
+# ==========================================
+def test_async_un_lote_por_tick_y_cancelacion_aislada():
+    backend = Backend()
+
+    async def escenario():
+        cargador = CargadorLotesAsync(cargar_lote=backend.cargar_lote_async)
+        cancelada = asyncio.ensure_future(cargador.cargar(3))
+        tareas = [cargador.cargar(i % 5) for i in range(20)]
+        await asyncio.sleep(0)
+        cancelada.cancel()
+        valores = await asyncio.gather(*tareas)
+        return valores, await cargador.cargar_muchos([1, 2]), cargador.estadisticas()
+
+    valores, memorizados, stats = asyncio.run(escenario())
+    assert valores == [(i % 5) * 10 for i in range(20)] and memorizados == [10, 20]
+    assert backend.lotes == [[3, 0, 1, 2, 4]]
+    assert stats["llamadas"] == 1
+
+# ==========================================
+# 3. CARGADORES DEL CATÁLOGO CONTRA EL SERVIDOR LOCAL
+# ==========================================
+@pytest.fixture
+def servidor():
+    with ServidorEcoMarket(productos=60, productores=6) as servidor:
+        yield servidor
+
+def peticiones(servidor):
+    return servidor.estadisticas()["peticiones"]
+
+def test_productos_de_productor_priman_el_detalle(servidor):
+    with ClienteContrato(servidor.base_url) as cliente, CargadoresCatalogo(cliente) as cargadores:
+        with ThreadPoolExecutor(12) as pool:
+            listados = list(pool.map(cargadores.productos_de_productor.cargar, [1, 2, 3, 4, 5, 6] * 2))
+        assert peticiones(servidor) == 6
+        ids = [p["id"] for productos in listados for p in productos]
+        assert [p["id"] for p in cargadores.productos.cargar_muchos(ids)] == ids
+        assert peticiones(servidor) == 6  # Todos los detalles salieron del memo
+
+def test_ids_en_lote(servidor):
+    with ClienteContrato(servidor.base_url) as cliente, CargadoresCatalogo(cliente, ids_en_lote=True) as cargadores:
+        assert [p["id"] for p in cargadores.productos.cargar_muchos([5, 9, 5, 1])] == [5, 9, 5, 1]
+        assert peticiones(servidor) == 1
+        with pytest.raises(ProductoNoEncontrado):
+            cargadores.productos.cargar(999)
+
+def test_cargadores_async(servidor):
+    async def escenario():
+        async with AsyncEcoMarketClient(cliente=ClienteContrato(servidor.base_url)) as cliente:
+            cargadores = CargadoresCatalogoAsync(cliente, ids_en_lote=True)
+            listados = await asyncio.gather(*(cargadores.productos_de_productor.cargar(i) for i in (1, 2, 1)))
+            detalle = await cargadores.productos.cargar_muchos([p["id"] for p in listados[0]] + [3])
+            return listados, detalle
+
+    listados, detalle = asyncio.run(escenario())
+    assert listados[0] is listados[2]
+    assert detalle[-1]["id"] == 3
+    assert peticiones(servidor) == 3  # 2 productores + 1 lote ?ids= con el único id que faltaba
@@ -0,0 +1,238 @@
+import threading
+
+import pytest
+import responses
+
+import retry
+from circuit_breaker import (
+    ABIERTO,
+    CERRADO,
+    SEMI_ABIERTO,
+    Bulkhead,
+    CircuitBreaker,
+    RegistroCircuitos,
+)
+from cliente_ecomarket import (
+    EcoMarketClient,
+    EcoMarketError,
+    ProductoNoEncontrado,
+    CircuitoAbiertoError,
+    BulkheadLlenoError,
+)
+from retry import PoliticaReintentos, PresupuestoReintentos, with_retry
+
+URL = "http://ecomarket.test/api"
+
+@pytest.fixture
+def cliente(reloj):
+    circuitos = RegistroCircuitos(breaker={"ventana": 4, "minimo_llamadas": 4, "espera_abierto": 10,
+                                           "llamadas_prueba": 2, "reloj": reloj})
+    with EcoMarketClient(URL, circuitos=circuitos) as c:
+        yield c
+
+# ==========================================
+# 1. CIRCUIT BREAKER CON EL CLIENTE
+# ==========================================
+@responses.activate
+def test_503_abre_el_circuito_y_falla_rapido(cliente):
+    responses.add(responses.GET, f"{URL}/productos/1", status=503)
+    for _ in range(4):
+        with pytest.raises(EcoMarketError):
+            cliente.obtener_producto(1)
+    assert len(responses.calls) == 4
+
+    with pytest.raises(CircuitoAbiertoError):
+        cliente.obtener_producto(1)
+    assert len(responses.calls) == 4  # No salió a la red
+
+    estadisticas = cliente.circuitos.estadisticas()["obtener_producto"]
+    assert estadisticas["estado"] == ABIERTO
+    assert estadisticas["rechazadas"] == 1
+
+@responses.activate
+def test_circuito_por_operacion(cliente):
+    responses.add(responses.GET, f"{URL}/productos/1", status=503)
+    responses.add(responses.GET, f"{URL}/productos", json=[], status=200)
+    for _ in range(4):
+        with pytest.raises(EcoMarketError):
+            cliente.obtener_producto(1)
+    # Otra operación sigue funcionando con su propio circuito
+    assert cliente.listar_productos() == []
+
+@responses.activate
+def test_404_no_cuenta_como_fallo(cliente):
+    responses.add(responses.GET, f"{URL}/productos/9", status=404)
+    for _ in range(6):
+        with pytest.raises(ProductoNoEncontrado):
+            cliente.obtener_producto(9)
+    assert cliente.circuitos.breaker("obtener_producto").estado == CERRADO
+
+@responses.activate
+def test_semi_abierto_cierra_si_el_backend_se_recupera(cliente, reloj):
+    responses.add(responses.GET, f"{URL}/productos/1", status=503)
+    for _ in range(4):
+        with pytest.raises(EcoMarketError):
+            cliente.obtener_producto(1)
+
+    responses.replace(responses.GET, f"{URL}/productos/1", json={"id": 1}, status=200)
+    reloj.ahora = 10
+    assert cliente.obtener_producto(1) == {"id": 1}
+    assert cliente.circuitos.breaker("obtener_producto").estado == SEMI_ABIERTO
+    assert cliente.obtener_producto(1) == {"id": 1}
+
+    breaker = cliente.circuitos.breaker("obtener_producto")
+    assert breaker.estado == CERRADO
+    assert [(a, b) for _, a, b in breaker.transiciones] == [
+        (CERRADO, ABIERTO), (ABIERTO, SEMI_ABIERTO), (SEMI_ABIERTO, CERRADO)]
+
+def test_semi_abierto_vuelve_a_abrir_si_sigue_fallando(reloj):
+    cambios = []
+    breaker = CircuitBreaker("op", ventana=2, minimo_llamadas=2, espera_abierto=5, llamadas_prueba=1,
+                             reloj=reloj, al_cambiar_estado=lambda *c: cambios.append(c[1:]))
+    for _ in range(2):
+        assert breaker.permitir()
+        breaker.registrar(True, 0.1)
+    reloj.ahora = 5
+    assert breaker.permitir()
+    assert not breaker.permitir()  # Solo una llamada de prueba
+    breaker.registrar(True, 0.1)
+    assert cambios == [(CERRADO, ABIERTO), (ABIERTO, SEMI_ABIERTO), (SEMI_ABIERTO, ABIERTO)]
+
+def test_callback_de_cambio_puede_consultar_el_breaker(reloj):
+    vistos = []
+    breaker = CircuitBreaker("op", ventana=2, minimo_llamadas=2, espera_abierto=5, reloj=reloj,
+                             al_cambiar_estado=lambda *cambio: vistos.append(breaker.estadisticas()["estado"]))
+
+    def escenario():
+        for _ in range(2):
+            breaker.registrar(True, 0.1)
+        reloj.ahora = 5
+        breaker.permitir()
+
+    # En un hilo aparte: si el callback corriera con el lock tomado, se colgaría
+    hilo = threading.Thread(target=escenario, daemon=True)
+    hilo.start()
+    hilo.join(timeout=2)
+    assert not hilo.is_alive()
+    assert vistos == [ABIERTO, SEMI_ABIERTO]
+
+def test_llamadas_lentas_abren_el_circuito(reloj):
+    breaker = CircuitBreaker("op", ventana=4, minimo_llamadas=4, umbral_lentas=0.5, duracion_lenta=1.0,
+                             reloj=reloj)
+    for duracion in (0.1, 1.5, 0.2, 2.0):
+        breaker.registrar(False, duracion)
+    assert breaker.estado == ABIERTO
+
+def test_por_defecto_las_lentas_no_abren_el_circuito(reloj):
+    breaker = CircuitBreaker("op", ventana=3, minimo_llamadas=3, reloj=reloj)
+    for _ in range(3):
+        breaker.registrar(False, 5.0)
+    assert breaker.estado == CERRADO
+    assert breaker.estadisticas()["tasa_lentas"] == 1.0
+
+def test_ventana_deslizante_olvida_fallos_viejos(reloj):
+    breaker = CircuitBreaker("op", ventana=4, minimo_llamadas=4, umbral_fallos=0.75, reloj=reloj)
+    for fallo in (True, True, False, False, False, True):
+        breaker.registrar(fallo, 0.0)
+    assert breaker.estado == CERRADO
+    assert breaker.estadisticas()["tasa_fallos"] == 0.25
+
+# ==========================================
+# 2. BULKHEAD
+# ==========================================
+def test_bulkhead_rechaza_por_encima_del_limite():
+    circuitos = RegistroCircuitos(por_operacion={"lenta": {"max_concurrentes": 2}})
+    dentro = threading.Barrier(3)
+    soltar = threading.Event()
+
+    def lenta():
+        dentro.wait()
+        soltar.wait(5)
+        return "ok"
+
+    hilos = [threading.Thread(target=circuitos.ejecutar, args=("lenta", lenta)) for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    dentro.wait()
+    try:
+        assert circuitos.bulkhead("lenta").en_vuelo == 2
+        with pytest.raises(BulkheadLlenoError):
+            circuitos.ejecutar("lenta", lenta)
+        # Otra operación no comparte el cupo
+        assert circuitos.ejecutar("rapida", lambda: "ok") == "ok"
+    finally:
+        soltar.set()
+        for hilo in hilos:
+            hilo.join()
+    estadisticas = circuitos.estadisticas()["lenta"]["bulkhead"]
+    assert estadisticas == {"en_vuelo": 0, "max_concurrentes": 2, "rechazadas": 1}
+
+def test_bulkhead_espera_un_lugar():
+    bulkhead = Bulkhead("op", max_concurrentes=1, espera_maxima=0.01)
+    assert bulkhead.adquirir()
+    assert not bulkhead.adquirir()
+    bulkhead.liberar()
+    assert bulkhead.adquirir()
+
+def _registro_con_bulkhead_lleno(reloj):
+    circuitos = RegistroCircuitos(breaker={"ventana": 4, "minimo_llamadas": 4, "espera_abierto": 5,
+                                           "llamadas_prueba": 2, "reloj": reloj}, max_concurrentes=1)
+    assert circuitos.bulkhead("op").adquirir()  # Ocupa el único lugar
+    return circuitos
+
+def test_rechazo_del_bulkhead_no_cuenta_como_exito_en_cerrado(reloj):
+    circuitos = _registro_con_bulkhead_lleno(reloj)
+    for _ in range(5):
+        with pytest.raises(BulkheadLlenoError):
+            circuitos.ejecutar("op", lambda: "ok")
+    assert circuitos.breaker("op").estadisticas()["llamadas_en_ventana"] == 0
+
+def test_rechazo_del_bulkhead_devuelve_el_permiso_de_prueba(reloj):
+    circuitos = _registro_con_bulkhead_lleno(reloj)
+    breaker = circuitos.breaker("op")
+    for _ in range(4):
+        breaker.registrar(True, 0.0)
+    reloj.ahora = 5
+    for _ in range(3):
+        with pytest.raises(BulkheadLlenoError):
+            circuitos.ejecutar("op", lambda: "ok")
+    assert breaker.estado == SEMI_ABIERTO  # Ninguna prueba llegó al backend
+
+    circuitos.bulkhead("op").liberar()
+    assert circuitos.ejecutar("op", lambda: "ok") == "ok"
+    assert breaker.estado == SEMI_ABIERTO
+    assert circuitos.ejecutar("op", lambda: "ok") == "ok"
+    assert breaker.estado == CERRADO
+
+# ==========================================
+# 3. REINTENTOS SOBRE 503 SIMULADOS
+# ==========================================
+@pytest.fixture
+def sin_esperas(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(retry.time, "sleep", esperas.append)
+    return esperas
+
+@responses.activate
+def test_cliente_se_recupera_tras_dos_503(sin_esperas):
+    responses.add(responses.GET, f"{URL}/productos", status=503)
+    responses.add(responses.GET, f"{URL}/productos", status=503)
+    responses.add(responses.GET, f"{URL}/productos", json=[{"id": 1}], status=200)
+    politica = PoliticaReintentos(presupuesto=PresupuestoReintentos(minimo_por_segundo=10))
+
+    with EcoMarketClient(URL) as cliente:
+        listar = with_retry(cliente.listar_productos, politica=politica)
+        assert listar() == [{"id": 1}]
+    assert len(responses.calls) == 3
+    assert len(sin_esperas) == 2
+
+@responses.activate
+def test_circuito_abierto_no_se_reintenta(sin_esperas, cliente):
+    responses.add(responses.GET, f"{URL}/productos", status=503)
+    politica = PoliticaReintentos(max_reintentos=10, presupuesto=PresupuestoReintentos(minimo_por_segundo=100))
+    listar = with_retry(cliente.listar_productos, politica=politica)
+    with pytest.raises(CircuitoAbiertoError):
+        listar()
+    # 4 llamadas abren el circuito; el rechazo siguiente no es reintentable
+    assert len(responses.calls) == 4
+    assert len(sin_esperas) == 4
@@ -1,197 +1,471 @@
-import pytest
-import responses
-import requests
-import json
-from cliente_ecomarket import (
-    listar_productos,
-    obtener_producto,
-    crear_producto,
-    actualizar_producto_parcial,
-    eliminar_producto,
-    BASE_URL
-)
-
-# ==========================================
-# 1. HAPPY PATH (Casos de éxito)
-# ==========================================
-
-@responses.activate
-def test_listar_productos_exito():
-    # Simulamos que el servidor responde correctamente
-    mock_data = [{"id": 1, "nombre": "Manzana", "precio": 10}]
-    responses.add(responses.GET, f"{BASE_URL}/productos", json=mock_data, status=200)
-
-    resultado = listar_productos()
-    assert isinstance(resultado, list)
-    assert len(resultado) == 1
-    assert resultado[0]['nombre'] == "Manzana"
-
-@responses.activate
-def test_obtener_producto_exito():
-    mock_data = {"id": 1, "nombre": "Manzana", "precio": 10}
-    responses.add(responses.GET, f"{BASE_URL}/productos/1", json=mock_data, status=200)
-
-    resultado = obtener_producto(1)
-    assert resultado['id'] == 1
-    assert resultado['nombre'] == "Manzana"
-
-@responses.activate
-def test_crear_producto_exito():
-    nuevo_producto = {"nombre": "Pera", "precio": 20, "categoria": "frutas"}
-    respuesta_mock = {"id": 2, "nombre": "Pera", "mensaje": "Creado"}
-    
-    responses.add(responses.POST, f"{BASE_URL}/productos", json=respuesta_mock, status=201)
-
-    resultado = crear_producto(nuevo_producto)
-    assert resultado['id'] == 2
-
-@responses.activate
-def test_actualizar_parcial_exito():
-    datos_update = {"precio": 25}
-    respuesta_mock = {"status": "Actualizado correctamente"}
-    
-    responses.add(responses.PATCH, f"{BASE_URL}/productos/1", json=respuesta_mock, status=200)
-
-    resultado = actualizar_producto_parcial(1, datos_update)
-    assert resultado['status'] == "Actualizado correctamente"
-
-@responses.activate
-def test_eliminar_producto_exito():
-    # DELETE suele devolver 204 No Content o un JSON simple
-    responses.add(responses.DELETE, f"{BASE_URL}/productos/1", status=204)
-
-    resultado = eliminar_producto(1)
-    assert resultado is True  # Asumiendo que tu función devuelve True si sale bien
-
-# ==========================================
-# 2. ERRORES HTTP (Simulando fallos del server)
-# ==========================================
-
-@responses.activate
-def test_error_404_producto_no_encontrado():
-    responses.add(responses.GET, f"{BASE_URL}/productos/999", status=404)
-
-    # Esperamos que tu cliente lance una excepción o maneje el error
-    with pytest.raises(Exception): # O la excepción específica que uses, ej: requests.exceptions.HTTPError
-        obtener_producto(999)
-
-@responses.activate
-def test_error_500_servidor_caido():
-    responses.add(responses.GET, f"{BASE_URL}/productos", status=500)
-
-    with pytest.raises(Exception):
-        listar_productos()
-
-@responses.activate
-def test_error_400_peticion_invalida():
-    # Intentar crear algo mal
-    responses.add(responses.POST, f"{BASE_URL}/productos", status=400)
-    
-    with pytest.raises(Exception):
-        crear_producto({})
-
-# ==========================================
-# 3. EDGE CASES (Casos raros)
-# ==========================================
-
-@responses.activate
-def test_respuesta_vacia_pero_200():
-    # El server dice OK, pero manda lista vacía
-    responses.add(responses.GET, f"{BASE_URL}/productos", json=[], status=200)
-
-    resultado = listar_productos()
-    assert resultado == []
-
-@responses.activate
-def test_timeout_servidor():
-    # Simulamos que el servidor tarda mucho en responder
-    responses.add(responses.GET, f"{BASE_URL}/productos", body=Exception("Timeout"))
-
-    with pytest.raises(Exception):
-        listar_productos()
-
-# ==========================================
-# 4. TUS TESTS PROPIOS (Requisito del reto)
-# ==========================================
-
-@responses.activate
-def test_filtro_categoria_vacio():
-    # Test propio 1: Qué pasa si filtro por una categoría que no tiene productos
-    responses.add(responses.GET, f"{BASE_URL}/productos", json=[], status=200)
-    resultado = listar_productos() # Aquí podrías pasar categoría si tu función lo soporta
-    assert len(resultado) == 0
-
-@responses.activate
-def test_crear_producto_precio_negativo():
-    # Test propio 2: Validar lógica de negocio si el API falla
-    responses.add(responses.POST, f"{BASE_URL}/productos", status=400)
-    with pytest.raises(Exception):
-        crear_producto({"nombre": "Malo", "precio": -50})
-       
-# ==========================================
-# 5. BONUS TRACK (Para llegar a los 20+ tests)
-# ==========================================
-
-@responses.activate
-def test_error_401_no_autorizado():
-    # Simulamos que falta el token o permiso
-    responses.add(responses.GET, f"{BASE_URL}/productos", status=401)
-    with pytest.raises(Exception):
-        listar_productos()
-
-@responses.activate
-def test_error_409_conflicto_duplicado():
-    # Simulamos que intentamos crear algo que ya existe
-    responses.add(responses.POST, f"{BASE_URL}/productos", status=409)
-    with pytest.raises(Exception):
-        crear_producto({"nombre": "Duplicado", "precio": 10})
-
-@responses.activate
-def test_error_503_servicio_no_disponible():
-    # Simulamos servidor en mantenimiento
-    responses.add(responses.GET, f"{BASE_URL}/productos", status=503)
-    with pytest.raises(Exception):
-        listar_productos()
-
-@responses.activate
-def test_json_respuesta_invalida():
-    # El servidor devuelve texto plano en vez de JSON (pasa mucho en errores de nginx)
-    responses.add(responses.GET, f"{BASE_URL}/productos", body="Internal Server Error", status=500)
-    with pytest.raises(Exception):
-        listar_productos()
-
-@responses.activate
-def test_actualizar_producto_id_inexistente():
-    # Intentar actualizar algo que no existe
-    responses.add(responses.PATCH, f"{BASE_URL}/productos/9999", status=404)
-    with pytest.raises(Exception):
-        actualizar_producto_parcial(9999, {"precio": 50})
-
-@responses.activate
-def test_eliminar_producto_id_inexistente():
-    # Intentar borrar algo que no existe
-    responses.add(responses.DELETE, f"{BASE_URL}/productos/9999", status=404)
-    with pytest.raises(Exception):
-        eliminar_producto(9999)
-
-@responses.activate
-def test_crear_producto_sin_campos_requeridos():
-    # Enviar un diccionario vacío al crear
-    responses.add(responses.POST, f"{BASE_URL}/productos", status=400)
-    with pytest.raises(Exception):
-        crear_producto({})
-
-@responses.activate
-def test_busqueda_sin_resultados():
-    # Una búsqueda válida que simplemente no trae nada
-    responses.add(responses.GET, f"{BASE_URL}/productos", json=[], status=200)
-    resultado = listar_productos()
-    assert isinstance(resultado, list)
-    assert len(resultado) == 0
-
-@responses.activate
-def test_timeout_en_creacion():
-    # El servidor se cuelga al intentar guardar
-    responses.add(responses.POST, f"{BASE_URL}/productos", body=Exception("TimeOut"))
-    with pytest.raises(Exception):
-        crear_producto({"nombre": "Lento", "precio": 10})
\ No newline at end of file
+import pytest
+import responses
+from responses import matchers
+import requests
+import json
+import asyncio
+import threading
+import time
+from cliente_ecomarket import (
+    listar_productos,
+    obtener_producto,
+    crear_producto,
+    actualizar_producto_parcial,
+    eliminar_producto,
+    EcoMarketClient,
+    cliente_por_defecto,
+    iter_productos,
+    crear_productos_lote,
+    actualizar_productos_parcial_lote,
+    eliminar_productos_lote,
+    EcoMarketError,
+    ProductoNoEncontrado,
+    ConflictoError,
+    BASE_URL
+)
+from cliente_async import AsyncEcoMarketClient
+from cache_http import CacheLRU, CacheDisco, _CacheBase
+
+# ==========================================
+# 1. HAPPY PATH (Casos de éxito)
+# ==========================================
+
+@responses.activate
+def test_listar_productos_exito():
+    # Simulamos que el servidor responde correctamente
+    mock_data = [{"id": 1, "nombre": "Manzana", "precio": 10}]
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=mock_data, status=200)
+
+    resultado = listar_productos()
+    assert isinstance(resultado, list)
+    assert len(resultado) == 1
+    assert resultado[0]['nombre'] == "Manzana"
+
+@responses.activate
+def test_obtener_producto_exito():
+    mock_data = {"id": 1, "nombre": "Manzana", "precio": 10}
+    responses.add(responses.GET, f"{BASE_URL}/productos/1", json=mock_data, status=200)
+
+    resultado = obtener_producto(1)
+    assert resultado['id'] == 1
+    assert resultado['nombre'] == "Manzana"
+
+@responses.activate
+def test_crear_producto_exito():
+    nuevo_producto = {"nombre": "Pera", "precio": 20, "categoria": "frutas"}
+    respuesta_mock = {"id": 2, "nombre": "Pera", "mensaje": "Creado"}
+    
+    responses.add(responses.POST, f"{BASE_URL}/productos", json=respuesta_mock, status=201)
+
+    resultado = crear_producto(nuevo_producto)
+    assert resultado['id'] == 2
+
+@responses.activate
+def test_actualizar_parcial_exito():
+    datos_update = {"precio": 25}
+    respuesta_mock = {"status": "Actualizado correctamente"}
+    
+    responses.add(responses.PATCH, f"{BASE_URL}/productos/1", json=respuesta_mock, status=200)
+
+    resultado = actualizar_producto_parcial(1, datos_update)
+    assert resultado['status'] == "Actualizado correctamente"
+
+@responses.activate
+def test_eliminar_producto_exito():
+    # DELETE suele devolver 204 No Content o un JSON simple
+    responses.add(responses.DELETE, f"{BASE_URL}/productos/1", status=204)
+
+    resultado = eliminar_producto(1)
+    assert resultado is True  # Asumiendo que tu función devuelve True si sale bien
+
+# ==========================================
+# 2. ERRORES HTTP (Simulando fallos del server)
+# ==========================================
+
+@responses.activate
+def test_error_404_producto_no_encontrado():
+    responses.add(responses.GET, f"{BASE_URL}/productos/999", status=404)
+
+    # Esperamos que tu cliente lance una excepción o maneje el error
+    with pytest.raises(Exception): # O la excepción específica que uses, ej: requests.exceptions.HTTPError
+        obtener_producto(999)
+
+@responses.activate
+def test_error_500_servidor_caido():
+    responses.add(responses.GET, f"{BASE_URL}/productos", status=500)
+
+    with pytest.raises(Exception):
+        listar_productos()
+
+@responses.activate
+def test_error_400_peticion_invalida():
+    # Intentar crear algo mal
+    responses.add(responses.POST, f"{BASE_URL}/productos", status=400)
+    
+    with pytest.raises(Exception):
+        crear_producto({})
+
+# ==========================================
+# 3. EDGE CASES (Casos raros)
+# ==========================================
+
+@responses.activate
+def test_respuesta_vacia_pero_200():
+    # El server dice OK, pero manda lista vacía
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=[], status=200)
+
+    resultado = listar_productos()
+    assert resultado == []
+
+@responses.activate
+def test_timeout_servidor():
+    # Simulamos que el servidor tarda mucho en responder
+    responses.add(responses.GET, f"{BASE_URL}/productos", body=Exception("Timeout"))
+
+    with pytest.raises(Exception):
+        listar_productos()
+
+# ==========================================
+# 4. TUS TESTS PROPIOS (Requisito del reto)
+# ==========================================
+
+@responses.activate
+def test_filtro_categoria_vacio():
+    # Test propio 1: Qué pasa si filtro por una categoría que no tiene productos
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=[], status=200)
+    resultado = listar_productos() # Aquí podrías pasar categoría si tu función lo soporta
+    assert len(resultado) == 0
+
+@responses.activate
+def test_crear_producto_precio_negativo():
+    # Test propio 2: Validar lógica de negocio si el API falla
+    responses.add(responses.POST, f"{BASE_URL}/productos", status=400)
+    with pytest.raises(Exception):
+        crear_producto({"nombre": "Malo", "precio": -50})
+       
+# ==========================================
+# 5. BONUS TRACK (Para llegar a los 20+ tests)
+# ==========================================
+
+@responses.activate
+def test_error_401_no_autorizado():
+    # Simulamos que falta el token o permiso
+    responses.add(responses.GET, f"{BASE_URL}/productos", status=401)
+    with pytest.raises(Exception):
+        listar_productos()
+
+@responses.activate
+def test_error_409_conflicto_duplicado():
+    # Simulamos que intentamos crear algo que ya existe
+    responses.add(responses.POST, f"{BASE_URL}/productos", status=409)
+    with pytest.raises(Exception):
+        crear_producto({"nombre": "Duplicado", "precio": 10})
+
+@responses.activate
+def test_error_503_servicio_no_disponible():
+    # Simulamos servidor en mantenimiento
+    responses.add(responses.GET, f"{BASE_URL}/productos", status=503)
+    with pytest.raises(Exception):
+        listar_productos()
+
+@responses.activate
+def test_json_respuesta_invalida():
+    # El servidor devuelve texto plano en vez de JSON (pasa mucho en errores de nginx)
+    responses.add(responses.GET, f"{BASE_URL}/productos", body="Internal Server Error", status=500)
+    with pytest.raises(Exception):
+        listar_productos()
+
+@responses.activate
+def test_actualizar_producto_id_inexistente():
+    # Intentar actualizar algo que no existe
+    responses.add(responses.PATCH, f"{BASE_URL}/productos/9999", status=404)
+    with pytest.raises(Exception):
+        actualizar_producto_parcial(9999, {"precio": 50})
+
+@responses.activate
+def test_eliminar_producto_id_inexistente():
+    # Intentar borrar algo que no existe
+    responses.add(responses.DELETE, f"{BASE_URL}/productos/9999", status=404)
+    with pytest.raises(Exception):
+        eliminar_producto(9999)
+
+@responses.activate
+def test_crear_producto_sin_campos_requeridos():
+    # Enviar un diccionario vacío al crear
+    responses.add(responses.POST, f"{BASE_URL}/productos", status=400)
+    with pytest.raises(Exception):
+        crear_producto({})
+
+@responses.activate
+def test_busqueda_sin_resultados():
+    # Una búsqueda válida que simplemente no trae nada
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=[], status=200)
+    resultado = listar_productos()
+    assert isinstance(resultado, list)
+    assert len(resultado) == 0
+
+@responses.activate
+def test_timeout_en_creacion():
+    # El servidor se cuelga al intentar guardar
+    responses.add(responses.POST, f"{BASE_URL}/productos", body=Exception("TimeOut"))
+    with pytest.raises(Exception):
+        crear_producto({"nombre": "Lento", "precio": 10})
+
+# ==========================================
+# 6. CLIENTE CON POOL DE CONEXIONES
+# ==========================================
+
+@responses.activate
+def test_cliente_con_base_url_propia():
+    responses.add(responses.GET, "http://localhost:8080/productos/7", json={"id": 7}, status=200)
+    with EcoMarketClient("http://localhost:8080/") as cliente:
+        assert cliente.obtener_producto(7)["id"] == 7
+
+def test_cliente_configura_pool_por_host():
+    cliente = EcoMarketClient("http://localhost:8080", pool_maxsize=32, pool_connections=4)
+    adapter = cliente.session.get_adapter("http://localhost:8080")
+    assert adapter._pool_maxsize == 32
+    assert adapter._pool_connections == 4
+    assert "Connection" not in cliente.session.headers or cliente.session.headers["Connection"] != "close"
+    cliente.close()
+
+def test_cliente_sin_keep_alive():
+    cliente = EcoMarketClient("http://localhost:8080", keep_alive=False)
+    assert cliente.session.headers["Connection"] == "close"
+    cliente.close()
+
+@responses.activate
+def test_funciones_del_modulo_reutilizan_la_misma_sesion():
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=[], status=200)
+    listar_productos()
+    listar_productos()
+    assert cliente_por_defecto() is cliente_por_defecto()
+    assert len(responses.calls) == 2
+
+
+# ==========================================
+# 7. CLIENTE ASYNCIO
+# ==========================================
+
+@responses.activate
+def test_async_obtener_productos_lote_no_aborta_por_un_404():
+    responses.add(responses.GET, f"{BASE_URL}/productos/1", json={"id": 1}, status=200)
+    responses.add(responses.GET, f"{BASE_URL}/productos/2", status=404)
+    responses.add(responses.GET, f"{BASE_URL}/productos/3", json={"id": 3}, status=200)
+
+    async def escenario():
+        async with AsyncEcoMarketClient(limite=2) as cliente:
+            return await cliente.obtener_productos([1, 2, 3])
+
+    resultados = asyncio.run(escenario())
+    assert [r.ok for r in resultados] == [True, False, True]
+    assert resultados[0].valor["id"] == 1
+    assert isinstance(resultados[1].error, ProductoNoEncontrado)
+
+@responses.activate
+def test_async_mantiene_excepciones_del_cliente():
+    responses.add(responses.POST, f"{BASE_URL}/productos", status=409)
+
+    async def escenario():
+        async with AsyncEcoMarketClient() as cliente:
+            await cliente.crear_producto({"nombre": "Duplicado", "precio": 10})
+
+    with pytest.raises(ConflictoError):
+        asyncio.run(escenario())
+
+def test_async_respeta_limite_de_concurrencia():
+    en_vuelo = 0
+    maximo = 0
+    lock = threading.Lock()
+
+    def obtener_lento(producto_id):
+        nonlocal en_vuelo, maximo
+        with lock:
+            en_vuelo += 1
+            maximo = max(maximo, en_vuelo)
+        time.sleep(0.01)
+        with lock:
+            en_vuelo -= 1
+        return {"id": producto_id}
+
+    async def escenario():
+        cliente = AsyncEcoMarketClient(limite=3)
+        cliente._cliente.obtener_producto = obtener_lento
+        resultados = await cliente.obtener_productos(range(12))
+        await cliente.aclose()
+        return resultados
+
+    resultados = asyncio.run(escenario())
+    assert all(r.ok for r in resultados)
+    assert maximo <= 3
+
+
+# ==========================================
+# 8. OPERACIONES EN LOTE
+# ==========================================
+
+@responses.activate
+def test_crear_productos_lote_clasifica_por_indice():
+    responses.add(responses.POST, f"{BASE_URL}/productos", json={"id": 10}, status=201)
+    responses.add(responses.POST, f"{BASE_URL}/productos", status=409)
+    responses.add(responses.POST, f"{BASE_URL}/productos", json={"id": 11}, status=201)
+
+    reporte = crear_productos_lote([{"nombre": "A"}, {"nombre": "B"}, {"nombre": "C"}], workers=1)
+    assert sorted(reporte.exitos) == [0, 2]
+    assert list(reporte.duplicados) == [1]
+    assert reporte.total == 3
+    assert not reporte.ok
+
+@responses.activate
+def test_crear_productos_lote_valida_antes_de_enviar():
+    responses.add(responses.POST, f"{BASE_URL}/productos", json={"id": 1}, status=201)
+    valido = {"id": 1, "nombre": "Miel", "precio": 50.0, "categoria": "miel"}
+    invalido = {"id": 2, "nombre": "Peras", "precio": -5.0, "categoria": "frutas"}
+
+    reporte = crear_productos_lote([invalido, valido], validar=True)
+    assert list(reporte.invalidos) == [0]
+    assert list(reporte.exitos) == [1]
+    assert len(responses.calls) == 1
+
+@responses.activate
+def test_actualizar_y_eliminar_lote_reportan_no_encontrados():
+    responses.add(responses.PATCH, f"{BASE_URL}/productos/1", json={"id": 1}, status=200)
+    responses.add(responses.PATCH, f"{BASE_URL}/productos/2", status=404)
+    responses.add(responses.DELETE, f"{BASE_URL}/productos/1", status=204)
+    responses.add(responses.DELETE, f"{BASE_URL}/productos/2", status=500)
+
+    reporte = actualizar_productos_parcial_lote([(1, {"precio": 3}), (2, {"precio": 4})])
+    assert list(reporte.exitos) == [0]
+    assert isinstance(reporte.no_encontrados[1], ProductoNoEncontrado)
+
+    reporte = eliminar_productos_lote([1, 2])
+    assert reporte.exitos == {0: True}
+    assert list(reporte.fallos) == [1]
+
+
+# ==========================================
+# 9. LISTADO PAGINADO EN STREAMING
+# ==========================================
+
+@responses.activate
+def test_iter_productos_paginacion_offset():
+    pagina = lambda desde, hasta: [{"id": i} for i in range(desde, hasta)]
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=pagina(0, 2),
+                  match=[matchers.query_param_matcher({"limit": "2", "offset": "0"})])
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=pagina(2, 4),
+                  match=[matchers.query_param_matcher({"limit": "2", "offset": "2"})])
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=pagina(4, 5),
+                  match=[matchers.query_param_matcher({"limit": "2", "offset": "4"})])
+
+    assert [p["id"] for p in iter_productos(tamano_pagina=2)] == [0, 1, 2, 3, 4]
+    assert len(responses.calls) == 3
+
+@responses.activate
+def test_iter_productos_paginacion_cursor():
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=[{"id": 1}], headers={"X-Next-Cursor": "abc"},
+                  match=[matchers.query_param_matcher({"limit": "1"})])
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=[{"id": 2}],
+                  match=[matchers.query_param_matcher({"limit": "1", "cursor": "abc"})])
+
+    assert [p["id"] for p in iter_productos(tamano_pagina=1, paginacion="cursor")] == [1, 2]
+
+@responses.activate
+def test_iter_productos_es_perezoso_y_valida():
+    validos = [{"id": 1, "nombre": "Miel", "precio": 50.0, "categoria": "miel"}]
+    invalido = {"id": 2, "nombre": "Teclado", "precio": 10.0, "categoria": "electronica"}
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=validos + [invalido])
+
+    productos = iter_productos(tamano_pagina=10, validar=True)
+    assert len(responses.calls) == 0  # Nada se pide hasta consumir
+    assert next(productos)["id"] == 1
+    with pytest.raises(ValueError):
+        next(productos)
+
+@responses.activate
+def test_iter_productos_error_servidor():
+    responses.add(responses.GET, f"{BASE_URL}/productos", status=503)
+    with pytest.raises(EcoMarketError):
+        list(iter_productos())
+
+
+# ==========================================
+# 10. CACHÉ HTTP
+# ==========================================
+
+@responses.activate
+def test_cache_evita_segunda_peticion_y_cuenta_hits():
+    responses.add(responses.GET, f"{BASE_URL}/productos/1", json={"id": 1},
+                  headers={"Cache-Control": "max-age=60"})
+    cliente = EcoMarketClient(cache=CacheLRU())
+
+    assert cliente.obtener_producto(1) == cliente.obtener_producto(1)
+    assert len(responses.calls) == 1
+    assert cliente.cache.estadisticas()["hits"] == 1
+    assert cliente.cache.estadisticas()["misses"] == 1
+
+@responses.activate
+def test_cache_revalida_con_etag_y_304():
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=[{"id": 1}],
+                  headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+    cliente = EcoMarketClient(cache=CacheLRU())
+    primero = cliente.listar_productos()
+
+    responses.replace(responses.GET, f"{BASE_URL}/productos", status=304,
+                      match=[matchers.header_matcher({"If-None-Match": '"v1"'})])
+    assert cliente.listar_productos() is primero
+    assert cliente.cache.estadisticas()["revalidaciones"] == 1
+
+@responses.activate
+def test_cache_no_store_no_guarda():
+    responses.add(responses.GET, f"{BASE_URL}/productos/1", json={"id": 1},
+                  headers={"Cache-Control": "no-store"})
+    cliente = EcoMarketClient(cache=CacheLRU())
+    cliente.obtener_producto(1)
+    cliente.obtener_producto(1)
+    assert len(responses.calls) == 2
+
+@responses.activate
+def test_cache_se_invalida_tras_escrituras():
+    responses.add(responses.GET, f"{BASE_URL}/productos/1", json={"id": 1, "precio": 10})
+    responses.add(responses.GET, f"{BASE_URL}/productos", json=[{"id": 1}])
+    responses.add(responses.PATCH, f"{BASE_URL}/productos/1", json={"id": 1, "precio": 20})
+    responses.add(responses.DELETE, f"{BASE_URL}/productos/1", status=204)
+    cliente = EcoMarketClient(cache=CacheLRU())
+
+    cliente.obtener_producto(1)
+    cliente.listar_productos()
+    cliente.actualizar_producto_parcial(1, {"precio": 20})
+    assert cliente.cache.estadisticas()["entradas"] == 0
+
+    cliente.obtener_producto(1)
+    cliente.eliminar_producto(1)
+    assert cliente.cache.estadisticas()["invalidaciones"] == 3
+
+def test_cache_lru_desaloja_la_menos_usada():
+    cache = CacheLRU(max_entradas=2)
+    respuesta = requests.Response()
+    for clave in ("a", "b"):
+        cache.guardar_respuesta(clave, respuesta, clave)
+    cache.buscar("a")
+    cache.guardar_respuesta("c", respuesta, "c")
+    assert cache.buscar("b") is None
+    assert cache.buscar("a").valor == "a"
+    assert cache.estadisticas()["evictions"] == 1
+
+def test_cache_disco_persiste_entre_instancias(tmp_path):
+    respuesta = requests.Response()
+    respuesta.headers["ETag"] = '"abc"'
+    CacheDisco(str(tmp_path)).guardar_respuesta("/productos/1", respuesta, {"id": 1})
+
+    entrada = CacheDisco(str(tmp_path)).buscar("/productos/1")
+    assert entrada.valor == {"id": 1}
+    assert entrada.etag == '"abc"'
+    assert entrada.fresca()
+
+def test_backend_de_cache_incompleto_falla_al_crearse():
+    class SoloLectura(_CacheBase):
+        def _leer(self, clave):
+            return None
+
+    with pytest.raises(TypeError, match="_escribir"):
+        SoloLectura()
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cliente_async import AsyncEcoMarketClient
+from cliente_ecomarket import EcoMarketClient, ProductoNoEncontrado
+from coalescencia import Coalescedor, CoalescedorAsync
+from servidor_local import Inyeccion, ServidorEcoMarket
+
+LENTO = {"GET /productos/{id}": Inyeccion(latencia="fija:100"),
+         "GET /productos": Inyeccion(latencia="fija:100")}
+
+def _en_paralelo(funcion, argumentos):
+    """Lanza todas las llamadas a la vez y devuelve valor o excepción de cada una."""
+    barrera = threading.Barrier(len(argumentos))
+
+    def llamar(argumento):
+        barrera.wait()
+        try:
+            return funcion(argumento)
+        except Exception as e:
+            return e
+    with ThreadPoolExecutor(max_workers=len(argumentos)) as executor:
+        return list(executor.map(llamar, argumentos))
+
+# ==========================================
+# 1. HILOS
+# ==========================================
+def test_lecturas_iguales_comparten_una_peticion():
+    coalescedor = Coalescedor()
+    with ServidorEcoMarket(productos=5, por_ruta=LENTO) as servidor:
+        with EcoMarketClient(servidor.base_url, pool_maxsize=20, coalescedor=coalescedor) as cliente:
+            resultados = _en_paralelo(cliente.obtener_producto, [3] * 10 + [4] * 10)
+        peticiones = servidor.estadisticas()["peticiones"]
+    assert [r["id"] for r in resultados] == [3] * 10 + [4] * 10
+    assert peticiones == 2
+    estadisticas = coalescedor.estadisticas()
+    assert estadisticas["obtener_producto"] == {"ejecutadas": 2, "coalescidas": 18}
+    assert estadisticas["total"]["en_vuelo"] == 0
+
+def test_todos_reciben_la_misma_excepcion():
+    coalescedor = Coalescedor()
+    with ServidorEcoMarket(productos=5, por_ruta=LENTO) as servidor:
+        with EcoMarketClient(servidor.base_url, pool_maxsize=8, coalescedor=coalescedor) as cliente:
+            errores = _en_paralelo(cliente.obtener_producto, [99] * 8)
+    assert all(isinstance(e, ProductoNoEncontrado) for e in errores)
+    assert len({id(e) for e in errores}) == 1
+    assert coalescedor.estadisticas()["total"] == {"ejecutadas": 1, "coalescidas": 7, "en_vuelo": 0}
+
+def test_no_es_una_cache():
+    coalescedor = Coalescedor()
+    llamadas = []
+    for _ in range(3):
+        coalescedor.ejecutar("op", "clave", llamadas.append, 1)
+    assert len(llamadas) == 3
+    assert coalescedor.estadisticas()["op"]["coalescidas"] == 0
+
+def test_escrituras_no_se_coalescen():
+    coalescedor = Coalescedor()
+    with ServidorEcoMarket(productos=5) as servidor:
+        with EcoMarketClient(servidor.base_url, pool_maxsize=8, coalescedor=coalescedor) as cliente:
+            creados = _en_paralelo(cliente.crear_producto,
+                                   [{"nombre": "Miel", "precio": 10.0, "categoria": "miel"}] * 4)
+    assert len({p["id"] for p in creados}) == 4
+    assert coalescedor.estadisticas()["total"]["ejecutadas"] == 0
+
+# ==========================================
+# 2. ASYNCIO
+# ==========================================
+def test_async_coalesce_antes_de_ocupar_un_hilo():
+    coalescedor = CoalescedorAsync()
+    with ServidorEcoMarket(productos=5, por_ruta=LENTO) as servidor:
+        async def escenario():
+            async with AsyncEcoMarketClient(servidor.base_url, limite=4, coalescedor=coalescedor) as cliente:
+                return await asyncio.gather(*[cliente.listar_productos() for _ in range(10)],
+                                            *[cliente.obtener_producto(2) for _ in range(10)])
+        resultados = asyncio.run(escenario())
+        peticiones = servidor.estadisticas()["peticiones"]
+    assert len(resultados[0]) == 5 and resultados[10]["id"] == 2
+    assert peticiones == 2
+    assert coalescedor.estadisticas()["total"]["coalescidas"] == 18
+
+def test_async_cancelar_al_lider_no_cancela_a_los_demas():
+    coalescedor = CoalescedorAsync()
+
+    async def lenta():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def escenario():
+        lider = asyncio.ensure_future(coalescedor.ejecutar("op", "k", lenta))
+        await asyncio.sleep(0)
+        seguidor = asyncio.ensure_future(coalescedor.ejecutar("op", "k", lenta))
+        await asyncio.sleep(0)
+        lider.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await lider
+        return await seguidor
+
+    assert asyncio.run(escenario()) == "ok"
+    assert coalescedor.estadisticas()["op"] == {"ejecutadas": 1, "coalescidas": 1}
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+import requests
+import responses
+
+from cache_http import CacheLRU
+from cliente_ecomarket import EcoMarketClient, EcoMarketError
+from codec_json import CodecJSON, codecs_disponibles, obtener_codec
+from modelos import Producto
+from servidor_local import ServidorEcoMarket
+
+BASE = "http://ecomarket.test"
+CATALOGO = [
+    {"id": 1, "nombre": "Café de Chiapas", "precio": 12.5, "categoria": "conservas", "disponible": True},
+    {"id": 2, "nombre": "Miel", "precio": 3.0, "categoria": "miel", "extra": [1, 2]},
+]
+
+@pytest.fixture(params=codecs_disponibles())
+def codec(request):
+    return obtener_codec(request.param)
+
+# ==========================================
+# 1. CODECS
+# ==========================================
+def test_ida_y_vuelta_en_bytes(codec):
+    datos = codec.codificar(CATALOGO)
+    assert isinstance(datos, bytes)
+    assert codec.decodificar(datos) == CATALOGO
+    assert json.loads(datos) == CATALOGO  # Cualquier otro codec lo entiende
+
+def test_decodificar_como_producto(codec):
+    productos = codec.decodificar_como(json.dumps(CATALOGO).encode(), Producto)
+    assert productos[0] == Producto(1, "Café de Chiapas", 12.5, "conservas")
+    assert productos[1].disponible is True  # Valor por defecto; 'extra' se ignora
+    assert codec.decodificar_como(json.dumps(CATALOGO[0]).encode(), Producto).nombre == "Café de Chiapas"
+    assert productos[0].a_dict() == CATALOGO[0]
+
+def test_json_invalido_es_value_error(codec):
+    with pytest.raises(ValueError):
+        codec.decodificar(b"Internal Server Error")
+
+def test_codec_por_defecto_es_el_mas_rapido_instalado():
+    assert obtener_codec().nombre == codecs_disponibles()[0]
+    assert "json" in codecs_disponibles()
+    with pytest.raises(ValueError):
+        obtener_codec("ujson")
+
+# ==========================================
+# 2. EN EL CLIENTE
+# ==========================================
+@responses.activate
+def test_cuerpos_salen_codificados_por_el_codec(codec):
+    responses.add(responses.POST, f"{BASE}/productos", json={"id": 3, "nombre": "Ñandú"}, status=201)
+    with EcoMarketClient(BASE, codec=codec) as cliente:
+        assert cliente.crear_producto({"nombre": "Ñandú", "precio": 1.0})["nombre"] == "Ñandú"
+    peticion = responses.calls[0].request
+    assert peticion.headers["Content-Type"] == "application/json"
+    assert json.loads(peticion.body) == {"nombre": "Ñandú", "precio": 1.0}
+
+@responses.activate
+def test_respuesta_no_json_es_error_del_cliente():
+    responses.add(responses.GET, f"{BASE}/productos", body="<html>", status=200)
+    with EcoMarketClient(BASE, codec=CodecJSON()) as cliente:
+        with pytest.raises(EcoMarketError) as error:
+            cliente.listar_productos()
+    assert isinstance(error.value.__cause__, requests.exceptions.JSONDecodeError)
+
+def test_lecturas_tipadas_contra_servidor_local():
+    with ServidorEcoMarket(productos=20) as servidor:
+        with EcoMarketClient(servidor.base_url, codec="json", cache=CacheLRU()) as cliente:
+            productos = cliente.listar_productos(tipo=Producto)
+            producto = cliente.obtener_producto(3, tipo=Producto)
+            como_dict = cliente.obtener_producto(3)
+            listado = cliente.listar_productos()  # La caché guarda dicts, no instancias
+    assert len(productos) == 20 and all(isinstance(p, Producto) for p in productos)
+    assert isinstance(listado[0], dict)
+    assert producto == productos[2] and producto.a_dict() == como_dict
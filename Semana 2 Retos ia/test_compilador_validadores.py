@@ -0,0 +1,69 @@
+import pytest
+
+from compilador_validadores import compilar_validador, schema_desde_openapi
+from validadores import validar_producto, validar_producto_manual
+
+PRODUCTO_BASE = {
+    "id": 1,
+    "nombre": "Miel",
+    "precio": 50.0,
+    "categoria": "miel",
+    "disponible": True,
+    "productor": {"id": 3},
+    "creado_en": "2024-01-15T10:30:00Z",
+}
+
+VARIANTES = {
+    "id": ["1", None, True, 2.0],
+    "nombre": [3, None],
+    "precio": [0, -1, "3", 2],
+    "categoria": ["electronica", 5, [1]],
+    "disponible": ["SÍ", 1],
+    "productor": [{"id": "a"}, ["Granja", 123], {}],
+    "creado_en": ["ayer", 5, "2024-01-15"],
+}
+
+def _casos():
+    yield None
+    yield []
+    yield {}
+    yield PRODUCTO_BASE
+    for campo, valores in VARIANTES.items():
+        for valor in valores:
+            yield {**PRODUCTO_BASE, campo: valor}
+        yield {k: v for k, v in PRODUCTO_BASE.items() if k != campo}
+
+def _resultado(validador, data):
+    try:
+        return ("ok", validador(data))
+    except (ValueError, TypeError) as e:
+        return (type(e).__name__, str(e))
+
+@pytest.mark.parametrize("data", list(_casos()))
+def test_compilado_equivale_al_manual(data):
+    assert _resultado(validar_producto, data) == _resultado(validar_producto_manual, data)
+
+def test_falta_el_primer_requerido_en_orden():
+    with pytest.raises(ValueError, match="Falta el campo requerido: 'nombre'"):
+        validar_producto({"id": 1, "categoria": "miel"})
+
+def test_minimo_exclusivo_estilo_openapi_30():
+    validar = compilar_validador({"properties": {"stock": {"type": "integer", "minimum": 0, "exclusiveMinimum": True}}})
+    with pytest.raises(ValueError, match="El stock debe ser mayor a 0. Valor actual: 0"):
+        validar({"stock": 0})
+    assert validar({"stock": 1}) == {"stock": 1}
+
+def test_estrategias_de_la_comparacion_devuelven_lo_mismo():
+    import comparacion_validacion as comparacion
+
+    estrategias = [comparacion.validar_manual, comparacion.validar_pydantic,
+                   comparacion.validar_jsonschema, comparacion.validar_compilado]
+    assert [validar(comparacion.producto_valido) for validar in estrategias] == [True] * 4
+
+def test_compila_componentes_del_contrato():
+    validar = compilar_validador(schema_desde_openapi("openapi_sem2.yaml", "ProductInput"))
+    assert validar({"name": "Miel", "price": 20.5, "producerId": 7})
+    with pytest.raises(ValueError, match="Falta el campo requerido: 'producerId'"):
+        validar({"name": "Miel", "price": 20.5})
+    with pytest.raises(TypeError, match="El 'price' debe ser numérico"):
+        validar({"name": "Miel", "price": "20", "producerId": 7})
@@ -0,0 +1,75 @@
+import importlib.util
+import json
+
+import pytest
+import requests
+
+from cliente_ecomarket import EcoMarketClient
+from compresion import PoliticaCompresion, compresores_disponibles, negociar, obtener_compresor
+from servidor_local import Inyeccion, ServidorEcoMarket
+
+DESCRIPCION = "Miel orgánica de flores silvestres, sin pasteurizar. " * 100
+
+# ==========================================
+# 1. CODIFICACIONES Y NEGOCIACIÓN
+# ==========================================
+def test_gzip_entero_y_por_bloques():
+    gzip = obtener_compresor("gzip")
+    datos = json.dumps([{"nombre": f"Producto {i}", "precio": 1.5} for i in range(2000)]).encode()
+    comprimido = gzip.comprimir(datos)
+    assert len(comprimido) * 5 < len(datos)
+    assert gzip.descomprimir(comprimido) == datos
+    descompresor = gzip.descompresor()
+    assert b"".join(descompresor.descomprimir(comprimido[i:i + 100]) for i in range(0, len(comprimido), 100)) == datos
+
+def test_opcionales_solo_si_estan_instalados():
+    disponibles = compresores_disponibles()
+    assert "gzip" in disponibles
+    assert ("br" in disponibles) == (importlib.util.find_spec("brotli") is not None)
+    assert ("zstd" in disponibles) == (importlib.util.find_spec("zstandard") is not None)
+    with pytest.raises(ValueError):
+        obtener_compresor("lzma")
+
+def test_negociar_respeta_calidades():
+    ofrecidas = ("zstd", "br", "gzip")
+    assert negociar("gzip, deflate", ofrecidas) == "gzip"
+    assert negociar("gzip;q=0.5, br", ofrecidas) == "br"
+    assert negociar("br;q=0, gzip", ofrecidas) == "gzip"
+    assert negociar("*", ofrecidas) == "zstd"
+    assert negociar("identity", ofrecidas) is None
+    assert negociar(None, ofrecidas) is None
+
+def test_politica_comprime_solo_por_encima_del_umbral():
+    politica = PoliticaCompresion(umbral=1024)
+    assert politica.comprimir_cuerpo(b'{"nombre":"Miel"}') == (b'{"nombre":"Miel"}', None)
+    cuerpo, codificacion = politica.comprimir_cuerpo(DESCRIPCION.encode())
+    assert codificacion == "gzip" and len(cuerpo) < 200
+    assert "gzip" in politica.accept_encoding()
+
+# ==========================================
+# 2. CONTRA EL SERVIDOR LOCAL
+# ==========================================
+def test_listados_comprimidos_y_parseo_incremental():
+    # El cuerpo llega a cuentagotas: iter_productos descomprime y parsea por bloques
+    lento = Inyeccion(cuerpo_lento=(256, 0))
+    with ServidorEcoMarket(productos=300, compresion=("gzip",), por_ruta={"GET /productos": lento}) as servidor:
+        with EcoMarketClient(servidor.base_url, compresion=True) as cliente:
+            response = cliente.session.get(f"{servidor.base_url}/productos")
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert int(response.headers["Content-Length"]) * 5 < len(response.content)
+            assert [p["id"] for p in cliente.iter_productos(tamano_pagina=100)] == list(range(1, 301))
+            assert cliente.listar_productos() == response.json()
+
+def test_cuerpos_de_peticion_comprimidos():
+    with ServidorEcoMarket(productos=0) as servidor:
+        with EcoMarketClient(servidor.base_url, compresion=PoliticaCompresion(umbral=1024)) as cliente:
+            creado = cliente.crear_producto({"nombre": "Miel", "precio": 5.0, "descripcion": DESCRIPCION})
+            assert cliente.obtener_producto(creado["id"])["descripcion"] == DESCRIPCION
+            cliente.crear_producto({"nombre": "Pan", "precio": 1.0})  # Chico: sale sin comprimir
+        assert servidor.bytes_recibidos < len(DESCRIPCION) / 5
+
+def test_servidor_rechaza_codificaciones_desconocidas_o_corruptas():
+    with ServidorEcoMarket(productos=0) as servidor:
+        url = f"{servidor.base_url}/productos"
+        assert requests.post(url, data=b"xx", headers={"Content-Encoding": "lzma"}).status_code == 415
+        assert requests.post(url, data=b"no es gzip", headers={"Content-Encoding": "gzip"}).status_code == 400
@@ -0,0 +1,170 @@
+import asyncio
+import threading
+
+import pytest
+
+from cliente_async import AsyncEcoMarketClient
+from cliente_ecomarket import BulkheadLlenoError, EcoMarketClient, EcoMarketError, LimiteTasaError
+from control_carga import ControlCarga, LimiteAdaptativo, LimitadorTasa, TokenBucket
+from servidor_local import Inyeccion, ServidorEcoMarket
+
+# ==========================================
+# 1. TOKEN BUCKET
+# ==========================================
+def test_rafaga_y_luego_la_tasa(reloj):
+    bucket = TokenBucket(tasa=10, rafaga=3, reloj=reloj)
+    assert [bucket.reservar() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Sin tokens: cada uno reserva el siguiente y espera más que el anterior
+    assert bucket.reservar() == pytest.approx(0.1)
+    assert bucket.reservar() == pytest.approx(0.2)
+    reloj.ahora = 1.0
+    assert bucket.intentar()
+
+def test_espera_maxima_rechaza_sin_consumir(reloj):
+    bucket = TokenBucket(tasa=1, rafaga=1, reloj=reloj)
+    assert bucket.intentar()
+    assert not bucket.intentar()
+    assert bucket.reservar(espera_maxima=0.5) is None
+    assert bucket.reservar(espera_maxima=1.0) == pytest.approx(1.0)
+    assert bucket.estadisticas()["rechazadas"] == 2
+
+def test_pausar_por_retry_after(reloj):
+    bucket = TokenBucket(tasa=10, rafaga=10, reloj=reloj)
+    bucket.pausar(2)
+    assert bucket.reservar() == pytest.approx(2.1)
+
+def test_limitador_global_y_por_operacion(reloj):
+    limitador = LimitadorTasa(tasa=100, por_operacion={"crear_producto": {"tasa": 1, "rafaga": 1}},
+                              espera_maxima=0, reloj=reloj)
+    assert limitador.adquirir("crear_producto")
+    assert not limitador.adquirir("crear_producto")  # Su bucket está vacío...
+    assert limitador.bucket_global.estadisticas()["tokens"] == pytest.approx(99)  # ...y el global se devolvió
+    assert all(limitador.adquirir("obtener_producto") for _ in range(50))
+
+# ==========================================
+# 2. LÍMITE ADAPTATIVO (AIMD)
+# ==========================================
+def _ciclo(limite, latencia=0.01, sobrecarga=False):
+    assert limite.adquirir()
+    limite.liberar(latencia, sobrecarga)
+
+def test_sube_con_el_limite_en_uso_y_baja_ante_sobrecarga(reloj):
+    limite = LimiteAdaptativo(inicial=2, maximo=10, reloj=reloj)
+    for _ in range(40):
+        assert limite.adquirir() and limite.adquirir()
+        reloj.ahora += 0.01
+        limite.liberar(0.01)
+        limite.liberar(0.01)
+    assert limite.estadisticas()["limite"] > 2
+
+    antes = limite.limite
+    reloj.ahora += 1
+    _ciclo(limite, sobrecarga=True)
+    assert limite.limite == pytest.approx(antes * 0.7)
+    # Otra señal de una petición que salió antes de esa reducción: se ignora
+    _ciclo(limite, latencia=2.0, sobrecarga=True)
+    assert limite.reducciones == 1
+
+def test_no_sube_si_el_limite_no_se_usa(reloj):
+    limite = LimiteAdaptativo(inicial=10, reloj=reloj)
+    for _ in range(100):
+        _ciclo(limite)
+    assert limite.limite == 10
+
+def test_pico_de_latencia_reduce(reloj):
+    limite = LimiteAdaptativo(inicial=10, tolerancia_latencia=2.0, reloj=reloj)
+    for _ in range(10):
+        _ciclo(limite, latencia=0.010)
+    reloj.ahora = 5.0
+    _ciclo(limite, latencia=0.050)
+    assert limite.reducciones == 1 and limite.limite == pytest.approx(7)
+
+def test_hilos_esperan_lugar():
+    limite = LimiteAdaptativo(inicial=1, maximo=1)
+    assert limite.adquirir()
+    entro = threading.Event()
+    hilo = threading.Thread(target=lambda: limite.adquirir() and entro.set())
+    hilo.start()
+    assert not entro.wait(0.05)
+    limite.liberar(0.01)
+    assert entro.wait(1)
+    hilo.join()
+
+def test_corrutinas_esperan_lugar_y_respetan_espera_maxima():
+    async def escenario():
+        limite = LimiteAdaptativo(inicial=1, maximo=1, espera_maxima=0.05)
+        assert await limite.adquirir_async()
+        assert not await limite.adquirir_async()  # Nadie libera a tiempo
+        limite.espera_maxima = None
+        esperando = asyncio.ensure_future(limite.adquirir_async())
+        await asyncio.sleep(0.01)
+        assert not esperando.done()
+        # Libera un hilo: la corrutina se despierta desde fuera del loop
+        await asyncio.get_running_loop().run_in_executor(None, limite.liberar, 0.01)
+        assert await asyncio.wait_for(esperando, 1)
+        return limite.estadisticas()
+
+    assert asyncio.run(escenario())["rechazadas"] == 1
+
+def test_rechazo_por_concurrencia_devuelve_el_token_de_tasa(reloj):
+    control = ControlCarga(tasa=LimitadorTasa(tasa=1, rafaga=5, reloj=reloj),
+                           concurrencia=LimiteAdaptativo(inicial=1, maximo=1, espera_maxima=0))
+    assert control.concurrencia.adquirir()  # Ocupa el único lugar
+    for _ in range(5):
+        with pytest.raises(BulkheadLlenoError):
+            control.ejecutar("obtener_producto", lambda: None)
+    assert control.tasa.bucket_global.estadisticas()["tokens"] == pytest.approx(5)
+
+def test_interrupcion_libera_el_lugar_en_vuelo():
+    control = ControlCarga(concurrencia=LimiteAdaptativo(inicial=1, maximo=1, espera_maxima=0))
+
+    def interrumpida():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        control.ejecutar("obtener_producto", interrumpida)
+    assert control.concurrencia.estadisticas()["en_vuelo"] == 0
+
+# ==========================================
+# 3. CON EL CLIENTE
+# ==========================================
+def test_backend_saturado_reduce_el_limite():
+    control = ControlCarga(concurrencia=LimiteAdaptativo(inicial=16, maximo=16))
+    with ServidorEcoMarket(inyeccion=Inyeccion(latencia="fija:20", capacidad=4)) as servidor:
+        with EcoMarketClient(servidor.base_url, pool_maxsize=16, control_carga=control) as cliente:
+            def leer(_):
+                for _ in range(5):
+                    try:
+                        cliente.obtener_producto(1)
+                    except EcoMarketError:
+                        pass
+
+            hilos = [threading.Thread(target=leer, args=(i,)) for i in range(16)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+    assert control.concurrencia.reducciones > 0
+    assert control.concurrencia.estadisticas()["limite"] < 16
+
+def test_retry_after_pausa_el_bucket_compartido():
+    control = ControlCarga(tasa=LimitadorTasa(tasa=100, espera_maxima=0))
+    with ServidorEcoMarket(inyeccion=Inyeccion(tasa_429=1.0, retry_after=5)) as servidor:
+        with EcoMarketClient(servidor.base_url, control_carga=control) as cliente:
+            with pytest.raises(EcoMarketError):
+                cliente.obtener_producto(1)
+            with pytest.raises(LimiteTasaError):
+                cliente.obtener_producto(2)  # Sin token por 5 s: no sale a la red
+        assert servidor.estadisticas()["peticiones"] == 1
+
+def test_cliente_async_con_control_de_carga():
+    async def escenario(base_url):
+        control = ControlCarga(tasa=LimitadorTasa(tasa=1000), concurrencia=LimiteAdaptativo(inicial=4))
+        async with AsyncEcoMarketClient(base_url, control_carga=control) as cliente:
+            resultados = await cliente.obtener_productos(range(1, 21))
+        return resultados, control.estadisticas()
+
+    with ServidorEcoMarket(productos=20) as servidor:
+        resultados, estadisticas = asyncio.run(escenario(servidor.base_url))
+    assert all(r.ok for r in resultados)
+    assert estadisticas["concurrencia"]["en_vuelo"] == 0
@@ -0,0 +1,153 @@
+import math
+import time
+
+import pytest
+import responses
+
+from cliente_ecomarket import EcoMarketClient, EcoMarketError
+from espejo_catalogo import EspejoCatalogo
+from servidor_local import Inyeccion, ServidorEcoMarket
+
+@pytest.fixture
+def servidor():
+    with ServidorEcoMarket(productos=50) as s:
+        yield s
+
+# ==========================================
+# 1. SINCRONIZACIÓN
+# ==========================================
+def test_completa_y_luego_incremental(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente, EcoMarketClient(servidor.base_url) as otro:
+        espejo = EspejoCatalogo(cliente)
+        assert espejo.sincronizar() == "completa"
+        assert espejo.contar() == 50
+
+        # Cambios hechos por otro proceso: solo llegan al sincronizar
+        otro.actualizar_producto_parcial(3, {"precio": 999.0})
+        otro.eliminar_producto(4)
+        nuevo = otro.crear_producto({"nombre": "Kéfir", "precio": 7.0, "categoria": "lacteos"})
+        assert espejo.obtener(3)["precio"] != 999.0
+
+        peticiones = servidor.estadisticas()["peticiones"]
+        assert espejo.sincronizar() == "incremental"
+        assert espejo.obtener(3)["precio"] == 999.0
+        assert espejo.obtener(4) is None
+        assert espejo.obtener(nuevo["id"])["nombre"] == "Kéfir"
+        assert espejo.contar() == 50
+        assert servidor.estadisticas()["peticiones"] == peticiones + 1
+        assert espejo.estadisticas()["sincronizaciones"] == {"completa": 1, "incremental": 1,
+                                                              "no_modificada": 0, "error": 0}
+
+@responses.activate
+def test_sin_cursor_usa_etag_y_304():
+    base = "http://ecomarket.test"
+    responses.add(responses.GET, f"{base}/productos", json=[{"id": 1, "categoria": "miel", "precio": 3.0}],
+                  headers={"ETag": '"v1"'})
+    responses.add(responses.GET, f"{base}/productos", status=304)
+    with EcoMarketClient(base) as cliente:
+        espejo = EspejoCatalogo(cliente)
+        assert espejo.sincronizar() == "completa"
+        assert espejo.sincronizar() == "no_modificada"
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert "updated_since" not in responses.calls[1].request.url
+    assert espejo.buscar(categoria="miel") == [{"id": 1, "categoria": "miel", "precio": 3.0}]
+
+def test_escrituras_del_cliente_se_aplican_al_instante(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente:
+        espejo = EspejoCatalogo(cliente)
+        espejo.sincronizar()
+        peticiones = servidor.estadisticas()["peticiones"]
+        creado = cliente.crear_producto({"nombre": "Polen", "precio": 12.0, "categoria": "miel"})
+        cliente.actualizar_producto_total(1, {"nombre": "Uvas", "precio": 2.0, "categoria": "frutas"})
+        cliente.eliminar_producto(2)
+        assert espejo.obtener(creado["id"])["nombre"] == "Polen"
+        assert espejo.obtener(1) == {"nombre": "Uvas", "precio": 2.0, "categoria": "frutas", "id": 1}
+        assert espejo.obtener(2) is None
+        assert servidor.estadisticas()["peticiones"] == peticiones + 3  # Sin lecturas extra
+
+def test_al_cerrar_deja_de_escuchar_al_cliente(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente:
+        with EspejoCatalogo(cliente) as espejo:
+            espejo.sincronizar()
+        assert cliente.actualizar_producto_parcial(1, {"precio": 3.0})["precio"] == 3.0
+
+def test_suscriptor_que_falla_no_hace_fallar_la_escritura(servidor, caplog):
+    def roto(producto_id, producto):
+        raise RuntimeError("suscriptor roto")
+
+    with EcoMarketClient(servidor.base_url) as cliente:
+        avisos = []
+        cliente.suscribir_escrituras(roto)
+        cliente.suscribir_escrituras(lambda *aviso: avisos.append(aviso))
+        assert cliente.actualizar_producto_parcial(1, {"precio": 4.0})["precio"] == 4.0
+        assert avisos and "suscriptor roto" in caplog.text
+
+def test_error_de_red_conserva_la_copia_y_reporta_antiguedad():
+    reloj = [1000.0]
+    with ServidorEcoMarket(productos=10, por_ruta={"GET /productos": Inyeccion(tasa_503=1.0)}) as servidor:
+        with EcoMarketClient(servidor.base_url) as cliente:
+            espejo = EspejoCatalogo(cliente, reloj=lambda: reloj[0])
+            assert espejo.antiguedad() == math.inf
+            with pytest.raises(EcoMarketError):
+                espejo.sincronizar()
+    estadisticas = espejo.estadisticas()
+    assert estadisticas["sincronizaciones"]["error"] == 1
+    assert "503" in estadisticas["ultimo_error"]
+
+@responses.activate
+@pytest.mark.parametrize("roto", [{"nombre": "sin id"}, "no soy un dict", {"id": "x"}])
+def test_payload_invalido_no_deja_la_transaccion_abierta(roto):
+    base = "http://ecomarket.test"
+    bueno = {"id": 1, "categoria": "miel", "precio": 3.0}
+    responses.add(responses.GET, f"{base}/productos", json=[bueno])
+    responses.add(responses.GET, f"{base}/productos", json=[dict(bueno, precio=9.0), roto])
+    responses.add(responses.GET, f"{base}/productos", json=[dict(bueno, precio=5.0)])
+    with EcoMarketClient(base) as cliente, EspejoCatalogo(cliente) as espejo:
+        espejo.sincronizar()
+        with pytest.raises(Exception):
+            espejo.sincronizar()
+        assert not espejo._db.in_transaction  # Ni el write-through ni el próximo BEGIN quedan colgados
+        assert espejo.buscar(precio_max=4) == [bueno]  # Nada a medias
+        assert espejo.estadisticas()["sincronizaciones"]["error"] == 1
+        assert espejo.sincronizar() == "completa"
+        assert espejo.buscar(precio_max=6) == [dict(bueno, precio=5.0)]
+
+@responses.activate
+def test_sincronizacion_en_segundo_plano_sobrevive_a_errores_inesperados(caplog):
+    base = "http://ecomarket.test"
+    responses.add(responses.GET, f"{base}/productos", json=[{"nombre": "sin id"}])
+    with EcoMarketClient(base) as cliente, EspejoCatalogo(cliente) as espejo:
+        espejo.iniciar(intervalo=0.01)
+        for _ in range(200):
+            if espejo.sincronizaciones["error"] >= 2:
+                break
+            time.sleep(0.01)
+        assert espejo._hilo.is_alive()
+        espejo.detener()
+    assert espejo.sincronizaciones["error"] >= 2
+    assert isinstance(espejo.ultimo_error, KeyError)
+    assert "Falló la sincronización" in caplog.text
+
+def test_persiste_en_archivo(tmp_path, servidor):
+    ruta = str(tmp_path / "catalogo.db")
+    with EcoMarketClient(servidor.base_url) as cliente:
+        with EspejoCatalogo(cliente, ruta) as espejo:
+            espejo.sincronizar()
+        with EspejoCatalogo(cliente, ruta) as reabierto:
+            assert reabierto.contar() == 50
+            assert reabierto.antiguedad() < 60
+            assert reabierto.sincronizar() == "incremental"
+
+# ==========================================
+# 2. CONSULTAS LOCALES
+# ==========================================
+def test_buscar_por_indices(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente:
+        espejo = EspejoCatalogo(cliente)
+        espejo.sincronizar()
+        todos = cliente.listar_productos()
+    esperados = [p for p in todos if p["categoria"] == "miel" and 2 <= p["precio"] <= 8]
+    assert espejo.buscar(categoria="miel", precio_min=2, precio_max=8) == esperados
+    assert espejo.buscar(precio_max=2, limite=3) == [p for p in todos if p["precio"] <= 2][:3]
+    assert espejo.buscar(producer_id=1) == []  # La colección en español no trae producerId
+    assert len(espejo.buscar()) == 50
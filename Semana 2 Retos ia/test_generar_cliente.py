@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import auditar_contrato
+import cliente_contrato
+from cliente_contrato import ClienteContrato
+from cliente_ecomarket import ConflictoError, EcoMarketError, ProductoNoEncontrado
+from generar_cliente import RUTA_CONTRATO, desactualizado, escribir, generar, hash_contrato, nombre_operacion
+from servidor_local import ServidorEcoMarket
+
+@pytest.fixture
+def cliente():
+    with ServidorEcoMarket(productos=20, productores=4, semilla=7) as servidor:
+        with ClienteContrato(servidor.base_url) as c:
+            yield c
+
+def _contrato_modificado(tmp_path):
+    with open(RUTA_CONTRATO, encoding="utf-8") as f:
+        texto = f.read()
+    ruta = tmp_path / "openapi.yaml"
+    ruta.write_text(texto.replace("      summary: Eliminar productor\n",
+                                  "      summary: Eliminar productor\n      operationId: bajaProductor\n"),
+                    encoding="utf-8")
+    return str(ruta)
+
+# ==========================================
+# 1. GENERACIÓN
+# ==========================================
+def test_archivo_generado_esta_al_dia():
+    # Si falla: python generar_cliente.py
+    assert not desactualizado()
+    assert cliente_contrato.HASH_CONTRATO == hash_contrato()
+
+def test_una_operacion_por_endpoint_del_contrato():
+    assert {(m, p) for m, p, _ in cliente_contrato.OPERACIONES} == {
+        ("GET", "/products"), ("POST", "/products"), ("GET", "/products/{id}"), ("PATCH", "/products/{id}"),
+        ("DELETE", "/products/{id}"), ("DELETE", "/producers/{id}"), ("GET", "/producers/{id}/products")}
+    assert all(hasattr(ClienteContrato, nombre) for _, _, nombre in cliente_contrato.OPERACIONES)
+
+def test_nombres_de_operacion():
+    assert nombre_operacion("get", "/products") == "listar_products"
+    assert nombre_operacion("put", "/products/{id}") == "actualizar_product_total"
+    assert nombre_operacion("get", "/producers/{id}/products") == "listar_products_de_producer"
+    assert nombre_operacion("delete", "/producers/{id}", {"operationId": "bajaProductor"}) == "baja_productor"
+
+def test_generacion_es_determinista():
+    assert generar() == generar()
+
+def test_modulo_generado_no_importa_yaml():
+    codigo = "import sys, cliente_contrato; print('yaml' in sys.modules or 'jsonschema' in sys.modules)"
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(cliente_contrato.__file__)), check=True)
+    assert salida.stdout.strip() == "False"
+
+# ==========================================
+# 2. CLIENTE GENERADO CONTRA EL SERVIDOR LOCAL
+# ==========================================
+def test_crud_con_el_cliente_generado(cliente):
+    creado = cliente.crear_product({"name": "Miel de Ulmo", "price": 120.0, "producerId": 2})
+    assert cliente.obtener_product(creado["id"])["name"] == "Miel de Ulmo"
+    assert cliente.actualizar_product_parcial(creado["id"], {"price": 99.5})["price"] == 99.5
+    assert [p["name"] for p in cliente.listar_products(name="ulmo")] == ["Miel de Ulmo"]
+    assert cliente.eliminar_product(creado["id"]) is True
+    with pytest.raises(ProductoNoEncontrado):
+        cliente.obtener_product(creado["id"])
+
+def test_endpoints_de_productores(cliente):
+    productos = cliente.listar_products_de_producer(1)
+    assert productos and all(p["producerId"] == 1 for p in productos)
+    with pytest.raises(ConflictoError):
+        cliente.eliminar_producer(1)
+    with pytest.raises(EcoMarketError):
+        cliente.listar_products_de_producer(999)
+
+def test_valida_el_cuerpo_antes_de_enviar(cliente):
+    with pytest.raises(ValueError, match="price"):
+        cliente.crear_product({"name": "Sin precio", "producerId": 1})
+    with pytest.raises(TypeError):
+        cliente.actualizar_product_parcial(1, {"stock": "muchos"})
+    with pytest.raises(TypeError):
+        cliente.obtener_product("1")  # El id es integer en el contrato
+
+def test_metodos_escritos_a_mano_siguen_disponibles(cliente):
+    assert cliente.obtener_producto(1)["id"] == 1
+
+# ==========================================
+# 3. AUDITORÍA POR HASH
+# ==========================================
+def test_auditoria_sin_deriva():
+    assert auditar_contrato.auditar(estricto=True)
+
+def test_auditoria_detecta_contrato_modificado(tmp_path):
+    assert not auditar_contrato.auditar(_contrato_modificado(tmp_path))
+
+def test_auditoria_estricta_detecta_edicion_a_mano(tmp_path):
+    generado = tmp_path / "cliente_contrato.py"
+    escribir(salida=str(generado))
+    assert auditar_contrato.auditar(archivo=str(generado), estricto=True)
+    generado.write_text(generado.read_text(encoding="utf-8").replace("(201,)", "(200, 201)"), encoding="utf-8")
+    assert auditar_contrato.auditar(archivo=str(generado))  # El hash no cambia...
+    assert not auditar_contrato.auditar(archivo=str(generado), estricto=True)  # ...el código sí
+
+def test_regenerar_con_operation_id(tmp_path):
+    contrato = _contrato_modificado(tmp_path)
+    generado = tmp_path / "cliente_contrato.py"
+    escribir(contrato, str(generado))
+    assert "def baja_productor(self, id: int) -> bool:" in generado.read_text(encoding="utf-8")
+    assert auditar_contrato.auditar(contrato, str(generado), estricto=True)
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from cliente_ecomarket import EcoMarketClient
+from hedging import Hedging
+from servidor_local import Inyeccion, ServidorEcoMarket
+
+def lenta_la_primera(segundos=0.5, error=None):
+    """Función cuya primera llamada tarda 'segundos' (o falla con 'error') y las demás responden al instante."""
+    llamadas = []
+    lock = threading.Lock()
+
+    def funcion():
+        with lock:
+            llamadas.append(1)
+            numero = len(llamadas)
+        if numero == 1:
+            if error is not None:
+                raise error
+            time.sleep(segundos)
+        return numero
+
+    return funcion, llamadas
+
+@pytest.fixture
+def hedging():
+    creados = []
+
+    def crear(**kwargs):
+        creados.append(Hedging(**kwargs))
+        return creados[-1]
+
+    yield crear
+    for h in creados:
+        h.cerrar()
+
+# ==========================================
+# 1. DECISIÓN DEL HEDGE
+# ==========================================
+def test_gana_la_segunda_si_la_primera_tarda(hedging):
+    h = hedging(retardo=0.01, presupuesto=1)
+    funcion, llamadas = lenta_la_primera()
+    inicio = time.perf_counter()
+    assert h.ejecutar("obtener_producto", funcion) == 2
+    assert time.perf_counter() - inicio < 0.3
+    stats = h.estadisticas()["obtener_producto"]
+    assert stats["hedges"] == 1 and stats["ganadas_por_hedge"] == 1
+
+def test_sin_hedge_si_responde_a_tiempo(hedging):
+    h = hedging(retardo=0.2, presupuesto=1)
+    assert h.ejecutar("obtener_producto", lambda: "ok") == "ok"
+    assert h.estadisticas()["total"]["hedges"] == 0
+
+def test_el_presupuesto_limita_los_hedges(hedging):
+    h = hedging(retardo=0.001, presupuesto=0.5, rafaga=1)
+    for _ in range(6):
+        h.ejecutar("obtener_producto", time.sleep, 0.01)
+    total = h.estadisticas()["total"]
+    assert total["hedges"] == 3 and total["sin_presupuesto"] == 3
+    assert total["tasa_hedge"] == pytest.approx(0.5)
+
+def test_retardo_derivado_del_percentil(hedging):
+    h = hedging(percentil=90, minimo_muestras=10, retardo_minimo=0)
+    assert h.retardo_para("obtener_producto") is None
+    for i in range(1, 11):
+        h._registrar("obtener_producto", i / 1000)
+    assert h.retardo_para("obtener_producto") == pytest.approx(0.010)
+    assert h.retardo_para("listar_productos") is None
+
+def test_errores(hedging):
+    h = hedging(retardo=0.05, presupuesto=1)
+    # La primera falla enseguida (antes del retardo): no hay hedge, sale el error
+    funcion, _ = lenta_la_primera(error=ConnectionError("caída"))
+    with pytest.raises(ConnectionError):
+        h.ejecutar("obtener_producto", funcion)
+
+    # Si falla la primera después de lanzar el hedge, gana la segunda
+    def lenta_y_falla():
+        time.sleep(0.1)
+        raise ConnectionError("tarde y mal")
+
+    intentos = iter([lenta_y_falla, lambda: "hedge"])
+    assert h.ejecutar("obtener_producto", lambda: next(intentos)()) == "hedge"
+
+def test_solo_lecturas_idempotentes(hedging):
+    h = hedging()
+    assert h.aplica("GET", "obtener_producto", {})
+    assert not h.aplica("POST", "crear_producto", {})
+    assert not h.aplica("GET", "iter_productos", {"stream": True})
+
+# ==========================================
+# 2. CON EL CLIENTE Y UN BACKEND CON COLA LARGA
+# ==========================================
+def test_recorta_la_cola_contra_el_servidor(hedging):
+    h = hedging(retardo=0.03, presupuesto=1)
+    with ServidorEcoMarket(productos=10, semilla=3, inyeccion=Inyeccion(latencia="cola:1:0.1:400")) as servidor:
+        with EcoMarketClient(servidor.base_url, hedging=h) as cliente:
+            latencias = []
+            for i in range(40):
+                inicio = time.perf_counter()
+                assert cliente.obtener_producto(i % 10 + 1)["id"] == i % 10 + 1
+                latencias.append(time.perf_counter() - inicio)
+            cliente.crear_producto({"nombre": "Miel", "precio": 5.0})
+    stats = h.estadisticas()
+    assert stats["obtener_producto"]["ganadas_por_hedge"] > 0
+    assert "crear_producto" not in stats
+    # Sin hedge las lentas tardan 400 ms; con hedge, el retardo más una rápida
+    # (salvo que el hedge también caiga en una lenta: 10% de las veces)
+    assert sum(latencia > 0.3 for latencia in latencias) <= 1
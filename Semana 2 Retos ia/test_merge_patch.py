@@ -0,0 +1,109 @@
+import pytest
+
+from cache_http import CacheLRU
+from cliente_ecomarket import EcoMarketClient, VersionObsoletaError
+from merge_patch import aplicar_merge_patch, calcular_merge_patch, tiene_nulos
+from servidor_local import ServidorEcoMarket
+
+BASE = {"id": 1, "nombre": "Miel", "precio": 5.0, "disponible": True,
+        "origen": {"pais": "AR", "provincia": "Córdoba"}, "etiquetas": ["orgánico"]}
+
+# ==========================================
+# 1. CÁLCULO DEL MERGE PATCH
+# ==========================================
+@pytest.mark.parametrize("cambios, esperado", [
+    ({}, {}),
+    ({"precio": 5.5}, {"precio": 5.5}),
+    ({"precio": 5}, {}),                                # 5 == 5.0 en JSON
+    ({"disponible": 1}, {"disponible": 1}),             # true != 1 en JSON
+    ({"origen": {"pais": "AR", "provincia": "Jujuy"}}, {"origen": {"provincia": "Jujuy"}}),
+    ({"origen": {"pais": "AR"}}, {"origen": {"provincia": None}}),
+    ({"etiquetas": ["orgánico", "sin tacc"]}, {"etiquetas": ["orgánico", "sin tacc"]}),  # Listas: enteras
+    ({"stock": 3}, {"stock": 3}),
+])
+def test_patch_minimo(cambios, esperado):
+    deseado = {**BASE, **cambios}
+    patch = calcular_merge_patch(BASE, deseado)
+    assert patch == esperado
+    assert aplicar_merge_patch(BASE, patch) == deseado
+
+def test_claves_borradas_e_ignoradas():
+    deseado = {k: v for k, v in BASE.items() if k not in ("id", "disponible")}
+    assert calcular_merge_patch(BASE, deseado, ignorar={"id"}) == {"disponible": None}
+    assert "disponible" not in aplicar_merge_patch(BASE, {"disponible": None})
+    assert BASE["disponible"] is True  # aplicar no modifica la base
+
+def test_nulos_no_expresables():
+    assert tiene_nulos({"a": [1, {"b": None}]})
+    assert not tiene_nulos(BASE)
+
+# ==========================================
+# 2. MODO DELTA DEL CLIENTE
+# ==========================================
+@pytest.fixture
+def servidor():
+    with ServidorEcoMarket(productos=5) as servidor:
+        yield servidor
+
+def peticiones(servidor):
+    return servidor.estadisticas()["peticiones"]
+
+def test_sin_cambios_no_sale_ninguna_peticion(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente:
+        base = cliente.obtener_producto(1)
+        antes = peticiones(servidor)
+        assert cliente.actualizar_producto_delta(1, dict(base), base=base) is base
+        assert peticiones(servidor) == antes
+        assert cliente.deltas.estadisticas()["peticiones_ahorradas"] == 1
+
+def test_elige_patch_o_put_por_tamano(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente:
+        base = cliente.obtener_producto(2)
+        actualizado = cliente.actualizar_producto_delta(2, {**base, "precio": 99.0}, base=base)
+        assert actualizado == {**base, "precio": 99.0}
+
+        # Cambia casi todo: el PUT pesa menos que el patch con todos los null
+        nuevo = {"nombre": "Otro"}
+        assert cliente.actualizar_producto_delta(2, nuevo, base=actualizado) == {"id": 2, **nuevo}
+        # Un null real solo se puede fijar con PUT
+        assert cliente.actualizar_producto_delta(2, {"nombre": "Otro", "categoria": None})["categoria"] is None
+
+        stats = cliente.deltas.estadisticas()
+        assert (stats["patch"], stats["put"]) == (1, 2)
+        assert stats["bytes_ahorrados"] > 0
+
+def test_base_de_la_cache_o_de_un_get(servidor):
+    with EcoMarketClient(servidor.base_url, cache=CacheLRU()) as cliente:
+        base = cliente.obtener_producto(3)
+        antes = peticiones(servidor)
+        cliente.actualizar_producto_delta(3, {**base, "precio": 1.0})
+        assert peticiones(servidor) == antes + 1  # Solo el PATCH: la base salió de la caché
+    with EcoMarketClient(servidor.base_url) as cliente:
+        antes = peticiones(servidor)
+        assert cliente.actualizar_producto_delta(3, {**base, "precio": 1.0})["precio"] == 1.0
+        assert peticiones(servidor) == antes + 1  # Solo el GET: ya estaba así
+
+def test_if_match_evita_pisar_cambios_ajenos(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente, EcoMarketClient(servidor.base_url) as otro:
+        response = cliente.session.get(f"{servidor.base_url}/productos/4")
+        base, etag = response.json(), response.headers["ETag"]
+        otro.actualizar_producto_parcial(4, {"precio": 7.0})
+
+        with pytest.raises(VersionObsoletaError) as error:
+            cliente.actualizar_producto_delta(4, {**base, "nombre": "Pisado"}, base=base, etag=etag)
+        assert error.value.status_code == 412
+        assert cliente.obtener_producto(4)["nombre"] == base["nombre"]
+
+        actual = cliente.session.get(f"{servidor.base_url}/productos/4")
+        assert cliente.actualizar_producto_total(4, {"nombre": "Ok"}, etag=actual.headers["ETag"])["nombre"] == "Ok"
+
+def test_lote_de_sincronizacion(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente:
+        bases = {p["id"]: p for p in cliente.listar_productos()}
+        deseados = {i: dict(p) for i, p in bases.items()}
+        deseados[5]["precio"] = 50.0
+        antes = peticiones(servidor)
+        reporte = cliente.actualizar_productos_delta_lote(deseados, bases, workers=2)
+        assert reporte.ok and reporte.exitos[5]["precio"] == 50.0
+        assert peticiones(servidor) == antes + 1
+        assert cliente.deltas.estadisticas()["peticiones_ahorradas"] == 4
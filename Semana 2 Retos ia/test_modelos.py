@@ -0,0 +1,101 @@
+import dataclasses
+import json
+
+import pytest
+
+from cliente_ecomarket import EcoMarketClient
+from codec_json import codecs_disponibles, obtener_codec
+from modelos import Producto, ProductoBatch
+from servidor_local import ServidorEcoMarket
+
+PRODUCTOS = [
+    {"id": 1, "nombre": "Café de Chiapas", "precio": 12.5, "categoria": "conservas", "disponible": True},
+    {"id": 2, "nombre": "Miel", "precio": 3.0, "categoria": "miel", "disponible": False,
+     "productor": {"id": 7}},
+    {"id": 30, "nombre": "Ñame", "precio": 4.25, "categoria": "verduras", "disponible": True,
+     "creado_en": "2024-01-01T00:00:00Z"},
+    {"id": 4, "nombre": "Miel oscura", "precio": 5.0, "categoria": "miel", "disponible": True},
+]
+
+# ==========================================
+# 1. PRODUCTO
+# ==========================================
+def test_producto_compacto_e_inmutable():
+    producto = Producto.desde_dict(PRODUCTOS[1])
+    assert producto == Producto(2, "Miel", 3.0, "miel", False, {"id": 7})
+    assert not hasattr(producto, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        producto.precio = 1.0
+    assert producto.a_dict() == PRODUCTOS[1]
+
+def test_categorias_internadas():
+    decodificados = json.loads(json.dumps(PRODUCTOS))
+    a, b = Producto.desde_dict(decodificados[1]), Producto.desde_dict(decodificados[3])
+    assert decodificados[1]["categoria"] is not decodificados[3]["categoria"]
+    assert a.categoria is b.categoria
+
+# ==========================================
+# 2. PRODUCTOBATCH
+# ==========================================
+def test_batch_ida_y_vuelta_con_dicts():
+    batch = ProductoBatch.desde_dicts(iter(PRODUCTOS))
+    assert len(batch) == 4
+    assert batch.a_dicts() == PRODUCTOS
+    assert [batch[i] for i in range(4)] == PRODUCTOS
+    assert batch[-1] == PRODUCTOS[-1]
+    assert batch.categorias == ["conservas", "miel", "verduras"]
+    assert list(batch.codigos) == [0, 1, 2, 1]
+    with pytest.raises(IndexError):
+        batch[4]
+
+def test_batch_acceso_por_id_slices_y_productos():
+    batch = ProductoBatch.desde_dicts(PRODUCTOS)
+    assert batch.por_id(30)["nombre"] == "Ñame"
+    assert batch.por_id(99) is None
+    batch.agregar({"id": 99, "nombre": "Queso", "precio": 8, "categoria": "lacteos"})
+    assert batch.por_id(99) == {"id": 99, "nombre": "Queso", "precio": 8.0, "categoria": "lacteos",
+                                "disponible": True}
+    assert batch[1:3].a_dicts() == PRODUCTOS[1:3]
+    assert batch.producto(1) == Producto.desde_dict(PRODUCTOS[1])
+    assert list(batch.productos())[2].creado_en == "2024-01-01T00:00:00Z"
+
+def test_batch_los_dicts_son_copias():
+    batch = ProductoBatch.desde_dicts(PRODUCTOS)
+    batch[0]["precio"] = 0
+    assert batch[0]["precio"] == 12.5
+
+def test_batch_exige_campos_requeridos():
+    with pytest.raises(KeyError):
+        ProductoBatch.desde_dicts([{"id": 1, "nombre": "Sin precio", "categoria": "miel"}])
+
+@pytest.mark.parametrize("fila, error", [
+    ({"id": 9, "precio": 1.0, "categoria": "miel"}, KeyError),                    # Sin nombre
+    ({"id": 9, "nombre": "Caro", "precio": "mucho", "categoria": "miel"}, TypeError),
+    ({"id": "9", "nombre": "Id texto", "precio": 1.0, "categoria": "miel"}, TypeError),
+])
+def test_fila_invalida_no_deja_el_batch_a_medias(fila, error):
+    batch = ProductoBatch.desde_dicts(PRODUCTOS[:2])
+    batch.por_id(1)  # Con el índice por id ya armado
+    with pytest.raises(error):
+        batch.extender([PRODUCTOS[2], fila])
+    assert len(batch) == 3
+    assert list(batch) == PRODUCTOS[:3] and batch[-1] == PRODUCTOS[2]
+    assert batch.por_id(9) is None
+    batch.agregar(PRODUCTOS[3])
+    assert list(batch) == PRODUCTOS
+
+# ==========================================
+# 3. DESDE EL CLIENTE
+# ==========================================
+def test_codec_decodifica_a_batch():
+    for nombre in codecs_disponibles():
+        batch = obtener_codec(nombre).decodificar_como(json.dumps(PRODUCTOS).encode(), ProductoBatch)
+        assert isinstance(batch, ProductoBatch) and batch.a_dicts() == PRODUCTOS
+
+def test_cliente_devuelve_batch_cuando_se_pide():
+    with ServidorEcoMarket(productos=30) as servidor:
+        with EcoMarketClient(servidor.base_url) as cliente:
+            batch = cliente.listar_productos(tipo=ProductoBatch)
+            listado = cliente.listar_productos()
+            streaming = ProductoBatch.desde_dicts(cliente.iter_productos(tamano_pagina=7))
+    assert batch.a_dicts() == listado == streaming.a_dicts()
@@ -0,0 +1,162 @@
+import io
+import json
+import logging
+import random
+import sys
+import threading
+
+import pytest
+
+import retry
+from cliente_ecomarket import EcoMarketClient, ProductoNoEncontrado
+from observabilidad import FormateadorJSON, Histograma, Metricas, Observador, sanitizar_cabeceras
+from retry import PoliticaReintentos, PresupuestoReintentos, with_retry
+from servidor_local import Inyeccion, ServidorEcoMarket
+
+@pytest.fixture
+def logs():
+    """Logger propio con salida JSON a un buffer."""
+    salida = io.StringIO()
+    manejador = logging.StreamHandler(salida)
+    manejador.setFormatter(FormateadorJSON())
+    log = logging.getLogger("test.observabilidad")
+    log.addHandler(manejador)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    yield log, lambda: [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    log.removeHandler(manejador)
+
+# ==========================================
+# 1. HISTOGRAMA
+# ==========================================
+def test_histograma_percentiles_con_error_acotado():
+    azar = random.Random(1)
+    valores = [int(azar.lognormvariate(7, 1.2)) for _ in range(20_000)]
+    histograma = Histograma()
+    for valor in valores:
+        histograma.registrar(valor)
+    valores.sort()
+    for p in (50, 90, 99, 99.9):
+        exacto = valores[int(len(valores) * p / 100 + 0.5) - 1]
+        assert abs(histograma.percentil(p) - exacto) <= exacto * 2 / histograma.sub_cubetas + 1
+    assert histograma.percentil(100) == valores[-1]
+
+def test_histograma_memoria_constante_y_combinar():
+    a, b = Histograma(), Histograma()
+    cubetas = len(a.cubetas)
+    for valor in range(0, 10_000_000, 997):
+        a.registrar(valor)
+    a.registrar(2 ** 40)  # Se recorta al máximo
+    assert len(a.cubetas) == cubetas
+    b.registrar(5)
+    b.combinar(a)
+    assert b.total == a.total + 1
+    assert b.resumen()["min"] == 0 and b.resumen()["max"] == a.maximo
+    with pytest.raises(ValueError):
+        b.combinar(Histograma(bits_precision=5))
+
+def test_contadores_por_ruta_no_pierden_sumas_entre_hilos():
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Cambios de hilo muy frecuentes para provocar carreras
+    try:
+        metricas = Metricas().ruta("GET", "/productos/{id}")
+
+        def registrar():
+            for i in range(5_000):
+                metricas.contar(200, reintento=i % 2 == 0, error_red=False)
+                metricas.contar(None, reintento=False, error_red=True)
+
+        hilos = [threading.Thread(target=registrar) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        sys.setswitchinterval(intervalo)
+    assert metricas.contadores() == {"por_status": {200: 40_000}, "reintentos": 20_000, "errores_red": 40_000}
+
+def test_sanitizar_cabeceras():
+    limpias = sanitizar_cabeceras({"Authorization": "Bearer secreto", "X-Api-Key": "k", "Accept": "*/*"})
+    assert limpias == {"Authorization": "Bearer [OFUSCADO]", "X-Api-Key": "[OFUSCADO]", "Accept": "*/*"}
+
+# ==========================================
+# 2. OBSERVADOR EN EL CLIENTE
+# ==========================================
+def test_registra_fases_status_y_bytes(logs):
+    log, leer = logs
+    observador = Observador(log=log)
+    with ServidorEcoMarket(productos=5) as servidor:
+        with EcoMarketClient(servidor.base_url, observador=observador) as cliente:
+            cliente.session.headers["Authorization"] = "Bearer secreto"
+            for i in range(1, 6):
+                cliente.obtener_producto(i)
+            with pytest.raises(ProductoNoEncontrado):
+                cliente.obtener_producto(99)
+            cliente.listar_productos()
+
+    resumen = observador.metricas.resumen()
+    obtener = resumen["GET /productos/{id}"]
+    assert obtener["por_status"] == {200: 5, 404: 1}
+    assert obtener["total"]["n"] == 6
+    assert obtener["conexion"]["n"] == 1  # keep-alive: una sola conexión nueva
+    assert obtener["ttfb"]["max"] <= obtener["total"]["max"]
+    assert resumen["GET /productos"]["bytes"]["max"] > obtener["bytes"]["max"]
+
+    registros = leer()
+    assert [r["level"] for r in registros].count("ERROR") == 1
+    error = next(r for r in registros if r["level"] == "ERROR")
+    assert error["status"] == 404 and error["route"] == "/productos/{id}"
+    assert error["headers"]["Authorization"] == "Bearer [OFUSCADO]"
+    assert error["connect_ms"] is None and error["duration_ms"] > 0
+
+def test_muestreo_solo_afecta_a_los_exitos(logs):
+    log, leer = logs
+    observador = Observador(log=log, muestreo=0.0)
+    with ServidorEcoMarket(productos=3) as servidor:
+        with EcoMarketClient(servidor.base_url, observador=observador) as cliente:
+            cliente.listar_productos()
+            with pytest.raises(ProductoNoEncontrado):
+                cliente.obtener_producto(99)
+    assert [r["message"] for r in leer()] == ["Fallo HTTP 404"]
+    assert observador.metricas.resumen()["GET /productos"]["total"]["n"] == 1
+
+def test_respuesta_lenta_es_warn(logs):
+    log, leer = logs
+    observador = Observador(log=log, muestreo=0.0, umbral_lento_ms=10)
+    with ServidorEcoMarket(inyeccion=Inyeccion(latencia="fija:30")) as servidor:
+        with EcoMarketClient(servidor.base_url, observador=observador) as cliente:
+            cliente.obtener_producto(1)
+    assert [r["level"] for r in leer()] == ["WARNING"]
+
+def test_cuenta_reintentos(monkeypatch, logs):
+    log, leer = logs
+    monkeypatch.setattr(retry.time, "sleep", lambda segundos: None)
+    observador = Observador(log=log, muestreo=0.0)
+    politica = PoliticaReintentos(max_reintentos=5, respetar_retry_after=False,
+                                  presupuesto=PresupuestoReintentos(minimo_por_segundo=100))
+    por_ruta = {"GET /productos/{id}": Inyeccion(tasa_503=0.5)}
+    with ServidorEcoMarket(por_ruta=por_ruta, semilla=3) as servidor:
+        with EcoMarketClient(servidor.base_url, observador=observador) as cliente:
+            obtener = with_retry(cliente.obtener_producto, politica=politica)
+            for i in range(1, 11):
+                obtener(i)
+    metricas = observador.metricas.resumen()["GET /productos/{id}"]
+    assert metricas["reintentos"] == metricas["por_status"][503] > 0
+    assert {r["retry"] for r in leer()} - {0}  # Los 503 logueados traen su número de reintento
+
+def test_reintentos_se_loguean_correlacionados_con_las_peticiones(monkeypatch, logs):
+    log, leer = logs
+    monkeypatch.setattr(retry.time, "sleep", lambda segundos: None)
+    politica = PoliticaReintentos(max_reintentos=2, respetar_retry_after=False, presupuesto=None, log=log)
+    with ServidorEcoMarket(inyeccion=Inyeccion(tasa_503=1.0)) as servidor:
+        with EcoMarketClient(servidor.base_url, observador=Observador(log=log)) as cliente:
+            with pytest.raises(Exception):
+                politica.ejecutar(cliente.obtener_producto, 1)
+    registros = leer()
+    assert [(r.get("operation"), r["retry"], r["level"]) for r in registros] == [
+        (None, 0, "ERROR"), ("obtener_producto", 0, "WARNING"),
+        (None, 1, "ERROR"), ("obtener_producto", 1, "WARNING"),
+        (None, 2, "ERROR"), ("obtener_producto", 2, "ERROR"),
+    ]
+    assert len({r["call_id"] for r in registros}) == 1 and registros[0]["call_id"]
+    assert registros[-1]["reason"] == "sin reintentos" and registros[-1]["status"] == 503
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+import requests
+
+import retry
+from retry import (
+    PoliticaReintentos,
+    PresupuestoReintentos,
+    clasificar_error,
+    parsear_retry_after,
+    with_retry,
+)
+from cliente_ecomarket import EcoMarketError
+
+def respuesta(status, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    return resp
+
+def error_http(status, headers=None):
+    return requests.exceptions.HTTPError(f"{status} Error", response=respuesta(status, headers))
+
+@pytest.fixture
+def esperas(monkeypatch):
+    """Reemplaza time.sleep para que los tests no duerman y registren las esperas."""
+    registro = []
+    monkeypatch.setattr(retry.time, "sleep", registro.append)
+    return registro
+
+def falla_n_veces(n, error):
+    llamadas = {"n": 0}
+    def funcion():
+        llamadas["n"] += 1
+        if llamadas["n"] <= n:
+            raise error
+        return "OK"
+    return funcion, llamadas
+
+# ==========================================
+# CLASIFICACIÓN DE ERRORES
+# ==========================================
+
+@pytest.mark.parametrize("status, esperado", [(408, True), (429, True), (503, True), (500, True),
+                                              (400, False), (404, False), (409, False)])
+def test_clasificar_por_status(status, esperado):
+    assert clasificar_error(error_http(status))[0] is esperado
+
+def test_clasificar_errores_de_red_y_url_invalida():
+    assert clasificar_error(requests.exceptions.ConnectionError("caído"))[0] is True
+    assert clasificar_error(requests.exceptions.MissingSchema("sin http"))[0] is False
+
+def test_clasificar_ecomarket_error_con_respuesta():
+    assert clasificar_error(EcoMarketError("503", response=respuesta(503))) == (True, 503, None)
+
+def test_parsear_retry_after_segundos_y_fecha():
+    assert parsear_retry_after("7") == 7.0
+    assert parsear_retry_after("Thu, 01 Jan 1970 00:01:40 GMT", ahora=40) == 60.0
+    assert parsear_retry_after("mañana") is None
+
+# ==========================================
+# POLÍTICA DE REINTENTOS
+# ==========================================
+
+def test_reintenta_429_respetando_retry_after(esperas):
+    funcion, llamadas = falla_n_veces(1, error_http(429, {"Retry-After": "5"}))
+    politica = PoliticaReintentos(base_delay=0.01, presupuesto=None)
+    assert politica.ejecutar(funcion) == "OK"
+    assert esperas == [5.0]
+
+def test_no_reintenta_404(esperas):
+    funcion, llamadas = falla_n_veces(1, error_http(404))
+    with pytest.raises(requests.exceptions.HTTPError):
+        PoliticaReintentos(presupuesto=None).ejecutar(funcion)
+    assert llamadas["n"] == 1
+
+def test_deadline_corta_antes_de_dormir_de_mas(esperas):
+    funcion, llamadas = falla_n_veces(5, error_http(503, {"Retry-After": "30"}))
+    with pytest.raises(requests.exceptions.HTTPError):
+        PoliticaReintentos(deadline=10, presupuesto=None).ejecutar(funcion)
+    assert esperas == []
+    assert llamadas["n"] == 1
+
+def test_jitter_decorrelacionado_respeta_limites():
+    politica = PoliticaReintentos(base_delay=1, max_delay=8, jitter="decorrelacionado", presupuesto=None)
+    espera = 1
+    for reintento in range(1, 20):
+        espera = politica.calcular_espera(reintento, espera)
+        assert 1 <= espera <= 8
+
+def test_jitter_invalido():
+    with pytest.raises(ValueError):
+        PoliticaReintentos(jitter="gaussiano")
+
+def test_presupuesto_limita_reintentos():
+    reloj = lambda: 100.0
+    presupuesto = PresupuestoReintentos(ratio=0.5, minimo_por_segundo=0, ventana=10, reloj=reloj)
+    for _ in range(4):
+        presupuesto.registrar_peticion()
+    assert [presupuesto.intentar_reintento() for _ in range(3)] == [True, True, False]
+    assert presupuesto.estadisticas() == {"peticiones": 4, "reintentos": 2, "rechazados": 1}
+
+def test_presupuesto_agotado_falla_sin_esperar(esperas):
+    presupuesto = PresupuestoReintentos(ratio=0, minimo_por_segundo=0)
+    funcion, llamadas = falla_n_veces(1, error_http(503))
+    with pytest.raises(requests.exceptions.HTTPError):
+        PoliticaReintentos(presupuesto=presupuesto).ejecutar(funcion)
+    assert esperas == []
+
+# ==========================================
+# DECORADOR (sync y async)
+# ==========================================
+
+def test_decorador_sin_argumentos_sigue_funcionando(esperas):
+    funcion, llamadas = falla_n_veces(2, error_http(503))
+    assert with_retry(funcion)() == "OK"
+    assert llamadas["n"] == 3
+    assert len(esperas) == 2
+
+def test_decorador_async_usa_asyncio_sleep(monkeypatch):
+    esperas = []
+    async def dormir(segundos):
+        esperas.append(segundos)
+    monkeypatch.setattr(retry.asyncio, "sleep", dormir)
+    llamadas = {"n": 0}
+
+    @with_retry(politica=PoliticaReintentos(base_delay=0.5, presupuesto=None))
+    async def obtener():
+        llamadas["n"] += 1
+        if llamadas["n"] < 3:
+            raise error_http(502)
+        return "OK"
+
+    assert asyncio.run(obtener()) == "OK"
+    assert len(esperas) == 2
@@ -0,0 +1,173 @@
+import asyncio
+import random
+import socket
+
+import pytest
+import requests
+
+import retry
+from cliente_ecomarket import EcoMarketClient, EcoMarketError, ProductoNoEncontrado
+from retry import PoliticaReintentos, PresupuestoReintentos, with_retry
+from servidor_local import Inyeccion, Latencia, ServidorEcoMarket, generar_carga
+
+@pytest.fixture
+def servidor():
+    with ServidorEcoMarket(productos=20, productores=4, semilla=7) as s:
+        yield s
+
+# ==========================================
+# 1. RUTAS DEL CONTRATO
+# ==========================================
+def test_rutas_salen_del_contrato(servidor):
+    rutas = {(r.metodo, r.plantilla) for r in servidor.rutas}
+    assert ("GET", "/products") in rutas
+    assert ("DELETE", "/producers/{id}") in rutas
+    assert ("GET", "/producers/{id}/products") in rutas
+    assert ("PUT", "/productos/{id}") in rutas  # Alias del cliente
+
+def test_crud_products(servidor):
+    base = servidor.base_url
+    creado = requests.post(f"{base}/products", json={"name": "Miel de Ulmo", "price": 120.0, "producerId": 2})
+    assert creado.status_code == 201
+    producto_id = creado.json()["id"]
+
+    assert requests.get(f"{base}/products/{producto_id}").json()["name"] == "Miel de Ulmo"
+    assert requests.patch(f"{base}/products/{producto_id}", json={"price": 99.5}).json()["price"] == 99.5
+    assert [p["name"] for p in requests.get(f"{base}/products", params={"name": "ulmo"}).json()] == ["Miel de Ulmo"]
+    assert requests.delete(f"{base}/products/{producto_id}").status_code == 204
+    assert requests.get(f"{base}/products/{producto_id}").status_code == 404
+
+def test_post_valida_product_input(servidor):
+    respuesta = requests.post(f"{servidor.base_url}/products", json={"name": "Sin precio", "producerId": 1})
+    assert respuesta.status_code == 400
+    assert "price" in respuesta.json()["error"]
+
+def test_rutas_y_metodos_desconocidos(servidor):
+    assert requests.get(f"{servidor.base_url}/clientes").status_code == 404
+    assert requests.put(f"{servidor.base_url}/products/1", json={}).status_code == 405
+
+def test_borrar_productor_con_productos_da_409(servidor):
+    base = servidor.base_url
+    respuesta = requests.delete(f"{base}/producers/1")
+    assert respuesta.status_code == 409
+    assert respuesta.json()["code"] == "DEPENDENT_RESOURCES_EXIST"
+
+    for producto in requests.get(f"{base}/producers/1/products").json():
+        requests.delete(f"{base}/products/{producto['id']}")
+    assert requests.delete(f"{base}/producers/1").status_code == 204
+    assert requests.get(f"{base}/producers/1/products").status_code == 404
+
+def test_cliente_ecomarket_contra_alias(servidor):
+    with EcoMarketClient(servidor.base_url) as cliente:
+        creado = cliente.crear_producto({"nombre": "Queso", "precio": 80.0, "categoria": "lacteos"})
+        assert cliente.obtener_producto(creado["id"])["nombre"] == "Queso"
+        assert cliente.actualizar_producto_total(creado["id"], {"nombre": "Queso de cabra", "precio": 95.0,
+                                                                "categoria": "lacteos"})["precio"] == 95.0
+        assert len(list(cliente.iter_productos(tamano_pagina=7))) == 21
+        assert cliente.eliminar_producto(creado["id"])
+        with pytest.raises(ProductoNoEncontrado):
+            cliente.obtener_producto(creado["id"])
+
+def test_listado_con_etag_y_cambios_desde_un_cursor(servidor):
+    base = servidor.base_url
+    listado = requests.get(f"{base}/productos")
+    assert requests.get(f"{base}/productos", headers={"If-None-Match": listado.headers["ETag"]}).status_code == 304
+
+    cursor = listado.headers["X-Sync-Cursor"]
+    requests.patch(f"{base}/productos/5", json={"precio": 1.0})
+    requests.delete(f"{base}/productos/6")
+    cambios = requests.get(f"{base}/productos", params={"updated_since": cursor})
+    assert [p["id"] for p in cambios.json()] == [5]
+    assert cambios.headers["X-Deleted-Ids"] == "6"
+    assert int(cambios.headers["X-Sync-Cursor"]) == int(cursor) + 2
+
+def test_busqueda_por_ids(servidor):
+    respuesta = requests.get(f"{servidor.base_url}/products", params={"ids": "7,3,7,999"})
+    assert [p["id"] for p in respuesta.json()] == [7, 3]
+
+def test_patch_es_merge_patch_con_if_match(servidor):
+    url = f"{servidor.base_url}/productos/3"
+    etag = requests.get(url).headers["ETag"]
+    actualizado = requests.patch(url, json={"categoria": None}, headers={"If-Match": etag})
+    assert actualizado.status_code == 200 and "categoria" not in actualizado.json()
+    assert actualizado.headers["ETag"] != etag
+
+    obsoleto = requests.patch(url, json={"precio": 1.0}, headers={"If-Match": etag})
+    assert obsoleto.status_code == 412
+    assert obsoleto.headers["ETag"] == actualizado.headers["ETag"]
+
+# ==========================================
+# 2. INYECCIÓN DE FALLAS
+# ==========================================
+def test_503_con_retry_after():
+    with ServidorEcoMarket(inyeccion=Inyeccion(tasa_503=1.0, retry_after=3)) as servidor:
+        respuesta = requests.get(f"{servidor.base_url}/products/1")
+    assert respuesta.status_code == 503
+    assert respuesta.headers["Retry-After"] == "3"
+
+def test_inyeccion_por_ruta():
+    por_ruta = {"GET /products/{id}": Inyeccion(tasa_429=1.0)}
+    with ServidorEcoMarket(por_ruta=por_ruta) as servidor:
+        assert requests.get(f"{servidor.base_url}/products/1").status_code == 429
+        assert requests.get(f"{servidor.base_url}/products").status_code == 200
+
+def test_reintentos_superan_errores_intermitentes(monkeypatch):
+    monkeypatch.setattr(retry.time, "sleep", lambda segundos: None)
+    politica = PoliticaReintentos(max_reintentos=10, respetar_retry_after=False,
+                                  presupuesto=PresupuestoReintentos(minimo_por_segundo=1000))
+    with ServidorEcoMarket(inyeccion=Inyeccion(tasa_503=0.2, tasa_429=0.1), semilla=3) as servidor:
+        with EcoMarketClient(servidor.base_url) as cliente:
+            obtener = with_retry(cliente.obtener_producto, politica=politica)
+            assert all(obtener(i)["id"] == i for i in range(1, 21))
+        estadisticas = servidor.estadisticas()
+    assert estadisticas["por_status"][200] == 20
+    assert estadisticas["por_status"].get(503, 0) + estadisticas["por_status"].get(429, 0) > 0
+
+def test_latencia_provoca_timeout_del_cliente():
+    with ServidorEcoMarket(inyeccion=Inyeccion(latencia="fija:300")) as servidor:
+        with EcoMarketClient(servidor.base_url, timeout=0.05) as cliente:
+            with pytest.raises(EcoMarketError):
+                cliente.listar_productos()
+
+def test_cuerpo_lento_dispara_timeout_de_lectura():
+    with ServidorEcoMarket(inyeccion=Inyeccion(cuerpo_lento=(16, 200))) as servidor:
+        respuesta = requests.get(f"{servidor.base_url}/products/1", stream=True, timeout=1)
+        assert respuesta.status_code == 200  # Las cabeceras llegan sin esperar al cuerpo
+        respuesta.close()
+        with EcoMarketClient(servidor.base_url, timeout=0.1) as cliente:
+            with pytest.raises(EcoMarketError):
+                cliente.listar_productos()
+
+def test_distribuciones_de_latencia():
+    azar = random.Random(0)
+    assert Latencia("fija:5").muestra(azar) == 0.005
+    assert 0.001 <= Latencia("uniforme:1:10").muestra(azar) <= 0.010
+    assert not Latencia("0")
+    cola = sorted(Latencia("cola:5:0.1:100").muestra(azar) for _ in range(1000))
+    assert cola[500] == 0.005 and cola[-1] == 0.1 and 50 < sum(m == 0.1 for m in cola) < 150
+    with pytest.raises(ValueError):
+        Latencia("gamma:1:2")
+    with pytest.raises(ValueError):
+        Latencia("normal:5")
+
+# ==========================================
+# 3. KEEP-ALIVE, PIPELINING Y CARGA
+# ==========================================
+def test_pipelining_respeta_el_orden():
+    with ServidorEcoMarket(por_ruta={"GET /products/{id}": Inyeccion(latencia="fija:20")}) as servidor:
+        with socket.create_connection((servidor.host, servidor.puerto)) as conexion:
+            conexion.sendall(b"GET /products/2 HTTP/1.1\r\n\r\nGET /products HTTP/1.1\r\n\r\n"
+                             b"GET /products/3 HTTP/1.1\r\nConnection: close\r\n\r\n")
+            datos = b""
+            while True:
+                bloque = conexion.recv(65536)
+                if not bloque:
+                    break
+                datos += bloque
+    assert datos.count(b"HTTP/1.1 200 OK") == 3
+    assert datos.index(b'"id":2}') < datos.index(b'[') < datos.index(b'"id":3}')
+
+def test_generador_de_carga(servidor):
+    resultado = asyncio.run(generar_carga(servidor.base_url, conexiones=4, duracion=0.3, profundidad=4))
+    assert resultado["peticiones_por_segundo"] > 0
+    assert servidor.estadisticas()["peticiones"] > 0
@@ -0,0 +1,95 @@
+import random
+import string
+
+import pytest
+
+from url_builder import Ruta, URLBuilder, codificar_query, rutas_desde_openapi
+
+BASE = "https://api.ecomarket.com"
+
+@pytest.fixture
+def builder():
+    return URLBuilder(BASE + "/")
+
+# ==========================================
+# 1. EQUIVALENCIA CON LA IMPLEMENTACIÓN ORIGINAL
+# ==========================================
+@pytest.mark.parametrize("endpoint, resource_id, query", [
+    ("productos", None, None),
+    ("/productos/", 42, None),
+    ("productos", "../../etc/passwd", None),
+    ("productos", "café con leche", {"categoria": "miel&admin=true"}),
+    ("buscar", None, {"q": "Café & Postres / Delicia", "pagina": 2, "activo": True}),
+    ("productos", 0, {"etiquetas": ["a", "b"]}),
+])
+def test_build_url_igual_al_original(builder, endpoint, resource_id, query):
+    assert builder.build_url(endpoint, resource_id, query) == builder.build_url_original(endpoint, resource_id, query)
+
+def test_build_url_igual_al_original_con_valores_al_azar(builder):
+    azar = random.Random(13)
+    alfabeto = string.printable + "áéíóúñ€"
+    for _ in range(500):
+        texto = "".join(azar.choice(alfabeto) for _ in range(azar.randint(0, 12)))
+        resource_id = azar.choice([None, azar.randint(-5, 10**6), texto])
+        query = {texto: texto[::-1], "n": azar.random()} if azar.random() < 0.5 else None
+        assert builder.build_url("productos", resource_id, query) == \
+            builder.build_url_original("productos", resource_id, query)
+
+def test_build_url_rechaza_ids_de_otro_tipo(builder):
+    with pytest.raises(TypeError):
+        builder.build_url("productos", resource_id=1.5)
+
+def test_codificar_query_bytes_como_urlencode():
+    import urllib.parse
+
+    query = {"a": b"x y", b"cl ave": "v&w", "n": 1}
+    assert codificar_query(query) == urllib.parse.urlencode(query) == "a=x+y&cl+ave=v%26w&n=1"
+
+def test_codificar_query_distingue_1_de_true():
+    # Con memo typed=True, 1 y True no comparten entrada
+    assert codificar_query({"a": 1}) == "a=1"
+    assert codificar_query({"a": True}) == "a=True"
+
+# ==========================================
+# 2. PLANTILLAS COMPILADAS
+# ==========================================
+def test_ruta_escapa_cada_parametro():
+    ruta = Ruta("/producers/{id}/products/{sku}")
+    assert ruta.parametros == ["id", "sku"]
+    assert ruta.construir({"id": 3, "sku": "../admin?x=1"}) == "/producers/3/products/..%2Fadmin%3Fx%3D1"
+    with pytest.raises(ValueError):
+        ruta.construir({"id": 3})
+
+def test_ruta_de_un_parametro_valida_igual():
+    ruta = Ruta("/productos/{id}", {"id": "integer"})
+    assert ruta.construir({"id": 7}) == "/productos/7"
+    for invalido in (True, "7", 1.5):
+        with pytest.raises(TypeError):
+            ruta.construir({"id": invalido})
+    with pytest.raises(ValueError):
+        ruta.construir({})
+    assert Ruta("/items/{sku}/detalle").construir({"sku": "a/b"}) == "/items/a%2Fb/detalle"
+    assert Ruta("/productos").construir({}) == "/productos"
+
+def test_rutas_desde_openapi_usan_los_tipos_del_contrato():
+    rutas = rutas_desde_openapi()
+    assert "/producers/{id}/products" in rutas
+    assert rutas["/products/{id}"].tipos == {"id": (int,)}
+
+def test_url_valida_tipos_del_contrato():
+    contrato = URLBuilder.desde_openapi(BASE)
+    assert contrato.url("/products/{id}", {"campos": "a b"}, id=7) == BASE + "/products/7?campos=a+b"
+    with pytest.raises(TypeError):
+        contrato.url("/products/{id}", id="../../etc/passwd")
+    with pytest.raises(TypeError):
+        contrato.url("/products/{id}", id=True)
+    with pytest.raises(ValueError):
+        contrato.url("/clientes/{id}", id=1)
+
+def test_build_many(builder):
+    builder.registrar("/productos/{id}")
+    builder.registrar("/producers/{id}/products/{sku}")
+    assert builder.build_many("/productos/{id}", [1, "a/b"], {"v": 2}) == [
+        BASE + "/productos/1?v=2", BASE + "/productos/a%2Fb?v=2"]
+    assert builder.build_many("/producers/{id}/products/{sku}", [{"id": 1, "sku": "x"}]) == [
+        BASE + "/producers/1/products/x"]
@@ -1,67 +1,129 @@
-from validadores import validar_producto
-
-# Definimos 5 casos de prueba que DEBEN fallar (Casos Maliciosos/Erróneos)
-
-casos_falla = [
-    {
-        "nombre_prueba": "CASO 1: Falta campo requerido (id)",
-        "data": {
-            "nombre": "Manzanas",
-            "precio": 20.5,
-            "categoria": "frutas"
-        }
-    },
-    {
-        "nombre_prueba": "CASO 2: Precio negativo",
-        "data": {
-            "id": 2,
-            "nombre": "Peras",
-            "precio": -5.00,  # <-- Error aquí
-            "categoria": "frutas"
-        }
-    },
-    {
-        "nombre_prueba": "CASO 3: Categoría inválida",
-        "data": {
-            "id": 3,
-            "nombre": "Teclado Gamer",
-            "precio": 1500.0,
-            "categoria": "electronica" # <-- Error aquí
-        }
-    },
-    {
-        "nombre_prueba": "CASO 4: Tipo de dato incorrecto (disponible no es bool)",
-        "data": {
-            "id": 4,
-            "nombre": "Miel",
-            "precio": 50.0,
-            "categoria": "miel",
-            "disponible": "SÍ" # <-- Error aquí (debería ser True/False)
-        }
-    },
-    {
-        "nombre_prueba": "CASO 5: Productor mal formado (no es dict)",
-        "data": {
-            "id": 5,
-            "nombre": "Jalea",
-            "precio": 30.0,
-            "categoria": "conservas",
-            "productor": ["Granja", 123] # <-- Error aquí (debería ser dict)
-        }
-    }
-]
-
-print("--- INICIANDO TEST DE VALIDADORES ---\n")
-
-exitos = 0
-for caso in casos_falla:
-    print(f"Probando {caso['nombre_prueba']}...")
-    try:
-        validar_producto(caso['data'])
-        print("❌ FALLÓ: El validador aceptó datos inválidos.")
-    except (ValueError, TypeError) as e:
-        print(f"✅ ÉXITO: Error detectado correctamente -> {e}")
-        exitos += 1
-    print("-" * 50)
-
-print(f"\nResumen: {exitos}/{len(casos_falla)} pruebas pasadas.")
\ No newline at end of file
+from validadores import validar_producto
+
+# Definimos 5 casos de prueba que DEBEN fallar (Casos Maliciosos/Erróneos)
+
+casos_falla = [
+    {
+        "nombre_prueba": "CASO 1: Falta campo requerido (id)",
+        "data": {
+            "nombre": "Manzanas",
+            "precio": 20.5,
+            "categoria": "frutas"
+        }
+    },
+    {
+        "nombre_prueba": "CASO 2: Precio negativo",
+        "data": {
+            "id": 2,
+            "nombre": "Peras",
+            "precio": -5.00,  # <-- Error aquí
+            "categoria": "frutas"
+        }
+    },
+    {
+        "nombre_prueba": "CASO 3: Categoría inválida",
+        "data": {
+            "id": 3,
+            "nombre": "Teclado Gamer",
+            "precio": 1500.0,
+            "categoria": "electronica" # <-- Error aquí
+        }
+    },
+    {
+        "nombre_prueba": "CASO 4: Tipo de dato incorrecto (disponible no es bool)",
+        "data": {
+            "id": 4,
+            "nombre": "Miel",
+            "precio": 50.0,
+            "categoria": "miel",
+            "disponible": "SÍ" # <-- Error aquí (debería ser True/False)
+        }
+    },
+    {
+        "nombre_prueba": "CASO 5: Productor mal formado (no es dict)",
+        "data": {
+            "id": 5,
+            "nombre": "Jalea",
+            "precio": 30.0,
+            "categoria": "conservas",
+            "productor": ["Granja", 123] # <-- Error aquí (debería ser dict)
+        }
+    }
+]
+
+print("--- INICIANDO TEST DE VALIDADORES ---\n")
+
+exitos = 0
+for caso in casos_falla:
+    print(f"Probando {caso['nombre_prueba']}...")
+    try:
+        validar_producto(caso['data'])
+        print("❌ FALLÓ: El validador aceptó datos inválidos.")
+    except (ValueError, TypeError) as e:
+        print(f"✅ ÉXITO: Error detectado correctamente -> {e}")
+        exitos += 1
+    print("-" * 50)
+
+print(f"\nResumen: {exitos}/{len(casos_falla)} pruebas pasadas.")
+
+# ==========================================
+# VALIDACIÓN POR LOTES (pytest)
+# ==========================================
+import importlib.util
+import math
+import pytest
+from compilador_validadores import compilar_recolector_errores
+from validadores import SCHEMA_PRODUCTO, validar_lote_productos, ERROR_FALTA, ERROR_RANGO, ERROR_CATEGORIA, ERROR_TIPO
+
+PRODUCTO_OK = {"id": 1, "nombre": "Miel", "precio": 50.0, "categoria": "miel"}
+HAY_NUMPY = importlib.util.find_spec("numpy") is not None
+con_numpy = pytest.mark.skipif(not HAY_NUMPY, reason="NumPy no instalado")
+
+@pytest.mark.parametrize("usar_numpy", [False, pytest.param(True, marks=con_numpy)])
+def test_lote_reporta_todos_los_errores(usar_numpy):
+    lote = [PRODUCTO_OK] + [caso["data"] for caso in casos_falla] + ["no soy un dict"]
+    mascara, errores = validar_lote_productos(lote, usar_numpy=usar_numpy)
+
+    assert [bool(ok) for ok in mascara] == [True, False, False, False, False, False, False]
+    assert errores == [
+        (1, "id", ERROR_FALTA),
+        (2, "precio", ERROR_RANGO),
+        (3, "categoria", ERROR_CATEGORIA),
+        (4, "disponible", ERROR_TIPO),
+        (5, "productor", ERROR_TIPO),
+        (6, None, ERROR_TIPO),
+    ]
+
+def test_lote_coincide_con_validar_producto():
+    lote = [dict(PRODUCTO_OK, precio=p) for p in (1, 0, -2.5, "3")] + [{}]
+    mascara, errores = validar_lote_productos(lote, usar_numpy=False)
+    esperados = []
+    for item in lote:
+        try:
+            validar_producto(item)
+            esperados.append(True)
+        except (ValueError, TypeError):
+            esperados.append(False)
+    assert mascara == esperados
+    assert [e for e in errores if e[0] == 4] == [(4, c, ERROR_FALTA) for c in ("id", "nombre", "precio", "categoria")]
+
+@con_numpy
+def test_mascara_columnar_coincide_con_el_predicado():
+    casos = [{"precio": True}, {"precio": math.nan}, {"precio": 10 ** 400}, {"precio": -10 ** 400},
+             {"precio": "3"}, {"precio": None}, {"id": True}, {"id": 2.0}, {"categoria": ["miel"]},
+             {"nombre": str}, {"disponible": 1}, {"disponible": False}, {"productor": {"id": "x"}},
+             {"productor": []}, {"productor": {}}, {"creado_en": "ayer"}, {"creado_en": "2024-01-01T00:00:00Z"}]
+    lote = [dict(PRODUCTO_OK, **caso) for caso in casos] + [{}, None, [PRODUCTO_OK], PRODUCTO_OK]
+    columnar, errores_columnar = validar_lote_productos(lote, usar_numpy=True)
+    por_filas, errores_por_filas = validar_lote_productos(lote, usar_numpy=False)
+    assert columnar.tolist() == por_filas
+    assert errores_columnar == errores_por_filas
+
+def test_recolector_sale_del_schema():
+    schema = dict(SCHEMA_PRODUCTO, properties={**SCHEMA_PRODUCTO["properties"],
+                                               "stock": {"type": "integer", "minimum": 0}})
+    errores = compilar_recolector_errores(schema)
+    producto = dict(PRODUCTO_OK, precio="caro", stock=-1, productor={"id": "x"}, creado_en="ayer")
+    assert errores(producto) == [("precio", "tipo"), ("productor.id", "tipo"), ("creado_en", "formato"),
+                                 ("stock", "rango")]
+    assert errores(PRODUCTO_OK) == [] and errores(None) == [(None, "tipo")]
@@ -1,104 +1,315 @@
-import urllib.parse
-
-class URLBuilder:
-    """
-    Clase encargada de construir URLs de forma segura, escapando caracteres
-    especiales y codificando parámetros para evitar inyecciones.
-    """
-    
-    def __init__(self, base_url: str):
-        # Aseguramos que la URL base no tenga barra al final para consistencia
-        self.base_url = base_url.rstrip('/')
-
-    def build_url(self, endpoint: str, resource_id=None, query_params: dict = None) -> str:
-        """
-        Construye una URL final segura.
-        
-        Args:
-            endpoint (str): El recurso (ej. "productos").
-            resource_id (int|str, opcional): El ID del recurso. Se valida y escapa.
-            query_params (dict, opcional): Diccionario de filtros para la URL.
-        """
-        
-        # 1. Limpieza básica del endpoint
-        safe_endpoint = endpoint.strip('/')
-        
-        # 2. Construcción del Path con ID (Protección contra Path Traversal)
-        if resource_id is not None:
-            # Validamos que el ID sea de un tipo esperado (Entero o String seguro)
-            if not isinstance(resource_id, (int, str)):
-                raise TypeError(f"ID debe ser int o str, recibido: {type(resource_id)}")
-            
-            # EL TRUCO DE SEGURIDAD: quote() convierte '/' en '%2F' y '..' en '%2E%2E'
-            # Esto inutiliza los intentos de navegar por directorios.
-            safe_id = urllib.parse.quote(str(resource_id), safe='')
-            path = f"{safe_endpoint}/{safe_id}"
-        else:
-            path = safe_endpoint
-
-        # Unimos base + path
-        full_url = f"{self.base_url}/{path}"
-
-        # 3. Construcción de Query Strings (Protección contra Query Injection)
-        if query_params:
-            # urlencode() convierte espacios en '+', '&' en '%26', etc.
-            safe_query = urllib.parse.urlencode(query_params)
-            full_url = f"{full_url}?{safe_query}"
-
-        return full_url
-
-# --- SECCIÓN DE PRUEBAS Y DEMOSTRACIÓN (Requerida por el reto) ---
-if __name__ == "__main__":
-    base = "https://api.ecomarket.com"
-    builder = URLBuilder(base)
-
-    print("--- 🛡️ DEMOSTRACIÓN DE SEGURIDAD URLBUILDER 🛡️ ---\n")
-
-    # CASO 1: Ataque de Path Traversal
-    # El atacante intenta subir niveles para leer archivos del servidor
-    ataque_traversal = "../../etc/passwd"
-    
-    print("1. Intento de Path Traversal")
-    print(f"   Dato malicioso: '{ataque_traversal}'")
-    
-    # Forma INSEGURA (lo que hacíamos antes)
-    url_insegura = f"{base}/productos/{ataque_traversal}"
-    print(f"   ❌ Sin protección: {url_insegura}")
-    print("      (El servidor interpretaría esto y podría exponer archivos)")
-
-    # Forma SEGURA (con URLBuilder)
-    url_segura = builder.build_url("productos", resource_id=ataque_traversal)
-    print(f"   ✅ Con URLBuilder: {url_segura}")
-    print("      (Los caracteres '/' se escapan como '%2F', el servidor lo lee como un ID literal)")
-    print("-" * 60)
-
-    # CASO 2: Inyección de Query Params
-    # El atacante intenta inyectar otro parámetro (admin=true) rompiendo la URL
-    filtro_malicioso = "miel&admin=true"
-    
-    print("\n2. Intento de Inyección en Parámetros")
-    print(f"   Dato malicioso: categoría = '{filtro_malicioso}'")
-    
-    # Forma INSEGURA
-    url_insegura = f"{base}/productos?categoria={filtro_malicioso}"
-    print(f"   ❌ Sin protección: {url_insegura}")
-    print("      (El servidor cree que enviamos DOS parámetros: categoria='miel' y admin='true')")
-
-    # Forma SEGURA
-    url_segura = builder.build_url("productos", query_params={"categoria": filtro_malicioso})
-    print(f"   ✅ Con URLBuilder: {url_segura}")
-    print("      (El '&' se convierte en '%26', todo es parte del valor de 'categoria')")
-    print("-" * 60)
-
-    # CASO 3: Caracteres Unicode / Espacios
-    # Nombres con caracteres extraños que rompen URLs simples
-    nombre_raro = "Café & Postres / Delicia"
-    
-    print("\n3. Caracteres Especiales y Espacios")
-    print(f"   Dato complejo: '{nombre_raro}'")
-    
-    url_segura = builder.build_url("buscar", query_params={"q": nombre_raro})
-    print(f"   ✅ Con URLBuilder: {url_segura}")
-    print("      (Espacios y barras codificados correctamente)")
-    
+import functools
+import os
+import re
+import urllib.parse
+
+RUTA_CONTRATO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openapi_sem2.yaml")
+
+# ==========================================
+# CODIFICADORES MEMOIZADOS
+# ==========================================
+# Los IDs y filtros se repiten mucho (mismo producto, misma categoría): cada
+# valor distinto se escapa una sola vez. typed=True evita que 1, 1.0 y True
+# compartan entrada (su texto es distinto).
+TAMANO_MEMO = 4096
+
+@functools.lru_cache(maxsize=TAMANO_MEMO, typed=True)
+def _codificar_segmento(valor) -> str:
+    # EL TRUCO DE SEGURIDAD: quote() convierte '/' en '%2F' y '..' en '%2E%2E'
+    return urllib.parse.quote(str(valor), safe='')
+
+def _texto(valor):
+    # Como urlencode(): los bytes se escapan tal cual (sin el b'...' de str())
+    return valor if isinstance(valor, (str, bytes)) else str(valor)
+
+@functools.lru_cache(maxsize=TAMANO_MEMO, typed=True)
+def _codificar_par(clave, valor) -> str:
+    # Mismo resultado que urlencode() para un par: espacios -> '+', '&' -> '%26'
+    return urllib.parse.quote_plus(_texto(clave)) + '=' + urllib.parse.quote_plus(_texto(valor))
+
+@functools.lru_cache(maxsize=TAMANO_MEMO)
+def _limpiar_endpoint(endpoint: str) -> str:
+    return endpoint.strip('/')
+
+def codificar_query(query_params) -> str:
+    """Equivalente a urllib.parse.urlencode(query_params), con memo por par."""
+    pares = query_params.items() if hasattr(query_params, "items") else query_params
+    partes = []
+    for clave, valor in pares:
+        try:
+            partes.append(_codificar_par(clave, valor))
+        except TypeError:
+            # Valores no hasheables (listas...): sin memo, igual que urlencode
+            partes.append(urllib.parse.urlencode([(clave, valor)]))
+    return "&".join(partes)
+
+# Tipos aceptados por cada 'type' de OpenAPI en un parámetro de path
+_TIPOS_PARAMETRO = {
+    "integer": (int,),
+    "string": (str,),
+    None: (int, str),  # Sin tipo declarado: lo mismo que build_url
+}
+
+_FALTA = object()
+
+class Ruta:
+    """
+    Plantilla de ruta compilada, ej. '/producers/{id}/products'.
+    Se parte una sola vez en texto fijo + parámetros, y cada parámetro tiene
+    su validación de tipo según el contrato.
+    """
+
+    def __init__(self, plantilla: str, tipos: dict = None):
+        """
+        Args:
+            plantilla (str): Ruta con parámetros entre llaves.
+            tipos (dict, opcional): {'id': 'integer'} con los tipos de OpenAPI.
+        """
+        self.plantilla = "/" + plantilla.strip('/')
+        self.parametros = re.findall(r"\{(\w+)\}", self.plantilla)
+        tipos = tipos or {}
+        self.tipos = {nombre: _TIPOS_PARAMETRO[tipos.get(nombre)] for nombre in self.parametros}
+        # '/producers/{id}/products' -> '/producers/{0}/products' para str.format
+        contador = iter(range(len(self.parametros)))
+        self._formato = re.sub(r"\{\w+\}", lambda _: "{%d}" % next(contador), self.plantilla)
+        # Caso de casi todas las llamadas del cliente ('/productos/{id}'): un
+        # solo parámetro se arma concatenando, sin lista intermedia ni format()
+        self._unico = self.parametros[0] if len(self.parametros) == 1 else None
+        if self._unico is not None:
+            self._prefijo, self._sufijo = self.plantilla.split("{%s}" % self._unico)
+            self._tipos_unico = self.tipos[self._unico]
+
+    def _codificar(self, nombre: str, valor) -> str:
+        tipos = self.tipos[nombre]
+        # Camino rápido: el tipo exacto (un bool nunca coincide: type(True) es bool)
+        if type(valor) in tipos:
+            return _codificar_segmento(valor)
+        # bool es subclase de int, pero un True como ID es casi seguro un error
+        if not isinstance(valor, tipos) or (tipos == (int,) and (valor is True or valor is False)):
+            esperado = " o ".join(t.__name__ for t in tipos)
+            raise TypeError(f"'{nombre}' en {self.plantilla} debe ser {esperado}, recibido: {type(valor)}")
+        return _codificar_segmento(valor)
+
+    def construir(self, valores: dict) -> str:
+        """Devuelve el path con los parámetros escapados."""
+        if not self.parametros:
+            return self.plantilla
+        if self._unico is not None:
+            valor = valores.get(self._unico, _FALTA)
+            if type(valor) in self._tipos_unico:
+                return self._prefijo + _codificar_segmento(valor) + self._sufijo
+            if valor is _FALTA:
+                raise ValueError(f"Falta el parámetro '{self._unico}' para {self.plantilla}")
+            return self._prefijo + self._codificar(self._unico, valor) + self._sufijo
+        try:
+            return self._formato.format(*[self._codificar(nombre, valores[nombre]) for nombre in self.parametros])
+        except KeyError as e:
+            raise ValueError(f"Falta el parámetro {e} para {self.plantilla}") from None
+
+def rutas_desde_openapi(ruta: str = RUTA_CONTRATO) -> dict:
+    """Lee 'paths' del contrato y devuelve {plantilla: Ruta} con los tipos declarados."""
+    import yaml  # Solo se necesita al compilar desde el contrato
+
+    with open(ruta, encoding="utf-8") as f:
+        contrato = yaml.safe_load(f)
+    rutas = {}
+    for plantilla, operaciones in contrato.get("paths", {}).items():
+        tipos = {}
+        # Los parámetros pueden declararse a nivel de ruta o en cada operación
+        for declaracion in [operaciones] + [op for op in operaciones.values() if isinstance(op, dict)]:
+            for parametro in declaracion.get("parameters", []) if isinstance(declaracion, dict) else []:
+                if parametro.get("in") == "path":
+                    tipos[parametro["name"]] = parametro.get("schema", {}).get("type")
+        rutas[plantilla] = Ruta(plantilla, tipos)
+    return rutas
+
+class URLBuilder:
+    """
+    Clase encargada de construir URLs de forma segura, escapando caracteres
+    especiales y codificando parámetros para evitar inyecciones.
+    """
+    
+    def __init__(self, base_url: str, rutas: dict = None):
+        """
+        Args:
+            base_url (str): URL base de la API.
+            rutas (dict, opcional): {plantilla: Ruta} precompiladas, por ejemplo
+                las de rutas_desde_openapi(). También se pueden agregar con registrar().
+        """
+        # Aseguramos que la URL base no tenga barra al final para consistencia
+        self.base_url = base_url.rstrip('/')
+        self.rutas = dict(rutas or {})
+
+    @classmethod
+    def desde_openapi(cls, base_url: str, ruta: str = RUTA_CONTRATO) -> "URLBuilder":
+        return cls(base_url, rutas_desde_openapi(ruta))
+
+    def registrar(self, plantilla: str, tipos: dict = None) -> Ruta:
+        """Compila y guarda una plantilla que no está en el contrato."""
+        ruta = Ruta(plantilla, tipos)
+        self.rutas[ruta.plantilla] = ruta
+        return ruta
+
+    def _ruta(self, plantilla: str) -> Ruta:
+        try:
+            return self.rutas[plantilla]
+        except KeyError:
+            raise ValueError(f"Ruta '{plantilla}' no registrada. Opciones: {sorted(self.rutas)}") from None
+
+    def path(self, plantilla: str, query_params: dict = None, **valores) -> str:
+        """
+        Path relativo (sin base_url) a partir de una plantilla registrada.
+        Ej: path('/producers/{id}/products', id=3) -> '/producers/3/products'
+        """
+        return self._construir(plantilla, query_params, valores)
+
+    def url(self, plantilla: str, query_params: dict = None, **valores) -> str:
+        """Igual que path(), pero con la base_url adelante."""
+        return self.base_url + self._construir(plantilla, query_params, valores)
+
+    def _construir(self, plantilla: str, query_params, valores: dict) -> str:
+        # path() y url() corren en cada llamada del cliente: sin reempaquetar **valores
+        ruta = self.rutas.get(plantilla)
+        path = (ruta or self._ruta(plantilla)).construir(valores)
+        if query_params:
+            path = f"{path}?{codificar_query(query_params)}"
+        return path
+
+    def build_many(self, plantilla: str, valores, query_params: dict = None) -> list:
+        """
+        Construye muchas URLs de la misma plantilla de una vez.
+        'valores' es una lista de dicts ({'id': 1}) o, si la plantilla tiene un
+        solo parámetro, directamente de los valores ([1, 2, 3]).
+        """
+        ruta = self._ruta(plantilla)
+        sufijo = f"?{codificar_query(query_params)}" if query_params else ""
+        base = self.base_url
+        if len(ruta.parametros) == 1:
+            nombre = ruta.parametros[0]
+            return [base + ruta.construir(v if isinstance(v, dict) else {nombre: v}) + sufijo for v in valores]
+        return [base + ruta.construir(v) + sufijo for v in valores]
+
+    def build_url(self, endpoint: str, resource_id=None, query_params: dict = None) -> str:
+        """
+        Construye una URL final segura.
+        Mismo resultado que build_url_original, pero el endpoint limpio, el
+        ID escapado y cada par de la query se calculan una vez por valor.
+        
+        Args:
+            endpoint (str): El recurso (ej. "productos").
+            resource_id (int|str, opcional): El ID del recurso. Se valida y escapa.
+            query_params (dict, opcional): Diccionario de filtros para la URL.
+        """
+        full_url = f"{self.base_url}/{_limpiar_endpoint(endpoint)}"
+        if resource_id is not None:
+            if not isinstance(resource_id, (int, str)):
+                raise TypeError(f"ID debe ser int o str, recibido: {type(resource_id)}")
+            full_url = f"{full_url}/{_codificar_segmento(resource_id)}"
+        if query_params:
+            full_url = f"{full_url}?{codificar_query(query_params)}"
+        return full_url
+
+    def build_url_original(self, endpoint: str, resource_id=None, query_params: dict = None) -> str:
+        """
+        Versión original de build_url, sin memo (referencia y benchmark).
+        
+        Args:
+            endpoint (str): El recurso (ej. "productos").
+            resource_id (int|str, opcional): El ID del recurso. Se valida y escapa.
+            query_params (dict, opcional): Diccionario de filtros para la URL.
+        """
+        
+        # 1. Limpieza básica del endpoint
+        safe_endpoint = endpoint.strip('/')
+        
+        # 2. Construcción del Path con ID (Protección contra Path Traversal)
+        if resource_id is not None:
+            # Validamos que el ID sea de un tipo esperado (Entero o String seguro)
+            if not isinstance(resource_id, (int, str)):
+                raise TypeError(f"ID debe ser int o str, recibido: {type(resource_id)}")
+            
+            # EL TRUCO DE SEGURIDAD: quote() convierte '/' en '%2F' y '..' en '%2E%2E'
+            # Esto inutiliza los intentos de navegar por directorios.
+            safe_id = urllib.parse.quote(str(resource_id), safe='')
+            path = f"{safe_endpoint}/{safe_id}"
+        else:
+            path = safe_endpoint
+
+        # Unimos base + path
+        full_url = f"{self.base_url}/{path}"
+
+        # 3. Construcción de Query Strings (Protección contra Query Injection)
+        if query_params:
+            # urlencode() convierte espacios en '+', '&' en '%26', etc.
+            safe_query = urllib.parse.urlencode(query_params)
+            full_url = f"{full_url}?{safe_query}"
+
+        return full_url
+
+# --- SECCIÓN DE PRUEBAS Y DEMOSTRACIÓN (Requerida por el reto) ---
+if __name__ == "__main__":
+    base = "https://api.ecomarket.com"
+    builder = URLBuilder(base)
+
+    print("--- 🛡️ DEMOSTRACIÓN DE SEGURIDAD URLBUILDER 🛡️ ---\n")
+
+    # CASO 1: Ataque de Path Traversal
+    # El atacante intenta subir niveles para leer archivos del servidor
+    ataque_traversal = "../../etc/passwd"
+    
+    print("1. Intento de Path Traversal")
+    print(f"   Dato malicioso: '{ataque_traversal}'")
+    
+    # Forma INSEGURA (lo que hacíamos antes)
+    url_insegura = f"{base}/productos/{ataque_traversal}"
+    print(f"   ❌ Sin protección: {url_insegura}")
+    print("      (El servidor interpretaría esto y podría exponer archivos)")
+
+    # Forma SEGURA (con URLBuilder)
+    url_segura = builder.build_url("productos", resource_id=ataque_traversal)
+    print(f"   ✅ Con URLBuilder: {url_segura}")
+    print("      (Los caracteres '/' se escapan como '%2F', el servidor lo lee como un ID literal)")
+    print("-" * 60)
+
+    # CASO 2: Inyección de Query Params
+    # El atacante intenta inyectar otro parámetro (admin=true) rompiendo la URL
+    filtro_malicioso = "miel&admin=true"
+    
+    print("\n2. Intento de Inyección en Parámetros")
+    print(f"   Dato malicioso: categoría = '{filtro_malicioso}'")
+    
+    # Forma INSEGURA
+    url_insegura = f"{base}/productos?categoria={filtro_malicioso}"
+    print(f"   ❌ Sin protección: {url_insegura}")
+    print("      (El servidor cree que enviamos DOS parámetros: categoria='miel' y admin='true')")
+
+    # Forma SEGURA
+    url_segura = builder.build_url("productos", query_params={"categoria": filtro_malicioso})
+    print(f"   ✅ Con URLBuilder: {url_segura}")
+    print("      (El '&' se convierte en '%26', todo es parte del valor de 'categoria')")
+    print("-" * 60)
+
+    # CASO 3: Caracteres Unicode / Espacios
+    # Nombres con caracteres extraños que rompen URLs simples
+    nombre_raro = "Café & Postres / Delicia"
+    
+    print("\n3. Caracteres Especiales y Espacios")
+    print(f"   Dato complejo: '{nombre_raro}'")
+    
+    url_segura = builder.build_url("buscar", query_params={"q": nombre_raro})
+    print(f"   ✅ Con URLBuilder: {url_segura}")
+    print("      (Espacios y barras codificados correctamente)")
+    print("-" * 60)
+
+    # CASO 4: Plantillas compiladas desde el contrato OpenAPI
+    contrato = URLBuilder.desde_openapi(base)
+    print("\n4. Plantillas del contrato (openapi_sem2.yaml)")
+    print(f"   Rutas: {sorted(contrato.rutas)}")
+    print(f"   ✅ {contrato.url('/producers/{id}/products', id=7)}")
+    print(f"   ✅ build_many: {contrato.build_many('/products/{id}', [1, 2, 3])}")
+    try:
+        contrato.url('/products/{id}', id=ataque_traversal)
+    except TypeError as e:
+        print(f"   ✅ ID con tipo inválido rechazado: {e}")
+    
     print("\n--- ✅ PRUEBAS FINALIZADAS ---")
\ No newline at end of file
@@ -1,82 +1,315 @@
-import datetime
-
-def validar_producto(data: dict) -> dict:
-    """
-    Valida un diccionario de producto individual.
-    Lanza ValueError o TypeError si los datos son inválidos.
-    Retorna el diccionario validado si todo está bien.
-    """
-    
-    # 1. Validar que data sea un diccionario
-    if not isinstance(data, dict):
-        raise TypeError(f"El producto debe ser un objeto (dict), se recibió: {type(data).__name__}")
-
-    # 2. Validar campos requeridos
-    campos_requeridos = ['id', 'nombre', 'precio', 'categoria']
-    for campo in campos_requeridos:
-        if campo not in data:
-            raise ValueError(f"Falta el campo requerido: '{campo}'")
-
-    # 3. Validar tipos de datos básicos
-    if not isinstance(data['id'], int):
-        raise TypeError(f"El 'id' debe ser entero (int), se recibió: {type(data['id']).__name__}")
-    
-    if not isinstance(data['nombre'], str):
-        raise TypeError(f"El 'nombre' debe ser texto (str), se recibió: {type(data['nombre']).__name__}")
-        
-    # Aceptamos int o float para el precio, pero lo tratamos como número
-    if not isinstance(data['precio'], (float, int)):
-        raise TypeError(f"El 'precio' debe ser numérico (float), se recibió: {type(data['precio']).__name__}")
-
-    # 4. Validaciones lógicas (Reglas de Negocio)
-    if data['precio'] <= 0:
-        raise ValueError(f"El precio debe ser mayor a 0. Valor actual: {data['precio']}")
-
-    categorias_validas = ['frutas', 'verduras', 'lacteos', 'miel', 'conservas']
-    if data['categoria'] not in categorias_validas:
-        raise ValueError(f"Categoría '{data['categoria']}' no válida. Opciones: {categorias_validas}")
-
-    # 5. Validar campos opcionales
-    # 'disponible' (bool)
-    if 'disponible' in data:
-        if not isinstance(data['disponible'], bool):
-            raise TypeError(f"El campo 'disponible' debe ser booleano, se recibió: {type(data['disponible']).__name__}")
-
-    # 'productor' (dict anidado)
-    if 'productor' in data:
-        if not isinstance(data['productor'], dict):
-            raise TypeError("El campo 'productor' debe ser un objeto (dict)")
-        # Validación básica del anidado
-        if 'id' in data['productor'] and not isinstance(data['productor']['id'], int):
-             raise TypeError("El ID del productor debe ser int")
-
-    # 'creado_en' (formato fecha ISO 8601)
-    if 'creado_en' in data:
-        if not isinstance(data['creado_en'], str):
-             raise TypeError("La fecha 'creado_en' debe ser string")
-        # Intento simple de parseo para verificar formato
-        try:
-            # Esto valida formatos como '2024-01-15T10:30:00Z'
-            datetime.datetime.fromisoformat(data['creado_en'].replace('Z', '+00:00'))
-        except ValueError:
-            raise ValueError(f"Formato de fecha inválido en 'creado_en': {data['creado_en']}")
-
-    return data
-
-def validar_lista_productos(lista_data: list) -> list:
-    """
-    Valida una lista completa de productos.
-    """
-    if not isinstance(lista_data, list):
-        raise TypeError(f"Se esperaba una lista de productos, se recibió: {type(lista_data).__name__}")
-    
-    lista_validada = []
-    for index, item in enumerate(lista_data):
-        try:
-            producto_valido = validar_producto(item)
-            lista_validada.append(producto_valido)
-        except (ValueError, TypeError) as e:
-            # Agregamos contexto de cuál ítem falló
-            raise ValueError(f"Error en el producto índice {index}: {str(e)}")
-            
-    return lista_validada
\ No newline at end of file
+import datetime
+from itertools import compress, repeat
+from operator import ge, gt, le, lt, not_
+
+from compilador_validadores import compilar_recolector_errores, compilar_validador
+
+CATEGORIAS_VALIDAS = ['frutas', 'verduras', 'lacteos', 'miel', 'conservas']
+
+# Mismas reglas que validar_producto_manual, expresadas como schema
+SCHEMA_PRODUCTO = {
+    "type": "object",
+    "required": ["id", "nombre", "precio", "categoria"],
+    "properties": {
+        "id": {"type": "integer"},
+        "nombre": {"type": "string"},
+        "precio": {"type": "number", "exclusiveMinimum": 0},
+        "categoria": {"enum": CATEGORIAS_VALIDAS, "title": "Categoría"},
+        "disponible": {"type": "boolean"},
+        "productor": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer", "x-mensaje": "El ID del productor debe ser int"},
+            },
+        },
+        "creado_en": {
+            "type": "string",
+            "format": "date-time",
+            "x-mensaje": "La fecha 'creado_en' debe ser string",
+        },
+    },
+}
+
+# Validador generado a partir del schema: mismo orden de chequeos y mismos
+# mensajes que la versión manual, pero sin reconstruir listas en cada llamada.
+validar_producto = compilar_validador(SCHEMA_PRODUCTO, "validar_producto")
+validar_producto.__doc__ = """
+    Valida un diccionario de producto individual.
+    Lanza ValueError o TypeError si los datos son inválidos.
+    Retorna el diccionario validado si todo está bien.
+    """
+
+def validar_producto_manual(data: dict) -> dict:
+    """
+    Versión escrita a mano de validar_producto (referencia y benchmark).
+    Lanza ValueError o TypeError si los datos son inválidos.
+    Retorna el diccionario validado si todo está bien.
+    """
+    
+    # 1. Validar que data sea un diccionario
+    if not isinstance(data, dict):
+        raise TypeError(f"El producto debe ser un objeto (dict), se recibió: {type(data).__name__}")
+
+    # 2. Validar campos requeridos
+    campos_requeridos = ['id', 'nombre', 'precio', 'categoria']
+    for campo in campos_requeridos:
+        if campo not in data:
+            raise ValueError(f"Falta el campo requerido: '{campo}'")
+
+    # 3. Validar tipos de datos básicos
+    if not isinstance(data['id'], int):
+        raise TypeError(f"El 'id' debe ser entero (int), se recibió: {type(data['id']).__name__}")
+    
+    if not isinstance(data['nombre'], str):
+        raise TypeError(f"El 'nombre' debe ser texto (str), se recibió: {type(data['nombre']).__name__}")
+        
+    # Aceptamos int o float para el precio, pero lo tratamos como número
+    if not isinstance(data['precio'], (float, int)):
+        raise TypeError(f"El 'precio' debe ser numérico (float), se recibió: {type(data['precio']).__name__}")
+
+    # 4. Validaciones lógicas (Reglas de Negocio)
+    if data['precio'] <= 0:
+        raise ValueError(f"El precio debe ser mayor a 0. Valor actual: {data['precio']}")
+
+    categorias_validas = ['frutas', 'verduras', 'lacteos', 'miel', 'conservas']
+    if data['categoria'] not in categorias_validas:
+        raise ValueError(f"Categoría '{data['categoria']}' no válida. Opciones: {categorias_validas}")
+
+    # 5. Validar campos opcionales
+    # 'disponible' (bool)
+    if 'disponible' in data:
+        if not isinstance(data['disponible'], bool):
+            raise TypeError(f"El campo 'disponible' debe ser booleano, se recibió: {type(data['disponible']).__name__}")
+
+    # 'productor' (dict anidado)
+    if 'productor' in data:
+        if not isinstance(data['productor'], dict):
+            raise TypeError("El campo 'productor' debe ser un objeto (dict)")
+        # Validación básica del anidado
+        if 'id' in data['productor'] and not isinstance(data['productor']['id'], int):
+             raise TypeError("El ID del productor debe ser int")
+
+    # 'creado_en' (formato fecha ISO 8601)
+    if 'creado_en' in data:
+        if not isinstance(data['creado_en'], str):
+             raise TypeError("La fecha 'creado_en' debe ser string")
+        # Intento simple de parseo para verificar formato
+        try:
+            # Esto valida formatos como '2024-01-15T10:30:00Z'
+            datetime.datetime.fromisoformat(data['creado_en'].replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"Formato de fecha inválido en 'creado_en': {data['creado_en']}")
+
+    return data
+
+def validar_lista_productos(lista_data: list) -> list:
+    """
+    Valida una lista completa de productos.
+    """
+    if not isinstance(lista_data, list):
+        raise TypeError(f"Se esperaba una lista de productos, se recibió: {type(lista_data).__name__}")
+    
+    lista_validada = []
+    for index, item in enumerate(lista_data):
+        try:
+            producto_valido = validar_producto(item)
+            lista_validada.append(producto_valido)
+        except (ValueError, TypeError) as e:
+            # Agregamos contexto de cuál ítem falló
+            raise ValueError(f"Error en el producto índice {index}: {str(e)}")
+            
+    return lista_validada
+
+def iterar_productos_validos(productos):
+    """
+    Versión perezosa de validar_lista_productos para usar en un pipeline:
+    valida cada producto a medida que se consume el iterable.
+    """
+    for index, item in enumerate(productos):
+        try:
+            yield validar_producto(item)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Error en el producto índice {index}: {str(e)}")
+
+# ==========================================
+# VALIDACIÓN POR LOTES
+# ==========================================
+# Códigos de error compactos para validar_lote_productos
+ERROR_FALTA = "falta"
+ERROR_TIPO = "tipo"
+ERROR_RANGO = "rango"
+ERROR_CATEGORIA = "categoria"
+ERROR_FORMATO = "formato"
+
+# Predicado compilado del mismo schema: True/False sin construir excepciones
+es_producto_valido = compilar_validador(SCHEMA_PRODUCTO, "es_producto_valido", lanzar_errores=False)
+
+# Todos los errores (campo, codigo) de un producto, generados del mismo schema:
+# si cambia una regla, la máscara y la lista de errores cambian juntas.
+_errores_producto = compilar_recolector_errores(SCHEMA_PRODUCTO, "_errores_producto",
+                                                codigos={"enum": ERROR_CATEGORIA})
+
+# --- Plan columnar ---
+# Qué reglas del schema se pueden evaluar sobre una columna entera con NumPy:
+# tipo, límites numéricos y enum. Los campos con otras reglas (objetos
+# anidados, format) quedan "residuales" y se chequean con un predicado
+# compilado solo para ese campo, únicamente en las filas donde aparecen.
+# (tipos exactos del caso común, chequeo completo para los demás, ej. bool en number)
+_TIPO_ACEPTA = {
+    "integer": ((int,), lambda tipo: issubclass(tipo, int)),
+    "number": ((float, int), lambda tipo: issubclass(tipo, (float, int))),
+    "string": ((str,), lambda tipo: issubclass(tipo, str)),
+    "boolean": ((bool,), lambda tipo: tipo is bool),
+}
+_CLAVES_COLUMNARES = {"type", "enum", "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum",
+                      "title", "x-mensaje"}
+
+class _Falta:
+    """Marca de campo ausente en una columna (se detecta por su tipo)."""
+
+_FALTA = _Falta()
+
+class _ChequeoColumna:
+    def __init__(self, campo: str, schema: dict, requerido: bool):
+        self.campo = campo
+        self.requerido = requerido
+        self.acepta_tipo = _TIPO_ACEPTA.get(schema.get("type"))
+        self.opciones = list(schema["enum"]) if "enum" in schema else None
+        # Mismos operadores que emite el compilador: la fila falla si 'valor <op> límite'
+        self.limites = []
+        for clave, operador in (("minimum", lt), ("maximum", gt)):
+            if clave in schema:
+                exclusivo = schema.get("exclusive" + clave.capitalize()) is True
+                self.limites.append(({lt: le, gt: ge}[operador] if exclusivo else operador, schema[clave]))
+        for clave, operador in (("exclusiveMinimum", le), ("exclusiveMaximum", ge)):
+            limite = schema.get(clave)
+            if isinstance(limite, (int, float)) and not isinstance(limite, bool):
+                self.limites.append((operador, limite))
+        numerico = schema.get("type") in ("integer", "number")
+        self.residual = None
+        if not set(schema) <= _CLAVES_COLUMNARES or ("type" in schema and self.acepta_tipo is None) \
+                or (self.limites and not numerico):
+            self.residual = compilar_validador({"properties": {campo: schema}}, f"_es_{campo}_valido",
+                                               lanzar_errores=False)
+
+def _plan_columnar(schema: dict) -> list:
+    requeridos = schema.get("required", [])
+    propiedades = schema.get("properties", {})
+    return [_ChequeoColumna(campo, propiedades.get(campo, {}), campo in requeridos)
+            for campo in list(requeridos) + [c for c in propiedades if c not in requeridos]]
+
+_PLAN_PRODUCTO = _plan_columnar(SCHEMA_PRODUCTO)
+
+_np = None
+
+def _cargar_numpy():
+    """Importa NumPy la primera vez que se necesita (es opcional)."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+def _igual_a_alguno(np, columna, valores):
+    resultado = np.zeros(len(columna), dtype=bool)
+    for valor in valores:
+        resultado |= columna == valor
+    return resultado
+
+def _mascara_columnar(np, lista_data: list, plan: list):
+    """
+    Máscara de filas válidas calculada columna por columna. Equivale a
+    map(es_producto_valido, ...) pero los chequeos corren como operaciones
+    de NumPy sobre todo el lote; en Python solo queda armar las columnas.
+    """
+    n = len(lista_data)
+    mascara = np.ones(n, dtype=bool)
+    filas = lista_data
+    for chequeo in plan:
+        try:
+            valores = list(map(dict.get, filas, repeat(chequeo.campo, n), repeat(_FALTA, n)))
+        except TypeError:
+            # Hay filas que no son dict: quedan inválidas y se leen como {}
+            mascara = np.fromiter(map(isinstance, lista_data, repeat(dict, n)), dtype=bool, count=n)
+            filas = [d if ok else {} for d, ok in zip(lista_data, mascara.tolist())]
+            valores = list(map(dict.get, filas, repeat(chequeo.campo, n), repeat(_FALTA, n)))
+        tipos = np.fromiter(map(type, valores), dtype=object, count=n)
+        presente = tipos != _Falta
+        if chequeo.requerido:
+            mascara &= presente
+        validos = presente & mascara
+
+        if chequeo.residual is not None:
+            indices = np.flatnonzero(validos)
+            validos[indices] = np.fromiter(map(chequeo.residual, map(filas.__getitem__, indices.tolist())),
+                                           dtype=bool, count=len(indices))
+        else:
+            if chequeo.acepta_tipo is not None:
+                exactos, acepta = chequeo.acepta_tipo
+                tipo_ok = _igual_a_alguno(np, tipos, exactos)
+                # Los demás tipos (subclases) se resuelven uno por tipo distinto, no por fila
+                otros = set(tipos[~tipo_ok & presente].tolist())
+                tipo_ok |= _igual_a_alguno(np, tipos, [tipo for tipo in otros if acepta(tipo)])
+                validos &= tipo_ok
+            if chequeo.opciones is not None or chequeo.limites:
+                columna = np.fromiter(valores, dtype=object, count=n)
+            if chequeo.limites:
+                indices = np.flatnonzero(validos)
+                valores = columna[indices]
+                try:
+                    valores = valores.astype(np.float64)
+                except OverflowError:
+                    pass  # Enteros enormes: se comparan como objetos Python
+                with np.errstate(invalid="ignore"):  # NaN: comparación falsa, como en Python
+                    for operador, limite in chequeo.limites:
+                        validos[indices[operador(valores, limite)]] = False
+            if chequeo.opciones is not None:
+                validos &= _igual_a_alguno(np, columna, chequeo.opciones)
+        mascara &= validos | ~presente
+    return mascara
+
+def validar_lote_productos(lista_data: list, usar_numpy: bool = None):
+    """
+    Valida una lista completa de productos y reporta TODOS los errores en
+    lugar de cortar en el primero.
+
+    Trabaja en dos fases: primero arma la máscara de filas válidas; después
+    solo las filas inválidas se revisan campo por campo para listar cada error.
+    Con NumPy la máscara es columnar: el lote se convierte en una columna por
+    campo y tipos, límites (ej. precio > 0) y categorías se chequean como
+    operaciones vectorizadas. Sin NumPy el predicado compilado recorre las
+    filas con map() y los índices inválidos salen de itertools.compress.
+    Armar las columnas desde dicts cuesta casi lo mismo que recorrer las
+    filas, así que con listas de dicts usar_numpy=False puede ser más rápido:
+    benchmark_lote.py compara ambas variantes.
+
+    Args:
+        lista_data (list): Productos como diccionarios.
+        usar_numpy (bool, opcional): None = usar NumPy si está instalado.
+
+    Returns:
+        (mascara, errores): mascara[i] es True si validar_producto aceptaría
+        la fila i (array de NumPy o lista de bool); errores es una lista
+        ordenada de tuplas (indice, campo, codigo) con codigo en ERROR_FALTA,
+        ERROR_TIPO, ERROR_RANGO, ERROR_CATEGORIA o ERROR_FORMATO. Las filas
+        que no son dict se reportan como (indice, None, ERROR_TIPO).
+    """
+    if not isinstance(lista_data, list):
+        raise TypeError(f"Se esperaba una lista de productos, se recibió: {type(lista_data).__name__}")
+    np = _cargar_numpy() if usar_numpy is not False else None
+    if usar_numpy and np is None:
+        raise ImportError("usar_numpy=True pero NumPy no está instalado")
+
+    if np is not None:
+        mascara = _mascara_columnar(np, lista_data, _PLAN_PRODUCTO)
+        invalidas = np.flatnonzero(~mascara).tolist()
+    else:
+        mascara = list(map(es_producto_valido, lista_data))
+        invalidas = compress(range(len(mascara)), map(not_, mascara))
+    errores = []
+    for indice in invalidas:
+        errores.extend((indice, campo, codigo) for campo, codigo in _errores_producto(lista_data[indice]))
+    return mascara, errores